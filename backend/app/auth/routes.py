@@ -2,8 +2,8 @@ from fastapi import APIRouter, HTTPException, Depends
 from datetime import datetime, timedelta
 import uuid
 from ..models.user import UserAuth
-from ..database.connection import users_collection
-from ..security.jwt import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..database.connection import async_users_collection
+from ..security.jwt import create_access_token, get_current_user, invalidate_user_cache, ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -11,7 +11,7 @@ router = APIRouter(prefix="/api/auth", tags=["auth"])
 async def register(user_data: UserAuth):
     """Enregistrer un nouveau utilisateur"""
     # Vérifier si l'utilisateur existe déjà
-    existing_user = users_collection.find_one({
+    existing_user = await async_users_collection.find_one({
         "first_name": user_data.first_name, 
         "last_name": user_data.last_name
     })
@@ -31,7 +31,8 @@ async def register(user_data: UserAuth):
         "created_at": datetime.utcnow()
     }
     
-    users_collection.insert_one(user)
+    await async_users_collection.insert_one(user)
+    invalidate_user_cache(user_id)
     
     # Créer le token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -52,7 +53,7 @@ async def register(user_data: UserAuth):
 @router.post("/login")
 async def login(user_data: UserAuth):
     """Connexion d'un utilisateur"""
-    user = users_collection.find_one({
+    user = await async_users_collection.find_one({
         "first_name": user_data.first_name,
         "last_name": user_data.last_name
     }, {"_id": 0})
@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends
-from ..database.connection import books_collection
+import asyncio
+from fastapi import APIRouter, Depends, Response
+from ..database.connection import async_books_collection
 from ..security.jwt import get_current_user
+from ..utils.http_client import http_client
+from ..services.openlibrary_cache import openlibrary_cache
+from ..utils.fanout import StageTimer
 
 router = APIRouter(prefix="/api/authors", tags=["authors"])
 
@@ -24,7 +28,7 @@ async def get_authors(current_user: dict = Depends(get_current_user)):
         {"$sort": {"total_books": -1}}
     ]
     
-    authors_data = list(books_collection.aggregate(pipeline))
+    authors_data = await async_books_collection.aggregate(pipeline).to_list(length=None)
     
     # Nettoyer les données
     authors = []
@@ -43,15 +47,16 @@ async def get_authors(current_user: dict = Depends(get_current_user)):
     return authors
 
 @router.get("/{author_name}/books")
-async def get_author_books(author_name: str, current_user: dict = Depends(get_current_user)):
+async def get_author_books(author_name: str, response: Response, current_user: dict = Depends(get_current_user)):
     """Obtenir les livres d'un auteur spécifique depuis Wikipedia + OpenLibrary combinées"""
+    timer = StageTimer()
     
     try:
-        # 1. Récupérer les informations Wikipedia pour les œuvres principales
-        wikipedia_works = await get_wikipedia_author_works(author_name)
-        
-        # 2. Récupérer les œuvres OpenLibrary avec filtrage intelligent
-        openlibrary_works = await get_openlibrary_author_works(author_name)
+        # 1-2. Œuvres principales Wikipedia et œuvres OpenLibrary filtrées, en parallèle
+        wikipedia_works, openlibrary_works = await asyncio.gather(
+            timer.measure("wikipedia", get_wikipedia_author_works(author_name)),
+            timer.measure("openlibrary", get_openlibrary_author_works(author_name))
+        )
         
         # 3. Combiner et déduplicater les œuvres
         combined_works = combine_and_deduplicate_works(wikipedia_works, openlibrary_works)
@@ -59,6 +64,7 @@ async def get_author_books(author_name: str, current_user: dict = Depends(get_cu
         # 4. Organiser par séries et livres individuels
         organized_works = organize_author_works(combined_works)
         
+        timer.apply(response)
         return {
             "author": author_name,
             "series": organized_works["series"],
@@ -71,14 +77,15 @@ async def get_author_books(author_name: str, current_user: dict = Depends(get_cu
         
     except Exception as e:
         # Fallback vers la méthode originale (bibliothèque utilisateur)
-        return await get_author_books_from_library(author_name, current_user)
+        with timer.stage("library"):
+            result = await get_author_books_from_library(author_name, current_user)
+        timer.apply(response)
+        return result
 
 
 async def get_wikipedia_author_works(author_name: str):
     """Récupérer les œuvres principales depuis Wikipedia"""
     try:
-        import httpx
-        
         # Rechercher la page Wikipedia de l'auteur
         search_url = "https://en.wikipedia.org/w/api.php"
         search_params = {
@@ -90,33 +97,32 @@ async def get_wikipedia_author_works(author_name: str):
             "srprop": "snippet"
         }
         
-        async with httpx.AsyncClient(timeout=10) as client:
-            search_response = await client.get(search_url, params=search_params)
-            search_data = search_response.json()
-            
-            if not search_data.get("query", {}).get("search"):
-                return []
-            
-            # Récupérer le contenu de la page
-            page_title = search_data["query"]["search"][0]["title"]
-            content_params = {
-                "action": "query",
-                "format": "json",
-                "prop": "extracts",
-                "titles": page_title,
-                "exintro": False,
-                "explaintext": True,
-                "exsectionformat": "plain"
-            }
-            
-            content_response = await client.get(search_url, params=content_params)
-            content_data = content_response.json()
-            
-            # Extraire les œuvres principales du contenu
-            works = extract_works_from_wikipedia_content(content_data, author_name)
-            
-            return works
-            
+        search_response = await http_client.get(search_url, params=search_params)
+        search_data = search_response.json()
+        
+        if not search_data.get("query", {}).get("search"):
+            return []
+        
+        # Récupérer le contenu de la page
+        page_title = search_data["query"]["search"][0]["title"]
+        content_params = {
+            "action": "query",
+            "format": "json",
+            "prop": "extracts",
+            "titles": page_title,
+            "exintro": False,
+            "explaintext": True,
+            "exsectionformat": "plain"
+        }
+        
+        content_response = await http_client.get(search_url, params=content_params)
+        content_data = content_response.json()
+        
+        # Extraire les œuvres principales du contenu
+        works = extract_works_from_wikipedia_content(content_data, author_name)
+        
+        return works
+        
     except Exception as e:
         print(f"Erreur Wikipedia works: {e}")
         return []
@@ -125,13 +131,11 @@ async def get_wikipedia_author_works(author_name: str):
 async def get_openlibrary_author_works(author_name: str):
     """Récupérer les œuvres depuis OpenLibrary avec filtrage intelligent"""
     try:
-        import requests
-        
         # 1. Rechercher l'auteur
         search_url = f"https://openlibrary.org/search/authors.json"
         search_params = {"q": author_name, "limit": 1}
         
-        response = requests.get(search_url, params=search_params, timeout=10)
+        response = await openlibrary_cache.get(search_url, params=search_params, timeout=10)
         response.raise_for_status()
         search_data = response.json()
         
@@ -149,7 +153,7 @@ async def get_openlibrary_author_works(author_name: str):
         works_url = f"https://openlibrary.org{author_key}/works.json"
         works_params = {"limit": 100}  # Limiter pour éviter surcharge
         
-        works_response = requests.get(works_url, params=works_params, timeout=15)
+        works_response = await openlibrary_cache.get(works_url, params=works_params, timeout=15)
         works_response.raise_for_status()
         works_data = works_response.json()
         
@@ -370,10 +374,10 @@ def organize_author_works(works):
 
 async def get_author_books_from_library(author_name: str, current_user: dict):
     """Méthode fallback : récupérer les livres depuis la bibliothèque utilisateur"""
-    books = list(books_collection.find({
+    books = await async_books_collection.find({
         "user_id": current_user["id"],
         "author": author_name
-    }, {"_id": 0}))
+    }, {"_id": 0}).to_list(length=None)
     
     if not books:
         return {
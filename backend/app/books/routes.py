@@ -2,11 +2,16 @@ from fastapi import APIRouter, HTTPException, Depends, Query
 from datetime import datetime
 from typing import Optional
 import uuid
-import re
 from ..models.book import BookCreate, BookUpdate
-from ..database.connection import books_collection
+from ..database.connection import async_books_collection as books_collection
 from ..security.jwt import get_current_user
+from ..config import SEARCH_GROUP_BOOKS_LIMIT
+from ..utils.cache import cache
+from ..services.user_stats import user_stats_service, CONTRIBUTION_FIELDS
+from ..services.series_progress import series_progress_service
+from ..services.book_search import book_search_service
 from ..utils.validation import validate_category
+from ..utils.saga_key import with_saga_key
 from ..services.pagination import PaginatedResponse, pagination_service
 
 router = APIRouter(prefix="/api/books", tags=["books"])
@@ -20,6 +25,7 @@ async def get_books(
     offset: int = Query(0, ge=0, description="Décalage pour la pagination"),
     sort_by: str = Query("date_added", description="Champ de tri"),
     sort_order: str = Query("desc", regex="^(asc|desc)$", description="Ordre de tri"),
+    cursor: Optional[str] = Query(None, description="Curseur opaque (next_cursor) : remplace offset pour les pages profondes"),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -28,7 +34,7 @@ async def get_books(
     """
     # Si le mode série est demandé, déléguer aux séries avec pagination
     if view_mode == "series":
-        from ..series.routes import get_library_series_paginated
+        from ..library.routes import get_library_series_paginated
         return await get_library_series_paginated(
             category=category,
             limit=limit,
@@ -40,7 +46,7 @@ async def get_books(
     
     # Mode livres avec pagination optimisée
     try:
-        result = pagination_service.get_paginated_books(
+        result = await pagination_service.get_paginated_books(
             user_id=current_user["id"],
             category=category,
             status=status,
@@ -48,10 +54,13 @@ async def get_books(
             offset=offset,
             sort_by=sort_by,
             sort_order=sort_order,
-            exclude_series=True  # Exclure livres faisant partie d'une série
+            exclude_series=True,  # Exclure livres faisant partie d'une série
+            cursor=cursor
         )
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur récupération livres: {str(e)}")
 
@@ -65,6 +74,7 @@ async def get_all_books(
     offset: int = Query(0, ge=0, description="Décalage pour la pagination"),
     sort_by: str = Query("date_added", description="Champ de tri"),
     sort_order: str = Query("desc", regex="^(asc|desc)$", description="Ordre de tri"),
+    cursor: Optional[str] = Query(None, description="Curseur opaque (next_cursor) : remplace offset pour les pages profondes"),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -72,7 +82,7 @@ async def get_all_books(
     avec pagination et filtres avancés optimisés par indexes.
     """
     try:
-        result = pagination_service.get_paginated_books(
+        result = await pagination_service.get_paginated_books(
             user_id=current_user["id"],
             category=category,
             status=status,
@@ -82,10 +92,13 @@ async def get_all_books(
             offset=offset,
             sort_by=sort_by,
             sort_order=sort_order,
-            exclude_series=False  # Inclure tous les livres
+            exclude_series=False,  # Inclure tous les livres
+            cursor=cursor
         )
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur récupération livres: {str(e)}")
 
@@ -93,144 +106,34 @@ async def get_all_books(
 async def search_books_grouped(
     q: str,
     category: Optional[str] = None,
+    mode: str = Query("auto", regex="^(auto|text|regex)$", description="Moteur : index texte, regex ou automatique"),
+    limit: int = Query(20, ge=1, le=100, description="Nombre de groupes par page"),
+    offset: int = Query(0, ge=0, description="Décalage pour la pagination des groupes"),
+    books_per_group: int = Query(SEARCH_GROUP_BOOKS_LIMIT, ge=1, le=100, description="Livres renvoyés par groupe (la suite via books_url)"),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Recherche de livres avec regroupement intelligent par saga - SÉRIE FIRST
+    Recherche de livres avec regroupement intelligent par saga - SÉRIE FIRST.
+    Regroupement, comptage et tri faits par MongoDB ; groupes paginés.
     """
     if not q or len(q.strip()) < 2:
         return {"results": [], "total_books": 0, "total_sagas": 0, "search_term": q}
     
     search_term = q.strip().lower()
-    filter_dict = {"user_id": current_user["id"]}
     
-    if category:
-        filter_dict["category"] = category
-    
-    # Recherche dans tous les champs pertinents
-    search_filter = {
-        "$or": [
-            {"title": {"$regex": re.escape(search_term), "$options": "i"}},
-            {"author": {"$regex": re.escape(search_term), "$options": "i"}},
-            {"saga": {"$regex": re.escape(search_term), "$options": "i"}},
-            {"description": {"$regex": re.escape(search_term), "$options": "i"}},
-            {"genre": {"$regex": re.escape(search_term), "$options": "i"}},
-            {"publisher": {"$regex": re.escape(search_term), "$options": "i"}}
-        ]
-    }
-    
-    # Combiner les filtres
-    final_filter = {"$and": [filter_dict, search_filter]}
-    
-    # Récupérer tous les livres qui correspondent
-    matching_books = list(books_collection.find(final_filter, {"_id": 0}))
-    
-    # 🆕 AMÉLIORATION : Grouper par saga ET par auteur en privilégiant les séries
-    saga_groups = {}
-    author_groups = {}
-    isolated_books = []
-    
-    for book in matching_books:
-        saga = book.get("saga", "").strip()
-        author = book.get("author", "").strip()
-        
-        if saga:
-            # Grouper par saga
-            if saga not in saga_groups:
-                saga_groups[saga] = []
-            saga_groups[saga].append(book)
-        elif author:
-            # Grouper par auteur si pas de saga
-            if author not in author_groups:
-                author_groups[author] = []
-            author_groups[author].append(book)
-        else:
-            isolated_books.append(book)
-    
-    # Construire les résultats avec les séries en premier
-    results = []
-    
-    # 1. Ajouter les séries comme entités uniques (priorité absolue)
-    for saga_name, saga_books in saga_groups.items():
-        saga_books_sorted = sorted(saga_books, key=lambda b: b.get("volume_number", 0))
-        
-        # Calculer la progression de la série
-        total_books = len(saga_books)
-        completed_books = len([b for b in saga_books if b.get("status") == "completed"])
-        reading_books = len([b for b in saga_books if b.get("status") == "reading"])
-        
-        # Prendre les infos de base du premier livre
-        first_book = saga_books_sorted[0]
-        
-        series_entity = {
-            "id": f"series_{saga_name.replace(' ', '_').lower()}",
-            "type": "series",
-            "title": saga_name,
-            "author": first_book.get("author"),
-            "category": first_book.get("category"),
-            "description": first_book.get("description", ""),
-            "cover_url": first_book.get("cover_url", ""),
-            "genre": first_book.get("genre", ""),
-            "total_books": total_books,
-            "completed_books": completed_books,
-            "reading_books": reading_books,
-            "progress_percentage": round((completed_books / total_books) * 100) if total_books > 0 else 0,
-            "books": saga_books_sorted,
-            "date_added": min(b.get("date_added", datetime.utcnow()) for b in saga_books),
-            "last_updated": max(b.get("updated_at", b.get("date_added", datetime.utcnow())) for b in saga_books)
-        }
-        
-        results.append(series_entity)
-    
-    # 🆕 2. Ajouter les groupes d'auteurs (si plus de 1 livre par auteur)
-    for author_name, author_books in author_groups.items():
-        if len(author_books) > 1:  # Seulement si plusieurs livres du même auteur
-            author_books_sorted = sorted(author_books, key=lambda b: b.get("date_added", datetime.utcnow()))
-            
-            # Calculer la progression par auteur
-            total_books = len(author_books)
-            completed_books = len([b for b in author_books if b.get("status") == "completed"])
-            reading_books = len([b for b in author_books if b.get("status") == "reading"])
-            
-            # Prendre les infos de base du premier livre
-            first_book = author_books_sorted[0]
-            
-            author_series_entity = {
-                "id": f"author_{author_name.replace(' ', '_').lower()}",
-                "type": "author_series",
-                "title": f"Livres de {author_name}",
-                "author": author_name,
-                "category": first_book.get("category"),
-                "description": f"Collection de {total_books} livre(s) de {author_name}",
-                "cover_url": first_book.get("cover_url", ""),
-                "genre": first_book.get("genre", ""),
-                "total_books": total_books,
-                "completed_books": completed_books,
-                "reading_books": reading_books,
-                "progress_percentage": round((completed_books / total_books) * 100) if total_books > 0 else 0,
-                "books": author_books_sorted,
-                "date_added": min(b.get("date_added", datetime.utcnow()) for b in author_books),
-                "last_updated": max(b.get("updated_at", b.get("date_added", datetime.utcnow())) for b in author_books)
-            }
-            
-            results.append(author_series_entity)
-        else:
-            # Livre unique d'un auteur, ajouter comme livre isolé
-            isolated_books.extend(author_books)
-    
-    # 3. Ajouter les livres isolés
-    for book in isolated_books:
-        book["type"] = "book"
-        results.append(book)
-    
-    # Trier les résultats par date de dernière mise à jour
-    results.sort(key=lambda x: x.get("last_updated", x.get("date_added", datetime.utcnow())), reverse=True)
+    # Index texte (pertinence) ou regex pour les termes très courts
+    result = await book_search_service.search_grouped(
+        current_user["id"],
+        search_term,
+        category=category,
+        mode=mode,
+        limit=limit,
+        offset=offset,
+        books_per_group=books_per_group
+    )
     
     return {
-        "results": results,
-        "total_books": len(matching_books),
-        "total_sagas": len(saga_groups),
-        "total_author_series": len([author for author, books in author_groups.items() if len(books) > 1]),
+        **result,
         "search_term": q,
         "grouped_by_saga": True,
         "series_first": True
@@ -239,7 +142,7 @@ async def search_books_grouped(
 @router.get("/{book_id}")
 async def get_book(book_id: str, current_user: dict = Depends(get_current_user)):
     """Obtenir un livre par son ID"""
-    book = books_collection.find_one({
+    book = await books_collection.find_one({
         "id": book_id, 
         "user_id": current_user["id"]
     }, {"_id": 0})
@@ -273,7 +176,10 @@ async def create_book(book_data: BookCreate, current_user: dict = Depends(get_cu
         book["date_started"] = datetime.utcnow()
         book["date_completed"] = datetime.utcnow()
     
-    books_collection.insert_one(book)
+    await books_collection.insert_one(with_saga_key(book))
+    await user_stats_service.record_books_added(current_user["id"], [book])
+    await series_progress_service.record_books_added(current_user["id"], [book])
+    await cache.flush_user_cache(current_user["id"])
     book.pop("_id", None)
     return book
 
@@ -284,7 +190,7 @@ async def update_book(
     current_user: dict = Depends(get_current_user)
 ):
     """Mettre à jour un livre"""
-    book = books_collection.find_one({
+    book = await books_collection.find_one({
         "id": book_id, 
         "user_id": current_user["id"]
     })
@@ -307,27 +213,33 @@ async def update_book(
                 update_data["date_started"] = datetime.utcnow()
             update_data["date_completed"] = datetime.utcnow()
     
-    books_collection.update_one(
+    await books_collection.update_one(
         {"id": book_id, "user_id": current_user["id"]},
-        {"$set": update_data}
+        {"$set": with_saga_key(update_data)}
     )
     
-    updated_book = books_collection.find_one({
+    updated_book = await books_collection.find_one({
         "id": book_id, 
         "user_id": current_user["id"]
     }, {"_id": 0})
+    await user_stats_service.record_book_updated(current_user["id"], book, updated_book)
+    await series_progress_service.record_book_updated(current_user["id"], book, updated_book)
+    await cache.flush_user_cache(current_user["id"])
     
     return updated_book
 
 @router.delete("/{book_id}")
 async def delete_book(book_id: str, current_user: dict = Depends(get_current_user)):
     """Supprimer un livre"""
-    result = books_collection.delete_one({
+    deleted_book = await books_collection.find_one_and_delete({
         "id": book_id, 
         "user_id": current_user["id"]
-    })
+    }, projection=CONTRIBUTION_FIELDS)
     
-    if result.deleted_count == 0:
+    if deleted_book is None:
         raise HTTPException(status_code=404, detail="Livre non trouvé")
     
+    await user_stats_service.record_books_removed(current_user["id"], [deleted_book])
+    await series_progress_service.record_books_removed(current_user["id"], [deleted_book])
+    await cache.flush_user_cache(current_user["id"])
     return {"message": "Livre supprimé avec succès"}
\ No newline at end of file
@@ -8,11 +8,26 @@ load_dotenv()
 # Configuration MongoDB
 MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017/booktime")
 
+# Configuration du pool de connexions MongoDB (partagé par tout le processus)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "10"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000"))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primaryPreferred")
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "zstd,zlib")
+
 # Configuration JWT
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+# Cache des utilisateurs authentifiés (évite un find_one par requête)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+
 # Configuration API
 API_TITLE = "BookTime API"
 API_DESCRIPTION = "Votre bibliothèque personnelle"
@@ -38,11 +53,77 @@ OPEN_LIBRARY_BASE_URL = "https://openlibrary.org"
 OPEN_LIBRARY_SEARCH_URL = f"{OPEN_LIBRARY_BASE_URL}/search.json"
 OPEN_LIBRARY_COVERS_URL = "https://covers.openlibrary.org/b"
 
+# Client HTTP sortant partagé (Open Library, Wikipedia, Wikidata, intégrations)
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))  # secondes, par requête
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "20"))
+HTTP_MAX_KEEPALIVE_PER_HOST = int(os.getenv("HTTP_MAX_KEEPALIVE_PER_HOST", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))  # secondes
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))  # nouvelles tentatives des requêtes idempotentes
+HTTP_RETRY_BACKOFF = 0.5  # secondes, doublé à chaque tentative
+HTTP_RETRY_MAX_DELAY = 5.0  # plafond du délai, Retry-After compris
+HTTP_REQUEST_DEADLINE = float(os.getenv("HTTP_REQUEST_DEADLINE", "15"))  # secondes, toutes tentatives comprises
+HTTP_USER_AGENT = os.getenv("HTTP_USER_AGENT", "BookTime/1.0 (bibliotheque personnelle)")
+
+# Débit par fournisseur (requêtes/seconde, rafale), partagé par toutes les requêtes du processus
+HTTP_RATE_LIMITS = {
+    "openlibrary.org": (5.0, 10),
+    "covers.openlibrary.org": (5.0, 10),
+    "query.wikidata.org": (2.0, 2),  # remplace l'espacement de 0,5s de WikidataService
+    "en.wikipedia.org": (10.0, 20),
+    "fr.wikipedia.org": (10.0, 20),
+    "www.googleapis.com": (5.0, 10),
+}
+HTTP_DEFAULT_RATE_LIMIT = (10.0, 20)  # autres hôtes
+HTTP_RATE_LIMIT_MAX_WAIT = float(os.getenv("HTTP_RATE_LIMIT_MAX_WAIT", "5"))  # au-delà, échec immédiat plutôt qu'une attente
+# Coupe-circuit par hôte : ouvert après N échecs consécutifs (réseau, 429, 5xx), requête d'essai après le délai
+HTTP_BREAKER_FAILURE_THRESHOLD = int(os.getenv("HTTP_BREAKER_FAILURE_THRESHOLD", "5"))
+HTTP_BREAKER_RESET_SECONDS = float(os.getenv("HTTP_BREAKER_RESET_SECONDS", "30"))
+
+# Cache HTTP des réponses Open Library (collection openlibrary_cache, fraîcheur : CacheConfig "openlibrary")
+OPENLIBRARY_CACHE_STALE_SECONDS = int(os.getenv("OPENLIBRARY_CACHE_STALE_SECONDS", str(24 * 3600)))  # servie périmée, revalidée en arrière-plan
+OPENLIBRARY_CACHE_RETENTION_DAYS = int(os.getenv("OPENLIBRARY_CACHE_RETENTION_DAYS", "30"))  # conservée pour revalidation conditionnelle
+OPENLIBRARY_CACHE_NEGATIVE_SECONDS = 3600  # fraîcheur des 404 (ISBN, auteur inconnus)
+OPENLIBRARY_CACHE_MAX_BODY_BYTES = 4 * 1024 * 1024  # au-delà, la réponse n'est pas mise en cache
+OPENLIBRARY_FANOUT_CONCURRENCY = 5  # appels Open Library simultanés par requête (auteurs d'une œuvre...)
+
+# Cache des résultats SPARQL Wikidata (L1 mémoire borné + collection wikidata_cache partagée)
+WIKIDATA_CACHE_TTL_SECONDS = int(os.getenv("WIKIDATA_CACHE_TTL_SECONDS", str(3 * 3600)))
+WIKIDATA_CACHE_MAX_ITEMS = int(os.getenv("WIKIDATA_CACHE_MAX_ITEMS", "2000"))  # par processus
+WIKIDATA_CACHE_MAX_BYTES = int(os.getenv("WIKIDATA_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+WIKIDATA_CACHE_RETENTION_DAYS = int(os.getenv("WIKIDATA_CACHE_RETENTION_DAYS", "7"))  # servie périmée si Wikidata est injoignable
+WIKIDATA_WARMUP_CONCURRENCY = 2  # auteurs préchauffés en parallèle (débit Wikidata : HTTP_RATE_LIMITS)
+
 # Configuration de pagination
 DEFAULT_LIMIT = 10
 MAX_LIMIT = 100
 DEFAULT_OFFSET = 0
 
+# Insertions en masse (complétion automatique des séries)
+BULK_INSERT_CHUNK_SIZE = 500
+SAGA_GAPS_MAX_VOLUME = 2000  # numéro de tome maximal pris en compte par le rapport des tomes manquants
+
+# Configuration de la recherche (index texte, repli regex pour les termes courts)
+SEARCH_MIN_TEXT_LENGTH = int(os.getenv("SEARCH_MIN_TEXT_LENGTH", "3"))
+SEARCH_TEXT_INDEX_NAME = "books_user_fulltext_idx"
+SEARCH_GROUP_BOOKS_LIMIT = int(os.getenv("SEARCH_GROUP_BOOKS_LIMIT", "10"))  # livres renvoyés par groupe
+
+# Configuration du catalogue des séries (base récoltée, rechargée si le fichier change)
+SERIES_DATABASE_PATH = os.getenv("SERIES_DATABASE_PATH", "/app/backend/data/extended_series_database.json")
+SERIES_CATALOG_CHECK_INTERVAL = float(os.getenv("SERIES_CATALOG_CHECK_INTERVAL", "5"))  # secondes
+SERIES_DETECT_BATCH_MAX = 10000  # livres par appel à /api/series/detect/batch
+SERIES_BULK_VOLUMES_MAX = 2000  # tomes par appel à /api/library/series/{id}/volumes
+SERIES_AUTO_ASSIGN_MIN_CONFIDENCE = 80  # rattachement automatique à l'import (nom ou variation + auteur)
+
+# File des travaux d'enrichissement d'images (collection enrichment_jobs, scripts/enrichment_worker.py)
+ENRICHMENT_JOB_CHUNK_SIZE = int(os.getenv("ENRICHMENT_JOB_CHUNK_SIZE", "50"))  # séries entre deux points de reprise
+ENRICHMENT_ITEM_CONCURRENCY = int(os.getenv("ENRICHMENT_ITEM_CONCURRENCY", "5"))  # requêtes Open Library simultanées par travail
+ENRICHMENT_MAX_RUNNING_JOBS = int(os.getenv("ENRICHMENT_MAX_RUNNING_JOBS", "2"))  # travaux en cours, tous workers confondus
+ENRICHMENT_JOB_LEASE_SECONDS = int(os.getenv("ENRICHMENT_JOB_LEASE_SECONDS", "300"))  # sans point de reprise, le travail est repris ailleurs
+ENRICHMENT_JOB_MAX_ATTEMPTS = 3
+ENRICHMENT_WORKER_POLL_INTERVAL = float(os.getenv("ENRICHMENT_WORKER_POLL_INTERVAL", "2"))  # secondes
+ENRICHMENT_SERIES_LIST_MAX = 1000  # séries par appel à /api/series/enrich/images
+
 # Configuration des catégories
 VALID_CATEGORIES = ["roman", "bd", "manga"]
 VALID_STATUSES = ["to_read", "reading", "completed"]
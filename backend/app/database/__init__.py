@@ -1,17 +1,33 @@
 from .connection import (
+    database,
+    create_mongo_client,
     client,
     db,
     users_collection,
     books_collection,
     authors_collection,
-    series_library_collection
+    series_library_collection,
+    async_client,
+    async_db,
+    async_users_collection,
+    async_books_collection,
+    async_authors_collection,
+    async_series_library_collection
 )
 
 __all__ = [
+    "database",
+    "create_mongo_client",
     "client",
-    "db", 
+    "db",
     "users_collection",
     "books_collection",
     "authors_collection",
-    "series_library_collection"
-]
\ No newline at end of file
+    "series_library_collection",
+    "async_client",
+    "async_db",
+    "async_users_collection",
+    "async_books_collection",
+    "async_authors_collection",
+    "async_series_library_collection"
+]
@@ -1,18 +1,132 @@
+# Connexion MongoDB centralisée pour BOOKTIME
+"""
+Fabrique unique des clients MongoDB : un pool synchrone (pymongo) et un pool
+asynchrone (Motor) par processus, paramétrés depuis app/config.py.
+Tous les modules (routes, services, MongoOptimizer) réutilisent ces pools.
+"""
+
 from pymongo import MongoClient
-import os
-from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from ..config import (
+    MONGO_URL,
+    DATABASE_NAME,
+    COLLECTIONS,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_MAX_IDLE_TIME_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    MONGO_READ_PREFERENCE,
+    MONGO_COMPRESSORS
+)
+from .pool_metrics import PoolMetricsListener
+
+
+def create_mongo_client(listener: PoolMetricsListener, asynchronous: bool = False):
+    """Créer un client MongoDB avec les options de pool configurées"""
+    options = {
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": MONGO_MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+        "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "readPreference": MONGO_READ_PREFERENCE,
+        "event_listeners": [listener]
+    }
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+
+    client_class = AsyncIOMotorClient if asynchronous else MongoClient
+    return client_class(MONGO_URL, **options)
+
+
+class Database:
+    _instance = None
+    _client = None
+    _db = None
+    _async_client = None
+    _async_db = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Database, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        """Initialise les pools MongoDB (synchrone et asynchrone)"""
+        self.sync_pool_metrics = PoolMetricsListener("sync")
+        self.async_pool_metrics = PoolMetricsListener("async")
+
+        # Client synchrone : scripts, services et tâches hors boucle d'événements
+        self._client = create_mongo_client(self.sync_pool_metrics)
+        self._db = self._client[DATABASE_NAME]
 
-load_dotenv()
+        # Client asynchrone (Motor) pour les routes `async def`
+        self._async_client = create_mongo_client(self.async_pool_metrics, asynchronous=True)
+        self._async_db = self._async_client[DATABASE_NAME]
 
-# Configuration MongoDB
-MONGO_URL = os.getenv("MONGO_URL", "mongodb://localhost:27017/booktime")
+    @property
+    def client(self):
+        """Retourne le client MongoDB"""
+        return self._client
 
-# Client MongoDB
-client = MongoClient(MONGO_URL)
-db = client.booktime
+    @property
+    def db(self):
+        """Retourne la base de données"""
+        return self._db
+
+    @property
+    def async_client(self):
+        """Retourne le client MongoDB asynchrone (Motor)"""
+        return self._async_client
+
+    @property
+    def async_db(self):
+        """Retourne la base de données asynchrone"""
+        return self._async_db
+
+    def pool_stats(self):
+        """Métriques des pools de connexions (exposées sur /health)"""
+        return {
+            "sync": self.sync_pool_metrics.snapshot(),
+            "async": self.async_pool_metrics.snapshot(),
+            "config": {
+                "max_pool_size": MONGO_MAX_POOL_SIZE,
+                "min_pool_size": MONGO_MIN_POOL_SIZE,
+                "read_preference": MONGO_READ_PREFERENCE,
+                "compressors": MONGO_COMPRESSORS
+            }
+        }
+
+    def close(self):
+        """Ferme les connexions MongoDB"""
+        if self._client:
+            self._client.close()
+        if self._async_client:
+            self._async_client.close()
+
+
+# Instance globale de la base de données
+database = Database()
+
+client = database.client
+db = database.db
+async_client = database.async_client
+async_db = database.async_db
 
 # Collections
-users_collection = db.users
-books_collection = db.books
-authors_collection = db.authors
-series_library_collection = db.series_library
\ No newline at end of file
+users_collection = db[COLLECTIONS["users"]]
+books_collection = db[COLLECTIONS["books"]]
+authors_collection = db[COLLECTIONS["authors"]]
+series_library_collection = db[COLLECTIONS["series_library"]]
+
+# Collections asynchrones
+async_users_collection = async_db[COLLECTIONS["users"]]
+async_books_collection = async_db[COLLECTIONS["books"]]
+async_authors_collection = async_db[COLLECTIONS["authors"]]
+async_series_library_collection = async_db[COLLECTIONS["series_library"]]
@@ -7,20 +7,19 @@ Ce module contient les optimisations de performance pour MongoDB :
 - Audit complet des performances
 """
 
-from pymongo import MongoClient, ASCENDING, DESCENDING, TEXT
+from pymongo import ASCENDING, DESCENDING, TEXT
 import time
-import os
 from datetime import datetime
 from typing import Dict, List, Any, Optional
-from dotenv import load_dotenv
-
-load_dotenv()
+from .connection import client, db
+from ..config import SEARCH_TEXT_INDEX_NAME
+from ..services.book_search import TEXT_INDEX_WEIGHTS
 
 class MongoOptimizer:
     def __init__(self):
-        self.mongo_url = os.getenv("MONGO_URL", "mongodb://localhost:27017/booktime")
-        self.client = MongoClient(self.mongo_url)
-        self.db = self.client.booktime
+        # Réutilise le pool partagé au lieu d'ouvrir un nouveau MongoClient
+        self.client = client
+        self.db = db
         
         # Collections principales
         self.users_collection = self.db.users
@@ -105,6 +104,15 @@ class MongoOptimizer:
             books_indexes.append("user_date_idx")
             print("  ✅ user_date_idx créé")
             
+            # Index pour la pagination par curseur (tri stable date_added puis id)
+            self.books_collection.create_index([
+                ("user_id", ASCENDING),
+                ("date_added", DESCENDING),
+                ("id", DESCENDING)
+            ], name="user_date_added_id_idx")
+            books_indexes.append("user_date_added_id_idx")
+            print("  ✅ user_date_added_id_idx créé")
+            
             # Index pour recherche par auteur
             self.books_collection.create_index([
                 ("user_id", ASCENDING),
@@ -113,24 +121,37 @@ class MongoOptimizer:
             books_indexes.append("user_author_idx")
             print("  ✅ user_author_idx créé")
             
-            # Index pour recherche par saga
+            # Index pour recherche par saga et tomes existants (distinct couvert).
+            # Les lectures par saga passent par saga_key (voir app/utils/saga_key.py) :
+            # les anciens index sur saga / volume sont remplacés.
+            existing_indexes = self.books_collection.index_information()
+            for name in ("user_saga_volume_idx", "user_saga_volume_index"):
+                if name in existing_indexes:
+                    self.books_collection.drop_index(name)
+                    print(f"  🔁 Ancien index {name} supprimé")
             self.books_collection.create_index([
                 ("user_id", ASCENDING),
-                ("saga", ASCENDING),
-                ("volume", ASCENDING)
-            ], name="user_saga_volume_idx")
-            books_indexes.append("user_saga_volume_idx")
-            print("  ✅ user_saga_volume_idx créé")
+                ("saga_key", ASCENDING),
+                ("volume_number", ASCENDING)
+            ], name="user_saga_key_volume_index")
+            books_indexes.append("user_saga_key_volume_index")
+            print("  ✅ user_saga_key_volume_index créé")
             
-            # Index textuel pour recherche full-text
-            self.books_collection.create_index([
-                ("title", TEXT),
-                ("author", TEXT),
-                ("description", TEXT),
-                ("saga", TEXT)
-            ], name="books_fulltext_idx")
-            books_indexes.append("books_fulltext_idx")
-            print("  ✅ books_fulltext_idx créé")
+            # Index textuel pour la recherche (/api/books/search-grouped) :
+            # préfixé par user_id, pondéré, sans racinisation (titres multilingues).
+            # Un seul index texte par collection : les anciennes définitions sont remplacées.
+            for name, info in self.books_collection.index_information().items():
+                if name != SEARCH_TEXT_INDEX_NAME and any(kind == TEXT for _, kind in info["key"]):
+                    self.books_collection.drop_index(name)
+                    print(f"  🔁 Ancien index texte {name} supprimé")
+            self.books_collection.create_index(
+                [("user_id", ASCENDING)] + [(field, TEXT) for field in TEXT_INDEX_WEIGHTS],
+                weights=TEXT_INDEX_WEIGHTS,
+                default_language="none",
+                name=SEARCH_TEXT_INDEX_NAME
+            )
+            books_indexes.append(SEARCH_TEXT_INDEX_NAME)
+            print(f"  ✅ {SEARCH_TEXT_INDEX_NAME} créé")
             
             # Index pour statistiques (performance critiques)
             self.books_collection.create_index([
@@ -175,11 +196,124 @@ class MongoOptimizer:
         except Exception as e:
             print(f"  ⚠️  Erreur series_library indexes: {e}")
         
+        # === INDEXES USER_STATS COLLECTION ===
+        print("\n📈 User Stats Collection:")
+        user_stats_indexes = []
+        try:
+            # Un document de statistiques matérialisées par utilisateur
+            self.db.user_stats.create_index([
+                ("user_id", ASCENDING)
+            ], unique=True, name="user_stats_user_idx")
+            user_stats_indexes.append("user_stats_user_idx")
+            print("  ✅ user_stats_user_idx créé")
+            
+        except Exception as e:
+            print(f"  ⚠️  Erreur user_stats indexes: {e}")
+        
+        # === INDEXES SERIES_PROGRESS COLLECTION ===
+        print("\n📚 Series Progress Collection:")
+        series_progress_indexes = []
+        try:
+            # Un document de progression par (utilisateur, saga)
+            self.db.series_progress.create_index([
+                ("user_id", ASCENDING),
+                ("saga_key", ASCENDING)
+            ], unique=True, name="series_progress_user_saga_idx")
+            series_progress_indexes.append("series_progress_user_saga_idx")
+            print("  ✅ series_progress_user_saga_idx créé")
+            
+            # Cartes séries triées par dernière mise à jour
+            self.db.series_progress.create_index([
+                ("user_id", ASCENDING),
+                ("last_updated", DESCENDING)
+            ], name="series_progress_user_updated_idx")
+            series_progress_indexes.append("series_progress_user_updated_idx")
+            print("  ✅ series_progress_user_updated_idx créé")
+            
+            # Marqueur de matérialisation, un par utilisateur
+            self.db.series_progress_users.create_index([
+                ("user_id", ASCENDING)
+            ], unique=True, name="series_progress_users_user_idx")
+            series_progress_indexes.append("series_progress_users_user_idx")
+            print("  ✅ series_progress_users_user_idx créé")
+            
+        except Exception as e:
+            print(f"  ⚠️  Erreur series_progress indexes: {e}")
+        
+        # === INDEXES ENRICHMENT_JOBS COLLECTION ===
+        print("\n🖼️ Enrichment Jobs Collection:")
+        enrichment_jobs_indexes = []
+        try:
+            # Réservation du plus ancien travail disponible par les workers
+            self.db.enrichment_jobs.create_index([
+                ("status", ASCENDING),
+                ("created_at", ASCENDING)
+            ], name="enrichment_jobs_status_created_idx")
+            enrichment_jobs_indexes.append("enrichment_jobs_status_created_idx")
+            print("  ✅ enrichment_jobs_status_created_idx créé")
+            
+            # Suivi des travaux par utilisateur
+            self.db.enrichment_jobs.create_index([
+                ("user_id", ASCENDING),
+                ("created_at", DESCENDING)
+            ], name="enrichment_jobs_user_created_idx")
+            enrichment_jobs_indexes.append("enrichment_jobs_user_created_idx")
+            print("  ✅ enrichment_jobs_user_created_idx créé")
+            
+            self.db.enrichment_jobs.create_index("id", unique=True, name="enrichment_jobs_id_idx")
+            enrichment_jobs_indexes.append("enrichment_jobs_id_idx")
+            print("  ✅ enrichment_jobs_id_idx créé")
+            
+            # Un seul travail actif par type exclusif (enrichissement de la base)
+            self.db.enrichment_jobs.create_index(
+                "exclusive_key", unique=True,
+                partialFilterExpression={"exclusive_key": {"$exists": True}},
+                name="enrichment_jobs_exclusive_idx"
+            )
+            enrichment_jobs_indexes.append("enrichment_jobs_exclusive_idx")
+            print("  ✅ enrichment_jobs_exclusive_idx créé")
+            
+        except Exception as e:
+            print(f"  ⚠️  Erreur enrichment_jobs indexes: {e}")
+        
+        # === INDEXES OPENLIBRARY_CACHE COLLECTION ===
+        print("\n🌐 Open Library Cache Collection:")
+        openlibrary_cache_indexes = []
+        try:
+            # Purge automatique des réponses après la durée de conservation
+            self.db.openlibrary_cache.create_index(
+                "purge_at", expireAfterSeconds=0, name="openlibrary_cache_purge_ttl"
+            )
+            openlibrary_cache_indexes.append("openlibrary_cache_purge_ttl")
+            print("  ✅ openlibrary_cache_purge_ttl créé")
+            
+        except Exception as e:
+            print(f"  ⚠️  Erreur openlibrary_cache indexes: {e}")
+        
+        # === INDEXES WIKIDATA_CACHE COLLECTION ===
+        print("\n🧭 Wikidata Cache Collection:")
+        wikidata_cache_indexes = []
+        try:
+            # Purge automatique des résultats après la durée de conservation
+            self.db.wikidata_cache.create_index(
+                "purge_at", expireAfterSeconds=0, name="wikidata_cache_purge_ttl"
+            )
+            wikidata_cache_indexes.append("wikidata_cache_purge_ttl")
+            print("  ✅ wikidata_cache_purge_ttl créé")
+            
+        except Exception as e:
+            print(f"  ⚠️  Erreur wikidata_cache indexes: {e}")
+        
         indexes_created = {
             'users': users_indexes,
             'books': books_indexes,
             'authors': authors_indexes,
-            'series_library': series_indexes
+            'series_library': series_indexes,
+            'user_stats': user_stats_indexes,
+            'series_progress': series_progress_indexes,
+            'enrichment_jobs': enrichment_jobs_indexes,
+            'openlibrary_cache': openlibrary_cache_indexes,
+            'wikidata_cache': wikidata_cache_indexes
         }
         
         return indexes_created
@@ -294,7 +428,7 @@ class MongoOptimizer:
                 "name": "Livres d'une saga",
                 "query": lambda: list(self.books_collection.find({
                     "user_id": test_user_id,
-                    "saga": "Harry Potter"
+                    "saga_key": "harry potter"
                 }).limit(10))
             },
             # Recherche par auteur (fréquent)
@@ -0,0 +1,117 @@
+# Métriques des pools de connexions MongoDB pour BOOKTIME
+"""
+Listener pymongo qui suit, pour chaque pool (client + serveur) :
+- les connexions ouvertes et actuellement empruntées (checked-out)
+- le nombre d'emprunts, d'échecs d'emprunt et de purges du pool
+- le temps d'attente dans la file (moyenne et maximum)
+
+Les métriques sont exposées sur /health.
+"""
+
+import threading
+import time
+from typing import Dict, Any
+from pymongo import monitoring
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Collecte les métriques d'un client MongoDB (sync ou Motor)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._pools: Dict[str, Dict[str, Any]] = {}
+
+    def _pool(self, address) -> Dict[str, Any]:
+        key = f"{address[0]}:{address[1]}"
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = {
+                "open_connections": 0,
+                "checked_out": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "wait_time_total_ms": 0.0,
+                "wait_time_max_ms": 0.0,
+                "cleared": 0
+            }
+        return pool
+
+    def _record_wait(self, pool: Dict[str, Any]):
+        started = getattr(self._local, "checkout_started", None)
+        if started is None:
+            return
+        self._local.checkout_started = None
+        waited = (time.perf_counter() - started) * 1000
+        pool["wait_time_total_ms"] += waited
+        pool["wait_time_max_ms"] = max(pool["wait_time_max_ms"], waited)
+
+    # Événements du pool
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._pool(event.address)["cleared"] += 1
+
+    def pool_closed(self, event):
+        with self._lock:
+            self._pools.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    # Événements des connexions
+
+    def connection_created(self, event):
+        with self._lock:
+            self._pool(event.address)["open_connections"] += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["open_connections"] = max(0, pool["open_connections"] - 1)
+
+    def connection_check_out_started(self, event):
+        self._local.checkout_started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checkout_failures"] += 1
+            self._record_wait(pool)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checked_out"] += 1
+            pool["checkouts"] += 1
+            self._record_wait(pool)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checked_out"] = max(0, pool["checked_out"] - 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Photo des métriques de chaque pool de ce client"""
+        with self._lock:
+            pools = {}
+            for address, pool in self._pools.items():
+                checkouts = pool["checkouts"]
+                pools[address] = {
+                    "open_connections": pool["open_connections"],
+                    "checked_out": pool["checked_out"],
+                    "checkouts": checkouts,
+                    "checkout_failures": pool["checkout_failures"],
+                    "cleared": pool["cleared"],
+                    "wait_time_avg_ms": round(pool["wait_time_total_ms"] / checkouts, 3) if checkouts else 0.0,
+                    "wait_time_max_ms": round(pool["wait_time_max_ms"], 3)
+                }
+            return pools
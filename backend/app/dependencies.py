@@ -4,8 +4,7 @@ from datetime import datetime, timedelta
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from .config import SECRET_KEY, ALGORITHM
-from .database import users_collection
-from .models.user import UserResponse
+from .security.jwt import get_current_user
 
 # Security
 security = HTTPBearer()
@@ -46,20 +45,8 @@ def verify_token(token: str):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Récupère l'utilisateur actuel depuis le token"""
-    token = credentials.credentials
-    user_id = verify_token(token)
-    
-    # Récupérer l'utilisateur dans la base de données
-    user = users_collection.find_one({"id": user_id})
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    
-    return UserResponse(**user)
+# `get_current_user` est réexporté depuis security.jwt : un seul chemin
+# d'authentification, avec le cache LRU des utilisateurs.
 
 def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Récupère l'ID de l'utilisateur actuel (version légère)"""
@@ -85,6 +85,7 @@ async def import_user_data(
     skip_duplicates: bool = Form(True, description="Ignorer les doublons"),
     update_existing: bool = Form(False, description="Mettre à jour les livres existants"),
     dry_run: bool = Form(False, description="Simulation sans import réel"),
+    detect_series: bool = Form(False, description="Renseigner saga et tome des livres reconnus"),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -95,6 +96,7 @@ async def import_user_data(
         skip_duplicates: Ignorer les livres en doublon
         update_existing: Mettre à jour les livres existants
         dry_run: Mode simulation pour prévisualiser l'import
+        detect_series: Rattacher automatiquement les livres aux séries connues
         current_user: Utilisateur connecté
         
     Returns:
@@ -110,7 +112,8 @@ async def import_user_data(
         import_options = {
             'skip_duplicates': skip_duplicates,
             'update_existing': update_existing,
-            'dry_run': dry_run
+            'dry_run': dry_run,
+            'detect_series': detect_series
         }
         
         # Effectuer l'import
@@ -137,7 +140,9 @@ async def import_user_data(
                     {
                         "title": book.get("title"),
                         "author": book.get("author"),
-                        "category": book.get("category")
+                        "category": book.get("category"),
+                        "saga": book.get("saga"),
+                        "volume_number": book.get("volume_number")
                     }
                     for book in import_result.imported_books[:20]  # Limiter l'affichage
                 ]
@@ -18,6 +18,12 @@ import pandas as pd
 import uuid
 
 from ..database.connection import client
+from ..services.stats_service import library_stats_service
+from ..utils.cache import cache
+from ..services.user_stats import user_stats_service
+from ..services.series_progress import series_progress_service
+from ..services.series_catalog import series_catalog
+from ..utils.saga_key import with_saga_key
 from ..models.user import User
 
 # Configuration du logging
@@ -481,6 +487,11 @@ class ExportImportService:
         # Livres à ignorer (doublons)
         duplicate_titles = {dup['import_book']['title'] for dup in duplicates}
         
+        # Rattachement optionnel aux séries connues (un passage d'automate par livre)
+        if options.get('detect_series'):
+            assigned = series_catalog.assign_series(books)
+            logger.info(f"📚 {assigned} livre(s) rattaché(s) à une série")
+        
         for book in books:
             try:
                 # Ignorer les doublons si demandé
@@ -493,7 +504,7 @@ class ExportImportService:
                 book['_id'] = str(uuid.uuid4())
                 
                 # Insérer en base
-                result = self.db.books.insert_one(book)
+                result = self.db.books.insert_one(with_saga_key(book))
                 if result.inserted_id:
                     imported_books.append(book)
                 else:
@@ -502,6 +513,11 @@ class ExportImportService:
             except Exception as e:
                 errors.append(f"Erreur {book['title']}: {str(e)}")
         
+        if imported_books:
+            await user_stats_service.record_books_added(user_id, imported_books)
+            await series_progress_service.record_books_added(user_id, imported_books)
+            await cache.flush_user_cache(user_id)
+        
         return ImportResult(
             success=len(errors) == 0,
             total_processed=len(books),
@@ -616,57 +632,23 @@ class ExportImportService:
     
     async def _calculate_export_stats(self, user_id: str) -> Dict:
         """Calcule les statistiques d'export"""
-        books = list(self.db.books.find({"user_id": user_id}))
+        library_stats = await library_stats_service.get_user_stats(user_id)
         
-        total_books = len(books)
+        total_books = library_stats['total_books']
         if total_books == 0:
             return {}
         
-        stats = {
+        return {
             'total_books': total_books,
-            'by_category': {},
-            'by_status': {},
-            'by_rating': {},
+            'by_category': library_stats['by_category'],
+            'by_status': library_stats['by_status'],
+            'by_rating': library_stats['by_rating'],
             'reading_stats': {
-                'total_pages_read': 0,
-                'average_rating': 0,
-                'completion_rate': 0
+                'total_pages_read': library_stats['total_pages_read'],
+                'average_rating': library_stats['average_rating'],
+                'completion_rate': library_stats['completed_books'] / total_books
             }
         }
-        
-        # Analyser les livres
-        ratings = []
-        completed_books = 0
-        total_pages = 0
-        
-        for book in books:
-            # Par catégorie
-            category = book.get('category', 'unknown')
-            stats['by_category'][category] = stats['by_category'].get(category, 0) + 1
-            
-            # Par statut
-            status = book.get('status', 'unknown')
-            stats['by_status'][status] = stats['by_status'].get(status, 0) + 1
-            
-            # Par note
-            rating = book.get('rating', 0) or 0
-            if rating and rating > 0:
-                ratings.append(rating)
-                stats['by_rating'][str(rating)] = stats['by_rating'].get(str(rating), 0) + 1
-            
-            # Stats de lecture
-            if status == 'completed':
-                completed_books += 1
-                pages = book.get('total_pages', 0) or 0
-                if pages and pages > 0:
-                    total_pages += pages
-        
-        # Calculer les moyennes
-        stats['reading_stats']['completion_rate'] = completed_books / total_books
-        stats['reading_stats']['average_rating'] = sum(ratings) / len(ratings) if ratings else 0
-        stats['reading_stats']['total_pages_read'] = total_pages
-        
-        return stats
     
     async def _get_reading_progress(self, user_id: str) -> List[Dict]:
         """Récupère la progression de lecture détaillée"""
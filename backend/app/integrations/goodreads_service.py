@@ -3,7 +3,6 @@ PHASE 3.5 - Service Goodreads Integration
 Service pour intégration avec Goodreads et synchronisation
 """
 import asyncio
-import aiohttp
 from typing import Dict, List, Optional
 from datetime import datetime
 import logging
@@ -15,14 +14,7 @@ class GoodreadsService:
     
     def __init__(self):
         self.base_url = "https://www.goodreads.com"
-        self.session = None
         
-    async def get_session(self):
-        """Obtenir une session HTTP"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-        return self.session
-    
     async def parse_goodreads_export(self, csv_content: str) -> List[Dict]:
         """Parse un export CSV de Goodreads"""
         try:
@@ -128,12 +120,6 @@ class GoodreadsService:
             return 'completed'
         else:
             return 'to_read'
-    
-    async def close(self):
-        """Fermer la session HTTP"""
-        if self.session:
-            await self.session.close()
-            self.session = None
 
 # Instance globale
 goodreads_service = GoodreadsService()
\ No newline at end of file
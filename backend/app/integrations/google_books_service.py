@@ -3,10 +3,10 @@ PHASE 3.5 - Service Google Books Integration
 Service pour intégration avec Google Books API
 """
 import asyncio
-import aiohttp
 from typing import Dict, List, Optional
 from datetime import datetime
 import logging
+from ..utils.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -15,19 +15,10 @@ class GoogleBooksService:
     
     def __init__(self):
         self.base_url = "https://www.googleapis.com/books/v1"
-        self.session = None
         
-    async def get_session(self):
-        """Obtenir une session HTTP"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-        return self.session
-    
     async def search_books(self, query: str, max_results: int = 20) -> List[Dict]:
         """Rechercher des livres sur Google Books"""
         try:
-            session = await self.get_session()
-            
             params = {
                 'q': query,
                 'maxResults': min(max_results, 40),
@@ -35,22 +26,22 @@ class GoogleBooksService:
                 'langRestrict': 'fr'
             }
             
-            async with session.get(f"{self.base_url}/volumes", params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    books = []
-                    
-                    for item in data.get('items', []):
-                        book = await self._parse_google_book(item)
-                        if book:
-                            books.append(book)
-                    
-                    logger.info(f"Found {len(books)} books from Google Books for query: {query}")
-                    return books
-                else:
-                    logger.error(f"Google Books API error: {response.status}")
-                    return []
-                    
+            response = await http_client.get(f"{self.base_url}/volumes", params=params)
+            if response.status_code == 200:
+                data = response.json()
+                books = []
+                
+                for item in data.get('items', []):
+                    book = await self._parse_google_book(item)
+                    if book:
+                        books.append(book)
+                
+                logger.info(f"Found {len(books)} books from Google Books for query: {query}")
+                return books
+            else:
+                logger.error(f"Google Books API error: {response.status_code}")
+                return []
+                
         except Exception as e:
             logger.error(f"Error searching Google Books: {str(e)}")
             return []
@@ -58,16 +49,14 @@ class GoogleBooksService:
     async def get_book_details(self, volume_id: str) -> Optional[Dict]:
         """Récupérer les détails d'un livre par son ID Google Books"""
         try:
-            session = await self.get_session()
-            
-            async with session.get(f"{self.base_url}/volumes/{volume_id}") as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return await self._parse_google_book(data)
-                else:
-                    logger.error(f"Google Books API error for volume {volume_id}: {response.status}")
-                    return None
-                    
+            response = await http_client.get(f"{self.base_url}/volumes/{volume_id}")
+            if response.status_code == 200:
+                data = response.json()
+                return await self._parse_google_book(data)
+            else:
+                logger.error(f"Google Books API error for volume {volume_id}: {response.status_code}")
+                return None
+                
         except Exception as e:
             logger.error(f"Error getting book details from Google Books: {str(e)}")
             return None
@@ -166,12 +155,6 @@ class GoogleBooksService:
             return 0
         except:
             return 0
-    
-    async def close(self):
-        """Fermer la session HTTP"""
-        if self.session:
-            await self.session.close()
-            self.session = None
 
 # Instance globale
 google_books_service = GoogleBooksService()
\ No newline at end of file
@@ -3,11 +3,11 @@ PHASE 3.5 - Service LibraryThing Integration
 Service pour intégration avec LibraryThing
 """
 import asyncio
-import aiohttp
 from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 import xml.etree.ElementTree as ET
+from ..utils.http_client import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -16,19 +16,10 @@ class LibraryThingService:
     
     def __init__(self):
         self.base_url = "http://www.librarything.com/services"
-        self.session = None
         
-    async def get_session(self):
-        """Obtenir une session HTTP"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
-        return self.session
-    
     async def get_book_recommendations(self, isbn: str) -> List[Dict]:
         """Récupérer les recommandations LibraryThing pour un livre"""
         try:
-            session = await self.get_session()
-            
             # LibraryThing API pour recommandations
             url = f"{self.base_url}/rest/1.1/"
             params = {
@@ -38,14 +29,14 @@ class LibraryThingService:
                 'max': 20
             }
             
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    return await self._parse_recommendations_xml(content)
-                else:
-                    logger.error(f"LibraryThing API error: {response.status}")
-                    return []
-                    
+            response = await http_client.get(url, params=params)
+            if response.status_code == 200:
+                content = response.text
+                return await self._parse_recommendations_xml(content)
+            else:
+                logger.error(f"LibraryThing API error: {response.status_code}")
+                return []
+                
         except Exception as e:
             logger.error(f"Error getting LibraryThing recommendations: {str(e)}")
             return []
@@ -76,21 +67,19 @@ class LibraryThingService:
     async def get_book_tags(self, isbn: str) -> List[str]:
         """Récupérer les tags LibraryThing pour un livre"""
         try:
-            session = await self.get_session()
-            
             url = f"{self.base_url}/rest/1.1/"
             params = {
                 'method': 'librarything.ck.gettags',
                 'isbn': isbn
             }
             
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    content = await response.text()
-                    return await self._parse_tags_xml(content)
-                else:
-                    return []
-                    
+            response = await http_client.get(url, params=params)
+            if response.status_code == 200:
+                content = response.text
+                return await self._parse_tags_xml(content)
+            else:
+                return []
+                
         except Exception as e:
             logger.error(f"Error getting LibraryThing tags: {str(e)}")
             return []
@@ -111,12 +100,6 @@ class LibraryThingService:
         except Exception as e:
             logger.error(f"Error parsing LibraryThing tags: {str(e)}")
             return []
-    
-    async def close(self):
-        """Fermer la session HTTP"""
-        if self.session:
-            await self.session.close()
-            self.session = None
 
 # Instance globale
 librarything_service = LibraryThingService()
\ No newline at end of file
@@ -8,6 +8,7 @@ from datetime import datetime
 import logging
 
 from ..security.jwt import get_current_user
+from ..services.series_catalog import series_catalog
 from .goodreads_service import goodreads_service
 from .google_books_service import google_books_service
 from .librarything_service import librarything_service
@@ -21,6 +22,7 @@ router = APIRouter(prefix="/api/integrations", tags=["external_integrations"])
 @router.post("/goodreads/import")
 async def import_goodreads_csv(
     file: UploadFile = File(...),
+    detect_series: bool = Query(False, description="Renseigner saga et tome des livres reconnus"),
     current_user: dict = Depends(get_current_user)
 ):
     """
@@ -28,6 +30,7 @@ async def import_goodreads_csv(
     
     Args:
         file: Fichier CSV d'export Goodreads
+        detect_series: Rattacher automatiquement les livres aux séries connues
         current_user: Utilisateur connecté
         
     Returns:
@@ -51,10 +54,14 @@ async def import_goodreads_csv(
         # Convertir au format BookTime
         booktime_books = await goodreads_service.convert_to_booktime_format(goodreads_books)
         
+        # Rattachement optionnel aux séries (titres Goodreads "Titre (Saga, #n)")
+        series_assigned = series_catalog.assign_series(booktime_books) if detect_series else 0
+        
         # Statistiques
         stats = {
             'total_books': len(goodreads_books),
             'converted_books': len(booktime_books),
+            'series_assigned': series_assigned,
             'categories': {},
             'statuses': {}
         }
@@ -1,101 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pymongo import ReturnDocument
 from typing import Optional
-from ..database.connection import books_collection, series_library_collection
+from ..database.connection import async_series_library_collection as series_library_collection
 from ..security.jwt import get_current_user
-from ..models.series import SeriesLibraryCreate, VolumeData
+from ..utils.cache import cache
+from ..models.series import SeriesLibraryCreate, VolumeData, VolumeStatusBulkUpdate
+from ..services.pagination import PaginatedResponse, pagination_service
+from ..services.series_progress import series_progress_service
+from ..services.series_library import series_library_service, expand_volume_numbers
 
 router = APIRouter(prefix="/api/library", tags=["library"])
 
-@router.get("/series")
+@router.get("/series", response_model=PaginatedResponse)
 async def get_library_series(
     category: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100, description="Nombre de séries par page"),
+    offset: int = Query(0, ge=0, description="Décalage pour la pagination"),
+    sort_by: str = Query("last_updated", description="Tri : last_updated, date_added, name ou total_books"),
+    sort_order: str = Query("desc", regex="^(asc|desc)$", description="Ordre de tri"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Récupérer les séries de la bibliothèque comme entités uniques.
-    Chaque série est représentée comme UNE carte avec indicateur de progression.
+    Chaque série est représentée comme UNE carte avec indicateur de progression ;
+    progression et couverture sont calculées par MongoDB, les tomes se chargent
+    à la demande via `books_url`.
     """
-    filter_dict = {"user_id": current_user["id"]}
-    
-    if category:
-        filter_dict["category"] = category
-    
-    # Grouper les livres par saga avec informations de progression
-    pipeline = [
-        {"$match": {**filter_dict, "saga": {"$ne": "", "$exists": True}}},
-        {"$group": {
-            "_id": {
-                "saga": "$saga",
-                "author": "$author",
-                "category": "$category"
-            },
-            "books_count": {"$sum": 1},
-            "completed_books": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
-            "reading_books": {"$sum": {"$cond": [{"$eq": ["$status", "reading"]}, 1, 0]}},
-            "to_read_books": {"$sum": {"$cond": [{"$eq": ["$status", "to_read"]}, 1, 0]}},
-            "first_added": {"$min": "$date_added"},
-            "last_updated": {"$max": "$updated_at"},
-            "cover_url": {"$first": "$cover_url"},  # Prendre la première couverture disponible
-            "max_volume": {"$max": "$volume_number"},
-            "books": {"$push": {
-                "id": "$id",
-                "title": "$title", 
-                "volume_number": "$volume_number",
-                "status": "$status",
-                "cover_url": "$cover_url"
-            }}
-        }},
-        {"$sort": {"last_updated": -1, "first_added": -1}}
-    ]
-    
-    series_data = list(books_collection.aggregate(pipeline))
-    
-    # Formater les données pour l'affichage en cartes séries
-    formatted_series = []
-    for series in series_data:
-        # Calculer le pourcentage de progression
-        completion_percentage = 0
-        if series["books_count"] > 0:
-            completion_percentage = round((series["completed_books"] / series["books_count"]) * 100)
-        
-        # Déterminer le statut global de la série
-        global_status = "to_read"
-        if series["reading_books"] > 0:
-            global_status = "reading"
-        elif series["completed_books"] == series["books_count"]:
-            global_status = "completed"
-        
-        # Trouver la meilleure couverture (priorité aux derniers tomes)
-        best_cover = ""
-        if series["books"]:
-            sorted_books = sorted(series["books"], key=lambda x: x.get("volume_number", 0), reverse=True)
-            for book in sorted_books:
-                if book.get("cover_url"):
-                    best_cover = book["cover_url"]
-                    break
-        
-        formatted_series.append({
-            "id": f"series_{series['_id']['saga'].lower().replace(' ', '_')}",
-            "name": series["_id"]["saga"],
-            "author": series["_id"]["author"],
-            "category": series["_id"]["category"],
-            "isSeriesCard": True,
-            "isOwnedSeries": True,  # Marquer comme série possédée
-            "total_books": series["books_count"],
-            "completed_books": series["completed_books"],
-            "reading_books": series["reading_books"],
-            "to_read_books": series["to_read_books"],
-            "completion_percentage": completion_percentage,
-            "status": global_status,
-            "cover_url": best_cover,
-            "max_volume": series["max_volume"] or 0,
-            "first_added": series["first_added"],
-            "last_updated": series["last_updated"],
-            "progress_text": f"{series['completed_books']}/{series['books_count']} tomes lus",
-            "books": series["books"]  # Liste des tomes pour la fiche détaillée
-        })
-    
-    return formatted_series
+    return await pagination_service.get_paginated_series_cards(
+        user_id=current_user["id"],
+        limit=limit,
+        offset=offset,
+        category=category,
+        sort_by=sort_by,
+        sort_order=sort_order
+    )
+
+
+async def get_library_series_paginated(
+    category: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+    sort_by: str = "last_updated",
+    sort_order: str = "desc",
+    current_user: dict = None
+):
+    """Cartes séries paginées (mode "series" de /api/books)"""
+    return await pagination_service.get_paginated_series_cards(
+        user_id=current_user["id"],
+        limit=limit,
+        offset=offset,
+        category=category,
+        sort_by=sort_by,
+        sort_order=sort_order
+    )
 
 # Routes pour les séries en bibliothèque (nouvelle fonctionnalité)
 @router.post("/series")
@@ -116,7 +73,9 @@ async def create_series_library(
         "updated_at": datetime.utcnow()
     }
     
-    series_library_collection.insert_one(series)
+    await series_library_collection.insert_one(series)
+    await series_progress_service.refresh(current_user["id"], [series["series_name"]])
+    await cache.flush_user_cache(current_user["id"])
     series.pop("_id", None)
     
     return {
@@ -136,7 +95,7 @@ async def get_series_library(
     if category:
         filter_dict["category"] = category
     
-    series_list = list(series_library_collection.find(filter_dict, {"_id": 0}))
+    series_list = await series_library_collection.find(filter_dict, {"_id": 0}).to_list(length=None)
     
     return series_list
 
@@ -151,16 +110,18 @@ async def update_volume_status(
     from datetime import datetime
     
     # Vérifier que la série appartient à l'utilisateur
-    series = series_library_collection.find_one({
+    series = await series_library_collection.find_one({
         "id": series_id,
         "user_id": current_user["id"]
-    })
+    }, {"_id": 0, "series_name": 1})
     
     if not series:
         raise HTTPException(status_code=404, detail="Série non trouvée")
     
-    # Mettre à jour le volume
-    result = series_library_collection.update_one(
+    is_read = bool(volume_data.get("is_read", False))
+    
+    # Mettre à jour le volume (état précédent du tome renvoyé pour la progression)
+    previous = await series_library_collection.find_one_and_update(
         {
             "id": series_id,
             "user_id": current_user["id"],
@@ -168,21 +129,57 @@ async def update_volume_status(
         },
         {
             "$set": {
-                "volumes.$.is_read": volume_data.get("is_read", False),
-                "volumes.$.date_read": datetime.utcnow().isoformat() if volume_data.get("is_read") else None,
+                "volumes.$.is_read": is_read,
+                "volumes.$.date_read": datetime.utcnow().isoformat() if is_read else None,
                 "updated_at": datetime.utcnow()
             }
-        }
+        },
+        projection={"_id": 0, "volumes.$": 1},
+        return_document=ReturnDocument.BEFORE
     )
     
-    if result.modified_count == 0:
+    if previous is None:
         raise HTTPException(status_code=404, detail="Volume non trouvé")
     
+    was_read = bool((previous.get("volumes") or [{}])[0].get("is_read"))
+    if was_read != is_read:
+        await series_progress_service.record_volume_read(
+            current_user["id"], series["series_name"], 1 if is_read else -1
+        )
+    
+    await cache.flush_user_cache(current_user["id"])
     return {
         "success": True,
         "message": f"Volume {volume_number} mis à jour"
     }
 
+@router.put("/series/{series_id}/volumes")
+async def update_volumes_status(
+    series_id: str,
+    update: VolumeStatusBulkUpdate,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Marquer plusieurs tomes lus/non lus en une requête (liste et/ou plages).
+    Une seule écriture MongoDB ; renvoie la nouvelle progression.
+    """
+    try:
+        volume_numbers = expand_volume_numbers(update.volumes, update.ranges)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    result = await series_library_service.set_volumes_read(
+        current_user["id"], series_id, volume_numbers, update.is_read
+    )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Série non trouvée")
+    
+    return {
+        "success": True,
+        "message": f"{len(result['updated_volumes'])} tome(s) mis à jour",
+        **result
+    }
+
 @router.put("/series/{series_id}")
 async def update_series_status(
     series_id: str,
@@ -196,7 +193,7 @@ async def update_series_status(
     if not new_status or new_status not in ["to_read", "reading", "completed"]:
         raise HTTPException(status_code=400, detail="Statut invalide")
     
-    result = series_library_collection.update_one(
+    result = await series_library_collection.update_one(
         {
             "id": series_id,
             "user_id": current_user["id"]
@@ -212,6 +209,7 @@ async def update_series_status(
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="Série non trouvée")
     
+    await cache.flush_user_cache(current_user["id"])
     return {
         "success": True,
         "message": "Statut de la série mis à jour"
@@ -225,12 +223,14 @@ async def delete_series(
     """Supprimer une série de la bibliothèque"""
     from fastapi import HTTPException
     
-    result = series_library_collection.delete_one({
+    deleted_series = await series_library_collection.find_one_and_delete({
         "id": series_id,
         "user_id": current_user["id"]
-    })
+    }, projection={"_id": 0, "series_name": 1})
     
-    if result.deleted_count == 0:
+    if deleted_series is None:
         raise HTTPException(status_code=404, detail="Série non trouvée")
     
+    await series_progress_service.refresh(current_user["id"], [deleted_series.get("series_name")])
+    await cache.flush_user_cache(current_user["id"])
     return {"success": True, "message": "Série supprimée de votre bibliothèque"}
\ No newline at end of file
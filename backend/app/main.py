@@ -1,7 +1,11 @@
+import asyncio
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
-from .database.connection import client
+from .database.connection import async_client, database
+from .services.series_catalog import series_catalog
+from .utils.http_client import http_client
+from .services.openlibrary_cache import openlibrary_cache
 
 # Import des routers
 from .auth.routes import router as auth_router
@@ -43,6 +47,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Durées par étape des routes (app/utils/fanout.py), lisibles par le frontend
+    expose_headers=["Server-Timing"],
 )
 
 # Routes de base
@@ -53,11 +59,32 @@ async def read_root():
 @app.get("/health")
 async def health():
     try:
-        client.admin.command('ping')
-        return {"status": "ok", "database": "connected", "timestamp": datetime.utcnow().isoformat()}
+        await async_client.admin.command('ping')
+        return {
+            "status": "ok",
+            "database": "connected",
+            "pools": database.pool_stats(),
+            "http": http_client.stats(),
+            "openlibrary_cache": openlibrary_cache.stats(),
+            "timestamp": datetime.utcnow().isoformat()
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database connection error: {str(e)}")
 
+@app.on_event("startup")
+async def load_series_catalog():
+    # Construire les index du catalogue avant la première requête
+    await asyncio.to_thread(series_catalog.reload)
+
+@app.on_event("shutdown")
+async def close_database():
+    database.close()
+
+@app.on_event("shutdown")
+async def close_http_client():
+    # Fermer les connexions keep-alive vers les services externes
+    await http_client.close()
+
 # Enregistrement des routers
 app.include_router(auth_router)
 app.include_router(books_router)
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
+from ..config import SERIES_DETECT_BATCH_MAX, SERIES_BULK_VOLUMES_MAX
 
 class VolumeData(BaseModel):
     volume_number: int
@@ -7,6 +8,16 @@ class VolumeData(BaseModel):
     is_read: bool = False
     date_read: Optional[str] = None
 
+# Mise à jour groupée des tomes lus
+class VolumeRange(BaseModel):
+    start: int = Field(..., ge=1)
+    end: int = Field(..., ge=1)  # inclus
+
+class VolumeStatusBulkUpdate(BaseModel):
+    volumes: List[int] = Field(default_factory=list, max_length=SERIES_BULK_VOLUMES_MAX)
+    ranges: List[VolumeRange] = Field(default_factory=list, max_length=100)
+    is_read: bool = True
+
 class SeriesLibraryCreate(BaseModel):
     series_name: str
     authors: List[str]
@@ -25,4 +36,14 @@ class SeriesReadingPreferences(BaseModel):
     read_tomes: List[int]  # Liste des numéros de tomes marqués comme lus
     
 class SeriesReadingPreferencesUpdate(BaseModel):
-    read_tomes: List[int]  # Liste des numéros de tomes marqués comme lus
\ No newline at end of file
+    read_tomes: List[int]  # Liste des numéros de tomes marqués comme lus
+
+# Détection de séries par lot
+class SeriesDetectItem(BaseModel):
+    title: str
+    author: Optional[str] = None
+    id: Optional[str] = None  # Identifiant libre renvoyé tel quel
+
+class SeriesDetectBatchRequest(BaseModel):
+    books: List[SeriesDetectItem] = Field(..., min_length=1, max_length=SERIES_DETECT_BATCH_MAX)
+    limit: int = Field(1, ge=1, le=5)  # Séries proposées par livre
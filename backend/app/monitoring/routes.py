@@ -4,6 +4,8 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime
 import json
 import logging
+from ..utils.http_client import http_client
+from ..services.openlibrary_cache import openlibrary_cache
 
 # Configuration du logger pour monitoring
 logging.basicConfig(level=logging.INFO)
@@ -262,6 +264,28 @@ async def log_abtest_metrics(abtest_data: ABTestMetrics):
         logger.error(f"Failed to log A/B test metric: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to log A/B test metric")
 
+def open_circuits() -> List[str]:
+    """Hôtes externes dont le coupe-circuit n'est pas fermé"""
+    return [
+        host for host, provider in http_client.stats()["providers"].items()
+        if provider["circuit"]["state"] != "closed"
+    ]
+
+@router.get("/providers")
+async def get_providers_status():
+    """
+    État des fournisseurs externes (Open Library, Wikipedia, Wikidata...) :
+    débit (seau à jetons), coupe-circuit et requêtes par hôte
+    """
+    stats = http_client.stats()
+    return {
+        "providers": stats["providers"],
+        "requests": stats["hosts"],
+        "open_circuits": open_circuits(),
+        "openlibrary_cache": openlibrary_cache.stats(),
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
 @router.get("/health")
 async def monitoring_health():
     """
@@ -276,8 +300,10 @@ async def monitoring_health():
                 "error_logging": "operational",
                 "performance_monitoring": "operational", 
                 "user_analytics": "operational",
-                "abtest_tracking": "operational"
+                "abtest_tracking": "operational",
+                "external_providers": "degraded" if open_circuits() else "operational"
             },
+            "open_circuits": open_circuits(),
             "uptime": "N/A",  # TODO: Calculer l'uptime réel
             "version": "2.4.0"
         }
@@ -1,11 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from datetime import datetime
 from typing import Optional
+import asyncio
 import uuid
-import requests
-from ..database.connection import books_collection
+import httpx
+from ..database.connection import async_books_collection
 from ..security.jwt import get_current_user
 from ..utils.validation import validate_category
+from ..utils.saga_key import with_saga_key
+from ..utils.cache import cache
+from ..services.user_stats import user_stats_service
+from ..services.series_progress import series_progress_service
+from ..config import OPENLIBRARY_FANOUT_CONCURRENCY
+from ..services.openlibrary_cache import openlibrary_cache
+from ..utils.fanout import StageTimer, gather_bounded
 
 router = APIRouter(prefix="/api/openlibrary", tags=["openlibrary"])
 
@@ -73,7 +81,7 @@ async def search_open_library(
         
         params["q"] = " AND ".join(query_parts)
         
-        response = requests.get("https://openlibrary.org/search.json", params=params, timeout=10)
+        response = await openlibrary_cache.get("https://openlibrary.org/search.json", params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -110,12 +118,13 @@ async def search_open_library(
             }
         }
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la recherche: {str(e)}")
 
 @router.post("/import")
 async def import_from_open_library(
     import_data: dict,
+    response: Response,
     current_user: dict = Depends(get_current_user)
 ):
     """Importer un livre depuis Open Library"""
@@ -127,29 +136,40 @@ async def import_from_open_library(
     if not ol_key:
         raise HTTPException(status_code=400, detail="Clé Open Library ou données série requises")
     
-    try:
-        # Récupérer les détails du livre
+    timer = StageTimer()
+    
+    async def fetch_work_and_authors():
+        # L'œuvre, puis tous ses auteurs en parallèle
         work_url = f"https://openlibrary.org{ol_key}.json"
-        response = requests.get(work_url, timeout=10)
-        response.raise_for_status()
-        work_data = response.json()
-        
-        # Récupérer les éditions pour plus de détails
+        work_response = await timer.measure("work", openlibrary_cache.get(work_url, timeout=10))
+        work_response.raise_for_status()
+        work_data = work_response.json()
+        
+        author_keys = [
+            author_ref.get("author", {}).get("key", "")
+            for author_ref in work_data.get("authors") or []
+        ]
+        author_responses = await timer.measure("authors", gather_bounded(
+            [openlibrary_cache.get(f"https://openlibrary.org{key}.json", timeout=5) for key in author_keys if key],
+            OPENLIBRARY_FANOUT_CONCURRENCY
+        ))
+        authors = [
+            author_response.json().get("name", "")
+            for author_response in author_responses if author_response.status_code == 200
+        ]
+        return work_data, authors
+    
+    async def fetch_editions():
+        # Éditions pour plus de détails, indépendantes de l'œuvre
         editions_url = f"https://openlibrary.org{ol_key}/editions.json"
-        editions_response = requests.get(editions_url, timeout=10)
-        editions_data = editions_response.json() if editions_response.status_code == 200 else {"entries": []}
+        editions_response = await timer.measure("editions", openlibrary_cache.get(editions_url, timeout=10))
+        return editions_response.json() if editions_response.status_code == 200 else {"entries": []}
+    
+    try:
+        (work_data, authors), editions_data = await asyncio.gather(fetch_work_and_authors(), fetch_editions())
         
         # Extraire les informations principales
         title = work_data.get("title", "")
-        authors = []
-        if work_data.get("authors"):
-            for author_ref in work_data["authors"]:
-                author_key = author_ref.get("author", {}).get("key", "")
-                if author_key:
-                    author_response = requests.get(f"https://openlibrary.org{author_key}.json", timeout=5)
-                    if author_response.status_code == 200:
-                        author_data = author_response.json()
-                        authors.append(author_data.get("name", ""))
         
         author_str = ", ".join(authors) if authors else ""
         
@@ -195,9 +215,14 @@ async def import_from_open_library(
             "updated_at": datetime.utcnow()
         }
         
-        books_collection.insert_one(book)
+        with timer.stage("insert"):
+            await async_books_collection.insert_one(with_saga_key(book))
+            await user_stats_service.record_books_added(current_user["id"], [book])
+            await series_progress_service.record_books_added(current_user["id"], [book])
+            await cache.flush_user_cache(current_user["id"])
         book.pop("_id", None)
         
+        timer.apply(response)
         return {
             "success": True,
             "message": "Livre importé avec succès",
@@ -205,7 +230,7 @@ async def import_from_open_library(
             "type": "book"
         }
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de l'import: {str(e)}")
 
 @router.get("/search-advanced")
@@ -229,7 +254,7 @@ async def search_open_library_advanced(
         if sort:
             params["sort"] = sort
         
-        response = requests.get("https://openlibrary.org/search.json", params=params, timeout=10)
+        response = await openlibrary_cache.get("https://openlibrary.org/search.json", params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -263,7 +288,7 @@ async def search_open_library_advanced(
             "has_more": offset + limit < data.get("numFound", 0)
         }
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la recherche: {str(e)}")
 
 @router.get("/search-isbn")
@@ -273,14 +298,14 @@ async def search_by_isbn(
 ):
     """Rechercher un livre par ISBN"""
     try:
-        response = requests.get(f"https://openlibrary.org/isbn/{isbn}.json", timeout=10)
+        response = await openlibrary_cache.get(f"https://openlibrary.org/isbn/{isbn}.json", timeout=10)
         response.raise_for_status()
         data = response.json()
         
         # Récupérer les détails du work
         work_key = data.get("works", [{}])[0].get("key", "")
         if work_key:
-            work_response = requests.get(f"https://openlibrary.org{work_key}.json", timeout=10)
+            work_response = await openlibrary_cache.get(f"https://openlibrary.org{work_key}.json", timeout=10)
             work_data = work_response.json() if work_response.status_code == 200 else {}
         else:
             work_data = {}
@@ -300,7 +325,7 @@ async def search_by_isbn(
         
         return {"book": book}
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=404, detail=f"Livre non trouvé pour l'ISBN {isbn}")
 
 @router.get("/search-author")
@@ -317,7 +342,7 @@ async def search_by_author(
             "fields": "key,title,author_name,first_publish_year,isbn,cover_i,subject,number_of_pages_median,publisher"
         }
         
-        response = requests.get("https://openlibrary.org/search.json", params=params, timeout=10)
+        response = await openlibrary_cache.get("https://openlibrary.org/search.json", params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -343,22 +368,26 @@ async def search_by_author(
             "author": author
         }
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la recherche: {str(e)}")
 
 @router.get("/author/{author_name}")
 async def get_author_info(
-    author_name: str
+    author_name: str,
+    response: Response
 ):
     """Récupérer les informations d'un auteur depuis Open Library"""
+    # La fiche dépend de la clé trouvée par la recherche : deux étapes successives
+    timer = StageTimer()
     try:
         # Rechercher l'auteur dans Open Library
         search_url = f"https://openlibrary.org/search/authors.json"
         search_params = {"q": author_name, "limit": 1}
         
-        response = requests.get(search_url, params=search_params, timeout=10)
-        response.raise_for_status()
-        search_data = response.json()
+        search_response = await timer.measure("search", openlibrary_cache.get(search_url, params=search_params, timeout=10))
+        search_response.raise_for_status()
+        search_data = search_response.json()
+        timer.apply(response)
         
         if not search_data.get("docs"):
             return {"found": False, "message": "Auteur non trouvé"}
@@ -373,7 +402,8 @@ async def get_author_info(
             if not author_key.startswith("/authors/"):
                 author_key = f"/authors/{author_key}"
             author_url = f"https://openlibrary.org{author_key}.json"
-            author_response = requests.get(author_url, timeout=10)
+            author_response = await timer.measure("author", openlibrary_cache.get(author_url, timeout=10))
+            timer.apply(response)
             
             if author_response.status_code == 200:
                 author_details = author_response.json()
@@ -413,7 +443,7 @@ async def get_author_info(
         
         return {"found": False, "message": "Détails de l'auteur non disponibles"}
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la récupération des informations de l'auteur: {str(e)}")
 
 @router.get("/author/{author_name}/works")
@@ -425,12 +455,12 @@ async def get_author_works(
     """Récupérer toutes les œuvres d'un auteur depuis OpenLibrary"""
     try:
         # 1. Récupérer les livres de l'auteur depuis la bibliothèque personnelle
-        user_books = list(books_collection.find(
+        user_books = await async_books_collection.find(
             {
                 "user_id": current_user["id"],
                 "author": {"$regex": author_name, "$options": "i"}
             }
-        ))
+        ).to_list(length=None)
         
         # 2. Récupérer les œuvres depuis OpenLibrary
         params = {
@@ -439,7 +469,7 @@ async def get_author_works(
             "fields": "key,title,author_name,first_publish_year,isbn,cover_i,subject,number_of_pages_median,publisher,series"
         }
         
-        response = requests.get("https://openlibrary.org/search.json", params=params, timeout=10)
+        response = await openlibrary_cache.get("https://openlibrary.org/search.json", params=params, timeout=10)
         response.raise_for_status()
         data = response.json()
         
@@ -514,7 +544,7 @@ async def get_author_works(
             "sources": {"openlibrary": total_books, "library": len(user_books)}
         }
         
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la recherche: {str(e)}")
 
 @router.get("/recommendations")
@@ -524,10 +554,10 @@ async def get_recommendations(
 ):
     """Obtenir des recommandations basées sur la bibliothèque de l'utilisateur"""
     # Analyser les genres et auteurs préférés de l'utilisateur
-    user_books = list(books_collection.find(
+    user_books = await async_books_collection.find(
         {"user_id": current_user["id"], "status": "completed"},
         {"genre": 1, "author": 1, "category": 1}
-    ))
+    ).to_list(length=None)
     
     if not user_books:
         # Recommandations générales si pas de livres
@@ -6,13 +6,14 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import aiohttp
 import asyncio
 from typing import List, Dict, Optional
 import logging
 from datetime import datetime
 import json
 
+from ..services.openlibrary_cache import openlibrary_cache
+
 logger = logging.getLogger(__name__)
 
 class OpenLibraryService:
@@ -20,16 +21,6 @@ class OpenLibraryService:
     
     def __init__(self):
         self.base_url = "https://openlibrary.org"
-        self.session = None
-        self.timeout = 10
-    
-    async def _get_session(self):
-        """Obtient une session HTTP réutilisable"""
-        if self.session is None:
-            self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=self.timeout)
-            )
-        return self.session
     
     async def search_books_by_author(self, author: str, limit: int = 10) -> List[Dict]:
         """
@@ -43,8 +34,6 @@ class OpenLibraryService:
             Liste des livres trouvés
         """
         try:
-            session = await self._get_session()
-            
             # Recherche par auteur
             url = f"{self.base_url}/search.json"
             params = {
@@ -53,28 +42,28 @@ class OpenLibraryService:
                 'fields': 'title,author_name,cover_i,first_publish_year,key,subject'
             }
             
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    books = []
-                    
-                    for doc in data.get('docs', []):
-                        book = {
-                            'title': doc.get('title', ''),
-                            'author': ', '.join(doc.get('author_name', [])),
-                            'cover_url': self._get_cover_url(doc.get('cover_i')),
-                            'publication_year': doc.get('first_publish_year'),
-                            'ol_key': doc.get('key', ''),
-                            'category': self._determine_category(doc.get('subject', [])),
-                            'subjects': doc.get('subject', [])[:5]  # Top 5 sujets
-                        }
-                        books.append(book)
-                    
-                    return books
-                else:
-                    logger.error(f"Erreur API Open Library: {response.status}")
-                    return []
-                    
+            response = await openlibrary_cache.get(url, params=params)
+            if response.status_code == 200:
+                data = response.json()
+                books = []
+                
+                for doc in data.get('docs', []):
+                    book = {
+                        'title': doc.get('title', ''),
+                        'author': ', '.join(doc.get('author_name', [])),
+                        'cover_url': self._get_cover_url(doc.get('cover_i')),
+                        'publication_year': doc.get('first_publish_year'),
+                        'ol_key': doc.get('key', ''),
+                        'category': self._determine_category(doc.get('subject', [])),
+                        'subjects': doc.get('subject', [])[:5]  # Top 5 sujets
+                    }
+                    books.append(book)
+                
+                return books
+            else:
+                logger.error(f"Erreur API Open Library: {response.status_code}")
+                return []
+                
         except Exception as e:
             logger.error(f"Erreur recherche par auteur: {str(e)}")
             return []
@@ -91,8 +80,6 @@ class OpenLibraryService:
             Liste des livres populaires
         """
         try:
-            session = await self._get_session()
-            
             # Mapping des catégories vers les sujets Open Library
             category_mapping = {
                 'roman': ['fiction', 'literature', 'novel'],
@@ -110,29 +97,29 @@ class OpenLibraryService:
                 'fields': 'title,author_name,cover_i,first_publish_year,key,subject,ratings_average'
             }
             
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    books = []
-                    
-                    for doc in data.get('docs', []):
-                        book = {
-                            'title': doc.get('title', ''),
-                            'author': ', '.join(doc.get('author_name', [])),
-                            'cover_url': self._get_cover_url(doc.get('cover_i')),
-                            'publication_year': doc.get('first_publish_year'),
-                            'ol_key': doc.get('key', ''),
-                            'category': category,
-                            'rating': doc.get('ratings_average', 0),
-                            'subjects': doc.get('subject', [])[:5]
-                        }
-                        books.append(book)
-                    
-                    return books
-                else:
-                    logger.error(f"Erreur API Open Library: {response.status}")
-                    return []
-                    
+            response = await openlibrary_cache.get(url, params=params)
+            if response.status_code == 200:
+                data = response.json()
+                books = []
+                
+                for doc in data.get('docs', []):
+                    book = {
+                        'title': doc.get('title', ''),
+                        'author': ', '.join(doc.get('author_name', [])),
+                        'cover_url': self._get_cover_url(doc.get('cover_i')),
+                        'publication_year': doc.get('first_publish_year'),
+                        'ol_key': doc.get('key', ''),
+                        'category': category,
+                        'rating': doc.get('ratings_average', 0),
+                        'subjects': doc.get('subject', [])[:5]
+                    }
+                    books.append(book)
+                
+                return books
+            else:
+                logger.error(f"Erreur API Open Library: {response.status_code}")
+                return []
+                
         except Exception as e:
             logger.error(f"Erreur recherche populaire: {str(e)}")
             return []
@@ -149,8 +136,6 @@ class OpenLibraryService:
             Liste des livres de la série
         """
         try:
-            session = await self._get_session()
-            
             url = f"{self.base_url}/search.json"
             params = {
                 'q': f'title:"{series_name}"',
@@ -158,28 +143,28 @@ class OpenLibraryService:
                 'fields': 'title,author_name,cover_i,first_publish_year,key,subject'
             }
             
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    books = []
-                    
-                    for doc in data.get('docs', []):
-                        book = {
-                            'title': doc.get('title', ''),
-                            'author': ', '.join(doc.get('author_name', [])),
-                            'cover_url': self._get_cover_url(doc.get('cover_i')),
-                            'publication_year': doc.get('first_publish_year'),
-                            'ol_key': doc.get('key', ''),
-                            'category': self._determine_category(doc.get('subject', [])),
-                            'series_name': series_name
-                        }
-                        books.append(book)
-                    
-                    return books
-                else:
-                    logger.error(f"Erreur API Open Library: {response.status}")
-                    return []
-                    
+            response = await openlibrary_cache.get(url, params=params)
+            if response.status_code == 200:
+                data = response.json()
+                books = []
+                
+                for doc in data.get('docs', []):
+                    book = {
+                        'title': doc.get('title', ''),
+                        'author': ', '.join(doc.get('author_name', [])),
+                        'cover_url': self._get_cover_url(doc.get('cover_i')),
+                        'publication_year': doc.get('first_publish_year'),
+                        'ol_key': doc.get('key', ''),
+                        'category': self._determine_category(doc.get('subject', [])),
+                        'series_name': series_name
+                    }
+                    books.append(book)
+                
+                return books
+            else:
+                logger.error(f"Erreur API Open Library: {response.status_code}")
+                return []
+                
         except Exception as e:
             logger.error(f"Erreur recherche série: {str(e)}")
             return []
@@ -195,27 +180,25 @@ class OpenLibraryService:
             Détails du livre ou None
         """
         try:
-            session = await self._get_session()
-            
             url = f"{self.base_url}{ol_key}.json"
             
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    return {
-                        'title': data.get('title', ''),
-                        'description': self._extract_description(data.get('description')),
-                        'publication_year': self._extract_year(data.get('first_publish_date')),
-                        'isbn': self._extract_isbn(data.get('isbn_13', [])),
-                        'subjects': data.get('subjects', [])[:10],
-                        'language': data.get('languages', []),
-                        'page_count': data.get('number_of_pages')
-                    }
-                else:
-                    logger.error(f"Erreur récupération détails: {response.status}")
-                    return None
-                    
+            response = await openlibrary_cache.get(url)
+            if response.status_code == 200:
+                data = response.json()
+                
+                return {
+                    'title': data.get('title', ''),
+                    'description': self._extract_description(data.get('description')),
+                    'publication_year': self._extract_year(data.get('first_publish_date')),
+                    'isbn': self._extract_isbn(data.get('isbn_13', [])),
+                    'subjects': data.get('subjects', [])[:10],
+                    'language': data.get('languages', []),
+                    'page_count': data.get('number_of_pages')
+                }
+            else:
+                logger.error(f"Erreur récupération détails: {response.status_code}")
+                return None
+                
         except Exception as e:
             logger.error(f"Erreur détails livre: {str(e)}")
             return None
@@ -231,8 +214,6 @@ class OpenLibraryService:
             Liste des livres populaires
         """
         try:
-            session = await self._get_session()
-            
             url = f"{self.base_url}/search.json"
             params = {
                 'q': 'fiction',
@@ -241,29 +222,29 @@ class OpenLibraryService:
                 'fields': 'title,author_name,cover_i,first_publish_year,key,subject,ratings_average'
             }
             
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    books = []
-                    
-                    for doc in data.get('docs', []):
-                        book = {
-                            'title': doc.get('title', ''),
-                            'author': ', '.join(doc.get('author_name', [])),
-                            'cover_url': self._get_cover_url(doc.get('cover_i')),
-                            'publication_year': doc.get('first_publish_year'),
-                            'ol_key': doc.get('key', ''),
-                            'category': self._determine_category(doc.get('subject', [])),
-                            'rating': doc.get('ratings_average', 0),
-                            'subjects': doc.get('subject', [])[:5]
-                        }
-                        books.append(book)
-                    
-                    return books
-                else:
-                    logger.error(f"Erreur API Open Library: {response.status}")
-                    return []
-                    
+            response = await openlibrary_cache.get(url, params=params)
+            if response.status_code == 200:
+                data = response.json()
+                books = []
+                
+                for doc in data.get('docs', []):
+                    book = {
+                        'title': doc.get('title', ''),
+                        'author': ', '.join(doc.get('author_name', [])),
+                        'cover_url': self._get_cover_url(doc.get('cover_i')),
+                        'publication_year': doc.get('first_publish_year'),
+                        'ol_key': doc.get('key', ''),
+                        'category': self._determine_category(doc.get('subject', [])),
+                        'rating': doc.get('ratings_average', 0),
+                        'subjects': doc.get('subject', [])[:5]
+                    }
+                    books.append(book)
+                
+                return books
+            else:
+                logger.error(f"Erreur API Open Library: {response.status_code}")
+                return []
+                
         except Exception as e:
             logger.error(f"Erreur livres populaires: {str(e)}")
             return []
@@ -311,8 +292,3 @@ class OpenLibraryService:
     def _extract_isbn(self, isbn_list: List[str]) -> Optional[str]:
         """Extrait le premier ISBN"""
         return isbn_list[0] if isbn_list else None
-    
-    async def close(self):
-        """Ferme la session HTTP"""
-        if self.session:
-            await self.session.close()
\ No newline at end of file
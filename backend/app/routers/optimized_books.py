@@ -30,6 +30,7 @@ async def get_books_optimized(
     limit: int = Query(20, ge=1, le=100, description="Éléments par page"),
     sort_by: str = Query("date_added", description="Champ de tri"),
     sort_order: str = Query("desc", pattern="^(asc|desc)$", description="Ordre de tri"),
+    cursor: Optional[str] = Query(None, description="Curseur opaque (remplace page pour les pages profondes)"),
     
     # Paramètres de filtrage
     category: Optional[str] = Query(None, description="Filtrer par catégorie"),
@@ -48,7 +49,8 @@ async def get_books_optimized(
         page=page,
         limit=limit,
         sort_by=sort_by,
-        sort_order=sort_order
+        sort_order=sort_order,
+        cursor=cursor
     )
     
     try:
@@ -66,6 +68,8 @@ async def get_books_optimized(
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erreur get_books_optimized: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve books")
@@ -203,7 +207,7 @@ async def invalidate_user_cache(
     Invalider manuellement le cache d'un utilisateur
     """
     try:
-        cache.flush_user_cache(current_user["id"])
+        await cache.flush_user_cache(current_user["id"])
         
         return {
             "message": "Cache invalidé avec succès",
@@ -222,7 +226,7 @@ async def get_cache_stats(
     Obtenir les statistiques du cache Redis
     """
     try:
-        stats = cache.get_cache_stats()
+        stats = await cache.get_cache_stats()
         
         return {
             "cache_stats": stats,
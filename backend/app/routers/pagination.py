@@ -7,13 +7,12 @@ from fastapi import APIRouter, Depends, Query, HTTPException
 from typing import Optional, List
 from ..auth.dependencies import get_current_user
 from ..services.pagination import pagination_service, PaginatedResponse
-from ..models.user import User
 
 router = APIRouter()
 
 @router.get("/books/paginated", response_model=PaginatedResponse)
 async def get_paginated_books(
-    current_user: User = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user),
     limit: int = Query(10, ge=1, le=100, description="Nombre d'éléments par page"),
     offset: int = Query(0, ge=0, description="Décalage pour la pagination"),
     category: Optional[str] = Query(None, description="Filtre par catégorie"),
@@ -21,13 +20,14 @@ async def get_paginated_books(
     author: Optional[str] = Query(None, description="Filtre par auteur"),
     saga: Optional[str] = Query(None, description="Filtre par saga"),
     sort_by: str = Query("date_added", description="Champ de tri"),
-    sort_order: str = Query("desc", regex="^(asc|desc)$", description="Ordre de tri")
+    sort_order: str = Query("desc", regex="^(asc|desc)$", description="Ordre de tri"),
+    cursor: Optional[str] = Query(None, description="Curseur opaque (next_cursor) : remplace offset")
 ):
     """
     Récupère les livres avec pagination et cache
     
     Fonctionnalités :
-    - Pagination configurable (limit/offset)
+    - Pagination configurable (limit/offset ou curseur)
     - Filtres multiples (catégorie, statut, auteur, saga)
     - Tri personnalisable
     - Cache Redis intégré
@@ -35,8 +35,8 @@ async def get_paginated_books(
     """
     
     try:
-        result = pagination_service.get_paginated_books(
-            user_id=current_user.id,
+        result = await pagination_service.get_paginated_books(
+            user_id=current_user["id"],
             limit=limit,
             offset=offset,
             category=category,
@@ -44,16 +44,19 @@ async def get_paginated_books(
             author=author,
             saga=saga,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            cursor=cursor
         )
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur récupération livres: {str(e)}")
 
 @router.get("/series/paginated", response_model=PaginatedResponse)
 async def get_paginated_series(
-    current_user: User = Depends(get_current_user),
+    current_user: dict = Depends(get_current_user),
     limit: int = Query(10, ge=1, le=100, description="Nombre d'éléments par page"),
     offset: int = Query(0, ge=0, description="Décalage pour la pagination"),
     category: Optional[str] = Query(None, description="Filtre par catégorie"),
@@ -70,8 +73,8 @@ async def get_paginated_series(
     """
     
     try:
-        result = pagination_service.get_paginated_series(
-            user_id=current_user.id,
+        result = await pagination_service.get_paginated_series(
+            user_id=current_user["id"],
             limit=limit,
             offset=offset,
             category=category,
@@ -86,7 +89,7 @@ async def get_paginated_series(
 async def get_search_suggestions(
     q: str = Query(..., min_length=1, description="Terme de recherche"),
     limit: int = Query(5, ge=1, le=20, description="Nombre de suggestions"),
-    current_user: User = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     Récupère des suggestions de recherche avec cache
@@ -98,8 +101,8 @@ async def get_search_suggestions(
     """
     
     try:
-        suggestions = pagination_service.get_search_suggestions(
-            user_id=current_user.id,
+        suggestions = await pagination_service.get_search_suggestions(
+            user_id=current_user["id"],
             query=q,
             limit=limit
         )
@@ -110,7 +113,7 @@ async def get_search_suggestions(
 
 @router.post("/cache/invalidate")
 async def invalidate_user_cache(
-    current_user: User = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user)
 ):
     """
     Invalide le cache pour l'utilisateur actuel
@@ -119,7 +122,7 @@ async def invalidate_user_cache(
     """
     
     try:
-        pagination_service.invalidate_user_cache(current_user.id)
+        await pagination_service.invalidate_user_cache(current_user["id"])
         return {"message": "Cache invalidé avec succès"}
         
     except Exception as e:
@@ -128,25 +131,19 @@ async def invalidate_user_cache(
 @router.get("/cache/status")
 async def get_cache_status():
     """
-    Vérifie le statut du cache Redis
+    Vérifie le statut du cache (L1 mémoire + L2 Redis)
     """
     
     try:
-        cache_enabled = pagination_service.cache.cache_enabled
-        redis_info = None
-        
-        if cache_enabled:
-            try:
-                redis_info = {
-                    "connected": True,
-                    "ping": pagination_service.cache.redis_client.ping()
-                }
-            except:
-                redis_info = {"connected": False}
+        stats = await pagination_service.cache.get_cache_stats()
         
         return {
-            "cache_enabled": cache_enabled,
-            "redis_info": redis_info
+            "cache_enabled": True,
+            "redis_info": {"connected": stats["l2"]["status"] == "available"},
+            "local": {
+                "l1": stats["l1"],
+                "namespaces": stats["namespaces"]
+            }
         }
         
     except Exception as e:
@@ -1,53 +1,67 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from datetime import datetime
 from typing import Optional
-import uuid
 import re
-from ..database.connection import books_collection
+import orjson
+from ..database.connection import async_books_collection as books_collection
 from ..security.jwt import get_current_user
+from ..utils.cache import cache
+from ..services.user_stats import user_stats_service, contribution_delta, CONTRIBUTION_FIELDS
+from ..services.saga_volumes import saga_volume_service, volume_gaps
+from ..services.series_progress import series_progress_service, progress_percentage
+from ..utils.saga_key import saga_filter
 
 router = APIRouter(prefix="/api/sagas", tags=["sagas"])
 
 @router.get("")
 async def get_sagas(current_user: dict = Depends(get_current_user)):
-    """Obtenir la liste des sagas de l'utilisateur"""
-    user_filter = {"user_id": current_user["id"]}
+    """Obtenir la liste des sagas de l'utilisateur (progression matérialisée)"""
+    progress_list, _ = await series_progress_service.list(
+        current_user["id"], sort_by="total_books", sort_order="desc"
+    )
     
-    # Grouper les livres par saga
-    pipeline = [
-        {"$match": {**user_filter, "saga": {"$ne": ""}}},
-        {"$group": {
-            "_id": "$saga",
-            "books_count": {"$sum": 1},
-            "completed_books": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
-            "author": {"$first": "$author"},
-            "category": {"$first": "$category"},
-            "max_volume": {"$max": "$volume_number"},
-            "volumes": {"$push": {"volume_number": "$volume_number", "status": "$status"}}
-        }},
-        {"$sort": {"books_count": -1}}
-    ]
+    sagas = []
+    for progress in progress_list:
+        sagas.append({
+            "name": progress["name"],
+            "books_count": progress["total_books"],
+            "completed_books": progress["completed_books"],
+            "author": progress["author"],
+            "category": progress["category"],
+            # Calculer le prochain tome
+            "next_volume": (progress.get("max_volume") or 0) + 1,
+            "completion_percentage": progress_percentage(progress)
+        })
     
-    sagas_data = list(books_collection.aggregate(pipeline))
+    return sagas
+
+@router.get("/gaps")
+async def get_sagas_gaps(
+    stream: bool = Query(False, description="Réponse NDJSON, une ligne par saga"),
+    include_complete: bool = Query(False, description="Inclure les sagas sans tome manquant"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Rapport des tomes manquants de toutes les sagas en un appel.
+    Une seule agrégation ; tomes attendus complétés par le catalogue des séries.
+    """
+    report = saga_volume_service.gaps_report(current_user["id"], include_complete=include_complete)
     
-    sagas = []
-    for saga_data in sagas_data:
-        # Calculer le prochain tome
-        volumes = [v["volume_number"] for v in saga_data["volumes"] if v["volume_number"]]
-        next_volume = max(volumes) + 1 if volumes else 1
+    if stream:
+        async def stream_lines():
+            async for entry in report:
+                yield orjson.dumps(entry) + b"\n"
         
-        saga = {
-            "name": saga_data["_id"],
-            "books_count": saga_data["books_count"],
-            "completed_books": saga_data["completed_books"],
-            "author": saga_data["author"],
-            "category": saga_data["category"],
-            "next_volume": next_volume,
-            "completion_percentage": round((saga_data["completed_books"] / saga_data["books_count"]) * 100) if saga_data["books_count"] > 0 else 0
-        }
-        sagas.append(saga)
+        return StreamingResponse(stream_lines(), media_type="application/x-ndjson")
     
-    return sagas
+    sagas = [entry async for entry in report]
+    return {
+        "sagas": sagas,
+        "total_sagas": len(sagas),
+        "incomplete_sagas": sum(1 for entry in sagas if entry["missing_count"]),
+        "missing_volumes": sum(entry["missing_count"] for entry in sagas)
+    }
 
 @router.get("/{saga_name}/books")
 async def get_saga_books(saga_name: str, current_user: dict = Depends(get_current_user)):
@@ -56,10 +70,7 @@ async def get_saga_books(saga_name: str, current_user: dict = Depends(get_curren
     Ne retourne QUE les livres appartenant exactement à cette série.
     """
     # Filtrage strict par série ET auteur spécifique
-    books = list(books_collection.find({
-        "user_id": current_user["id"],
-        "saga": saga_name
-    }, {"_id": 0}).sort("volume_number", 1))
+    books = await books_collection.find(saga_filter(current_user["id"], saga_name), {"_id": 0}).sort("volume_number", 1).to_list(length=None)
     
     if not books:
         return books
@@ -126,51 +137,26 @@ async def auto_add_next_volume(
     """
     Ajouter automatiquement le prochain tome d'une saga
     """
-    # Récupérer les livres existants de la saga
-    existing_books = list(books_collection.find({
-        "user_id": current_user["id"],
-        "saga": saga_name
-    }).sort("volume_number", 1))
+    # Premier tome comme modèle, puis numéros existants (index saga, sans charger les livres)
+    template_book = await books_collection.find_one(
+        saga_filter(current_user["id"], saga_name), {"_id": 0}, sort=[("volume_number", 1)]
+    )
     
-    if not existing_books:
+    if not template_book:
         raise HTTPException(status_code=404, detail="Saga non trouvée")
     
     # Trouver le prochain numéro de volume
-    volume_numbers = [book.get("volume_number", 1) for book in existing_books]
+    volume_numbers = await saga_volume_service.existing_volume_numbers(current_user["id"], saga_name)
     next_volume = max(volume_numbers) + 1 if volume_numbers else 1
     
-    # Utiliser le premier livre comme modèle
-    template_book = existing_books[0]
+    # Créer le nouveau livre (même document que la complétion groupée)
+    new_book = saga_volume_service.new_volume(current_user["id"], saga_name, next_volume, template_book)
     
-    # Créer le nouveau livre
-    book_id = str(uuid.uuid4())
-    new_book = {
-        "id": book_id,
-        "user_id": current_user["id"],
-        "title": f"{saga_name} - Tome {next_volume}",
-        "author": template_book.get("author", ""),
-        "category": template_book.get("category", "roman"),
-        "saga": saga_name,
-        "volume_number": next_volume,
-        "status": "to_read",
-        "genre": template_book.get("genre", ""),
-        "publisher": template_book.get("publisher", ""),
-        "auto_added": True,
-        "date_added": datetime.utcnow(),
-        "description": f"Tome {next_volume} de la saga {saga_name}",
-        "total_pages": None,
-        "current_page": None,
-        "rating": None,
-        "review": "",
-        "cover_url": "",
-        "publication_year": None,
-        "isbn": "",
-        "date_started": None,
-        "date_completed": None,
-        "updated_at": datetime.utcnow()
-    }
-    
-    books_collection.insert_one(new_book)
+    await books_collection.insert_one(new_book)
+    new_book.pop("_id", None)
+    await user_stats_service.record_books_added(current_user["id"], [new_book])
+    await series_progress_service.record_books_added(current_user["id"], [new_book])
+    await cache.flush_user_cache(current_user["id"])
     
     return {
         "success": True,
@@ -204,13 +190,18 @@ async def bulk_update_saga_status(
         update_data["date_started"] = datetime.utcnow()
         update_data["date_completed"] = datetime.utcnow()
     
-    result = books_collection.update_many(
-        {
-            "user_id": current_user["id"],
-            "saga": saga_name
-        },
-        {"$set": update_data}
+    books_filter = saga_filter(current_user["id"], saga_name)
+    books_before = await books_collection.find(books_filter, CONTRIBUTION_FIELDS).to_list(length=None)
+    
+    result = await books_collection.update_many(books_filter, {"$set": update_data})
+    
+    books_after = [{**book, **update_data} for book in books_before]
+    await user_stats_service.apply_delta(
+        current_user["id"],
+        contribution_delta(before=books_before, after=books_after)
     )
+    await series_progress_service.record_status_change(current_user["id"], books_before, books_after)
+    await cache.flush_user_cache(current_user["id"])
     
     return {
         "success": True,
@@ -229,60 +220,27 @@ async def auto_complete_saga(
     """
     target_volumes = completion_data.get("target_volumes", 10)
     
-    # Récupérer les livres existants de la saga
-    existing_books = list(books_collection.find({
-        "user_id": current_user["id"],
-        "saga": saga_name
-    }))
+    # Livre modèle et tomes existants : requêtes couvertes par user_saga_key_volume_index
+    template_book = await books_collection.find_one(saga_filter(current_user["id"], saga_name), {"_id": 0})
     
-    if not existing_books:
+    if not template_book:
         raise HTTPException(status_code=404, detail="Saga non trouvée")
     
-    # Utiliser le premier livre comme modèle
-    template_book = existing_books[0]
-    
-    # Déterminer les volumes existants
-    existing_volumes = {book.get("volume_number", 1) for book in existing_books}
+    existing_volumes = await saga_volume_service.existing_volume_numbers(current_user["id"], saga_name)
     
-    # Créer les volumes manquants
-    created_books = []
-    for volume_num in range(1, target_volumes + 1):
-        if volume_num not in existing_volumes:
-            book_id = str(uuid.uuid4())
-            new_book = {
-                "id": book_id,
-                "user_id": current_user["id"],
-                "title": f"{saga_name} - Tome {volume_num}",
-                "author": template_book.get("author", ""),
-                "category": template_book.get("category", "roman"),
-                "saga": saga_name,
-                "volume_number": volume_num,
-                "status": "to_read",
-                "genre": template_book.get("genre", ""),
-                "publisher": template_book.get("publisher", ""),
-                "auto_added": True,
-                "date_added": datetime.utcnow(),
-                "description": f"Tome {volume_num} de la saga {saga_name}",
-                "total_pages": None,
-                "current_page": None,
-                "rating": None,
-                "review": "",
-                "cover_url": "",
-                "publication_year": None,
-                "isbn": "",
-                "date_started": None,
-                "date_completed": None,
-                "updated_at": datetime.utcnow()
-            }
-            
-            books_collection.insert_one(new_book)
-            created_books.append(new_book)
+    # Créer les volumes manquants (insertion par paquets)
+    new_books = [
+        saga_volume_service.new_volume(current_user["id"], saga_name, volume_num, template_book)
+        for volume_num in range(1, target_volumes + 1)
+        if volume_num not in existing_volumes
+    ]
+    created_books = await saga_volume_service.insert_volumes(current_user["id"], new_books)
     
     return {
         "success": True,
         "message": f"{len(created_books)} tome(s) ajouté(s) à la saga {saga_name}",
         "created_books": len(created_books),
-        "existing_books": len(existing_books),
+        "existing_books": len(existing_volumes),
         "total_volumes": target_volumes
     }
 
@@ -294,11 +252,10 @@ async def analyze_missing_volumes(
     """
     Analyser les volumes manquants d'une saga
     """
-    # Récupérer les livres existants de la saga
-    existing_books = list(books_collection.find({
-        "user_id": current_user["id"],
-        "saga": saga_name
-    }))
+    # Récupérer les numéros de tomes de la saga (projection couverte par l'index saga)
+    existing_books = await books_collection.find(
+        saga_filter(current_user["id"], saga_name), {"_id": 0, "volume_number": 1}
+    ).to_list(length=None)
     
     if not existing_books:
         raise HTTPException(status_code=404, detail="Saga non trouvée")
@@ -319,26 +276,11 @@ async def analyze_missing_volumes(
     max_volume = max(volume_numbers)
     
     # Identifier les volumes manquants
-    missing_volumes = []
-    for vol_num in range(min_volume, max_volume + 1):
-        if vol_num not in volume_numbers:
-            missing_volumes.append(vol_num)
+    owned_volumes = set(volume_numbers)
+    missing_volumes = [vol_num for vol_num in range(min_volume, max_volume + 1) if vol_num not in owned_volumes]
     
     # Identifier les gaps (séquences manquantes)
-    gaps = []
-    if missing_volumes:
-        gap_start = missing_volumes[0]
-        gap_end = missing_volumes[0]
-        
-        for i in range(1, len(missing_volumes)):
-            if missing_volumes[i] == gap_end + 1:
-                gap_end = missing_volumes[i]
-            else:
-                gaps.append({"start": gap_start, "end": gap_end})
-                gap_start = missing_volumes[i]
-                gap_end = missing_volumes[i]
-        
-        gaps.append({"start": gap_start, "end": gap_end})
+    gaps = volume_gaps(missing_volumes)
     
     return {
         "saga_name": saga_name,
@@ -1,6 +1,7 @@
 from .jwt import (
     create_access_token,
     get_current_user,
+    invalidate_user_cache,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     security
 )
@@ -8,6 +9,7 @@ from .jwt import (
 __all__ = [
     "create_access_token",
     "get_current_user", 
+    "invalidate_user_cache",
     "ACCESS_TOKEN_EXPIRE_MINUTES",
     "security"
 ]
\ No newline at end of file
@@ -4,7 +4,8 @@ from datetime import datetime, timedelta
 from fastapi import HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
-from ..database.connection import users_collection
+from ..database.connection import async_users_collection
+from .user_cache import user_cache
 
 load_dotenv()
 
@@ -27,8 +28,8 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Obtenir l'utilisateur actuel à partir du token JWT"""
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Obtenir l'utilisateur actuel à partir du token JWT (avec cache LRU)"""
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
@@ -37,16 +38,23 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid authentication credentials"
             )
-        
-        user = users_collection.find_one({"id": user_id}, {"_id": 0})
+    except jwt.PyJWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
+    
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await async_users_collection.find_one({"id": user_id}, {"_id": 0})
         if user is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="User not found"
             )
-        return user
-    except jwt.PyJWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials"
-        )
\ No newline at end of file
+        user_cache.set(user_id, user)
+    return user
+
+def invalidate_user_cache(user_id: str):
+    """Invalider l'utilisateur en cache après une modification"""
+    user_cache.invalidate(user_id)
\ No newline at end of file
@@ -0,0 +1,81 @@
+# Cache LRU des utilisateurs authentifiés pour BOOKTIME
+"""
+Cache en mémoire (par processus) des documents utilisateur, indexé par le
+`sub` du token JWT. Évite un aller-retour MongoDB à chaque requête
+authentifiée. Le TTL court borne la durée pendant laquelle un autre worker
+peut servir un utilisateur modifié ; le worker qui modifie invalide
+immédiatement son entrée.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+from ..config import USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS
+
+
+class UserCache:
+    """Cache LRU à expiration des documents utilisateur"""
+
+    def __init__(self, maxsize: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL_SECONDS):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[Dict]:
+        """Récupérer un utilisateur (None si absent ou expiré)"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return dict(user)
+
+    def set(self, user_id: str, user: Dict):
+        """Stocker un utilisateur en évinçant le moins récemment utilisé"""
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, dict(user))
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        """Retirer un utilisateur du cache (après modification/suppression)"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        """Vider le cache"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """Statistiques du cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total * 100, 2) if total else 0.0
+            }
+
+
+# Instance globale du cache utilisateurs
+user_cache = UserCache()
@@ -3,12 +3,15 @@ Service d'enrichissement d'images pour les séries
 Utilise Open Library API et vision_expert_agent pour obtenir des images de couverture
 """
 import asyncio
-import aiohttp
 import json
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Union
 from urllib.parse import quote
+import httpx
+from ..utils.cache import cache, CacheConfig
+from ..utils.http_client import http_client
+from ..services.openlibrary_cache import openlibrary_cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,22 +19,9 @@ class SeriesImageService:
     """Service pour enrichir les séries avec des images de couverture"""
     
     def __init__(self):
-        self.session = None
         self.base_openlibrary_url = "https://openlibrary.org"
         self.base_covers_url = "https://covers.openlibrary.org/b"
         
-    async def get_session(self):
-        """Obtenir une session aiohttp réutilisable"""
-        if not self.session:
-            self.session = aiohttp.ClientSession()
-        return self.session
-    
-    async def close(self):
-        """Fermer la session aiohttp"""
-        if self.session:
-            await self.session.close()
-            self.session = None
-    
     async def search_series_cover_openlibrary(self, series_name: str, author: str = None) -> Optional[str]:
         """
         Rechercher une image de couverture pour une série via Open Library
@@ -45,8 +35,6 @@ class SeriesImageService:
             URL de l'image de couverture ou None
         """
         try:
-            session = await self.get_session()
-            
             # 🔍 OPTIMISATION : Essayer plusieurs stratégies de recherche
             search_strategies = []
             
@@ -78,26 +66,26 @@ class SeriesImageService:
                 }
                 
                 try:
-                    async with session.get(search_url, params=params, timeout=10) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            docs = data.get('docs', [])
-                            
-                            # Chercher un livre avec une couverture
-                            for doc in docs:
-                                cover_id = doc.get('cover_i')
-                                if cover_id:
-                                    # Construire l'URL de la couverture (utiliser taille L pour meilleure qualité)
-                                    cover_url = f"{self.base_covers_url}/id/{cover_id}-L.jpg"
-                                    
-                                    # Vérifier que l'image existe
-                                    if await self._verify_image_exists(cover_url):
-                                        logger.info(f"✅ Image trouvée pour '{series_name}' (stratégie {i+1}): {cover_url}")
-                                        return cover_url
-                        else:
-                            logger.debug(f"⚠️ Stratégie {i+1} - Erreur Open Library: {response.status}")
-                            
-                except asyncio.TimeoutError:
+                    response = await openlibrary_cache.get(search_url, params=params, timeout=10)
+                    if response.status_code == 200:
+                        data = response.json()
+                        docs = data.get('docs', [])
+                        
+                        # Chercher un livre avec une couverture
+                        for doc in docs:
+                            cover_id = doc.get('cover_i')
+                            if cover_id:
+                                # Construire l'URL de la couverture (utiliser taille L pour meilleure qualité)
+                                cover_url = f"{self.base_covers_url}/id/{cover_id}-L.jpg"
+                                
+                                # Vérifier que l'image existe
+                                if await self._verify_image_exists(cover_url):
+                                    logger.info(f"✅ Image trouvée pour '{series_name}' (stratégie {i+1}): {cover_url}")
+                                    return cover_url
+                    else:
+                        logger.debug(f"⚠️ Stratégie {i+1} - Erreur Open Library: {response.status_code}")
+                        
+                except httpx.TimeoutException:
                     logger.debug(f"⏰ Stratégie {i+1} - Timeout")
                     continue
                 except Exception as e:
@@ -151,22 +139,29 @@ class SeriesImageService:
         OPTIMISÉ - Amélioration gestion timeout et erreurs
         """
         try:
-            session = await self.get_session()
-            # Timeout plus court pour vérification rapide
-            async with session.head(image_url, timeout=5) as response:
-                is_valid = response.status == 200 and response.headers.get('content-type', '').startswith('image/')
-                if is_valid:
-                    logger.debug(f"✅ Image valide: {image_url}")
-                else:
-                    logger.debug(f"❌ Image invalide (status: {response.status}): {image_url}")
-                return is_valid
-        except asyncio.TimeoutError:
+            # Résultat partagé entre workers pour la durée du cache Open Library
+            return await cache.get_or_set(
+                cache.build_key("openlibrary", "cover_exists", image_url),
+                lambda: self._head_image(image_url),
+                CacheConfig.duration_for("openlibrary")
+            )
+        except httpx.TimeoutException:
             logger.debug(f"⏰ Timeout vérification image: {image_url}")
             return False
         except Exception as e:
             logger.debug(f"⚠️ Erreur vérification image: {e}")
             return False
     
+    async def _head_image(self, image_url: str) -> bool:
+        # Timeout plus court pour vérification rapide
+        response = await http_client.request("HEAD", image_url, timeout=5)
+        is_valid = response.status_code == 200 and response.headers.get('content-type', '').startswith('image/')
+        if is_valid:
+            logger.debug(f"✅ Image valide: {image_url}")
+        else:
+            logger.debug(f"❌ Image invalide (status: {response.status_code}): {image_url}")
+        return is_valid
+    
     async def get_placeholder_image_from_vision_expert(self, series_name: str, category: str = None) -> Optional[str]:
         """
         Obtenir une image placeholder de qualité via vision_expert_agent
@@ -351,8 +346,6 @@ class SeriesImageService:
         except Exception as e:
             logger.error(f"❌ Erreur enrichissement base: {e}")
             raise
-        finally:
-            await self.close()
 
 # Instance globale
 image_service = SeriesImageService()
\ No newline at end of file
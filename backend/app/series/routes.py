@@ -1,21 +1,37 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from typing import Optional, List, Dict
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict
 from datetime import datetime
 import uuid
-import re
-import json
-import os
 import asyncio
 import logging
-from ..database.connection import books_collection, series_library_collection
+import orjson
+from ..database.connection import (
+    async_books_collection as books_collection,
+    async_series_library_collection as series_library_collection
+)
+from ..config import SERIES_DATABASE_PATH, ENRICHMENT_SERIES_LIST_MAX
 from ..security.jwt import get_current_user
-from ..models.series import VolumeData, SeriesLibraryCreate, SeriesReadingPreferences, SeriesReadingPreferencesUpdate
+from ..utils.cache import cache
+from ..services.series_catalog import series_catalog, extract_volume_number
+from ..services.saga_volumes import saga_volume_service
+from ..services.enrichment_jobs import (
+    enrichment_job_service, database_image_stats, database_output_path,
+    JOB_KIND_SERIES_LIST, JOB_KIND_DATABASE
+)
+from ..utils.saga_key import saga_filter
+from ..models.series import (
+    VolumeData, SeriesLibraryCreate, SeriesReadingPreferences, SeriesReadingPreferencesUpdate,
+    SeriesDetectBatchRequest, VolumeStatusBulkUpdate
+)
 from .image_service import image_service
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/series", tags=["series"])
 
+DETECT_BATCH_YIELD_EVERY = 500
+
 @router.get("/popular")
 async def get_popular_series(
     category: Optional[str] = None,
@@ -26,136 +42,8 @@ async def get_popular_series(
     """
     Récupérer la liste des séries populaires avec métadonnées complètes
     """
-    # Mapping complet des séries populaires (côté backend)
-    series_data = {
-        # ROMANS FANTASY/SF
-        "harry_potter": {
-            "name": "Harry Potter",
-            "category": "roman",
-            "score": 18000,
-            "keywords": ["harry", "potter", "hogwarts", "sorcier", "wizard", "poudlard", "voldemort"],
-            "authors": ["J.K. Rowling"],
-            "variations": ["Harry Potter", "École des Sorciers", "Chambre des Secrets"],
-            "volumes": 7,
-            "languages": ["fr", "en"],
-            "description": "La saga emblématique du jeune sorcier Harry Potter",
-            "first_published": 1997,
-            "status": "completed"
-        },
-        "seigneur_des_anneaux": {
-            "name": "Le Seigneur des Anneaux",
-            "category": "roman",
-            "score": 18000,
-            "keywords": ["anneau", "terre du milieu", "hobbit", "frodo", "gandalf"],
-            "authors": ["J.R.R. Tolkien"],
-            "variations": ["Seigneur des Anneaux", "Lord of the Rings"],
-            "volumes": 3,
-            "languages": ["fr", "en"],
-            "description": "L'épopée fantasy légendaire de Tolkien",
-            "first_published": 1954,
-            "status": "completed"
-        },
-        "game_of_thrones": {
-            "name": "Game of Thrones",
-            "category": "roman",
-            "score": 16000,
-            "keywords": ["trône de fer", "westeros", "stark", "lannister"],
-            "authors": ["George R.R. Martin"],
-            "variations": ["Game of Thrones", "Trône de Fer"],
-            "volumes": 5,
-            "languages": ["fr", "en"],
-            "description": "La saga politique et fantastique de Westeros",
-            "first_published": 1996,
-            "status": "ongoing"
-        },
-        # MANGAS
-        "one_piece": {
-            "name": "One Piece",
-            "category": "manga",
-            "score": 18000,
-            "keywords": ["luffy", "pirates", "chapeau de paille", "grand line"],
-            "authors": ["Eiichiro Oda"],
-            "variations": ["One Piece"],
-            "volumes": 108,
-            "languages": ["fr", "en", "jp"],
-            "description": "L'aventure du pirate Luffy à la recherche du One Piece",
-            "first_published": 1997,
-            "status": "ongoing"
-        },
-        "naruto": {
-            "name": "Naruto",
-            "category": "manga",
-            "score": 17000,
-            "keywords": ["naruto", "ninja", "konoha", "sasuke", "hokage"],
-            "authors": ["Masashi Kishimoto"],
-            "variations": ["Naruto", "Boruto"],
-            "volumes": 72,
-            "languages": ["fr", "en", "jp"],
-            "description": "L'histoire du ninja Naruto Uzumaki",
-            "first_published": 1999,
-            "status": "completed"
-        },
-        "dragon_ball": {
-            "name": "Dragon Ball",
-            "category": "manga",
-            "score": 17000,
-            "keywords": ["goku", "saiyan", "kamehameha", "vegeta"],
-            "authors": ["Akira Toriyama"],
-            "variations": ["Dragon Ball", "Dragon Ball Z", "Dragon Ball Super"],
-            "volumes": 42,
-            "languages": ["fr", "en", "jp"],
-            "description": "Les aventures de Son Goku et des Dragon Balls",
-            "first_published": 1984,
-            "status": "completed"
-        },
-        # BANDES DESSINÉES
-        "asterix": {
-            "name": "Astérix",
-            "category": "bd",
-            "score": 18000,
-            "keywords": ["astérix", "obélix", "gaulois", "potion magique"],
-            "authors": ["René Goscinny", "Albert Uderzo"],
-            "variations": ["Astérix", "Asterix"],
-            "volumes": 39,
-            "languages": ["fr", "en"],
-            "description": "Les aventures d'Astérix et Obélix en Gaule",
-            "first_published": 1961,
-            "status": "completed"
-        },
-        "tintin": {
-            "name": "Tintin",
-            "category": "bd",
-            "score": 17000,
-            "keywords": ["tintin", "milou", "capitaine haddock", "dupont"],
-            "authors": ["Hergé"],
-            "variations": ["Tintin", "Adventures of Tintin"],
-            "volumes": 24,
-            "languages": ["fr", "en"],
-            "description": "Les aventures du reporter Tintin et de son chien Milou",
-            "first_published": 1929,
-            "status": "completed"
-        }
-    }
-    
-    # Filtrer par catégorie si spécifiée
-    if category:
-        series_data = {k: v for k, v in series_data.items() if v["category"] == category}
-    
-    # Filtrer par langue si spécifiée
-    if language:
-        series_data = {k: v for k, v in series_data.items() if language in v["languages"]}
-    
-    # Convertir en liste et trier par score
-    series_list = []
-    for series_id, series_info in series_data.items():
-        series_list.append({
-            "id": series_id,
-            **series_info
-        })
-    
-    # Trier par score et limiter
-    series_list.sort(key=lambda x: x["score"], reverse=True)
-    series_list = series_list[:limit]
+    # Catalogue indexé (séries de référence + base récoltée), trié par score
+    series_list = series_catalog.popular(category=category, language=language, limit=limit)
     
     return {
         "series": series_list,
@@ -174,33 +62,8 @@ async def search_series(
     if not q or len(q.strip()) < 2:
         return {"series": [], "total": 0, "search_term": q}
     
-    # Récupérer les séries populaires
-    popular_response = await get_popular_series(category, "fr", 1000, current_user)
-    all_series = popular_response["series"]
-    
-    search_term = q.strip().lower()
-    matching_series = []
-    
-    for series in all_series:
-        # Chercher dans le nom
-        if search_term in series["name"].lower():
-            matching_series.append(series)
-            continue
-        
-        # Chercher dans les mots-clés
-        if any(search_term in keyword for keyword in series["keywords"]):
-            matching_series.append(series)
-            continue
-        
-        # Chercher dans les auteurs
-        if any(search_term in author.lower() for author in series["authors"]):
-            matching_series.append(series)
-            continue
-        
-        # Chercher dans les variations
-        if any(search_term in variation.lower() for variation in series["variations"]):
-            matching_series.append(series)
-            continue
+    # Recherche par préfixe de jetons dans l'index du catalogue
+    matching_series = series_catalog.search(q, category=category)
     
     return {
         "series": matching_series,
@@ -220,55 +83,45 @@ async def detect_series(
     if not title or len(title.strip()) < 2:
         return {"detected_series": [], "book_info": {"title": title, "author": author}}
     
-    # Récupérer les séries populaires
-    popular_response = await get_popular_series(None, "fr", 1000, current_user)
-    all_series = popular_response["series"]
-    
-    detected_series = []
-    title_lower = title.lower()
-    author_lower = author.lower() if author else ""
-    
-    for series in all_series:
-        confidence = 0
-        
-        # Vérifier le nom de la série
-        if series["name"].lower() in title_lower:
-            confidence += 80
-        
-        # Vérifier les mots-clés
-        matching_keywords = sum(1 for keyword in series["keywords"] if keyword in title_lower)
-        confidence += matching_keywords * 20
-        
-        # Vérifier l'auteur
-        if author_lower and any(author_name.lower() in author_lower for author_name in series["authors"]):
-            confidence += 50
-        
-        # Vérifier les variations
-        if any(variation.lower() in title_lower for variation in series["variations"]):
-            confidence += 60
-        
-        # Seuil de confiance
-        if confidence >= 40:
-            detected_series.append({
-                "series_name": series["name"],
-                "confidence": confidence,
-                "authors": series["authors"],
-                "category": series["category"],
-                "volumes": series["volumes"],
-                "description": series["description"]
-            })
-    
-    # Trier par confiance
-    detected_series.sort(key=lambda x: x["confidence"], reverse=True)
+    # Seules les séries partageant un jeton avec le titre ou l'auteur sont évaluées
+    detected_series = series_catalog.detect(title, author, limit=5)
     
     return {
-        "detected_series": detected_series[:5],  # Top 5
+        "detected_series": detected_series,  # Top 5
         "book_info": {
             "title": title,
             "author": author
         }
     }
 
+@router.post("/detect/batch")
+async def detect_series_batch(
+    request: SeriesDetectBatchRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Détecter les séries d'un lot de livres (imports, re-scan de bibliothèque).
+    Réponse en flux NDJSON : une ligne par livre, dans l'ordre de la requête.
+    """
+    async def stream_results():
+        detections = series_catalog.detect_many(
+            ((book.title, book.author) for book in request.books), limit=request.limit
+        )
+        for position, (book, detected) in enumerate(zip(request.books, detections)):
+            yield orjson.dumps({
+                "index": position,
+                "id": book.id,
+                "title": book.title,
+                "author": book.author,
+                "detected_series": detected,
+                "volume_number": extract_volume_number(book.title)
+            }) + b"\n"
+            # Rendre la main à la boucle entre deux paquets de lignes
+            if position % DETECT_BATCH_YIELD_EVERY == DETECT_BATCH_YIELD_EVERY - 1:
+                await asyncio.sleep(0)
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 @router.post("/complete")
 async def auto_complete_series(
     series_data: dict,
@@ -284,92 +137,39 @@ async def auto_complete_series(
     if not series_name:
         raise HTTPException(status_code=400, detail="Nom de série requis")
     
-    # Base de données des séries pour obtenir les informations par défaut
-    SERIES_INFO = {
-        "Le Seigneur des Anneaux": {
-            "author": "J.R.R. Tolkien",
-            "category": "roman",
-            "volumes": 3,
-            "tomes": ["La Communauté de l'Anneau", "Les Deux Tours", "Le Retour du Roi"]
-        },
-        "Harry Potter": {
-            "author": "J.K. Rowling", 
-            "category": "roman",
-            "volumes": 7,
-            "tomes": [
-                "Harry Potter à l'école des sorciers",
-                "Harry Potter et la Chambre des secrets", 
-                "Harry Potter et le Prisonnier d'Azkaban",
-                "Harry Potter et la Coupe de feu",
-                "Harry Potter et l'Ordre du phénix",
-                "Harry Potter et le Prince de sang-mêlé",
-                "Harry Potter et les Reliques de la Mort"
-            ]
-        },
-        "One Piece": {
-            "author": "Eiichiro Oda",
-            "category": "manga", 
-            "volumes": 100,
-            "tomes": []
-        },
-        "Naruto": {
-            "author": "Masashi Kishimoto",
-            "category": "manga",
-            "volumes": 72,
-            "tomes": []
-        },
-        "Astérix": {
-            "author": "René Goscinny et Albert Uderzo",
-            "category": "bd",
-            "volumes": 39,
-            "tomes": []
-        }
-    }
-    
     # Récupérer le livre modèle si existe
     template_book = None
     if template_book_id:
-        template_book = books_collection.find_one({
+        template_book = await books_collection.find_one({
             "id": template_book_id,
             "user_id": current_user["id"]
         })
     
-    # Sinon, chercher un livre de cette série
+    # Sinon, chercher un livre de cette série (égalité sur saga_key : index user_saga_key_volume_index)
     if not template_book:
-        template_book = books_collection.find_one({
-            "user_id": current_user["id"],
-            "saga": {"$regex": re.escape(series_name), "$options": "i"}
-        })
+        template_book = await books_collection.find_one(saga_filter(current_user["id"], series_name))
     
-    # Si pas de livre modèle, utiliser les informations de la base de données
-    series_info = SERIES_INFO.get(series_name)
+    # Si pas de livre modèle, utiliser les informations du catalogue des séries
+    series_info = series_catalog.get(series_name)
     if not template_book and not series_info:
         raise HTTPException(status_code=404, detail="Série non reconnue et aucun livre modèle trouvé")
     
     # Déterminer les informations de base
     if template_book:
-        base_author = template_book.get("author", "")
-        base_category = template_book.get("category", "roman")
-        base_genre = template_book.get("genre", "")
-        base_publisher = template_book.get("publisher", "")
-    elif series_info:
-        base_author = series_info["author"]
-        base_category = series_info["category"]
-        base_genre = ""
-        base_publisher = ""
-        if series_info["volumes"] < target_volumes:
+        template = template_book
+    else:
+        template = {
+            "author": " et ".join(series_info["authors"]),
+            "category": series_info["category"]
+        }
+        if series_info["volumes"] and series_info["volumes"] < target_volumes:
             target_volumes = series_info["volumes"]
     
-    # Vérifier les volumes existants
-    existing_volumes = list(books_collection.find({
-        "user_id": current_user["id"],
-        "saga": {"$regex": re.escape(series_name), "$options": "i"}
-    }))
+    # Vérifier les volumes existants (un seul distinct indexé)
+    existing_volume_numbers = await saga_volume_service.existing_volume_numbers(current_user["id"], series_name)
     
-    existing_volume_numbers = {book.get("volume_number", 1) for book in existing_volumes}
-    
-    # Créer les volumes manquants
-    created_books = []
+    # Préparer les volumes manquants
+    new_books = []
     for volume_num in range(1, target_volumes + 1):
         if volume_num not in existing_volume_numbers:
             # Utiliser le titre spécifique si disponible
@@ -377,42 +177,24 @@ async def auto_complete_series(
             if series_info and series_info["tomes"] and volume_num <= len(series_info["tomes"]):
                 volume_title = series_info["tomes"][volume_num - 1]
             
-            book_id = str(uuid.uuid4())
-            new_book = {
-                "id": book_id,
-                "user_id": current_user["id"],
-                "title": volume_title,
-                "author": base_author,
-                "category": base_category,
-                "saga": series_name,
-                "volume_number": volume_num,
-                "status": "to_read",
-                "genre": base_genre,
-                "publisher": base_publisher,
-                "auto_added": True,
-                "date_added": datetime.utcnow(),
-                "description": f"Tome {volume_num} de la série {series_name}",
-                "total_pages": None,
-                "current_page": None,
-                "rating": None,
-                "review": "",
-                "cover_url": "",
-                "publication_year": None,
-                "isbn": "",
-                "date_started": None,
-                "date_completed": None,
-                "updated_at": datetime.utcnow()
-            }
-            
-            books_collection.insert_one(new_book)
-            created_books.append(new_book)
+            new_books.append(saga_volume_service.new_volume(
+                current_user["id"],
+                series_name,
+                volume_num,
+                template,
+                title=volume_title,
+                description=f"Tome {volume_num} de la série {series_name}"
+            ))
+    
+    # Insertion par paquets, statistiques et cache mis à jour une fois
+    created_books = await saga_volume_service.insert_volumes(current_user["id"], new_books)
     
     return {
         "success": True,
         "message": f"{len(created_books)} tome(s) ajouté(s) à votre bibliothèque !",
         "series_name": series_name,
         "created_books": len(created_books),
-        "existing_volumes": len(existing_volumes),
+        "existing_volumes": len(existing_volume_numbers),
         "created_volumes": len(created_books)
     }
 
@@ -458,6 +240,19 @@ async def update_volume_status_endpoint(
     # Déléguer l'appel à la fonction existante
     return await update_volume_status(series_id, volume_number, volume_data, current_user)
 
+@router.put("/library/{series_id}/volumes")
+async def update_volumes_status_endpoint(
+    series_id: str,
+    update: VolumeStatusBulkUpdate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Endpoint de délégation pour mettre à jour plusieurs volumes en une requête"""
+    # Importer la fonction depuis library.routes
+    from app.library.routes import update_volumes_status
+    
+    # Déléguer l'appel à la fonction existante
+    return await update_volumes_status(series_id, update, current_user)
+
 @router.put("/library/{series_id}")
 async def update_series_status_endpoint(
     series_id: str,
@@ -495,7 +290,7 @@ async def get_series_reading_preferences(
     """
     try:
         # Chercher les préférences existantes pour cette série et cet utilisateur
-        preferences = series_library_collection.find_one({
+        preferences = await series_library_collection.find_one({
             "user_id": current_user["id"],
             "series_name": series_name
         }, {"_id": 0})
@@ -533,7 +328,7 @@ async def save_series_reading_preferences(
         }
         
         # Upsert (créer ou mettre à jour) les préférences
-        result = series_library_collection.update_one(
+        result = await series_library_collection.update_one(
             {
                 "user_id": current_user["id"],
                 "series_name": preferences.series_name
@@ -547,6 +342,7 @@ async def save_series_reading_preferences(
             },
             upsert=True
         )
+        await cache.flush_user_cache(current_user["id"])
         
         return {
             "message": "Préférences de lecture sauvegardées avec succès",
@@ -570,7 +366,7 @@ async def update_series_reading_preferences(
     """
     try:
         # Mettre à jour les préférences existantes
-        result = series_library_collection.update_one(
+        result = await series_library_collection.update_one(
             {
                 "user_id": current_user["id"],
                 "series_name": series_name
@@ -594,7 +390,8 @@ async def update_series_reading_preferences(
                 "updated_at": datetime.utcnow().isoformat()
             }
             
-            series_library_collection.insert_one(preference_data)
+            await series_library_collection.insert_one(preference_data)
+            await cache.flush_user_cache(current_user["id"])
             
             return {
                 "message": "Nouvelles préférences de lecture créées",
@@ -603,6 +400,7 @@ async def update_series_reading_preferences(
                 "created": True
             }
         
+        await cache.flush_user_cache(current_user["id"])
         return {
             "message": "Préférences de lecture mises à jour avec succès",
             "series_name": series_name,
@@ -622,7 +420,7 @@ async def delete_series_reading_preferences(
     Supprimer les préférences de lecture d'une série pour l'utilisateur connecté
     """
     try:
-        result = series_library_collection.delete_one({
+        result = await series_library_collection.delete_one({
             "user_id": current_user["id"],
             "series_name": series_name
         })
@@ -630,6 +428,8 @@ async def delete_series_reading_preferences(
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Aucune préférence trouvée pour cette série")
         
+        await cache.flush_user_cache(current_user["id"])
+        
         return {
             "message": f"Préférences de lecture supprimées pour la série '{series_name}'",
             "deleted": True
@@ -645,30 +445,36 @@ async def delete_series_reading_preferences(
 @router.post("/enrich/images")
 async def enrich_series_with_images(
     request_data: Dict,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Enrichir une liste de séries avec des images de couverture
+    (travail exécuté par les workers d'enrichissement, suivi via /enrich/jobs/{job_id})
     """
     try:
         series_list = request_data.get('series_list', [])
         if not series_list:
             raise HTTPException(status_code=400, detail="Liste de séries vide")
-        
-        # Traitement en arrière-plan pour éviter les timeouts
-        background_tasks.add_task(
-            _enrich_series_background,
-            series_list,
-            current_user["id"]
+        if len(series_list) > ENRICHMENT_SERIES_LIST_MAX:
+            raise HTTPException(status_code=400, detail=f"Trop de séries (maximum {ENRICHMENT_SERIES_LIST_MAX})")
+        
+        job = await enrichment_job_service.enqueue(
+            current_user["id"],
+            JOB_KIND_SERIES_LIST,
+            {"series_list": series_list},
+            len(series_list)
         )
         
         return {
-            "message": f"Enrichissement de {len(series_list)} séries démarré en arrière-plan",
-            "status": "processing",
+            "message": f"Enrichissement de {len(series_list)} séries en file d'attente",
+            "status": job["status"],
+            "job_id": job["id"],
+            "status_url": f"/api/series/enrich/jobs/{job['id']}",
             "series_count": len(series_list)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors du lancement de l'enrichissement: {str(e)}")
 
@@ -725,36 +531,79 @@ async def enrich_single_series_image(
 @router.post("/enrich/database")
 async def enrich_database_with_images(
     request_data: Dict,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Enrichir la base de données complète des séries avec des images
+    (travail exécuté par les workers d'enrichissement, suivi via /enrich/jobs/{job_id})
     """
     try:
         sample_size = request_data.get('sample_size', None)
-        database_path = "/app/backend/data/extended_series_database.json"
+        database_path = SERIES_DATABASE_PATH
         
-        if not os.path.exists(database_path):
+        stats = await database_image_stats.get(database_path)
+        if stats is None:
             raise HTTPException(status_code=404, detail="Base de données des séries non trouvée")
         
-        # Traitement en arrière-plan pour éviter les timeouts
-        background_tasks.add_task(
-            _enrich_database_background,
-            database_path,
-            sample_size,
-            current_user["id"]
+        # Un seul enrichissement de la base à la fois (même fichier de sortie) : renvoyer celui en cours
+        total = min(sample_size or stats["total_series"], stats["total_series"])
+        job, created = await enrichment_job_service.enqueue_exclusive(
+            current_user["id"],
+            JOB_KIND_DATABASE,
+            {
+                "database_path": database_path,
+                "output_path": database_output_path(database_path),
+                "sample_size": sample_size
+            },
+            total
         )
+        if not created:
+            return {
+                "message": "Un enrichissement de la base de données est déjà en cours",
+                "status": job["status"],
+                "job_id": job["id"],
+                "status_url": f"/api/series/enrich/jobs/{job['id']}",
+                "database_path": database_path
+            }
         
         return {
-            "message": f"Enrichissement de la base de données démarré (échantillon: {sample_size or 'toute la base'})",
-            "status": "processing",
+            "message": f"Enrichissement de la base de données en file d'attente (échantillon: {sample_size or 'toute la base'})",
+            "status": job["status"],
+            "job_id": job["id"],
+            "status_url": f"/api/series/enrich/jobs/{job['id']}",
             "database_path": database_path
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors du lancement de l'enrichissement: {str(e)}")
 
+@router.get("/enrich/jobs")
+async def list_enrichment_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|completed|failed)$"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Derniers travaux d'enrichissement de l'utilisateur
+    """
+    jobs = await enrichment_job_service.list(current_user["id"], status=status, limit=limit)
+    return {"jobs": jobs, "total": len(jobs)}
+
+@router.get("/enrich/jobs/{job_id}")
+async def get_enrichment_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Statut, progression et résultats d'un travail d'enrichissement
+    """
+    job = await enrichment_job_service.get(job_id, current_user["id"])
+    if not job:
+        raise HTTPException(status_code=404, detail="Travail d'enrichissement non trouvé")
+    return job
+
 @router.get("/images/status")
 async def get_image_enrichment_status(
     current_user: dict = Depends(get_current_user)
@@ -763,45 +612,21 @@ async def get_image_enrichment_status(
     Obtenir le statut de l'enrichissement d'images
     """
     try:
-        database_path = "/app/backend/data/extended_series_database.json"
-        
-        if not os.path.exists(database_path):
+        # Comptage mis en cache tant que le fichier ne change pas
+        stats = await database_image_stats.get(SERIES_DATABASE_PATH)
+        if stats is None:
             return {"status": "no_database", "message": "Base de données non trouvée"}
         
-        # Charger un échantillon pour analyser l'état
-        with open(database_path, 'r', encoding='utf-8') as f:
-            series_data = json.load(f)
-        
-        total_series = len(series_data)
-        series_with_images = sum(1 for series in series_data if series.get('cover_url'))
+        total_series = stats["total_series"]
+        series_with_images = stats["series_with_images"]
         
         return {
             "total_series": total_series,
             "series_with_images": series_with_images,
             "enrichment_percentage": (series_with_images / total_series * 100) if total_series > 0 else 0,
-            "status": "complete" if series_with_images == total_series else "partial"
+            "status": "complete" if series_with_images == total_series else "partial",
+            "active_jobs": await enrichment_job_service.active(JOB_KIND_DATABASE)
         }
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors de la vérification du statut: {str(e)}")
-
-# Fonctions utilitaires pour les tâches en arrière-plan
-
-async def _enrich_series_background(series_list: List[Dict], user_id: str):
-    """Enrichir une liste de séries en arrière-plan"""
-    try:
-        enriched_series = await image_service.batch_enrich_series(series_list, max_concurrent=5)
-        logger.info(f"✅ Enrichissement terminé pour utilisateur {user_id}: {len(enriched_series)} séries")
-    except Exception as e:
-        logger.error(f"❌ Erreur enrichissement arrière-plan: {e}")
-
-async def _enrich_database_background(database_path: str, sample_size: Optional[int], user_id: str):
-    """Enrichir la base de données en arrière-plan"""
-    try:
-        result = await image_service.enrich_series_database(
-            database_path, 
-            sample_size=sample_size
-        )
-        logger.info(f"✅ Enrichissement base terminé pour utilisateur {user_id}: {result}")
-    except Exception as e:
-        logger.error(f"❌ Erreur enrichissement base arrière-plan: {e}")
\ No newline at end of file
@@ -5,6 +5,7 @@ from fastapi import HTTPException, status
 from ..database import users_collection
 from ..models.user import UserAuth, UserCreate, UserResponse, LoginResponse
 from ..dependencies import create_access_token
+from ..security.jwt import invalidate_user_cache
 from ..config import ACCESS_TOKEN_EXPIRE_MINUTES
 
 class AuthService:
@@ -125,6 +126,8 @@ class AuthService:
                 detail="Failed to update user"
             )
         
+        invalidate_user_cache(user_id)
+        
         # Récupérer l'utilisateur mis à jour
         updated_user = users_collection.find_one({"id": user_id})
         return UserResponse(**updated_user)
@@ -154,6 +157,7 @@ class AuthService:
                 detail="Failed to delete user"
             )
         
+        invalidate_user_cache(user_id)
         return {"message": "User deleted successfully"}
     
     @staticmethod
@@ -0,0 +1,328 @@
+# Moteur de recherche des livres pour BOOKTIME
+"""
+Recherche dans la bibliothèque d'un utilisateur :
+- mode "text" : index texte composé (user_id + champs pondérés), tri par pertinence
+- mode "regex" : sous-chaîne insensible à la casse sur les six champs (parcours
+  des livres de l'utilisateur), réservé aux termes trop courts pour l'index
+
+En mode "auto", les termes de moins de SEARCH_MIN_TEXT_LENGTH caractères passent
+par la regex ; les autres par l'index texte, avec repli regex si aucun mot
+entier ne correspond (saisie partielle, ex. "pott" pour "Potter"). Un terme de
+plusieurs mots est cherché comme une phrase, comme la regex : "harry potter"
+ne renvoie pas tous les livres contenant "harry" ou "potter". Sans index texte
+(créé par MongoOptimizer), la recherche passe aussi par la regex.
+
+La recherche groupée (search_grouped) regroupe, compte et trie côté MongoDB
+($group puis $facet) : seuls la page de groupes demandée et les premiers
+livres de chaque groupe sont renvoyés, le reste se charge à la demande.
+La progression des séries (tomes lus sur la série entière) vient de la
+progression matérialisée (series_progress), et non des seuls livres trouvés.
+"""
+
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+from pymongo.errors import OperationFailure
+from ..config import SEARCH_MIN_TEXT_LENGTH, SEARCH_GROUP_BOOKS_LIMIT
+from ..database import async_db
+from ..utils.saga_key import saga_key
+from .series_progress import series_progress_service, progress_percentage
+
+logger = logging.getLogger(__name__)
+
+SEARCH_FIELDS = ["title", "author", "saga", "description", "genre", "publisher"]
+
+# Pondération de l'index texte (voir MongoOptimizer.create_strategic_indexes)
+TEXT_INDEX_WEIGHTS = {
+    "title": 10,
+    "saga": 8,
+    "author": 6,
+    "genre": 2,
+    "publisher": 1,
+    "description": 1
+}
+
+SEARCH_MODES = ("auto", "text", "regex")
+
+
+def build_regex_filter(term: str) -> Dict[str, Any]:
+    """Filtre sous-chaîne sur tous les champs de recherche"""
+    pattern = re.escape(term)
+    return {"$or": [{field: {"$regex": pattern, "$options": "i"}} for field in SEARCH_FIELDS]}
+
+
+def build_text_filter(term: str) -> Dict[str, Any]:
+    """
+    Filtre $text (insensible à la casse et aux accents).
+    $text combine les mots par OU : plusieurs mots sont cherchés comme une phrase.
+    """
+    words = term.replace('"', " ").split()
+    search = f'"{" ".join(words)}"' if len(words) > 1 else term
+    return {"$text": {"$search": search, "$caseSensitive": False, "$diacriticSensitive": False}}
+
+
+def _trimmed(field: str) -> Dict[str, Any]:
+    return {"$trim": {"input": {"$ifNull": [f"${field}", ""]}}}
+
+
+def build_grouped_pipeline(
+    match: Dict[str, Any],
+    text: bool,
+    limit: int,
+    offset: int,
+    books_per_group: int = SEARCH_GROUP_BOOKS_LIMIT
+) -> List[Dict[str, Any]]:
+    """
+    Pipeline de regroupement des résultats :
+    saga d'abord, sinon auteur (si plusieurs livres), sinon livre isolé.
+    Une page de groupes + les totaux, en une seule agrégation.
+    """
+    saga, author = _trimmed("saga"), _trimmed("author")
+    # Clé d'une saga : saga_key ("One Piece" = "one  piece"), nom brut si non renseignée
+    series_key = {"$ifNull": ["$saga_key", saga]}
+    pipeline: List[Dict[str, Any]] = [{"$match": match}]
+    if text:
+        pipeline.append({"$addFields": {"score": {"$meta": "textScore"}}})
+
+    pipeline += [
+        {"$project": {"_id": 0}},
+        # Ordre des livres dans un groupe : tome, puis date d'ajout
+        {"$sort": {"volume_number": 1, "date_added": 1, "id": 1}},
+        {"$group": {
+            "_id": {
+                "type": {"$switch": {"branches": [
+                    {"case": {"$ne": [saga, ""]}, "then": "series"},
+                    {"case": {"$ne": [author, ""]}, "then": "author_series"}
+                ], "default": "book"}},
+                "key": {"$switch": {"branches": [
+                    {"case": {"$ne": [saga, ""]}, "then": series_key},
+                    {"case": {"$ne": [author, ""]}, "then": author}
+                ], "default": "$id"}}
+            },
+            # Nom affiché : celui du premier tome
+            "name": {"$first": {"$switch": {"branches": [
+                {"case": {"$ne": [saga, ""]}, "then": saga},
+                {"case": {"$ne": [author, ""]}, "then": author}
+            ], "default": "$id"}}},
+            "total_books": {"$sum": 1},
+            "completed_books": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+            "reading_books": {"$sum": {"$cond": [{"$eq": ["$status", "reading"]}, 1, 0]}},
+            "relevance": {"$max": {"$ifNull": ["$score", 0]}},
+            "date_added": {"$min": "$date_added"},
+            "last_updated": {"$max": {"$ifNull": ["$updated_at", "$date_added"]}},
+            "books": {"$firstN": {"input": "$$ROOT", "n": books_per_group}}
+        }},
+        # Un seul livre d'un auteur : livre isolé
+        {"$addFields": {"type": {"$cond": [
+            {"$and": [{"$eq": ["$_id.type", "author_series"]}, {"$eq": ["$total_books", 1]}]},
+            "book",
+            "$_id.type"
+        ]}}},
+        {"$sort": {
+            **({"relevance": -1} if text else {}),
+            "last_updated": -1,
+            "_id.key": 1
+        }},
+        {"$facet": {
+            "groups": [{"$skip": offset}, {"$limit": limit}],
+            "counts": [{"$group": {
+                "_id": "$type",
+                "groups": {"$sum": 1},
+                "books": {"$sum": "$total_books"}
+            }}]
+        }}
+    ]
+    return pipeline
+
+
+def format_group(group: Dict[str, Any]) -> Dict[str, Any]:
+    """Entité de résultat (série, auteur ou livre isolé) depuis un groupe agrégé"""
+    books = group.get("books", [])
+    if group["type"] == "book":
+        book = books[0]
+        book["type"] = "book"
+        return book
+
+    name = group["name"]
+    first_book = books[0] if books else {}
+    total_books = group["total_books"]
+    completed_books = group["completed_books"]
+    is_series = group["type"] == "series"
+
+    return {
+        "id": f"{'series' if is_series else 'author'}_{name.replace(' ', '_').lower()}",
+        "type": group["type"],
+        "title": name if is_series else f"Livres de {name}",
+        "author": first_book.get("author") if is_series else name,
+        "category": first_book.get("category"),
+        "description": first_book.get("description", "") if is_series else f"Collection de {total_books} livre(s) de {name}",
+        "cover_url": first_book.get("cover_url", ""),
+        "genre": first_book.get("genre", ""),
+        "total_books": total_books,
+        "completed_books": completed_books,
+        "reading_books": group["reading_books"],
+        "progress_percentage": round((completed_books / total_books) * 100) if total_books > 0 else 0,
+        "relevance": group.get("relevance", 0),
+        "books": books,
+        "has_more_books": total_books > len(books),
+        # Suite des livres du groupe, chargée à la demande
+        "books_url": (
+            f"/api/sagas/{quote(name, safe='')}/books" if is_series
+            else f"/api/books/all?author={quote(name, safe='')}"
+        ),
+        "date_added": group.get("date_added"),
+        "last_updated": group.get("last_updated")
+    }
+
+
+class BookSearchService:
+    """Recherche de livres par index texte avec repli regex"""
+
+    def __init__(self):
+        self.db = async_db
+
+    @staticmethod
+    def resolve_mode(term: str, mode: str = "auto") -> str:
+        """Mode effectivement utilisé pour un terme"""
+        if mode in ("text", "regex"):
+            return mode
+        return "text" if len(term) >= SEARCH_MIN_TEXT_LENGTH else "regex"
+
+    @staticmethod
+    def _base_filter(user_id: str, category: Optional[str]) -> Dict[str, Any]:
+        base_filter = {"user_id": user_id}
+        if category:
+            base_filter["category"] = category
+        return base_filter
+
+    async def search(
+        self,
+        user_id: str,
+        term: str,
+        category: Optional[str] = None,
+        mode: str = "auto"
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Livres de l'utilisateur correspondant au terme.
+        Retourne (livres, mode utilisé) ; en mode texte chaque livre porte son `score`.
+        """
+        base_filter = self._base_filter(user_id, category)
+
+        start_time = time.time()
+        used_mode = self.resolve_mode(term, mode)
+
+        books: List[Dict[str, Any]] = []
+        if used_mode == "text":
+            try:
+                books = await self.db.books.find(
+                    {**base_filter, **build_text_filter(term)},
+                    {"_id": 0, "score": {"$meta": "textScore"}}
+                ).sort([("score", {"$meta": "textScore"})]).to_list(length=None)
+            except OperationFailure as e:
+                logger.warning(f"⚠️ Recherche texte indisponible (index manquant ?), repli regex: {e}")
+                used_mode = "regex_fallback"
+
+            if not books and mode == "auto":
+                used_mode = "regex_fallback"
+
+        if used_mode != "text":
+            books = await self.db.books.find(
+                {"$and": [base_filter, build_regex_filter(term)]},
+                {"_id": 0}
+            ).to_list(length=None)
+
+        logger.debug(f"search[{used_mode}] '{term}': {len(books)} livres en {(time.time() - start_time) * 1000:.2f}ms")
+        return books, used_mode
+
+    async def search_grouped(
+        self,
+        user_id: str,
+        term: str,
+        category: Optional[str] = None,
+        mode: str = "auto",
+        limit: int = 20,
+        offset: int = 0,
+        books_per_group: int = SEARCH_GROUP_BOOKS_LIMIT
+    ) -> Dict[str, Any]:
+        """
+        Page de résultats groupés (séries, auteurs, livres isolés) et totaux.
+        Chaque groupe contient au plus `books_per_group` livres.
+        """
+        base_filter = self._base_filter(user_id, category)
+
+        start_time = time.time()
+        used_mode = self.resolve_mode(term, mode)
+
+        facets: Dict[str, Any] = {}
+        if used_mode == "text":
+            try:
+                facets = await self._aggregate_groups(
+                    {**base_filter, **build_text_filter(term)}, True, limit, offset, books_per_group
+                )
+            except OperationFailure as e:
+                logger.warning(f"⚠️ Recherche texte indisponible (index manquant ?), repli regex: {e}")
+                used_mode = "regex_fallback"
+            if not facets.get("counts") and mode == "auto":
+                used_mode = "regex_fallback"
+
+        if used_mode != "text":
+            facets = await self._aggregate_groups(
+                {"$and": [base_filter, build_regex_filter(term)]}, False, limit, offset, books_per_group
+            )
+
+        counts = {row["_id"]: row for row in facets.get("counts", [])}
+        total_groups = sum(row["groups"] for row in counts.values())
+        results = [format_group(group) for group in facets.get("groups", [])]
+        await self._apply_series_progress(user_id, results)
+        logger.debug(f"search_grouped[{used_mode}] '{term}': {total_groups} groupes en {(time.time() - start_time) * 1000:.2f}ms")
+
+        return {
+            "results": results,
+            "total_books": sum(row["books"] for row in counts.values()),
+            "total_sagas": counts.get("series", {}).get("groups", 0),
+            "total_author_series": counts.get("author_series", {}).get("groups", 0),
+            "total_groups": total_groups,
+            "search_mode": used_mode,
+            "limit": limit,
+            "offset": offset,
+            "has_more": offset + limit < total_groups
+        }
+
+    @staticmethod
+    async def _apply_series_progress(user_id: str, results: List[Dict[str, Any]]):
+        """
+        Progression de la série entière pour les groupes « series » de la page,
+        sous des clés series_* : les compteurs du groupe (livres trouvés) restent cohérents
+        """
+        series = [result for result in results if result["type"] == "series"]
+        if not series:
+            return
+        progress_by_key = await series_progress_service.get_many(user_id, [result["title"] for result in series])
+        for result in series:
+            progress = progress_by_key.get(saga_key(result["title"]))
+            if not progress or not progress.get("total_books"):
+                continue
+            result.update({
+                "series_total_books": progress["total_books"],
+                "series_completed_books": progress["completed_books"],
+                "series_reading_books": progress["reading_books"],
+                "series_progress_percentage": progress_percentage(progress)
+            })
+
+    async def _aggregate_groups(
+        self,
+        match: Dict[str, Any],
+        text: bool,
+        limit: int,
+        offset: int,
+        books_per_group: int
+    ) -> Dict[str, Any]:
+        pipeline = build_grouped_pipeline(match, text, limit, offset, books_per_group)
+        result = await self.db.books.aggregate(pipeline, allowDiskUse=True).to_list(length=1)
+        return result[0] if result else {}
+
+
+# Instance globale du moteur de recherche
+book_search_service = BookSearchService()
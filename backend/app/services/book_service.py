@@ -8,6 +8,7 @@ from ..models.book import BookCreate, BookUpdate, BookResponse, BookSearchRespon
 from ..models.common import StatsResponse, AuthorStats, SagaStats
 from ..dependencies import build_search_query, get_pagination_params, build_pagination_response
 from ..config import VALID_CATEGORIES, VALID_STATUSES
+from ..utils.saga_key import with_saga_key
 
 class BookService:
     
@@ -53,7 +54,7 @@ class BookService:
         }
         
         try:
-            books_collection.insert_one(book_doc)
+            books_collection.insert_one(with_saga_key(book_doc))
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -171,7 +172,7 @@ class BookService:
         try:
             books_collection.update_one(
                 {"id": book_id, "user_id": user_id},
-                {"$set": update_dict}
+                {"$set": with_saga_key(update_dict)}
             )
         except Exception as e:
             raise HTTPException(
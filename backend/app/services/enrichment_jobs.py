@@ -0,0 +1,425 @@
+# File des travaux d'enrichissement d'images pour BOOKTIME
+"""
+Les enrichissements d'images (/api/series/enrich/images et /enrich/database)
+sont enregistrés dans la collection `enrichment_jobs` et exécutés par des
+processus séparés (scripts/enrichment_worker.py), hors du worker web.
+
+Cycle d'un travail : queued -> running -> completed | failed.
+- Un worker réserve un travail par `find_one_and_update` et le garde par un
+  bail (`lease_expires_at`) renouvelé à chaque point de reprise.
+- Les séries sont traitées par paquets de ENRICHMENT_JOB_CHUNK_SIZE ; après
+  chaque paquet, `checkpoint` et `progress` sont écrits (et, pour la base,
+  le fichier de sortie). Un travail dont le bail expire (worker arrêté) est
+  repris par un autre worker à partir du dernier point de reprise.
+- Au plus ENRICHMENT_MAX_RUNNING_JOBS travaux en cours tous workers confondus
+  (contrôle au moment de la réservation), et ENRICHMENT_ITEM_CONCURRENCY
+  requêtes Open Library simultanées par travail.
+- Un seul travail actif (en attente ou en cours) par type exclusif : ces
+  travaux portent `exclusive_key` tant qu'ils sont actifs, et un index unique
+  partiel sur ce champ refuse le second à l'insertion (pas de lecture
+  préalable, donc pas de course entre deux requêtes ou deux workers).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from ..config import (
+    ENRICHMENT_JOB_CHUNK_SIZE, ENRICHMENT_ITEM_CONCURRENCY, ENRICHMENT_MAX_RUNNING_JOBS,
+    ENRICHMENT_JOB_LEASE_SECONDS, ENRICHMENT_JOB_MAX_ATTEMPTS, ENRICHMENT_WORKER_POLL_INTERVAL
+)
+from ..database import async_db
+from ..series.image_service import image_service
+from ..utils.http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND_SERIES_LIST = "series_list"
+JOB_KIND_DATABASE = "database"
+
+# Un seul travail de ces types actif à la fois : ils réécrivent le même fichier de sortie
+EXCLUSIVE_KINDS = [JOB_KIND_DATABASE]
+EXCLUSIVE_INDEX_NAME = "enrichment_jobs_exclusive_idx"
+
+# Champs renvoyés par l'API (la liste de séries à traiter reste en base)
+JOB_PUBLIC_PROJECTION = {"_id": 0, "payload.series_list": 0, "locked_by": 0, "exclusive_key": 0}
+
+
+def new_job(user_id: str, kind: str, payload: Dict[str, Any], total: int) -> Dict[str, Any]:
+    """Document d'un travail en attente"""
+    now = datetime.utcnow()
+    job = {
+        "id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "kind": kind,
+        "status": "queued",
+        "payload": payload,
+        "checkpoint": 0,
+        "progress": {"total": total, "processed": 0, "enriched": 0},
+        "results": [],
+        "attempts": 0,
+        "locked_by": None,
+        "lease_expires_at": None,
+        "error": None,
+        "result": None,
+        "created_at": now,
+        "updated_at": now
+    }
+    if kind in EXCLUSIVE_KINDS:
+        # Retiré à la fin du travail (_finish, fail_exhausted)
+        job["exclusive_key"] = kind
+    return job
+
+
+def claimable_filter(now: datetime) -> Dict[str, Any]:
+    """Travaux réservables : en attente, ou en cours dont le bail a expiré"""
+    return {
+        "$or": [
+            {"status": "queued"},
+            {"status": "running", "lease_expires_at": {"$lt": now}}
+        ],
+        "attempts": {"$lt": ENRICHMENT_JOB_MAX_ATTEMPTS}
+    }
+
+
+def job_percentage(job: Dict[str, Any]) -> int:
+    """Avancement d'un travail en pourcentage"""
+    progress = job.get("progress") or {}
+    total = progress.get("total") or 0
+    return round(progress.get("processed", 0) / total * 100) if total else 0
+
+
+def database_output_path(database_path: str) -> str:
+    """Fichier de sortie de l'enrichissement de la base (comme enrich_series_database)"""
+    return database_path.replace('.json', '_enriched.json')
+
+
+def _read_json(path: str) -> Any:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write_json_atomic(path: str, data: Any):
+    # Fichier temporaire puis renommage : un arrêt en cours d'écriture laisse le point de reprise précédent intact
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+class DatabaseImageStats:
+    """Comptage des séries avec image, recalculé seulement si le fichier change"""
+
+    def __init__(self):
+        self._cache: Dict[str, Tuple[Tuple[float, int], Dict[str, int]]] = {}
+
+    def _compute(self, path: str) -> Optional[Dict[str, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        signature = (stat.st_mtime, stat.st_size)
+        cached = self._cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        series_data = _read_json(path)
+        stats = {
+            "total_series": len(series_data),
+            "series_with_images": sum(1 for series in series_data if series.get('cover_url'))
+        }
+        self._cache[path] = (signature, stats)
+        return stats
+
+    async def get(self, path: str) -> Optional[Dict[str, int]]:
+        """Statistiques du fichier, None s'il n'existe pas (lecture hors boucle d'événements)"""
+        return await asyncio.to_thread(self._compute, path)
+
+
+class EnrichmentJobService:
+    """File persistante des travaux d'enrichissement d'images"""
+
+    def __init__(self):
+        self.db = async_db
+        self.collection = self.db.enrichment_jobs
+        self._handlers = {
+            JOB_KIND_SERIES_LIST: self._run_series_list,
+            JOB_KIND_DATABASE: self._run_database
+        }
+        self._indexes_ready = False
+
+    async def ensure_indexes(self):
+        """Index unique partiel garantissant un seul travail actif par type exclusif"""
+        if self._indexes_ready:
+            return
+        await self.collection.create_index(
+            [("exclusive_key", ASCENDING)],
+            unique=True,
+            partialFilterExpression={"exclusive_key": {"$exists": True}},
+            name=EXCLUSIVE_INDEX_NAME
+        )
+        self._indexes_ready = True
+
+    # Côté API
+
+    async def enqueue(self, user_id: str, kind: str, payload: Dict[str, Any], total: int) -> Dict[str, Any]:
+        """Enregistrer un travail ; il sera pris par le premier worker disponible"""
+        job = new_job(user_id, kind, payload, total)
+        await self.collection.insert_one(job)
+        logger.info(f"📥 Travail d'enrichissement {job['id']} ({kind}, {total} séries) en attente")
+        return job
+
+    async def enqueue_exclusive(
+        self,
+        user_id: str,
+        kind: str,
+        payload: Dict[str, Any],
+        total: int
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Travail d'un type exclusif : (nouveau travail, True), ou (travail déjà
+        actif, False) si l'index unique refuse l'insertion
+        """
+        await self.ensure_indexes()
+        for _ in range(3):
+            try:
+                return await self.enqueue(user_id, kind, payload, total), True
+            except DuplicateKeyError:
+                active = await self.active(kind)
+                if active:
+                    return active[0], False
+                # Le travail actif vient de se terminer : nouvel essai
+        raise RuntimeError(f"Impossible d'enregistrer le travail {kind}")
+
+    async def get(self, job_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Travail d'un utilisateur (ou enrichissement de la base, commun à tous), sans la liste des séries à traiter"""
+        job = await self.collection.find_one(
+            {"id": job_id, "$or": [{"user_id": user_id}, {"kind": {"$in": EXCLUSIVE_KINDS}}]},
+            JOB_PUBLIC_PROJECTION
+        )
+        if job:
+            job["percentage"] = job_percentage(job)
+        return job
+
+    async def list(self, user_id: str, status: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Derniers travaux d'un utilisateur, sans les résultats"""
+        query: Dict[str, Any] = {"user_id": user_id}
+        if status:
+            query["status"] = status
+        cursor = self.collection.find(query, {**JOB_PUBLIC_PROJECTION, "results": 0}).sort("created_at", -1).limit(limit)
+        jobs = await cursor.to_list(length=limit)
+        for job in jobs:
+            job["percentage"] = job_percentage(job)
+        return jobs
+
+    async def active(self, kind: str) -> List[Dict[str, Any]]:
+        """Travaux en attente ou en cours d'un type donné"""
+        cursor = self.collection.find(
+            {"kind": kind, "status": {"$in": ["queued", "running"]}},
+            {"_id": 0, "locked_by": 0, "results": 0, "payload": 0}
+        ).sort("created_at", 1)
+        jobs = await cursor.to_list(length=None)
+        for job in jobs:
+            job["percentage"] = job_percentage(job)
+        return jobs
+
+    # Côté worker
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Réserver le plus ancien travail disponible, None si rien à faire ou limite atteinte"""
+        now = datetime.utcnow()
+        running = await self.collection.count_documents({"status": "running", "lease_expires_at": {"$gte": now}})
+        if running >= ENRICHMENT_MAX_RUNNING_JOBS:
+            return None
+
+        return await self.collection.find_one_and_update(
+            claimable_filter(now),
+            {
+                "$set": {
+                    "status": "running",
+                    "locked_by": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=ENRICHMENT_JOB_LEASE_SECONDS),
+                    "updated_at": now
+                },
+                "$min": {"started_at": now},  # première réservation seulement
+                "$inc": {"attempts": 1}
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def checkpoint(
+        self,
+        job: Dict[str, Any],
+        worker_id: str,
+        position: int,
+        enriched: int,
+        results: Optional[List[Dict[str, Any]]] = None
+    ) -> bool:
+        """
+        Enregistrer l'avancement et renouveler le bail.
+        Retourne False si le travail n'appartient plus à ce worker (bail repris).
+        """
+        now = datetime.utcnow()
+        update: Dict[str, Any] = {
+            "$set": {
+                "checkpoint": position,
+                "progress.processed": position,
+                "lease_expires_at": now + timedelta(seconds=ENRICHMENT_JOB_LEASE_SECONDS),
+                "updated_at": now
+            },
+            "$inc": {"progress.enriched": enriched}
+        }
+        if results:
+            update["$push"] = {"results": {"$each": results}}
+        result = await self.collection.update_one(
+            {"id": job["id"], "locked_by": worker_id, "status": "running"}, update
+        )
+        return result.modified_count == 1
+
+    async def _finish(self, job: Dict[str, Any], worker_id: str, fields: Dict[str, Any]):
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"id": job["id"], "locked_by": worker_id},
+            {
+                "$set": {**fields, "locked_by": None, "lease_expires_at": None, "updated_at": now, "finished_at": now},
+                "$unset": {"exclusive_key": ""}
+            }
+        )
+
+    async def _release_after_error(self, job: Dict[str, Any], worker_id: str, error: Exception):
+        # Nouvelle tentative depuis le point de reprise, sauf si les essais sont épuisés
+        if job.get("attempts", 0) >= ENRICHMENT_JOB_MAX_ATTEMPTS:
+            await self._finish(job, worker_id, {"status": "failed", "error": str(error)})
+            return
+        await self.collection.update_one(
+            {"id": job["id"], "locked_by": worker_id},
+            {"$set": {
+                "status": "queued", "error": str(error), "locked_by": None,
+                "lease_expires_at": None, "updated_at": datetime.utcnow()
+            }}
+        )
+
+    async def fail_exhausted(self) -> int:
+        """Marquer en échec les travaux abandonnés dont les essais sont épuisés"""
+        now = datetime.utcnow()
+        result = await self.collection.update_many(
+            {
+                "status": "running",
+                "lease_expires_at": {"$lt": now},
+                "attempts": {"$gte": ENRICHMENT_JOB_MAX_ATTEMPTS}
+            },
+            {
+                "$set": {
+                    "status": "failed", "error": "Bail expiré, nombre d'essais maximal atteint",
+                    "locked_by": None, "lease_expires_at": None, "updated_at": now, "finished_at": now
+                },
+                "$unset": {"exclusive_key": ""}
+            }
+        )
+        return result.modified_count
+
+    async def process(self, job: Dict[str, Any], worker_id: str):
+        """Exécuter un travail réservé jusqu'au bout ou jusqu'à la perte du bail"""
+        logger.info(f"🚀 Travail {job['id']} ({job['kind']}) repris au point {job.get('checkpoint', 0)}")
+        try:
+            result = await self._handlers[job["kind"]](job, worker_id)
+        except Exception as e:
+            logger.error(f"❌ Travail d'enrichissement {job['id']} en erreur: {e}")
+            await self._release_after_error(job, worker_id, e)
+            return
+
+        if result is None:
+            logger.warning(f"⚠️ Travail {job['id']} repris par un autre worker, arrêt")
+            return
+        await self._finish(job, worker_id, {"status": "completed", "error": None, "result": result})
+        logger.info(f"✅ Travail d'enrichissement {job['id']} terminé: {result}")
+
+    async def _run_series_list(self, job: Dict[str, Any], worker_id: str) -> Optional[Dict[str, Any]]:
+        series_list = job["payload"]["series_list"]
+        position = job.get("checkpoint", 0)
+
+        while position < len(series_list):
+            chunk = series_list[position:position + ENRICHMENT_JOB_CHUNK_SIZE]
+            enriched = await image_service.batch_enrich_series(chunk, max_concurrent=ENRICHMENT_ITEM_CONCURRENCY)
+            position += len(chunk)
+            found = [
+                {"name": series.get("name"), "cover_url": series["cover_url"]}
+                for series in enriched if series.get("cover_url")
+            ]
+            if not await self.checkpoint(job, worker_id, position, len(found), found):
+                return None
+
+        progress = await self.collection.find_one({"id": job["id"]}, {"_id": 0, "progress": 1})
+        return {"total_processed": position, "enriched_count": progress["progress"]["enriched"]}
+
+    async def _run_database(self, job: Dict[str, Any], worker_id: str) -> Optional[Dict[str, Any]]:
+        payload = job["payload"]
+        output_path = payload["output_path"]
+        position = job.get("checkpoint", 0)
+
+        # En reprise, le fichier de sortie contient déjà les paquets traités
+        source = output_path if position and os.path.exists(output_path) else payload["database_path"]
+        database = await asyncio.to_thread(_read_json, source)
+        total = min(payload.get("sample_size") or len(database), len(database))
+
+        while position < total:
+            end = min(position + ENRICHMENT_JOB_CHUNK_SIZE, total)
+            enriched = await image_service.batch_enrich_series(database[position:end], max_concurrent=ENRICHMENT_ITEM_CONCURRENCY)
+            database[position:end] = enriched
+            await asyncio.to_thread(_write_json_atomic, output_path, database)
+            found = sum(1 for series in enriched if series.get("cover_url"))
+            position = end
+            if not await self.checkpoint(job, worker_id, position, found):
+                return None
+
+        enriched_count = sum(1 for series in database[:total] if series.get("cover_url"))
+        return {
+            "total_processed": total,
+            "enriched_count": enriched_count,
+            "success_rate": enriched_count / total if total > 0 else 0,
+            "output_file": output_path
+        }
+
+    async def run_worker(self, worker_id: str, concurrency: int = 1, stop: Optional[asyncio.Event] = None):
+        """Boucle d'un worker : réserver et exécuter jusqu'à `concurrency` travaux à la fois"""
+        stop = stop or asyncio.Event()
+        tasks = set()
+        logger.info(f"👷 Worker d'enrichissement {worker_id} démarré ({concurrency} travail(aux) simultané(s))")
+        await self.ensure_indexes()
+        try:
+            while not stop.is_set():
+                if await self.fail_exhausted():
+                    logger.warning("⚠️ Travaux abandonnés marqués en échec")
+                while len(tasks) < concurrency:
+                    job = await self.claim(worker_id)
+                    if not job:
+                        break
+                    tasks.add(asyncio.create_task(self.process(job, worker_id)))
+
+                if tasks:
+                    _, tasks = await asyncio.wait(
+                        tasks, timeout=ENRICHMENT_WORKER_POLL_INTERVAL, return_when=asyncio.FIRST_COMPLETED
+                    )
+                else:
+                    try:
+                        await asyncio.wait_for(stop.wait(), timeout=ENRICHMENT_WORKER_POLL_INTERVAL)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            # Travaux interrompus : le bail expirera et un autre worker les reprendra
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await http_client.close()
+            logger.info(f"🛑 Worker d'enrichissement {worker_id} arrêté")
+
+
+# Instances globales de la file d'enrichissement
+enrichment_job_service = EnrichmentJobService()
+database_image_stats = DatabaseImageStats()
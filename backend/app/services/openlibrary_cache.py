@@ -0,0 +1,261 @@
+# Cache HTTP des réponses Open Library pour BOOKTIME
+"""
+Les lectures Open Library (recherche, œuvres, éditions, ISBN, auteurs) des
+routes, d'OpenLibraryService, du service d'images et des scripts de récolte
+passent par `openlibrary_cache.get`, qui renvoie un `httpx.Response` comme
+`http_client.get`.
+
+Une entrée par URL normalisée (paramètres triés) dans la collection
+`openlibrary_cache` :
+- fraîche (CacheConfig "openlibrary") : servie sans sortir du serveur ;
+- périmée depuis moins de OPENLIBRARY_CACHE_STALE_SECONDS : servie
+  immédiatement et revalidée en arrière-plan (stale-while-revalidate) ;
+- plus ancienne : requête conditionnelle (If-None-Match / If-Modified-Since),
+  un 304 prolonge l'entrée sans retransférer le corps ;
+- en cas d'erreur réseau ou 5xx, ou tant que le coupe-circuit d'Open Library
+  est ouvert (http_client), l'entrée existante est servie (stale-if-error).
+
+Les requêtes simultanées sur la même URL sont regroupées en un seul appel.
+Les entrées sont purgées par index TTL après OPENLIBRARY_CACHE_RETENTION_DAYS.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import httpx
+from bson import Binary
+from ..config import (
+    OPENLIBRARY_CACHE_STALE_SECONDS, OPENLIBRARY_CACHE_RETENTION_DAYS,
+    OPENLIBRARY_CACHE_NEGATIVE_SECONDS, OPENLIBRARY_CACHE_MAX_BODY_BYTES
+)
+from ..database import async_db
+from ..utils.cache import CacheConfig
+from ..utils.http_client import http_client
+from ..utils.resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Réponses mises en cache : succès et absences (ISBN ou auteur inconnus)
+CACHEABLE_STATUSES = {200, 404}
+
+# Pause du cache après une erreur Mongo (secondes)
+STORAGE_RETRY_SECONDS = 30
+
+
+def normalize_url(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """URL canonique : schéma et hôte en minuscules, paramètres fusionnés et triés"""
+    # Fusion et encodage des paramètres par httpx (booléens, listes), comme pour la requête envoyée
+    full = httpx.URL(url).copy_merge_params(params) if params else httpx.URL(url)
+    parts = urlsplit(str(full))
+    query = sorted(parse_qsl(parts.query, keep_blank_values=False))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", urlencode(query), ""))
+
+
+def freshness_for(status_code: int) -> timedelta:
+    """Durée de fraîcheur d'une réponse selon son statut"""
+    if status_code == 404:
+        return timedelta(seconds=OPENLIBRARY_CACHE_NEGATIVE_SECONDS)
+    return CacheConfig.duration_for("openlibrary")
+
+
+def entry_state(entry: Dict[str, Any], now: datetime) -> str:
+    """'fresh', 'stale' (servie puis revalidée) ou 'expired' (revalidation avant réponse)"""
+    if now < entry["expires_at"]:
+        return "fresh"
+    if now < entry["expires_at"] + timedelta(seconds=OPENLIBRARY_CACHE_STALE_SECONDS):
+        return "stale"
+    return "expired"
+
+
+def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """En-têtes de revalidation depuis l'entrée en cache"""
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def validity_fields(status_code: int, headers: httpx.Headers, now: datetime) -> Dict[str, Any]:
+    """Dates et validateurs d'une entrée (nouvelle ou revalidée)"""
+    expires_at = now + freshness_for(status_code)
+    return {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "fetched_at": now,
+        "expires_at": expires_at,
+        "purge_at": expires_at + timedelta(days=OPENLIBRARY_CACHE_RETENTION_DAYS)
+    }
+
+
+def to_response(entry: Dict[str, Any]) -> httpx.Response:
+    """Réponse httpx reconstruite depuis une entrée (raise_for_status compris)"""
+    return httpx.Response(
+        entry["status"],
+        content=bytes(entry["body"]),
+        headers={"Content-Type": entry.get("content_type") or "application/json", "X-Cache": "HIT"},
+        request=httpx.Request("GET", entry["_id"])
+    )
+
+
+class OpenLibraryCache:
+    """Cache HTTP partagé des lectures Open Library"""
+
+    def __init__(self):
+        self.db = async_db
+        self.collection = self.db.openlibrary_cache
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._revalidating: set = set()
+        self._background: set = set()
+        self._storage_paused_until = 0.0
+        self._stats: Counter = Counter()
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> httpx.Response:
+        """GET Open Library servi depuis le cache quand c'est possible"""
+        key = normalize_url(url, params)
+        entry = await self._load(key)
+
+        if entry is not None:
+            state = entry_state(entry, datetime.utcnow())
+            if state == "fresh":
+                self._stats["hits"] += 1
+                return to_response(entry)
+            if state == "stale":
+                self._stats["stale_hits"] += 1
+                self._revalidate_in_background(key, entry)
+                return to_response(entry)
+
+        self._stats["misses"] += 1
+        return await self._fetch_coalesced(key, entry, timeout)
+
+    async def _fetch_coalesced(self, key: str, entry: Optional[Dict[str, Any]], timeout: Optional[float]) -> httpx.Response:
+        # Une seule requête sortante par URL, les appels simultanés attendent son résultat
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await self._fetch(key, entry, timeout)
+            future.set_result(response)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Exception marquée comme lue : les appels en attente la reçoivent, sinon rien n'est journalisé
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fetch(self, key: str, entry: Optional[Dict[str, Any]], timeout: Optional[float]) -> httpx.Response:
+        kwargs = {"headers": conditional_headers(entry)}
+        if timeout is not None:
+            kwargs["timeout"] = timeout
+        try:
+            response = await http_client.get(key, **kwargs)
+        except httpx.HTTPError:
+            if entry is None:
+                raise
+            self._stats["stale_if_error"] += 1
+            return to_response(entry)
+
+        now = datetime.utcnow()
+        if response.status_code == 304 and entry is not None:
+            self._stats["revalidated"] += 1
+            fields = validity_fields(entry["status"], response.headers, now)
+            # Un 304 peut omettre les validateurs : garder ceux de l'entrée
+            fields["etag"] = fields["etag"] or entry.get("etag")
+            fields["last_modified"] = fields["last_modified"] or entry.get("last_modified")
+            await self._update(key, {"$set": fields})
+            return to_response({**entry, **fields})
+
+        if response.status_code in CACHEABLE_STATUSES:
+            await self._store(key, response, now)
+        elif entry is not None and response.status_code >= 500:
+            self._stats["stale_if_error"] += 1
+            return to_response(entry)
+        return response
+
+    def _revalidate_in_background(self, key: str, entry: Dict[str, Any]):
+        if key in self._revalidating:
+            return
+        self._revalidating.add(key)
+
+        async def run():
+            try:
+                await self._fetch_coalesced(key, entry, None)
+            except CircuitOpenError:
+                # Open Library indisponible : l'entrée reste servie, revalidée à la prochaine lecture
+                pass
+            except Exception as e:
+                logger.warning(f"⚠️ Revalidation Open Library échouée ({key}): {e}")
+            finally:
+                self._revalidating.discard(key)
+
+        # Référence gardée jusqu'à la fin : une tâche non référencée peut être collectée
+        task = asyncio.create_task(run())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    # Stockage : une panne Mongo dégrade en requêtes directes, le cache est ignoré
+    # pendant STORAGE_RETRY_SECONDS plutôt que d'attendre le délai Mongo à chaque appel
+
+    def _storage_available(self) -> bool:
+        return time.monotonic() >= self._storage_paused_until
+
+    def _storage_failed(self, error: Exception):
+        self._storage_paused_until = time.monotonic() + STORAGE_RETRY_SECONDS
+        logger.warning(f"⚠️ Cache Open Library indisponible, ignoré {STORAGE_RETRY_SECONDS}s: {error}")
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self._storage_available():
+            return None
+        try:
+            return await self.collection.find_one({"_id": key})
+        except Exception as e:
+            self._storage_failed(e)
+            return None
+
+    async def _update(self, key: str, update: Dict[str, Any]):
+        if not self._storage_available():
+            return
+        try:
+            await self.collection.update_one({"_id": key}, update)
+        except Exception as e:
+            self._storage_failed(e)
+
+    async def _store(self, key: str, response: httpx.Response, now: datetime):
+        if not self._storage_available() or len(response.content) > OPENLIBRARY_CACHE_MAX_BODY_BYTES:
+            return
+        document = {
+            "status": response.status_code,
+            "body": Binary(response.content),
+            "content_type": response.headers.get("Content-Type"),
+            **validity_fields(response.status_code, response.headers, now)
+        }
+        try:
+            await self.collection.replace_one({"_id": key}, document, upsert=True)
+        except Exception as e:
+            self._storage_failed(e)
+
+    def stats(self) -> Dict[str, int]:
+        """Succès, réponses périmées servies, revalidations et requêtes sortantes"""
+        return dict(self._stats)
+
+
+# Instance globale du cache Open Library
+openlibrary_cache = OpenLibraryCache()
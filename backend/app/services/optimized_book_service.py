@@ -15,8 +15,12 @@ from ..database import books_collection, authors_collection
 from ..models.book import BookCreate, BookUpdate, BookResponse, BookSearchResponse
 from ..models.common import StatsResponse, AuthorStats, SagaStats
 from ..config import VALID_CATEGORIES, VALID_STATUSES
-from ..utils.pagination import AdvancedPaginator, PaginationParams, PaginatedResponse
+from ..utils.pagination import AdvancedPaginator, CursorPaginator, PaginationParams, PaginatedResponse
 from ..utils.cache import CacheDecorator, cache, BookCacheManager
+from ..utils.saga_key import with_saga_key
+from .stats_service import library_stats_service
+from .user_stats import user_stats_service
+from .series_progress import series_progress_service
 import time
 import logging
 
@@ -59,6 +63,12 @@ class OptimizedBookService:
                 )
             query["status"] = status.lower()
         
+        if pagination.cursor:
+            try:
+                CursorPaginator.decode_cursor(pagination.cursor, pagination.sort_by, pagination.sort_order)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
         try:
             # Utiliser le paginateur optimisé
             result = AdvancedPaginator.paginate_query(
@@ -88,66 +98,30 @@ class OptimizedBookService:
             )
     
     @staticmethod
-    @CacheDecorator.cached("user_stats", duration=timedelta(minutes=5))
     async def get_stats_optimized(user_id: str) -> StatsResponse:
         """
         Récupère les statistiques optimisées avec cache
+        (pipeline $facet partagé, voir services/stats_service.py)
         """
         start_time = time.time()
         
         try:
-            # Pipeline d'agrégation optimisé
-            pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$group": {
-                    "_id": None,
-                    "total_books": {"$sum": 1},
-                    "completed_books": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
-                    "reading_books": {"$sum": {"$cond": [{"$eq": ["$status", "reading"]}, 1, 0]}},
-                    "to_read_books": {"$sum": {"$cond": [{"$eq": ["$status", "to_read"]}, 1, 0]}},
-                    "roman_count": {"$sum": {"$cond": [{"$eq": ["$category", "roman"]}, 1, 0]}},
-                    "bd_count": {"$sum": {"$cond": [{"$eq": ["$category", "bd"]}, 1, 0]}},
-                    "manga_count": {"$sum": {"$cond": [{"$eq": ["$category", "manga"]}, 1, 0]}},
-                    "auto_added_count": {"$sum": {"$cond": ["$auto_added", 1, 0]}},
-                    "authors": {"$addToSet": "$author"},
-                    "sagas": {"$addToSet": "$saga"}
-                }}
-            ]
-            
-            result = list(books_collection.aggregate(pipeline))
+            data = await library_stats_service.get_user_stats(user_id)
             
-            if result:
-                data = result[0]
-                # Filtrer les auteurs et sagas vides
-                authors_count = len([a for a in data.get("authors", []) if a])
-                sagas_count = len([s for s in data.get("sagas", []) if s])
-                
-                stats = StatsResponse(
-                    total_books=data.get("total_books", 0),
-                    completed_books=data.get("completed_books", 0),
-                    reading_books=data.get("reading_books", 0),
-                    to_read_books=data.get("to_read_books", 0),
-                    categories={
-                        "roman": data.get("roman_count", 0),
-                        "bd": data.get("bd_count", 0),
-                        "manga": data.get("manga_count", 0)
-                    },
-                    authors_count=authors_count,
-                    sagas_count=sagas_count,
-                    auto_added_count=data.get("auto_added_count", 0)
-                )
-            else:
-                # Utilisateur sans livres
-                stats = StatsResponse(
-                    total_books=0,
-                    completed_books=0,
-                    reading_books=0,
-                    to_read_books=0,
-                    categories={"roman": 0, "bd": 0, "manga": 0},
-                    authors_count=0,
-                    sagas_count=0,
-                    auto_added_count=0
-                )
+            stats = StatsResponse(
+                total_books=data["total_books"],
+                completed_books=data["completed_books"],
+                reading_books=data["reading_books"],
+                to_read_books=data["to_read_books"],
+                categories={
+                    "roman": data["by_category"].get("roman", 0),
+                    "bd": data["by_category"].get("bd", 0),
+                    "manga": data["by_category"].get("manga", 0)
+                },
+                authors_count=data["authors_count"],
+                sagas_count=data["sagas_count"],
+                auto_added_count=data["auto_added_count"]
+            )
             
             # Log des performances
             duration = (time.time() - start_time) * 1000
@@ -163,7 +137,7 @@ class OptimizedBookService:
             )
     
     @staticmethod
-    @CacheDecorator.cache_invalidate(["stats:user:{user_id}:*", "books:user:{user_id}:*"])
+    @CacheDecorator.cache_invalidate()
     async def create_book_optimized(user_id: str, book_data: BookCreate) -> BookResponse:
         """
         Crée un nouveau livre avec invalidation automatique du cache
@@ -209,7 +183,9 @@ class OptimizedBookService:
         }
         
         try:
-            books_collection.insert_one(book_doc)
+            books_collection.insert_one(with_saga_key(book_doc))
+            await user_stats_service.record_books_added(user_id, [book_doc])
+            await series_progress_service.record_books_added(user_id, [book_doc])
             
             # Log des performances
             duration = (time.time() - start_time) * 1000
@@ -225,7 +201,7 @@ class OptimizedBookService:
             )
     
     @staticmethod
-    @CacheDecorator.cache_invalidate(["stats:user:{user_id}:*", "books:user:{user_id}:*"])
+    @CacheDecorator.cache_invalidate()
     async def update_book_optimized(user_id: str, book_id: str, update_data: BookUpdate) -> BookResponse:
         """
         Met à jour un livre avec invalidation automatique du cache
@@ -273,11 +249,13 @@ class OptimizedBookService:
         try:
             books_collection.update_one(
                 {"id": book_id, "user_id": user_id},
-                {"$set": update_dict}
+                {"$set": with_saga_key(update_dict)}
             )
             
             # Récupérer le livre mis à jour
             updated_book = books_collection.find_one({"id": book_id, "user_id": user_id})
+            await user_stats_service.record_book_updated(user_id, book, updated_book)
+            await series_progress_service.record_book_updated(user_id, book, updated_book)
             
             # Log des performances
             duration = (time.time() - start_time) * 1000
@@ -293,7 +271,7 @@ class OptimizedBookService:
             )
     
     @staticmethod
-    @CacheDecorator.cache_invalidate(["stats:user:{user_id}:*", "books:user:{user_id}:*"])
+    @CacheDecorator.cache_invalidate()
     async def delete_book_optimized(user_id: str, book_id: str) -> dict:
         """
         Supprime un livre avec invalidation automatique du cache
@@ -316,6 +294,8 @@ class OptimizedBookService:
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Book not found"
                 )
+            await user_stats_service.record_books_removed(user_id, [book])
+            await series_progress_service.record_books_removed(user_id, [book])
             
             # Log des performances
             duration = (time.time() - start_time) * 1000
@@ -337,7 +317,7 @@ class OptimizedBookService:
         """
         try:
             # Statistiques du cache
-            cache_stats = cache.get_cache_stats()
+            cache_stats = await cache.get_cache_stats()
             
             # Statistiques MongoDB (approximatives)
             db_stats = {
@@ -6,17 +6,14 @@ Implémentation de la pagination et du cache pour optimiser les performances
 from fastapi import Query, HTTPException
 from typing import Dict, List, Any, Optional
 from pydantic import BaseModel
-import redis
-import json
-import hashlib
 from datetime import datetime, timedelta
-import os
-from ..database import db
+from ..database import async_db
 from ..config import DEFAULT_LIMIT, MAX_LIMIT, DEFAULT_OFFSET
-
-# Configuration Redis (optionnel)
-REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
-CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))  # 5 minutes
+from ..utils.cache import cache
+from ..utils.pagination import CursorPaginator
+from ..utils.saga_key import saga_key
+from .series_cards import format_series_card
+from .series_progress import series_progress_service
 
 class PaginationParams(BaseModel):
     """Paramètres de pagination standardisés"""
@@ -35,71 +32,14 @@ class PaginatedResponse(BaseModel):
     has_previous: bool
     next_offset: Optional[int] = None
     previous_offset: Optional[int] = None
-
-class CacheManager:
-    """Gestionnaire de cache pour les requêtes fréquentes"""
-    
-    def __init__(self):
-        self.redis_client = None
-        self.cache_enabled = False
-        
-        # Tentative de connexion Redis
-        try:
-            self.redis_client = redis.from_url(REDIS_URL)
-            self.redis_client.ping()
-            self.cache_enabled = True
-            print("✅ Redis connecté - Cache activé")
-        except:
-            print("ℹ️  Redis non disponible - Cache désactivé")
-    
-    def _generate_cache_key(self, prefix: str, **kwargs) -> str:
-        """Génère une clé de cache unique"""
-        key_data = json.dumps(kwargs, sort_keys=True)
-        key_hash = hashlib.md5(key_data.encode()).hexdigest()
-        return f"booktime:{prefix}:{key_hash}"
-    
-    def get(self, key: str) -> Optional[Dict]:
-        """Récupère une valeur du cache"""
-        if not self.cache_enabled:
-            return None
-        
-        try:
-            cached_data = self.redis_client.get(key)
-            if cached_data:
-                return json.loads(cached_data)
-        except:
-            pass
-        
-        return None
-    
-    def set(self, key: str, value: Dict, ttl: int = CACHE_TTL):
-        """Stocke une valeur dans le cache"""
-        if not self.cache_enabled:
-            return
-        
-        try:
-            self.redis_client.setex(key, ttl, json.dumps(value, default=str))
-        except:
-            pass
-    
-    def delete_pattern(self, pattern: str):
-        """Supprime toutes les clés correspondant au pattern"""
-        if not self.cache_enabled:
-            return
-        
-        try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                self.redis_client.delete(*keys)
-        except:
-            pass
+    next_cursor: Optional[str] = None
 
 class PaginationService:
-    """Service de pagination avec cache intégré"""
+    """Service de pagination avec cache intégré (cache L1/L2 unifié)"""
     
     def __init__(self):
-        self.cache = CacheManager()
-        self.db = db
+        self.cache = cache
+        self.db = async_db
     
     def validate_pagination_params(self, limit: int, offset: int) -> PaginationParams:
         """Valide et normalise les paramètres de pagination"""
@@ -115,7 +55,7 @@ class PaginationService:
         
         return PaginationParams(limit=limit, offset=offset)
     
-    def get_paginated_books(
+    async def get_paginated_books(
         self,
         user_id: str,
         limit: int = DEFAULT_LIMIT,
@@ -126,7 +66,8 @@ class PaginationService:
         saga: Optional[str] = None,
         sort_by: str = "date_added",
         sort_order: str = "desc",
-        exclude_series: bool = False
+        exclude_series: bool = False,
+        cursor: Optional[str] = None
     ) -> PaginatedResponse:
         """
         Récupère les livres avec pagination et cache
@@ -134,13 +75,16 @@ class PaginationService:
         Args:
             user_id: ID de l'utilisateur
             limit: Nombre d'éléments par page
-            offset: Décalage pour la pagination
+            offset: Décalage pour la pagination (ignoré si cursor est fourni)
             category: Filtre par catégorie
             status: Filtre par statut
             author: Filtre par auteur
             saga: Filtre par saga
             sort_by: Champ de tri
             sort_order: Ordre de tri (asc/desc)
+            cursor: Curseur opaque `next_cursor` d'une page précédente.
+                La page est alors lue par clé (sort_by, id) sans skip, via
+                l.index user_date_added_id_idx pour le tri par défaut.
             
         Returns:
             PaginatedResponse avec les livres paginés
@@ -149,6 +93,13 @@ class PaginationService:
         # Validation des paramètres
         params = self.validate_pagination_params(limit, offset)
         
+        keyset = None
+        if cursor:
+            try:
+                keyset = CursorPaginator.decode_cursor(cursor, sort_by, sort_order)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
         # Construction de la requête
         query = {"user_id": user_id}
         
@@ -159,7 +110,8 @@ class PaginationService:
         if author:
             query["author"] = {"$regex": author, "$options": "i"}
         if saga:
-            query["saga"] = {"$regex": saga, "$options": "i"}
+            # Égalité sur la clé normalisée (index user_saga_key_volume_index)
+            query["saga_key"] = saga_key(saga)
         
         # Exclusion des livres de séries si demandé
         if exclude_series:
@@ -170,65 +122,56 @@ class PaginationService:
             ]
         
         # Génération de la clé de cache
-        cache_key = self.cache._generate_cache_key(
-            "books",
-            user_id=user_id,
+        cache_key = self.cache.build_key(
+            "user_books",
             limit=limit,
-            offset=offset,
+            offset=0 if cursor else offset,
+            cursor=cursor,
             query=query,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            scope=user_id
         )
         
-        # Vérification du cache
-        cached_result = self.cache.get(cache_key)
-        if cached_result:
-            return PaginatedResponse(**cached_result)
-        
-        # Construction du tri
-        sort_direction = 1 if sort_order == "asc" else -1
-        sort_spec = [(sort_by, sort_direction)]
-        
-        # Exécution de la requête
-        books_collection = self.db.books
-        
-        # Compte total (pour la pagination)
-        total_count = books_collection.count_documents(query)
-        
-        # Récupération des livres paginés
-        books_cursor = books_collection.find(query).sort(sort_spec).skip(offset).limit(limit)
-        books = list(books_cursor)
-        
-        # Conversion des ObjectId en strings
-        for book in books:
-            if "_id" in book:
-                book["_id"] = str(book["_id"])
-        
-        # Calcul des informations de pagination
-        has_next = offset + limit < total_count
-        has_previous = offset > 0
-        
-        next_offset = offset + limit if has_next else None
-        previous_offset = max(0, offset - limit) if has_previous else None
-        
-        # Construction de la réponse
-        response_data = {
-            "items": books,
-            "total": total_count,
-            "limit": limit,
-            "offset": offset,
-            "has_next": has_next,
-            "has_previous": has_previous,
-            "next_offset": next_offset,
-            "previous_offset": previous_offset
-        }
-        
-        # Mise en cache
-        self.cache.set(cache_key, response_data)
-        
+        async def load_page() -> Dict[str, Any]:
+            # Tri stable (clé de tri puis id) : condition des curseurs
+            sort_spec = CursorPaginator.keyset_sort(sort_by, sort_order)
+            
+            # Exécution de la requête
+            books_collection = self.db.books
+            
+            # Compte total : mis en cache séparément, partagé par toutes les pages
+            total_count = await self._count_books(user_id, query)
+            
+            # Récupération des livres paginés (+1 pour détecter la page suivante)
+            if keyset:
+                page_query = CursorPaginator.apply_keyset(query, sort_by, sort_order, *keyset)
+                books_cursor = books_collection.find(page_query).sort(sort_spec).limit(limit + 1)
+            else:
+                books_cursor = books_collection.find(query).sort(sort_spec).skip(offset).limit(limit + 1)
+            books = await books_cursor.to_list(length=limit + 1)
+            has_more = len(books) > limit
+            books = books[:limit]
+            
+            # Conversion des ObjectId en strings
+            for book in books:
+                if "_id" in book:
+                    book["_id"] = str(book["_id"])
+            
+            if keyset:
+                page = self._build_cursor_page(books, total_count, limit, has_more)
+            else:
+                page = self._build_page(books, total_count, limit, offset)
+                page["has_next"] = has_more
+            if has_more and books:
+                page["next_cursor"] = CursorPaginator.encode_cursor(books[-1], sort_by, sort_order)
+            return page
+        
+        # Cache L1/L2 avec coalescence des requêtes concurrentes
+        response_data = await self.cache.get_or_set(cache_key, load_page)
         return PaginatedResponse(**response_data)
     
-    def get_paginated_series(
+    async def get_paginated_series(
         self,
         user_id: str,
         limit: int = DEFAULT_LIMIT,
@@ -252,82 +195,131 @@ class PaginationService:
             query["status"] = status
         
         # Génération de la clé de cache
-        cache_key = self.cache._generate_cache_key(
-            "series",
-            user_id=user_id,
+        cache_key = self.cache.build_key(
+            "user_series",
             limit=limit,
             offset=offset,
-            query=query
+            query=query,
+            scope=user_id
         )
         
-        # Vérification du cache
-        cached_result = self.cache.get(cache_key)
-        if cached_result:
-            return PaginatedResponse(**cached_result)
+        async def load_page() -> Dict[str, Any]:
+            # Exécution de la requête
+            series_collection = self.db.series_library
+            
+            # Compte total
+            total_count = await series_collection.count_documents(query)
+            
+            # Récupération des séries paginées
+            series_cursor = series_collection.find(query).sort([("date_added", -1)]).skip(offset).limit(limit)
+            series = await series_cursor.to_list(length=limit)
+            
+            # Conversion des ObjectId en strings
+            for serie in series:
+                if "_id" in serie:
+                    serie["_id"] = str(serie["_id"])
+            
+            return self._build_page(series, total_count, limit, offset)
+        
+        response_data = await self.cache.get_or_set(cache_key, load_page)
+        return PaginatedResponse(**response_data)
+    
+    async def get_paginated_series_cards(
+        self,
+        user_id: str,
+        limit: int = DEFAULT_LIMIT,
+        offset: int = DEFAULT_OFFSET,
+        category: Optional[str] = None,
+        sort_by: str = "last_updated",
+        sort_order: str = "desc"
+    ) -> PaginatedResponse:
+        """
+        Cartes séries lues dans la progression matérialisée,
+        en cache jusqu'à la prochaine écriture de l'utilisateur
+        """
+        params = self.validate_pagination_params(limit, offset)
+        limit, offset = params.limit, params.offset
         
-        # Exécution de la requête
-        series_collection = self.db.series_library
+        cache_key = self.cache.build_key(
+            "user_series",
+            "cards",
+            limit=limit,
+            offset=offset,
+            category=category,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            scope=user_id
+        )
         
-        # Compte total
-        total_count = series_collection.count_documents(query)
+        async def load_page() -> Dict[str, Any]:
+            documents, total = await series_progress_service.list(
+                user_id, limit=limit, offset=offset, category=category,
+                sort_by=sort_by, sort_order=sort_order
+            )
+            cards = [format_series_card(document) for document in documents]
+            return self._build_page(cards, total, limit, offset)
         
-        # Récupération des séries paginées
-        series_cursor = series_collection.find(query).sort([("date_added", -1)]).skip(offset).limit(limit)
-        series = list(series_cursor)
+        response_data = await self.cache.get_or_set(cache_key, load_page)
+        return PaginatedResponse(**response_data)
+    
+    async def _count_books(self, user_id: str, query: Dict[str, Any]) -> int:
+        """Nombre total de livres pour un filtre, en cache jusqu'à la prochaine écriture"""
+        count_key = self.cache.build_key("user_books", "count", query=query, scope=user_id)
         
-        # Conversion des ObjectId en strings
-        for serie in series:
-            if "_id" in serie:
-                serie["_id"] = str(serie["_id"])
+        async def count() -> Dict[str, int]:
+            return {"total": await self.db.books.count_documents(query)}
         
-        # Calcul des informations de pagination
+        result = await self.cache.get_or_set(count_key, count)
+        return result["total"]
+    
+    @staticmethod
+    def _build_cursor_page(items: List[Dict[str, Any]], total_count: int, limit: int, has_next: bool) -> Dict[str, Any]:
+        """Construit la réponse paginée d'une page lue par curseur"""
+        return {
+            "items": items,
+            "total": total_count,
+            "limit": limit,
+            "offset": 0,
+            "has_next": has_next,
+            "has_previous": True,
+            "next_offset": None,
+            "previous_offset": None
+        }
+    
+    @staticmethod
+    def _build_page(items: List[Dict[str, Any]], total_count: int, limit: int, offset: int) -> Dict[str, Any]:
+        """Construit la réponse paginée (métadonnées offset)"""
         has_next = offset + limit < total_count
         has_previous = offset > 0
         
-        next_offset = offset + limit if has_next else None
-        previous_offset = max(0, offset - limit) if has_previous else None
-        
-        # Construction de la réponse
-        response_data = {
-            "items": series,
+        return {
+            "items": items,
             "total": total_count,
             "limit": limit,
             "offset": offset,
             "has_next": has_next,
             "has_previous": has_previous,
-            "next_offset": next_offset,
-            "previous_offset": previous_offset
+            "next_offset": offset + limit if has_next else None,
+            "previous_offset": max(0, offset - limit) if has_previous else None
         }
-        
-        # Mise en cache
-        self.cache.set(cache_key, response_data)
-        
-        return PaginatedResponse(**response_data)
     
-    def invalidate_user_cache(self, user_id: str):
+    async def invalidate_user_cache(self, user_id: str):
         """Invalide le cache pour un utilisateur spécifique"""
-        patterns = [
-            f"booktime:books:*user_id*{user_id}*",
-            f"booktime:series:*user_id*{user_id}*",
-            f"booktime:stats:*user_id*{user_id}*"
-        ]
-        
-        for pattern in patterns:
-            self.cache.delete_pattern(pattern)
+        await self.cache.flush_user_cache(user_id)
     
-    def get_search_suggestions(self, user_id: str, query: str, limit: int = 5) -> List[str]:
+    async def get_search_suggestions(self, user_id: str, query: str, limit: int = 5) -> List[str]:
         """
         Récupère des suggestions de recherche avec cache
         """
-        cache_key = self.cache._generate_cache_key(
+        cache_key = self.cache.build_key(
             "search_suggestions",
-            user_id=user_id,
             query=query.lower(),
-            limit=limit
+            limit=limit,
+            scope=user_id
         )
         
         # Vérification du cache
-        cached_result = self.cache.get(cache_key)
+        cached_result = await self.cache.get(cache_key)
         if cached_result:
             return cached_result.get("suggestions", [])
         
@@ -335,29 +327,29 @@ class PaginationService:
         books_collection = self.db.books
         
         # Recherche par titre
-        title_suggestions = books_collection.distinct("title", {
+        title_suggestions = (await books_collection.distinct("title", {
             "user_id": user_id,
             "title": {"$regex": query, "$options": "i"}
-        })[:limit]
+        }))[:limit]
         
         # Recherche par auteur
-        author_suggestions = books_collection.distinct("author", {
+        author_suggestions = (await books_collection.distinct("author", {
             "user_id": user_id,
             "author": {"$regex": query, "$options": "i"}
-        })[:limit]
+        }))[:limit]
         
         # Recherche par saga
-        saga_suggestions = books_collection.distinct("saga", {
+        saga_suggestions = (await books_collection.distinct("saga", {
             "user_id": user_id,
             "saga": {"$regex": query, "$options": "i"}
-        })[:limit]
+        }))[:limit]
         
         # Combinaison et déduplication
         all_suggestions = list(set(title_suggestions + author_suggestions + saga_suggestions))[:limit]
         
         # Mise en cache
         result = {"suggestions": all_suggestions}
-        self.cache.set(cache_key, result, ttl=600)  # 10 minutes
+        await self.cache.set(cache_key, result)
         
         return all_suggestions
 
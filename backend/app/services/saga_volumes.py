@@ -0,0 +1,190 @@
+# Ajout de tomes en masse pour BOOKTIME
+"""
+Complétion automatique des séries/sagas (/api/series/complete et
+/api/sagas/{saga}/auto-complete) :
+- tomes existants lus par un seul `distinct("volume_number")` couvert par
+  l'index user_saga_key_volume_index (égalité exacte sur saga_key) ;
+- tomes manquants insérés par `insert_many(ordered=False)` par paquets ;
+- statistiques, progression des séries et cache mis à jour une seule fois par lot.
+
+Rapport des tomes manquants (/api/sagas/gaps) : une seule agrégation pour
+toutes les sagas ($addToSet des numéros puis $setDifference avec 1..max),
+complétée par le nombre de tomes connu du catalogue des séries.
+"""
+
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+from pymongo.errors import BulkWriteError
+from ..config import BULK_INSERT_CHUNK_SIZE, SAGA_GAPS_MAX_VOLUME
+from ..database import async_db
+from ..utils.cache import cache
+from ..utils.saga_key import saga_filter, saga_key
+from .user_stats import user_stats_service
+from .series_catalog import series_catalog
+from .series_progress import series_progress_service
+
+logger = logging.getLogger(__name__)
+
+
+def volume_gaps(missing: Iterable[int]) -> List[Dict[str, int]]:
+    """Séquences consécutives de tomes manquants ({start, end})"""
+    gaps: List[Dict[str, int]] = []
+    for number in sorted(missing):
+        if gaps and number == gaps[-1]["end"] + 1:
+            gaps[-1]["end"] = number
+        else:
+            gaps.append({"start": number, "end": number})
+    return gaps
+
+
+def build_gaps_pipeline(user_id: str) -> List[Dict[str, Any]]:
+    """Tomes possédés et manquants (jusqu'au dernier tome possédé) de chaque saga"""
+    max_volume = {"$min": [{"$ifNull": [{"$max": "$volumes"}, 0]}, SAGA_GAPS_MAX_VOLUME]}
+    return [
+        {"$match": {"user_id": user_id, "saga_key": {"$nin": ["", None]}}},
+        {"$group": {
+            "_id": "$saga_key",
+            "name": {"$first": "$saga"},
+            "author": {"$first": "$author"},
+            "books_count": {"$sum": 1},
+            # Un livre sans numéro compte comme tome 1
+            "volumes": {"$addToSet": {"$ifNull": ["$volume_number", 1]}}
+        }},
+        {"$project": {
+            "_id": 0,
+            "saga_key": "$_id",
+            "name": 1,
+            "author": 1,
+            "books_count": 1,
+            "volumes": {"$sortArray": {
+                "input": {"$map": {
+                    "input": {"$filter": {"input": "$volumes", "cond": {"$isNumber": "$$this"}}},
+                    "in": {"$toInt": "$$this"}
+                }},
+                "sortBy": 1
+            }}
+        }},
+        {"$addFields": {"max_volume": max_volume}},
+        {"$addFields": {"missing": {"$setDifference": [
+            {"$range": [1, {"$add": ["$max_volume", 1]}]},
+            "$volumes"
+        ]}}},
+        {"$sort": {"saga_key": 1}}
+    ]
+
+
+def gaps_entry(row: Dict[str, Any], catalog_entry: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Tomes manquants d'une saga, complétés jusqu'au nombre de tomes du catalogue"""
+    owned = [number for number in row.get("volumes", []) if number >= 1]
+    max_volume = row.get("max_volume") or 0
+    catalog_volumes = min((catalog_entry or {}).get("volumes") or 0, SAGA_GAPS_MAX_VOLUME)
+
+    missing = sorted(row.get("missing", []))
+    missing += range(max_volume + 1, catalog_volumes + 1)
+    expected = max(max_volume, catalog_volumes)
+
+    return {
+        "saga": row.get("name"),
+        "saga_key": row.get("saga_key"),
+        "author": row.get("author"),
+        "books_count": row.get("books_count", 0),
+        "owned_volumes": len(owned),
+        "max_volume": max_volume,
+        "catalog_volumes": catalog_volumes or None,
+        "expected_volumes": expected,
+        "missing_volumes": missing,
+        "missing_count": len(missing),
+        "gaps": volume_gaps(missing),
+        "completion_percentage": round((expected - len(missing)) / expected * 100) if expected else 100
+    }
+
+
+class SagaVolumeService:
+    """Création des tomes manquants d'une saga"""
+
+    def __init__(self):
+        self.db = async_db
+
+    async def existing_volume_numbers(self, user_id: str, saga: str) -> Set[int]:
+        """Numéros de tomes déjà présents (un livre sans numéro compte comme tome 1)"""
+        volumes = await self.db.books.distinct("volume_number", saga_filter(user_id, saga))
+        return {volume if volume is not None else 1 for volume in volumes}
+
+    @staticmethod
+    def new_volume(
+        user_id: str,
+        saga: str,
+        volume_number: int,
+        template: Dict[str, Any],
+        title: Optional[str] = None,
+        description: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Document d'un tome ajouté automatiquement (auteur, catégorie... du modèle)"""
+        now = datetime.utcnow()
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "title": title or f"{saga} - Tome {volume_number}",
+            "author": template.get("author", ""),
+            "category": template.get("category", "roman"),
+            "saga": saga,
+            "saga_key": saga_key(saga),
+            "volume_number": volume_number,
+            "status": "to_read",
+            "genre": template.get("genre", ""),
+            "publisher": template.get("publisher", ""),
+            "auto_added": True,
+            "date_added": now,
+            "description": description or f"Tome {volume_number} de la saga {saga}",
+            "total_pages": None,
+            "current_page": None,
+            "rating": None,
+            "review": "",
+            "cover_url": "",
+            "publication_year": None,
+            "isbn": "",
+            "date_started": None,
+            "date_completed": None,
+            "updated_at": now
+        }
+
+    async def insert_volumes(self, user_id: str, books: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Insérer des tomes par paquets non ordonnés.
+        Retourne les livres effectivement insérés (sans `_id`).
+        """
+        inserted: List[Dict[str, Any]] = []
+        for start in range(0, len(books), BULK_INSERT_CHUNK_SIZE):
+            chunk = books[start:start + BULK_INSERT_CHUNK_SIZE]
+            try:
+                await self.db.books.insert_many(chunk, ordered=False)
+                inserted.extend(chunk)
+            except BulkWriteError as e:
+                # ordered=False : les autres documents du paquet sont insérés
+                failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                inserted.extend(book for position, book in enumerate(chunk) if position not in failed)
+                logger.warning(f"⚠️ {len(failed)} tome(s) non inséré(s) pour {user_id}: {e.details.get('writeErrors', [])[:1]}")
+
+        for book in books:
+            book.pop("_id", None)
+
+        if inserted:
+            # Une seule mise à jour des compteurs et du cache pour tout le lot
+            await user_stats_service.record_books_added(user_id, inserted)
+            await series_progress_service.record_books_added(user_id, inserted)
+            await cache.flush_user_cache(user_id)
+        return inserted
+
+    async def gaps_report(self, user_id: str, include_complete: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """Tomes manquants de toutes les sagas de l'utilisateur, saga par saga (une agrégation)"""
+        cursor = self.db.books.aggregate(build_gaps_pipeline(user_id), allowDiskUse=True)
+        async for row in cursor:
+            entry = gaps_entry(row, series_catalog.get(row.get("name") or ""))
+            if entry["missing_count"] or include_complete:
+                yield entry
+
+
+# Instance globale de complétion des sagas
+saga_volume_service = SagaVolumeService()
@@ -0,0 +1,33 @@
+# Cartes séries de la bibliothèque pour BOOKTIME
+"""
+Vue « une carte par série » (/api/library/series, /api/books?view_mode=series) :
+les cartes sont lues dans la progression matérialisée (`series_progress`),
+une page à la fois. Elles ne contiennent pas les tomes : ils se chargent à
+la demande via `books_url` (/api/sagas/{saga}/books).
+"""
+
+from typing import Any, Dict
+from urllib.parse import quote
+from .series_progress import global_status, progress_percentage
+
+# Champs d'un document de progression repris tels quels dans la carte
+CARD_FIELDS = (
+    "name", "author", "category", "total_books", "completed_books", "reading_books",
+    "to_read_books", "cover_url", "max_volume", "first_added", "last_updated"
+)
+
+
+def format_series_card(progress: Dict[str, Any]) -> Dict[str, Any]:
+    """Carte série affichable depuis un document de progression"""
+    name = progress.get("name") or ""
+    return {
+        "id": f"series_{name.lower().replace(' ', '_')}",
+        **{field: progress.get(field) for field in CARD_FIELDS},
+        "completion_percentage": progress_percentage(progress),
+        "status": global_status(progress),
+        "isSeriesCard": True,
+        "isOwnedSeries": True,  # Marquer comme série possédée
+        "progress_text": f"{progress.get('completed_books', 0)}/{progress.get('total_books', 0)} tomes lus",
+        # Tomes de la série, chargés à la demande
+        "books_url": f"/api/sagas/{quote(name, safe='')}/books"
+    }
@@ -0,0 +1,600 @@
+# Catalogue des séries pour BOOKTIME
+"""
+Catalogue en mémoire des séries connues, chargé une fois depuis la base
+récoltée (extended_series_database.json) et complété par les séries de
+référence ci-dessous (scores de popularité, titres des tomes).
+
+Index inversés construits au chargement :
+- jetons (nom, variations, mots-clés, auteurs, traductions) -> séries
+- auteur normalisé, catégorie, langue -> séries
+- nom / variation normalisé -> série (recherche exacte)
+- automates Aho-Corasick sur les mots (noms, variations, mots-clés ;
+  auteurs) pour la détection en un seul passage sur le titre, quelle que
+  soit la taille du catalogue
+
+Les recherches ne parcourent que les séries candidates issues des index.
+Le fichier est surveillé : s'il change (mtime/taille), le catalogue est
+reconstruit dans un thread puis remplacé d'un bloc ; les lectures continuent
+sur l'ancien index pendant la reconstruction, sans verrou.
+"""
+
+import bisect
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from ..config import SERIES_DATABASE_PATH, SERIES_CATALOG_CHECK_INTERVAL, SERIES_AUTO_ASSIGN_MIN_CONFIDENCE
+from ..utils.aho_corasick import AhoCorasick
+
+logger = logging.getLogger(__name__)
+
+# Séries de référence (toujours présentes, prioritaires sur la base récoltée)
+BUILTIN_SERIES: Dict[str, Dict[str, Any]] = {
+    # ROMANS FANTASY/SF
+    "harry_potter": {
+        "name": "Harry Potter",
+        "category": "roman",
+        "score": 18000,
+        "keywords": ["harry", "potter", "hogwarts", "sorcier", "wizard", "poudlard", "voldemort"],
+        "authors": ["J.K. Rowling"],
+        "variations": ["Harry Potter", "École des Sorciers", "Chambre des Secrets"],
+        "volumes": 7,
+        "languages": ["fr", "en"],
+        "description": "La saga emblématique du jeune sorcier Harry Potter",
+        "first_published": 1997,
+        "status": "completed",
+        "tomes": [
+            "Harry Potter à l'école des sorciers",
+            "Harry Potter et la Chambre des secrets",
+            "Harry Potter et le Prisonnier d'Azkaban",
+            "Harry Potter et la Coupe de feu",
+            "Harry Potter et l'Ordre du phénix",
+            "Harry Potter et le Prince de sang-mêlé",
+            "Harry Potter et les Reliques de la Mort"
+        ]
+    },
+    "seigneur_des_anneaux": {
+        "name": "Le Seigneur des Anneaux",
+        "category": "roman",
+        "score": 18000,
+        "keywords": ["anneau", "terre du milieu", "hobbit", "frodo", "gandalf"],
+        "authors": ["J.R.R. Tolkien"],
+        "variations": ["Seigneur des Anneaux", "Lord of the Rings"],
+        "volumes": 3,
+        "languages": ["fr", "en"],
+        "description": "L'épopée fantasy légendaire de Tolkien",
+        "first_published": 1954,
+        "status": "completed",
+        "tomes": ["La Communauté de l'Anneau", "Les Deux Tours", "Le Retour du Roi"]
+    },
+    "game_of_thrones": {
+        "name": "Game of Thrones",
+        "category": "roman",
+        "score": 16000,
+        "keywords": ["trône de fer", "westeros", "stark", "lannister"],
+        "authors": ["George R.R. Martin"],
+        "variations": ["Game of Thrones", "Trône de Fer"],
+        "volumes": 5,
+        "languages": ["fr", "en"],
+        "description": "La saga politique et fantastique de Westeros",
+        "first_published": 1996,
+        "status": "ongoing"
+    },
+    # MANGAS
+    "one_piece": {
+        "name": "One Piece",
+        "category": "manga",
+        "score": 18000,
+        "keywords": ["luffy", "pirates", "chapeau de paille", "grand line"],
+        "authors": ["Eiichiro Oda"],
+        "variations": ["One Piece"],
+        "volumes": 108,
+        "languages": ["fr", "en", "jp"],
+        "description": "L'aventure du pirate Luffy à la recherche du One Piece",
+        "first_published": 1997,
+        "status": "ongoing"
+    },
+    "naruto": {
+        "name": "Naruto",
+        "category": "manga",
+        "score": 17000,
+        "keywords": ["naruto", "ninja", "konoha", "sasuke", "hokage"],
+        "authors": ["Masashi Kishimoto"],
+        "variations": ["Naruto", "Boruto"],
+        "volumes": 72,
+        "languages": ["fr", "en", "jp"],
+        "description": "L'histoire du ninja Naruto Uzumaki",
+        "first_published": 1999,
+        "status": "completed"
+    },
+    "dragon_ball": {
+        "name": "Dragon Ball",
+        "category": "manga",
+        "score": 17000,
+        "keywords": ["goku", "saiyan", "kamehameha", "vegeta"],
+        "authors": ["Akira Toriyama"],
+        "variations": ["Dragon Ball", "Dragon Ball Z", "Dragon Ball Super"],
+        "volumes": 42,
+        "languages": ["fr", "en", "jp"],
+        "description": "Les aventures de Son Goku et des Dragon Balls",
+        "first_published": 1984,
+        "status": "completed"
+    },
+    # BANDES DESSINÉES
+    "asterix": {
+        "name": "Astérix",
+        "category": "bd",
+        "score": 18000,
+        "keywords": ["astérix", "obélix", "gaulois", "potion magique"],
+        "authors": ["René Goscinny", "Albert Uderzo"],
+        "variations": ["Astérix", "Asterix"],
+        "volumes": 39,
+        "languages": ["fr", "en"],
+        "description": "Les aventures d'Astérix et Obélix en Gaule",
+        "first_published": 1961,
+        "status": "completed"
+    },
+    "tintin": {
+        "name": "Tintin",
+        "category": "bd",
+        "score": 17000,
+        "keywords": ["tintin", "milou", "capitaine haddock", "dupont"],
+        "authors": ["Hergé"],
+        "variations": ["Tintin", "Adventures of Tintin"],
+        "volumes": 24,
+        "languages": ["fr", "en"],
+        "description": "Les aventures du reporter Tintin et de son chien Milou",
+        "first_published": 1929,
+        "status": "completed"
+    }
+}
+
+# Mots trop fréquents pour discriminer des séries (non indexés)
+STOPWORDS = frozenset({
+    "le", "la", "les", "l", "de", "des", "du", "d", "un", "une", "et", "a", "au", "aux",
+    "en", "the", "of", "and", "an", "to", "in", "on", "tome", "vol", "volume"
+})
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Points de confiance par type de correspondance (détection de série)
+DETECTION_WEIGHTS = {"name": 80, "variation": 60, "author": 50, "keyword": 20}
+DETECTION_MIN_CONFIDENCE = 40
+
+# Indications de tome dans un titre : "(Saga, #3)" (Goodreads), "Tome 3", "Vol. 3", "T03", "#3"
+_SERIES_HINT_RE = re.compile(r"\(([^()#]+?),?\s*#(\d{1,4})(?:\.\d+)?\)\s*$")
+_VOLUME_RE = re.compile(r"\b(?:tome|vol(?:ume)?|book|livre|t)\.?\s*(\d{1,4})\b|#\s*(\d{1,4})\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=65536)
+def _normalize_text(text: str) -> str:
+    text = text.lower()
+    if not text.isascii():
+        text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    return " ".join(text.split())
+
+
+def normalize(text: Any) -> str:
+    """Minuscules sans accents, espaces compactés"""
+    return _normalize_text(str(text or ""))
+
+
+def tokenize(text: Any) -> List[str]:
+    """Jetons significatifs d'un texte normalisé"""
+    return [token for token in _TOKEN_RE.findall(normalize(text)) if token not in STOPWORDS]
+
+
+def words(text: Any) -> List[str]:
+    """Tous les mots d'un texte normalisé (symboles des automates de détection)"""
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def extract_volume_number(title: Any) -> Optional[int]:
+    """Numéro de tome indiqué dans un titre (None si absent)"""
+    match = _VOLUME_RE.search(str(title or ""))
+    if not match:
+        return None
+    return int(match.group(1) or match.group(2)) or None
+
+
+def parse_series_hint(title: Any) -> Tuple[Optional[str], Optional[int]]:
+    """Série et tome explicites en fin de titre (format Goodreads : "Titre (Saga, #3)")"""
+    match = _SERIES_HINT_RE.search(str(title or ""))
+    if not match:
+        return None, None
+    return match.group(1).strip(), int(match.group(2)) or None
+
+
+def slugify(name: str) -> str:
+    return "_".join(_TOKEN_RE.findall(normalize(name)))
+
+
+def _as_list(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [value] if value else []
+    return [str(item) for item in value or [] if item]
+
+
+def normalize_entry(raw: Dict[str, Any], series_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Entrée de catalogue homogène (None si l'entrée n'a pas de nom)"""
+    name = str(raw.get("name") or "").strip()
+    if not name:
+        return None
+
+    translations = raw.get("translations") or {}
+    return {
+        **raw,
+        "id": series_id or raw.get("id") or slugify(name),
+        "name": name,
+        "category": raw.get("category") or "roman",
+        "score": raw.get("score") or int((raw.get("confidence_score") or 0) * 100),
+        "keywords": _as_list(raw.get("keywords")),
+        "authors": _as_list(raw.get("authors")),
+        "variations": _as_list(raw.get("variations")) or [name],
+        "volumes": raw.get("volumes") or 0,
+        "languages": _as_list(raw.get("languages")),
+        "description": raw.get("description") or "",
+        "tomes": _as_list(raw.get("tomes")),
+        "translations": translations if isinstance(translations, dict) else {}
+    }
+
+
+class CatalogIndex:
+    """Séries et index inversés (immuable une fois construit)"""
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self.series: List[Dict[str, Any]] = entries
+        self.names: List[str] = [normalize(series["name"]) for series in entries]
+        self.by_token: Dict[str, Set[int]] = {}
+        self.by_author: Dict[str, Set[int]] = {}
+        self.by_name: Dict[str, int] = {}
+
+        for position, series in enumerate(entries):
+            names = [series["name"], *series["variations"], *series["translations"].values()]
+            for text in [*names, *series["keywords"], *series["authors"]]:
+                for token in tokenize(text):
+                    self.by_token.setdefault(token, set()).add(position)
+            for author in series["authors"]:
+                self.by_author.setdefault(normalize(author), set()).add(position)
+            for name in names:
+                self.by_name.setdefault(normalize(name), position)
+
+        # Ordre de popularité (score décroissant, puis nom) et rang de chaque série
+        self.popularity: List[int] = sorted(
+            range(len(entries)), key=lambda position: (-entries[position]["score"], entries[position]["name"])
+        )
+        self.rank: List[int] = [0] * len(entries)
+        for rank, position in enumerate(self.popularity):
+            self.rank[position] = rank
+
+        # Catégorie et langue -> séries déjà triées par popularité.
+        # Séries sans langue renseignée : jamais exclues par le filtre de langue.
+        self.by_category: Dict[str, List[int]] = {}
+        self.by_language: Dict[str, List[int]] = {}
+        languages = {language for series in entries for language in series["languages"]}
+        for position in self.popularity:
+            series = entries[position]
+            self.by_category.setdefault(series["category"], []).append(position)
+            for language in series["languages"] or languages:
+                self.by_language.setdefault(language, []).append(position)
+
+        # Jetons et noms triés : recherche par préfixe en O(log n)
+        self.sorted_tokens: List[str] = sorted(self.by_token)
+        self.sorted_names: List[Tuple[str, int]] = sorted((name, position) for position, name in enumerate(self.names))
+
+        # Automates de détection (motifs = suites de mots) : un passage sur le
+        # titre, un sur l'auteur. Un mot-clé est un seul motif, partagé par
+        # toutes les séries qui le portent (keyword_postings).
+        self.title_matcher = AhoCorasick()
+        self.author_matcher = AhoCorasick()
+        self.keyword_postings: Dict[Tuple[str, ...], Set[int]] = {}
+        for position, series in enumerate(entries):
+            self.title_matcher.add(words(series["name"]), ("name", position))
+            for variation in {tuple(words(variation)) for variation in series["variations"]}:
+                self.title_matcher.add(variation, ("variation", position))
+            for keyword in {tuple(words(keyword)) for keyword in series["keywords"]}:
+                if keyword:
+                    self.keyword_postings.setdefault(keyword, set()).add(position)
+            for author in {tuple(words(author)) for author in series["authors"]}:
+                self.author_matcher.add(author, ("author", position))
+        for keyword in self.keyword_postings:
+            self.title_matcher.add(keyword, ("keyword", keyword))
+        self.title_matcher.build()
+        self.author_matcher.build()
+
+    def prefix_matches(self, prefix: str) -> Set[int]:
+        """Séries ayant un jeton commençant par `prefix`"""
+        matches: Set[int] = set()
+        start = bisect.bisect_left(self.sorted_tokens, prefix)
+        for token in self.sorted_tokens[start:]:
+            if not token.startswith(prefix):
+                break
+            matches |= self.by_token[token]
+        return matches
+
+    def name_prefix_matches(self, prefix: str, limit: int) -> List[int]:
+        """Séries dont le nom commence par `prefix` (au plus `limit`)"""
+        matches: List[int] = []
+        start = bisect.bisect_left(self.sorted_names, (prefix, -1))
+        for name, position in self.sorted_names[start:start + limit]:
+            if not name.startswith(prefix):
+                break
+            matches.append(position)
+        return matches
+
+
+def score_matches(index: CatalogIndex, title: str, author: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+    """
+    Détection en un passage par automate : nom (+80), chaque mot-clé (+20),
+    auteur (+50), variation (+60) ; seuil DETECTION_MIN_CONFIDENCE.
+    Les motifs correspondent à des mots entiers du titre normalisé.
+    """
+    kinds: Dict[int, Set[str]] = {}
+    matched_keywords: Set[Tuple[str, ...]] = set()
+    matches = list(index.title_matcher.finditer(words(title)))
+    if author:
+        matches += index.author_matcher.finditer(words(author))
+    for _start, _end, (kind, payload) in matches:
+        if kind == "keyword":
+            matched_keywords.add(payload)
+        else:
+            kinds.setdefault(payload, set()).add(kind)
+
+    # Un mot-clé seul (20) n'atteint pas le seuil : seules comptent les séries
+    # déjà touchées par ailleurs ou partageant au moins deux mots-clés du titre
+    keyword_sets = [index.keyword_postings[keyword] for keyword in matched_keywords]
+    candidates = set(kinds)
+    for i, first in enumerate(keyword_sets):
+        for second in keyword_sets[i + 1:]:
+            candidates |= first & second
+
+    detected = []
+    for position in candidates:
+        confidence = sum(DETECTION_WEIGHTS[kind] for kind in kinds.get(position, ()))
+        confidence += DETECTION_WEIGHTS["keyword"] * sum(1 for postings in keyword_sets if position in postings)
+        if confidence < DETECTION_MIN_CONFIDENCE:
+            continue
+
+        series = index.series[position]
+        detected.append({
+            "series_name": series["name"],
+            "confidence": confidence,
+            "authors": series["authors"],
+            "category": series["category"],
+            "volumes": series["volumes"],
+            "description": series["description"]
+        })
+
+    detected.sort(key=lambda item: (-item["confidence"], item["series_name"]))
+    return detected[:limit]
+
+
+class SeriesCatalog:
+    """Catalogue des séries avec rechargement à chaud du fichier source"""
+
+    def __init__(self, database_path: str = SERIES_DATABASE_PATH, check_interval: float = SERIES_CATALOG_CHECK_INTERVAL):
+        self.database_path = database_path
+        self.check_interval = check_interval
+        self._index: Optional[CatalogIndex] = None
+        self._signature: Optional[Tuple[float, int]] = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+
+    # Chargement
+
+    def _file_signature(self) -> Optional[Tuple[float, int]]:
+        try:
+            stat = os.stat(self.database_path)
+        except OSError:
+            return None
+        return stat.st_mtime, stat.st_size
+
+    def _load_entries(self) -> List[Dict[str, Any]]:
+        entries: List[Dict[str, Any]] = []
+        seen: Set[str] = set()
+        for series_id, raw in BUILTIN_SERIES.items():
+            entry = normalize_entry(raw, series_id)
+            entries.append(entry)
+            seen.add(normalize(entry["name"]))
+
+        try:
+            with open(self.database_path, "r", encoding="utf-8") as f:
+                harvested = json.load(f)
+        except FileNotFoundError:
+            harvested = []
+        except (OSError, ValueError) as e:
+            logger.error(f"❌ Base des séries illisible ({self.database_path}): {e}")
+            harvested = []
+
+        if isinstance(harvested, dict):
+            harvested = list(harvested.values())
+        for raw in harvested:
+            entry = normalize_entry(raw) if isinstance(raw, dict) else None
+            if entry and normalize(entry["name"]) not in seen:
+                entries.append(entry)
+                seen.add(normalize(entry["name"]))
+        return entries
+
+    def reload(self) -> CatalogIndex:
+        """Reconstruire le catalogue depuis le fichier"""
+        with self._reload_lock:
+            return self._rebuild()
+
+    def _rebuild(self) -> CatalogIndex:
+        start_time = time.time()
+        signature = self._file_signature()
+        index = CatalogIndex(self._load_entries())
+        self._index, self._signature = index, signature
+        logger.info(f"📚 Catalogue des séries chargé: {len(index.series)} séries en {(time.time() - start_time) * 1000:.1f}ms")
+        return index
+
+    def _reload_in_background(self):
+        # Une seule reconstruction à la fois ; les autres appels gardent l'index courant
+        if not self._reload_lock.acquire(blocking=False):
+            return
+
+        def run():
+            try:
+                self._rebuild()
+            except Exception as e:
+                logger.error(f"❌ Rechargement du catalogue des séries échoué: {e}")
+            finally:
+                self._reload_lock.release()
+
+        threading.Thread(target=run, name="series-catalog-reload", daemon=True).start()
+
+    @property
+    def index(self) -> CatalogIndex:
+        """Index courant, rechargé si le fichier source a changé"""
+        now = time.monotonic()
+        if self._index is None:
+            self._next_check = now + self.check_interval
+            return self.reload()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            if self._file_signature() != self._signature:
+                self._reload_in_background()
+        return self._index
+
+    # Consultation
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        """Série par nom ou variation exacts (casse et accents ignorés)"""
+        index = self.index
+        position = index.by_name.get(normalize(name))
+        return None if position is None else index.series[position]
+
+    def popular(self, category: Optional[str] = None, language: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Séries les plus populaires, filtrées par catégorie et langue"""
+        index = self.index
+        if category:
+            positions = index.by_category.get(category, [])
+        elif language:
+            positions = index.by_language.get(language, [])
+        else:
+            positions = index.popularity
+
+        results = []
+        for position in positions:
+            series = index.series[position]
+            if category and language and series["languages"] and language not in series["languages"]:
+                continue
+            results.append(series)
+            if len(results) >= limit:
+                break
+        return results
+
+    def search(self, term: str, category: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Séries dont chaque jeton du terme préfixe un jeton indexé
+        (nom, variations, mots-clés, auteurs). Nom exact puis nom commençant
+        par le terme en tête, le reste par popularité.
+        """
+        index = self.index
+        tokens = tokenize(term) or _TOKEN_RE.findall(normalize(term))
+        if not tokens:
+            return []
+
+        candidates: Optional[Set[int]] = None
+        for token in sorted(set(tokens), key=len, reverse=True):
+            matches = index.prefix_matches(token)
+            candidates = matches if candidates is None else candidates & matches
+            if not candidates:
+                return []
+        if category:
+            candidates = {position for position in candidates if index.series[position]["category"] == category}
+
+        normalized_term = normalize(term)
+        leading = [position for position in index.name_prefix_matches(normalized_term, limit) if position in candidates]
+        leading.sort(key=lambda position: (index.names[position] != normalized_term, index.rank[position]))
+
+        # Peu de candidats : tri direct ; sinon parcours par popularité jusqu'à `limit`
+        if len(candidates) <= limit * 4:
+            remaining = sorted(candidates, key=index.rank.__getitem__)
+        else:
+            remaining = (position for position in index.popularity if position in candidates)
+
+        results = leading[:]
+        seen = set(leading)
+        for position in remaining:
+            if len(results) >= limit:
+                break
+            if position not in seen:
+                results.append(position)
+        return [index.series[position] for position in results[:limit]]
+
+    def detect(self, title: str, author: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """Séries auxquelles un livre appartient probablement (avec confiance)"""
+        return score_matches(self.index, title, author, limit)
+
+    def detect_many(
+        self,
+        books: Iterable[Tuple[str, Optional[str]]],
+        limit: int = 1
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Détection pour une suite de (titre, auteur), dans l'ordre.
+        Un seul instantané de l'index pour tout le lot ; les paires
+        identiques (normalisées) ne sont évaluées qu'une fois.
+        """
+        index = self.index
+        memo: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for title, author in books:
+            key = (normalize(title), normalize(author))
+            if key not in memo:
+                memo[key] = score_matches(index, title, author, limit)
+            yield memo[key]
+
+    def assign_series(self, books: List[Dict[str, Any]], min_confidence: int = SERIES_AUTO_ASSIGN_MIN_CONFIDENCE) -> int:
+        """
+        Renseigner `saga` (et `volume_number` si absent) des livres qui n'en ont
+        pas : indication explicite du titre "(Saga, #n)" d'abord (nom du catalogue
+        si la série est connue), sinon série détectée avec une confiance
+        suffisante. Modifie les livres ; retourne le nombre de livres rattachés.
+        """
+        assigned = 0
+        undetermined = []
+        for book in books:
+            if book.get("saga") or not book.get("title"):
+                continue
+            hint_name, hint_volume = parse_series_hint(book["title"])
+            if not hint_name:
+                undetermined.append(book)
+                continue
+            known = self.get(hint_name)
+            book["saga"] = known["name"] if known else hint_name
+            if not book.get("volume_number"):
+                book["volume_number"] = hint_volume
+            assigned += 1
+
+        detections = self.detect_many(((book["title"], book.get("author")) for book in undetermined), limit=1)
+        for book, detected in zip(undetermined, detections):
+            if not detected or detected[0]["confidence"] < min_confidence:
+                continue
+            book["saga"] = detected[0]["series_name"]
+            if not book.get("volume_number"):
+                book["volume_number"] = extract_volume_number(book["title"])
+            assigned += 1
+        return assigned
+
+    def stats(self) -> Dict[str, Any]:
+        """Taille du catalogue et des index"""
+        index = self.index
+        return {
+            "total_series": len(index.series),
+            "tokens": len(index.by_token),
+            "authors": len(index.by_author),
+            "categories": {category: len(positions) for category, positions in index.by_category.items()},
+            "languages": {language: len(positions) for language, positions in index.by_language.items()},
+            "database_path": self.database_path,
+            "database_loaded": self._signature is not None
+        }
+
+
+# Instance globale du catalogue des séries
+series_catalog = SeriesCatalog()
@@ -0,0 +1,124 @@
+# Séries suivies (series_library) pour BOOKTIME
+"""
+Mise à jour groupée des tomes lus d'une série suivie : une liste de numéros
+et/ou de plages est appliquée en un seul `find_one_and_update` avec
+`arrayFilters` (contrôle d'appartenance compris), au lieu d'un aller-retour
+find_one + update_one par tome.
+
+Seuls les tomes dont l'état change sont modifiés : la date de lecture des
+tomes déjà lus est conservée, et le document d'avant mise à jour suffit à
+calculer la nouvelle progression sans relecture.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from pymongo import ReturnDocument
+from ..config import SERIES_BULK_VOLUMES_MAX
+from ..database import async_db
+from ..utils.cache import cache
+from .series_progress import series_progress_service
+
+logger = logging.getLogger(__name__)
+
+
+def expand_volume_numbers(volumes: Iterable[int] = (), ranges: Iterable[Any] = ()) -> List[int]:
+    """
+    Numéros de tomes triés et dédoublonnés depuis une liste et des plages
+    (objets ou dicts start/end, bornes incluses).
+    Lève ValueError si la demande est vide, invalide ou trop grande.
+    """
+    numbers = {number for number in volumes if number >= 1}
+    for volume_range in ranges:
+        start = volume_range["start"] if isinstance(volume_range, dict) else volume_range.start
+        end = volume_range["end"] if isinstance(volume_range, dict) else volume_range.end
+        if end < start:
+            raise ValueError(f"Plage de tomes invalide : {start}-{end}")
+        if end - start + 1 > SERIES_BULK_VOLUMES_MAX:
+            raise ValueError(f"Plage de tomes trop grande (maximum {SERIES_BULK_VOLUMES_MAX})")
+        numbers.update(range(start, end + 1))
+
+    if not numbers:
+        raise ValueError("Aucun tome indiqué")
+    if len(numbers) > SERIES_BULK_VOLUMES_MAX:
+        raise ValueError(f"Trop de tomes (maximum {SERIES_BULK_VOLUMES_MAX})")
+    return sorted(numbers)
+
+
+def summarize_volume_update(
+    volumes: List[Dict[str, Any]],
+    volume_numbers: Iterable[int],
+    is_read: bool
+) -> Dict[str, Any]:
+    """Bilan d'une mise à jour groupée depuis l'état des tomes avant écriture"""
+    requested = set(volume_numbers)
+    existing = {volume.get("volume_number") for volume in volumes}
+    changed = {
+        volume["volume_number"] for volume in volumes
+        if volume.get("volume_number") in requested and bool(volume.get("is_read")) != is_read
+    }
+    # État après écriture : les tomes modifiés basculent, les autres restent
+    read_after = sum(1 for volume in volumes if bool(volume.get("is_read")) != (volume.get("volume_number") in changed))
+
+    return {
+        "updated_volumes": sorted(changed),
+        "unchanged_volumes": sorted((requested & existing) - changed),
+        "missing_volumes": sorted(requested - existing),
+        "progress": {
+            "read_volumes": read_after,
+            "total_volumes": len(volumes),
+            "completion_percentage": round(read_after / len(volumes) * 100) if volumes else 0
+        }
+    }
+
+
+class SeriesLibraryService:
+    """Écritures groupées sur les séries suivies"""
+
+    def __init__(self):
+        self.db = async_db
+        self.collection = self.db.series_library
+
+    async def set_volumes_read(
+        self,
+        user_id: str,
+        series_id: str,
+        volume_numbers: List[int],
+        is_read: bool
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Marquer des tomes lus/non lus en une écriture.
+        Retourne le bilan et la nouvelle progression, None si la série n'existe pas.
+        """
+        now = datetime.utcnow()
+        previous = await self.collection.find_one_and_update(
+            # Les préférences de lecture partagent la collection sans tableau de tomes :
+            # sans ce filtre, array_filters lèverait une erreur au lieu d'un 404
+            {"id": series_id, "user_id": user_id, "volumes": {"$exists": True}},
+            {"$set": {
+                "volumes.$[volume].is_read": is_read,
+                "volumes.$[volume].date_read": now.isoformat() if is_read else None,
+                "updated_at": now
+            }},
+            array_filters=[{
+                "volume.volume_number": {"$in": volume_numbers},
+                "volume.is_read": {"$ne": is_read}
+            }],
+            projection={"_id": 0, "series_name": 1, "volumes.volume_number": 1, "volumes.is_read": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        if previous is None:
+            return None
+
+        summary = summarize_volume_update(previous.get("volumes") or [], volume_numbers, is_read)
+        changed = len(summary["updated_volumes"])
+        if changed:
+            await series_progress_service.record_volume_read(
+                user_id, previous.get("series_name"), changed if is_read else -changed
+            )
+            await cache.flush_user_cache(user_id)
+        return summary
+
+
+# Instance globale des séries suivies
+series_library_service = SeriesLibraryService()
@@ -0,0 +1,432 @@
+# Progression matérialisée des séries pour BOOKTIME
+"""
+Un document par (utilisateur, saga) dans la collection `series_progress` :
+compteurs de tomes par statut, tome le plus avancé, couverture, dates, et
+tomes lus des séries suivies dans `series_library`. Les vues séries
+(/api/sagas, cartes de /api/library/series, recherche groupée) lisent ces
+documents au lieu de regrouper les livres à chaque chargement.
+
+Mises à jour :
+- changement de statut seul (update_book, bulk-status) : `$inc` des compteurs ;
+- tome lu/non lu dans series_library : `$inc` de library_volumes_read ;
+- toute autre écriture (création, suppression, changement de saga, de tome,
+  de couverture...) : recalcul de la seule saga touchée, par l'index
+  user_saga_key_volume_index.
+
+Un utilisateur est matérialisé dès le début de sa première reconstruction,
+marqué dans `series_progress_users` (même s'il n'a aucune saga). Tant
+qu'il ne l'est pas, les écritures ne créent rien (document partiel) et la
+lecture suivante reconstruit l'ensemble.
+
+Chaque `$inc` incrémente aussi `writes` : le recalcul d'une saga, comme la
+reconstruction, ne remplace le document que si `writes` n'a pas bougé depuis
+sa lecture, sinon il recommence (un `$inc` concurrent n'est pas écrasé par un
+agrégat antérieur). La réconciliation (scripts/reconcile_user_stats.py)
+compare les compteurs à un recalcul complet.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pymongo import DeleteOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from ..database import async_db
+from ..utils.saga_key import saga_key
+
+logger = logging.getLogger(__name__)
+
+# Statut d'un livre -> compteur de la saga
+STATUS_COUNTERS = {
+    "completed": "completed_books",
+    "reading": "reading_books",
+    "to_read": "to_read_books"
+}
+
+# Champs dont la modification impose de recalculer la saga (sinon simple $inc)
+STRUCTURAL_FIELDS = ("saga", "volume_number", "cover_url", "author", "category")
+
+# Tris proposés aux vues séries : paramètre sort_by -> champ du document
+PROGRESS_SORT_FIELDS = {
+    "last_updated": "last_updated",
+    "date_added": "first_added",
+    "name": "name",
+    "total_books": "total_books"
+}
+
+# Recalculs d'une saga retentés quand un $inc concurrent l'a modifiée
+REFRESH_ATTEMPTS = 3
+
+# Compteurs comparés par la réconciliation (scripts/reconcile_user_stats.py)
+COMPARED_FIELDS = (
+    "total_books", "completed_books", "reading_books", "to_read_books",
+    "max_volume", "library_volumes", "library_volumes_read"
+)
+
+
+def build_progress_pipeline(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Progression par saga_key des livres correspondant au filtre"""
+    return [
+        {"$match": {**match, "saga_key": match.get("saga_key", {"$nin": ["", None]})}},
+        {"$project": {
+            "_id": 0, "saga": 1, "saga_key": 1, "author": 1, "category": 1, "status": 1,
+            "date_added": 1, "updated_at": 1, "volume_number": 1, "cover_url": 1,
+            "has_cover": {"$gt": [{"$strLenCP": {"$ifNull": ["$cover_url", ""]}}, 0]}
+        }},
+        # Nom, auteur et catégorie repris du premier tome
+        {"$sort": {"saga_key": 1, "volume_number": 1}},
+        {"$group": {
+            "_id": "$saga_key",
+            "name": {"$first": "$saga"},
+            "author": {"$first": "$author"},
+            "category": {"$first": "$category"},
+            "total_books": {"$sum": 1},
+            "completed_books": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
+            "reading_books": {"$sum": {"$cond": [{"$eq": ["$status", "reading"]}, 1, 0]}},
+            "to_read_books": {"$sum": {"$cond": [{"$eq": ["$status", "to_read"]}, 1, 0]}},
+            "first_added": {"$min": "$date_added"},
+            "last_updated": {"$max": {"$ifNull": ["$updated_at", "$date_added"]}},
+            "max_volume": {"$max": "$volume_number"},
+            # Meilleure couverture : le tome le plus avancé qui en possède une
+            "cover_url": {"$top": {
+                "sortBy": {"has_cover": -1, "volume_number": -1},
+                "output": "$cover_url"
+            }}
+        }}
+    ]
+
+
+def library_volume_counts(series: Dict[str, Any]) -> Tuple[int, int]:
+    """(tomes, tomes lus) d'une série de series_library"""
+    volumes = series.get("volumes") or []
+    return len(volumes), sum(1 for volume in volumes if volume.get("is_read"))
+
+
+def build_progress_document(
+    user_id: str,
+    key: str,
+    row: Optional[Dict[str, Any]],
+    library: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """Document de progression depuis l'agrégat des livres et la série suivie (None si vide)"""
+    if not row and not library:
+        return None
+
+    row = row or {}
+    library_volumes, library_volumes_read = library_volume_counts(library or {})
+    return {
+        "user_id": user_id,
+        "saga_key": key,
+        "name": row.get("name") or (library or {}).get("series_name") or key,
+        "author": row.get("author") or ", ".join((library or {}).get("authors") or []),
+        "category": row.get("category") or (library or {}).get("category"),
+        "total_books": row.get("total_books", 0),
+        "completed_books": row.get("completed_books", 0),
+        "reading_books": row.get("reading_books", 0),
+        "to_read_books": row.get("to_read_books", 0),
+        "max_volume": row.get("max_volume") or 0,
+        "cover_url": row.get("cover_url") or (library or {}).get("cover_image_url") or "",
+        "first_added": row.get("first_added"),
+        "last_updated": row.get("last_updated"),
+        "library_volumes": library_volumes,
+        "library_volumes_read": library_volumes_read,
+        "updated_at": datetime.utcnow()
+    }
+
+
+def status_delta(
+    before: Iterable[Dict[str, Any]] = (),
+    after: Iterable[Dict[str, Any]] = ()
+) -> Dict[str, Counter]:
+    """Différence des compteurs de statut par saga_key"""
+    deltas: Dict[str, Counter] = defaultdict(Counter)
+    for books, sign in ((after, 1), (before, -1)):
+        for book in books:
+            key = saga_key(book.get("saga"))
+            counter = STATUS_COUNTERS.get(book.get("status"))
+            if key and counter:
+                deltas[key][counter] += sign
+    return {key: Counter({path: value for path, value in delta.items() if value})
+            for key, delta in deltas.items() if any(delta.values())}
+
+
+def progress_percentage(document: Dict[str, Any]) -> int:
+    """Pourcentage de tomes lus (livres, sinon tomes suivis dans series_library)"""
+    if document.get("total_books"):
+        return round(document["completed_books"] / document["total_books"] * 100)
+    if document.get("library_volumes"):
+        return round(document["library_volumes_read"] / document["library_volumes"] * 100)
+    return 0
+
+
+def global_status(document: Dict[str, Any]) -> str:
+    """Statut global d'une série d'après ses compteurs"""
+    if document.get("reading_books", 0) > 0:
+        return "reading"
+    if document.get("total_books") and document.get("completed_books") == document.get("total_books"):
+        return "completed"
+    return "to_read"
+
+
+class SeriesProgressService:
+    """Progression matérialisée des séries (collection series_progress)"""
+
+    def __init__(self):
+        self.db = async_db
+        self.collection = self.db.series_progress
+        self.users = self.db.series_progress_users
+
+    # Écritures incrémentales
+
+    async def record_books_added(self, user_id: str, books: List[Dict[str, Any]]):
+        """Livres créés (création, auto-complétion, import)"""
+        await self.refresh(user_id, [book.get("saga") for book in books])
+
+    async def record_books_removed(self, user_id: str, books: List[Dict[str, Any]]):
+        """Livres supprimés"""
+        await self.refresh(user_id, [book.get("saga") for book in books])
+
+    async def record_book_updated(self, user_id: str, before: Dict[str, Any], after: Dict[str, Any]):
+        """Livre modifié : $inc si seul le statut change, sinon recalcul des sagas touchées"""
+        if all(before.get(field) == after.get(field) for field in STRUCTURAL_FIELDS):
+            await self.record_status_change(user_id, [before], [after])
+        else:
+            await self.refresh(user_id, [before.get("saga"), after.get("saga")])
+
+    async def record_status_change(
+        self,
+        user_id: str,
+        before: List[Dict[str, Any]],
+        after: List[Dict[str, Any]]
+    ):
+        """Changement de statut de livres restés dans la même saga"""
+        now = datetime.utcnow()
+        for key, delta in status_delta(before, after).items():
+            result = await self.collection.update_one(
+                {"user_id": user_id, "saga_key": key},
+                {"$inc": {**delta, "writes": 1}, "$set": {"last_updated": now, "updated_at": now}}
+            )
+            if result.matched_count == 0:
+                await self.refresh(user_id, [key])
+
+    async def record_volume_read(self, user_id: str, series_name: str, change: int):
+        """Tome d'une série suivie (series_library) marqué lu (+1) ou non lu (-1)"""
+        if not change:
+            return
+        result = await self.collection.update_one(
+            {"user_id": user_id, "saga_key": saga_key(series_name)},
+            {"$inc": {"library_volumes_read": change, "writes": 1}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+        if result.matched_count == 0:
+            await self.refresh(user_id, [series_name])
+
+    async def refresh(self, user_id: str, sagas: Iterable[Optional[str]]):
+        """Recalculer les documents des sagas touchées (utilisateur déjà matérialisé)"""
+        keys = {saga_key(saga) for saga in sagas} - {""}
+        if not keys or not await self.is_materialized(user_id):
+            return
+
+        library = await self._library_by_key(user_id)
+        for key in keys:
+            await self._refresh_saga(user_id, key, library.get(key))
+
+    async def _refresh_saga(self, user_id: str, key: str, library: Optional[Dict[str, Any]]):
+        """Recalculer une saga sans écraser un $inc arrivé pendant l'agrégat"""
+        selector = {"user_id": user_id, "saga_key": key}
+        for _ in range(REFRESH_ATTEMPTS):
+            current = await self.collection.find_one(selector, {"_id": 0, "writes": 1})
+            rows = await self.db.books.aggregate(build_progress_pipeline(selector)).to_list(length=1)
+            document = build_progress_document(user_id, key, rows[0] if rows else None, library)
+
+            if current is None:
+                if document is None:
+                    return
+                # Création : un recalcul concurrent déjà inséré fait foi
+                try:
+                    await self.collection.update_one(
+                        selector, {"$setOnInsert": {**document, "writes": 0}}, upsert=True
+                    )
+                except DuplicateKeyError:
+                    pass
+                return
+
+            # writes absent (document reconstruit) : {"writes": None} le sélectionne
+            guarded = {**selector, "writes": current.get("writes")}
+            if document is None:
+                result = await self.collection.delete_one(guarded)
+                if result.deleted_count:
+                    return
+            else:
+                result = await self.collection.replace_one(
+                    guarded, {**document, "writes": current.get("writes") or 0}
+                )
+                if result.matched_count:
+                    return
+
+        logger.warning(f"⚠️ Progression de la saga {key} modifiée pendant {REFRESH_ATTEMPTS} recalculs ({user_id})")
+
+    # Lecture et reconstruction
+
+    async def is_materialized(self, user_id: str) -> bool:
+        return await self.users.find_one({"user_id": user_id}, {"_id": 1}) is not None
+
+    async def _library_by_key(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """Séries suivies de l'utilisateur par saga_key"""
+        series_list = await self.db.series_library.find(
+            {"user_id": user_id, "volumes": {"$exists": True}},
+            {"_id": 0, "series_name": 1, "authors": 1, "category": 1, "cover_image_url": 1, "volumes.is_read": 1}
+        ).to_list(length=None)
+        return {saga_key(series.get("series_name")): series for series in series_list if series.get("series_name")}
+
+    async def compute(self, user_id: str) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """Documents attendus par saga_key (depuis les livres et les séries suivies), et séries suivies"""
+        rows = await self.db.books.aggregate(
+            build_progress_pipeline({"user_id": user_id}), allowDiskUse=True
+        ).to_list(length=None)
+        rows_by_key = {row["_id"]: row for row in rows}
+        library = await self._library_by_key(user_id)
+
+        documents = {}
+        for key in rows_by_key.keys() | library.keys():
+            document = build_progress_document(user_id, key, rows_by_key.get(key), library.get(key))
+            if document:
+                documents[key] = document
+        return documents, library
+
+    async def _writes_by_key(self, user_id: str) -> Dict[str, Optional[int]]:
+        documents = await self.collection.find(
+            {"user_id": user_id}, {"_id": 0, "saga_key": 1, "writes": 1}
+        ).to_list(length=None)
+        return {document["saga_key"]: document.get("writes") for document in documents}
+
+    async def rebuild(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        Reconstruire tous les documents de l'utilisateur.
+        Le marqueur est posé avant l'agrégat : les écritures concurrentes passent
+        par refresh. Comme dans _refresh_saga, un document n'est remplacé ou
+        supprimé que si `writes` n'a pas bougé ; les sagas modifiées pendant la
+        reconstruction sont ensuite recalculées une à une.
+        """
+        await self.users.update_one(
+            {"user_id": user_id}, {"$set": {"materialized_at": datetime.utcnow()}}, upsert=True
+        )
+        try:
+            before = await self._writes_by_key(user_id)
+            documents, library = await self.compute(user_id)
+
+            operations = []
+            for key, document in documents.items():
+                if key in before:
+                    operations.append(ReplaceOne(
+                        {"user_id": user_id, "saga_key": key, "writes": before[key]},
+                        {**document, "writes": before[key] or 0}
+                    ))
+                else:
+                    # Création : un recalcul concurrent déjà inséré fait foi
+                    operations.append(UpdateOne(
+                        {"user_id": user_id, "saga_key": key},
+                        {"$setOnInsert": {**document, "writes": 0}},
+                        upsert=True
+                    ))
+            for key in before.keys() - documents.keys():
+                operations.append(DeleteOne({"user_id": user_id, "saga_key": key, "writes": before[key]}))
+            if operations:
+                try:
+                    await self.collection.bulk_write(operations, ordered=False)
+                except BulkWriteError as e:
+                    if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                        raise
+
+            after = await self._writes_by_key(user_id)
+            # Modifiées pendant la reconstruction, ou à supprimer mais modifiées depuis
+            stale = [
+                key for key, writes in after.items()
+                if key in documents and writes != (before.get(key) or 0)
+                or key in before and key not in documents
+            ]
+        except Exception:
+            # Reconstruction interrompue : la prochaine lecture recommence
+            await self.users.delete_one({"user_id": user_id})
+            raise
+
+        for key in stale:
+            await self._refresh_saga(user_id, key, library.get(key))
+        logger.info(f"📚 Progression des séries reconstruite pour {user_id}: {len(documents)} série(s), {len(stale)} recalculée(s)")
+        return list(documents.values())
+
+    async def reconcile(self, user_id: str, fix: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Comparer les documents stockés à un recalcul complet.
+        Retourne les écarts par saga_key ({} si aucun, None si l'utilisateur n'est
+        pas matérialisé) ; reconstruit si `fix`.
+        """
+        if not await self.is_materialized(user_id):
+            return None
+        stored = {
+            document["saga_key"]: document
+            for document in await self.collection.find({"user_id": user_id}, {"_id": 0}).to_list(length=None)
+        }
+        expected, _ = await self.compute(user_id)
+
+        drift = {}
+        for key in stored.keys() | expected.keys():
+            stored_values = {field: (stored.get(key) or {}).get(field, 0) for field in COMPARED_FIELDS}
+            expected_values = {field: (expected.get(key) or {}).get(field, 0) for field in COMPARED_FIELDS}
+            if stored_values != expected_values:
+                drift[key] = {"stored": stored_values if key in stored else None,
+                              "expected": expected_values if key in expected else None}
+
+        if drift and fix:
+            await self.rebuild(user_id)
+        return drift
+
+    async def ensure(self, user_id: str):
+        """Matérialiser l'utilisateur avant une lecture si nécessaire"""
+        if not await self.is_materialized(user_id):
+            await self.rebuild(user_id)
+
+    async def list(
+        self,
+        user_id: str,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        category: Optional[str] = None,
+        sort_by: str = "last_updated",
+        sort_order: str = "desc",
+        with_books_only: bool = True
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Page de documents de progression et nombre total"""
+        await self.ensure(user_id)
+
+        query: Dict[str, Any] = {"user_id": user_id}
+        if with_books_only:
+            query["total_books"] = {"$gt": 0}
+        if category:
+            query["category"] = category
+
+        sort_field = PROGRESS_SORT_FIELDS.get(sort_by, PROGRESS_SORT_FIELDS["last_updated"])
+        direction = 1 if sort_order == "asc" else -1
+        cursor = self.collection.find(query, {"_id": 0}).sort([(sort_field, direction), ("saga_key", 1)])
+        if offset:
+            cursor = cursor.skip(offset)
+        if limit:
+            cursor = cursor.limit(limit)
+
+        documents = await cursor.to_list(length=limit)
+        total = await self.collection.count_documents(query) if limit else offset + len(documents)
+        return documents, total
+
+    async def get_many(self, user_id: str, sagas: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Documents de progression par saga_key pour une liste de noms de sagas"""
+        keys = list({saga_key(saga) for saga in sagas} - {""})
+        if not keys:
+            return {}
+        await self.ensure(user_id)
+        documents = await self.collection.find(
+            {"user_id": user_id, "saga_key": {"$in": keys}}, {"_id": 0}
+        ).to_list(length=None)
+        return {document["saga_key"]: document for document in documents}
+
+
+# Instance globale de la progression des séries
+series_progress_service = SeriesProgressService()
@@ -0,0 +1,114 @@
+# Service de statistiques de bibliothèque pour BOOKTIME
+"""
+Calcul des statistiques d'un utilisateur en un seul aller-retour MongoDB :
+un pipeline `$facet` produit les compteurs par statut, catégorie, note,
+auteurs et sagas distincts et livres auto-ajoutés.
+
+Le résultat est mis en cache par utilisateur (namespace `user_stats`) et
+invalidé par la génération de cache de l'utilisateur à chaque écriture.
+Consommateurs : /api/stats, /api/v2/books/stats, profils sociaux et export.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List
+from ..database import async_db
+from ..utils.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+def _count_by(field: str) -> List[Dict[str, Any]]:
+    return [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+
+
+def _count_distinct(field: str) -> List[Dict[str, Any]]:
+    # $group + $count : les valeurs distinctes ne sont jamais rassemblées
+    # dans un seul document (contrairement à $addToSet)
+    return [
+        {"$match": {field: {"$nin": [None, ""]}}},
+        {"$group": {"_id": f"${field}"}},
+        {"$count": "count"}
+    ]
+
+
+class LibraryStatsService:
+    """Statistiques de bibliothèque calculées par un pipeline $facet unique"""
+
+    def __init__(self):
+        self.cache = cache
+        self.db = async_db
+
+    @staticmethod
+    def build_pipeline(user_id: str) -> List[Dict[str, Any]]:
+        """Pipeline d'agrégation (le $match initial utilise l'index user_id)"""
+        return [
+            {"$match": {"user_id": user_id}},
+            {"$facet": {
+                "totals": [
+                    {"$group": {
+                        "_id": None,
+                        "total_books": {"$sum": 1},
+                        "auto_added_count": {"$sum": {"$cond": [{"$eq": ["$auto_added", True]}, 1, 0]}},
+                        "total_pages_read": {"$sum": {"$cond": [
+                            {"$eq": ["$status", "completed"]},
+                            {"$ifNull": ["$total_pages", 0]},
+                            0
+                        ]}},
+                        "average_rating": {"$avg": {"$cond": [{"$gt": ["$rating", 0]}, "$rating", None]}}
+                    }}
+                ],
+                "by_status": _count_by("status"),
+                "by_category": _count_by("category"),
+                "by_rating": [{"$match": {"rating": {"$gt": 0}}}, *_count_by("rating")],
+                "authors": _count_distinct("author"),
+                "sagas": _count_distinct("saga")
+            }}
+        ]
+
+    @staticmethod
+    def normalize(facets: Dict[str, Any]) -> Dict[str, Any]:
+        """Convertir la sortie du $facet en statistiques à plat"""
+        totals = facets["totals"][0] if facets.get("totals") else {}
+
+        def as_dict(buckets: List[Dict[str, Any]]) -> Dict[str, int]:
+            return {
+                str(bucket["_id"]) if bucket["_id"] is not None else "unknown": bucket["count"]
+                for bucket in buckets
+            }
+
+        def single_count(rows: List[Dict[str, Any]]) -> int:
+            return rows[0]["count"] if rows else 0
+
+        by_status = as_dict(facets.get("by_status", []))
+        return {
+            "total_books": totals.get("total_books", 0),
+            "completed_books": by_status.get("completed", 0),
+            "reading_books": by_status.get("reading", 0),
+            "to_read_books": by_status.get("to_read", 0),
+            "by_status": by_status,
+            "by_category": as_dict(facets.get("by_category", [])),
+            "by_rating": as_dict(facets.get("by_rating", [])),
+            "authors_count": single_count(facets.get("authors", [])),
+            "sagas_count": single_count(facets.get("sagas", [])),
+            "auto_added_count": totals.get("auto_added_count", 0),
+            "total_pages_read": totals.get("total_pages_read", 0),
+            "average_rating": totals.get("average_rating") or 0
+        }
+
+    async def compute_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Calculer les statistiques sans passer par le cache"""
+        start_time = time.time()
+        result = await self.db.books.aggregate(self.build_pipeline(user_id)).to_list(length=1)
+        stats = self.normalize(result[0] if result else {})
+        logger.debug(f"compute_user_stats: {(time.time() - start_time) * 1000:.2f}ms")
+        return stats
+
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Statistiques d'un utilisateur (cache L1/L2, invalidé à chaque écriture)"""
+        cache_key = self.cache.build_key("user_stats", "library", scope=user_id)
+        return await self.cache.get_or_set(cache_key, lambda: self.compute_user_stats(user_id))
+
+
+# Instance globale du service de statistiques
+library_stats_service = LibraryStatsService()
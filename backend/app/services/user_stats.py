@@ -0,0 +1,275 @@
+# Statistiques matérialisées par utilisateur pour BOOKTIME
+"""
+Un document par utilisateur dans la collection `user_stats`, tenu à jour par
+`$inc` à chaque écriture de livre : /api/stats devient une lecture d'un seul
+document au lieu d'un parcours de la bibliothèque.
+
+Chaque livre « contribue » des compteurs (book_contribution). Une création
+applique sa contribution, une suppression l'annule et une mise à jour applique
+la différence entre l'ancienne et la nouvelle version. Les cardinalités
+(auteurs, sagas distincts) sont suivies par des compteurs de références :
+la cardinalité change quand une référence passe de 0 à 1 ou de 1 à 0.
+
+Si le document n'existe pas, une écriture crée seulement un marqueur `dirty`
+(ses compteurs seraient partiels) : le document est reconstruit intégralement
+à la lecture suivante. Chaque écriture incrémente `writes` : une reconstruction
+n'enregistre son calcul que si aucune écriture n'a eu lieu pendant celui-ci,
+sinon elle recommence (ou laisse le document `dirty`).
+La réconciliation (scripts/reconcile_user_stats.py) recalcule le document
+depuis les livres et signale les écarts.
+"""
+
+import hashlib
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from pymongo import ReturnDocument
+from ..database import async_db
+
+logger = logging.getLogger(__name__)
+
+# Champs des livres nécessaires au calcul des compteurs
+CONTRIBUTION_FIELDS = {
+    "_id": 0, "status": 1, "category": 1, "author": 1, "saga": 1,
+    "auto_added": 1, "total_pages": 1, "date_completed": 1
+}
+
+REF_FIELDS = {"author_refs": "authors_count", "saga_refs": "sagas_count"}
+
+# Tentatives de reconstruction avant d'abandonner aux écritures concurrentes
+REBUILD_ATTEMPTS = 3
+
+
+def _field_key(value: Any) -> str:
+    """Clé de champ MongoDB sûre (pas de '.' ni de '$' en tête)"""
+    text = str(value) if value not in (None, "") else "unknown"
+    return text.replace(".", "_").replace("$", "_")
+
+
+def _ref_key(value: str) -> str:
+    # Les noms d'auteurs/sagas sont arbitraires : clé opaque de longueur fixe
+    return hashlib.md5(value.encode("utf-8")).hexdigest()[:16]
+
+
+def _month_key(value: Any) -> Optional[str]:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m")
+    if isinstance(value, str) and len(value) >= 7:
+        return value[:7]
+    return None
+
+
+def book_contribution(book: Optional[Dict[str, Any]]) -> Counter:
+    """Compteurs apportés par un livre (chemins pointés -> incrément)"""
+    contribution = Counter()
+    if not book:
+        return contribution
+
+    status = book.get("status")
+    contribution["total_books"] += 1
+    contribution[f"by_status.{_field_key(status)}"] += 1
+    contribution[f"by_category.{_field_key(book.get('category'))}"] += 1
+
+    if book.get("auto_added") is True:
+        contribution["auto_added_count"] += 1
+
+    if status == "completed":
+        pages = book.get("total_pages") or 0
+        if isinstance(pages, (int, float)) and pages > 0:
+            contribution["pages_read"] += int(pages)
+        month = _month_key(book.get("date_completed"))
+        if month:
+            contribution[f"completed_by_month.{month}"] += 1
+
+    if book.get("author"):
+        contribution[f"author_refs.{_ref_key(book['author'])}"] += 1
+    if book.get("saga"):
+        contribution[f"saga_refs.{_ref_key(book['saga'])}"] += 1
+
+    return contribution
+
+
+def contribution_delta(
+    before: Iterable[Dict[str, Any]] = (),
+    after: Iterable[Dict[str, Any]] = ()
+) -> Dict[str, int]:
+    """Différence de compteurs entre deux états d'un ensemble de livres"""
+    delta = Counter()
+    for book in after:
+        delta.update(book_contribution(book))
+    for book in before:
+        delta.subtract(book_contribution(book))
+    return {path: value for path, value in delta.items() if value}
+
+
+def build_stats_document(user_id: str, books: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Document complet calculé depuis les livres (reconstruction)"""
+    document: Dict[str, Any] = {
+        "user_id": user_id,
+        "total_books": 0,
+        "auto_added_count": 0,
+        "pages_read": 0,
+        "authors_count": 0,
+        "sagas_count": 0,
+        "by_status": {},
+        "by_category": {},
+        "completed_by_month": {},
+        "author_refs": {},
+        "saga_refs": {}
+    }
+    for path, value in contribution_delta(after=books).items():
+        if "." in path:
+            group, key = path.split(".", 1)
+            document[group][key] = value
+        else:
+            document[path] = value
+
+    document["authors_count"] = len(document["author_refs"])
+    document["sagas_count"] = len(document["saga_refs"])
+    return document
+
+
+class UserStatsService:
+    """Statistiques matérialisées (collection user_stats)"""
+
+    # Champs comparés lors de la réconciliation
+    COMPARED_FIELDS = [
+        "total_books", "auto_added_count", "pages_read", "authors_count", "sagas_count",
+        "by_status", "by_category", "completed_by_month"
+    ]
+
+    def __init__(self):
+        self.db = async_db
+        self.collection = self.db.user_stats
+
+    # Écritures incrémentales
+
+    async def apply_delta(self, user_id: str, delta: Dict[str, int]):
+        """Appliquer une différence de compteurs au document de l'utilisateur"""
+        if not delta:
+            return
+
+        ref_paths = [path for path in delta if path.split(".", 1)[0] in REF_FIELDS]
+        projection = {path: 1 for path in ref_paths} or {"_id": 1}
+        document = await self.collection.find_one_and_update(
+            {"user_id": user_id},
+            {"$inc": {**delta, "writes": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            projection=projection,
+            return_document=ReturnDocument.AFTER
+        )
+        if document is None:
+            # Pas encore matérialisé : marqueur pour la prochaine lecture. $set même si une
+            # reconstruction vient de créer le document : son calcul a pu manquer ce livre
+            await self.collection.update_one(
+                {"user_id": user_id},
+                {"$set": {"dirty": True}, "$inc": {"writes": 1}},
+                upsert=True
+            )
+            return
+
+        cardinality = Counter()
+        emptied = []
+        for path in ref_paths:
+            group, key = path.split(".", 1)
+            new_value = document.get(group, {}).get(key, 0)
+            old_value = new_value - delta[path]
+            if old_value <= 0 < new_value:
+                cardinality[REF_FIELDS[group]] += 1
+            elif new_value <= 0 < old_value:
+                cardinality[REF_FIELDS[group]] -= 1
+            if new_value <= 0:
+                emptied.append(path)
+
+        if cardinality:
+            await self.collection.update_one({"user_id": user_id}, {"$inc": dict(cardinality)})
+        for path in emptied:
+            # Conditionnel : une création concurrente a pu faire remonter le compteur
+            await self.collection.update_one(
+                {"user_id": user_id, path: {"$lte": 0}},
+                {"$unset": {path: ""}}
+            )
+
+    async def record_books_added(self, user_id: str, books: List[Dict[str, Any]]):
+        """Livres créés (création, auto-complétion, import)"""
+        await self.apply_delta(user_id, contribution_delta(after=books))
+
+    async def record_book_updated(self, user_id: str, before: Dict[str, Any], after: Dict[str, Any]):
+        """Livre modifié : seule la différence est appliquée"""
+        await self.apply_delta(user_id, contribution_delta(before=[before], after=[after]))
+
+    async def record_books_removed(self, user_id: str, books: List[Dict[str, Any]]):
+        """Livres supprimés"""
+        await self.apply_delta(user_id, contribution_delta(before=books))
+
+    # Lecture et reconstruction
+
+    async def compute(self, user_id: str) -> Dict[str, Any]:
+        """Recalculer le document depuis les livres de l'utilisateur"""
+        books = self.db.books.find({"user_id": user_id}, CONTRIBUTION_FIELDS)
+        return build_stats_document(user_id, await books.to_list(length=None))
+
+    async def rebuild(self, user_id: str) -> Dict[str, Any]:
+        """
+        Reconstruire et enregistrer le document, sans écraser une écriture
+        concurrente : création par $setOnInsert, remplacement conditionné à `writes`
+        """
+        for _ in range(REBUILD_ATTEMPTS):
+            current = await self.collection.find_one({"user_id": user_id}, {"_id": 0, "writes": 1})
+            document = await self.compute(user_id)
+            document["updated_at"] = document["rebuilt_at"] = datetime.utcnow()
+
+            if current is None:
+                result = await self.collection.update_one(
+                    {"user_id": user_id}, {"$setOnInsert": document}, upsert=True
+                )
+                if result.upserted_id is not None:
+                    return document
+            else:
+                document["writes"] = current.get("writes")
+                result = await self.collection.replace_one(
+                    {"user_id": user_id, "writes": current.get("writes")}, document
+                )
+                if result.matched_count:
+                    return document
+
+        # Écritures continues : calcul renvoyé tel quel, le document reste à reconstruire
+        logger.warning(f"⚠️ Statistiques de {user_id} modifiées pendant la reconstruction, nouvel essai à la prochaine lecture")
+        return document
+
+    async def get(self, user_id: str) -> Dict[str, Any]:
+        """Document de statistiques (lecture d'un seul document)"""
+        document = await self.collection.find_one(
+            {"user_id": user_id},
+            {"_id": 0, "author_refs": 0, "saga_refs": 0}
+        )
+        if document is None or document.get("dirty"):
+            document = await self.rebuild(user_id)
+        return document
+
+    async def reconcile(self, user_id: str, fix: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Comparer le document stocké à un recalcul complet.
+        Retourne les écarts par champ ({} si aucun, None si l'utilisateur n'est pas
+        matérialisé : sa prochaine lecture le reconstruit) ; corrige si `fix`.
+        """
+        stored = await self.collection.find_one({"user_id": user_id}, {"_id": 0})
+        if stored is None or stored.get("dirty"):
+            return None
+        expected = await self.compute(user_id)
+
+        drift = {}
+        for field in self.COMPARED_FIELDS:
+            stored_value = stored.get(field, {} if isinstance(expected[field], dict) else 0)
+            if isinstance(stored_value, dict):
+                stored_value = {key: value for key, value in stored_value.items() if value}
+            if stored_value != expected[field]:
+                drift[field] = {"stored": stored_value, "expected": expected[field]}
+
+        if drift and fix:
+            await self.rebuild(user_id)
+        return drift
+
+
+# Instance globale des statistiques matérialisées
+user_stats_service = UserStatsService()
@@ -9,6 +9,7 @@ import logging
 from dataclasses import dataclass
 
 from ..database.connection import client
+from ..services.stats_service import library_stats_service
 from .models import (
     UserProfile, Follow, SocialActivity, SocialComment, SocialLike,
     BookList, BookRecommendation, SocialNotification,
@@ -221,48 +222,16 @@ class SocialService:
     async def _get_user_reading_stats(self, user_id: str) -> Dict[str, Any]:
         """Calcule les statistiques de lecture d'un utilisateur"""
         try:
-            pipeline = [
-                {"$match": {"user_id": user_id}},
-                {"$group": {
-                    "_id": None,
-                    "total_books": {"$sum": 1},
-                    "completed_books": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
-                    "reading_books": {"$sum": {"$cond": [{"$eq": ["$status", "reading"]}, 1, 0]}},
-                    "to_read_books": {"$sum": {"$cond": [{"$eq": ["$status", "to_read"]}, 1, 0]}},
-                    "total_pages": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, "$total_pages", 0]}},
-                    "avg_rating": {"$avg": {"$cond": [{"$gt": ["$rating", 0]}, "$rating", None]}},
-                    "books_by_category": {"$push": "$category"}
-                }}
-            ]
-            
-            result = list(self.db.books.aggregate(pipeline))
-            
-            if not result:
-                return {
-                    "total_books": 0,
-                    "completed_books": 0,
-                    "reading_books": 0,
-                    "to_read_books": 0,
-                    "total_pages": 0,
-                    "avg_rating": 0,
-                    "categories": {}
-                }
-            
-            stats = result[0]
-            
-            # Compter les livres par catégorie
-            categories = {}
-            for category in stats.get("books_by_category", []):
-                categories[category] = categories.get(category, 0) + 1
+            stats = await library_stats_service.get_user_stats(user_id)
             
             return {
-                "total_books": stats.get("total_books", 0),
-                "completed_books": stats.get("completed_books", 0),
-                "reading_books": stats.get("reading_books", 0),
-                "to_read_books": stats.get("to_read_books", 0),
-                "total_pages": stats.get("total_pages", 0),
-                "avg_rating": round(stats.get("avg_rating", 0), 1) if stats.get("avg_rating") else 0,
-                "categories": categories
+                "total_books": stats["total_books"],
+                "completed_books": stats["completed_books"],
+                "reading_books": stats["reading_books"],
+                "to_read_books": stats["to_read_books"],
+                "total_pages": stats["total_pages_read"],
+                "avg_rating": round(stats["average_rating"], 1) if stats["average_rating"] else 0,
+                "categories": stats["by_category"]
             }
             
         except Exception as e:
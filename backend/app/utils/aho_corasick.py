@@ -0,0 +1,106 @@
+# Automate Aho-Corasick pour BOOKTIME
+"""
+Recherche simultanée de nombreux motifs dans une séquence en un seul passage
+(O(longueur de la séquence + nombre de correspondances)), quel que soit le
+nombre de motifs. Utilisé par le catalogue des séries pour la détection.
+
+Les symboles sont quelconques (hashables). Le catalogue travaille sur des
+mots normalisés : un motif est une suite de mots, ce qui donne des
+correspondances sur mots entiers et un automate bien plus compact qu'au
+niveau des caractères (un état par mot de motif, et non par lettre).
+"""
+
+from array import array
+from collections import deque
+from typing import Any, Dict, Hashable, Iterator, List, Sequence, Tuple
+
+# Clé de transition : (état << _SYMBOL_BITS) | identifiant du symbole
+_SYMBOL_BITS = 32
+
+
+class AhoCorasick:
+    """Automate multi-motifs : add() puis build(), ensuite finditer()"""
+
+    def __init__(self):
+        # Symboles internés en entiers, transitions à plat (un seul dict),
+        # liens d'échec en tableau et sorties des seuls états terminaux
+        self._symbols: Dict[Hashable, int] = {}
+        self._goto: Dict[int, int] = {}
+        self._children: List[List[int]] = [[]]
+        self._fail = array("i", [0])
+        self._outputs: Dict[int, List[Tuple[int, Any]]] = {}
+        self._built = False
+        self.patterns = 0
+
+    @property
+    def states(self) -> int:
+        return len(self._fail)
+
+    def add(self, pattern: Sequence[Hashable], value: Any):
+        """Ajouter un motif associé à une valeur (plusieurs valeurs possibles par motif)"""
+        if not pattern:
+            return
+        if self._built:
+            raise RuntimeError("Automate déjà construit : motifs en lecture seule")
+
+        state = 0
+        for symbol in pattern:
+            symbol_id = self._symbols.setdefault(symbol, len(self._symbols))
+            key = (state << _SYMBOL_BITS) | symbol_id
+            next_state = self._goto.get(key)
+            if next_state is None:
+                next_state = len(self._fail)
+                self._goto[key] = next_state
+                self._fail.append(0)
+                self._children.append([])
+                self._children[state].append(key)
+            state = next_state
+        self._outputs.setdefault(state, []).append((len(pattern), value))
+        self.patterns += 1
+
+    def build(self) -> "AhoCorasick":
+        """Calculer les liens d'échec (parcours en largeur)"""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        mask = (1 << _SYMBOL_BITS) - 1
+        queue = deque(goto[key] for key in self._children[0])
+        while queue:
+            state = queue.popleft()
+            for key in self._children[state]:
+                next_state = goto[key]
+                queue.append(next_state)
+                symbol_id = key & mask
+                fallback = fail[state]
+                while fallback and ((fallback << _SYMBOL_BITS) | symbol_id) not in goto:
+                    fallback = fail[fallback]
+                target = goto.get((fallback << _SYMBOL_BITS) | symbol_id, 0)
+                fail[next_state] = target if target != next_state else 0
+                # Sorties héritées du plus long suffixe qui est aussi un motif
+                inherited = outputs.get(fail[next_state])
+                if inherited:
+                    outputs[next_state] = outputs.get(next_state, []) + inherited
+
+        # Les listes d'enfants ne servent qu'à la construction
+        self._children = []
+        self._built = True
+        return self
+
+    def finditer(self, sequence: Sequence[Hashable]) -> Iterator[Tuple[int, int, Any]]:
+        """Correspondances (début, fin, valeur) dans la séquence"""
+        if not self._built:
+            self.build()
+
+        symbols, goto, fail, outputs = self._symbols, self._goto, self._fail, self._outputs
+        state = 0
+        for position, symbol in enumerate(sequence):
+            symbol_id = symbols.get(symbol)
+            if symbol_id is None:
+                # Symbole absent de tous les motifs : retour à la racine
+                state = 0
+                continue
+            next_state = goto.get((state << _SYMBOL_BITS) | symbol_id)
+            while next_state is None and state:
+                state = fail[state]
+                next_state = goto.get((state << _SYMBOL_BITS) | symbol_id)
+            state = next_state or 0
+            for length, value in outputs.get(state, ()):
+                yield position - length + 1, position + 1, value
@@ -1,201 +1,512 @@
-# Système de cache Redis pour BOOKTIME
+# Système de cache à deux niveaux pour BOOKTIME
 """
-Ce module implémente un système de cache sophistiqué avec Redis
-pour améliorer drastiquement les performances de l'application.
+Ce module implémente le cache unique de l'application :
+- L1 : LRU en mémoire (par processus), borné en nombre d'entrées et en octets, avec TTL
+- L2 : Redis partagé entre les workers
+
+Les valeurs sont sérialisées une seule fois (orjson, json en repli) et la même
+charge utile est stockée dans les deux niveaux. Les chargements concurrents
+d'une même clé sont coalescés (single-flight) et chaque namespace tient ses
+propres compteurs de hit/miss. Si Redis est indisponible, le L1 continue de
+servir et Redis est retenté après un délai.
+
+Invalidation par génération : chaque utilisateur possède un numéro de
+génération (compteur Redis `booktime:gen:<user_id>`) intégré à toutes ses clés.
+Une écriture incrémente ce compteur ; les anciennes entrées deviennent
+inaccessibles et expirent d'elles-mêmes via leur TTL (ou sont évincées du L1
+par le LRU). Aucun parcours du keyspace (KEYS/SCAN) ni du L1 n'est nécessaire
+sur le chemin des requêtes.
 """
 
-import json
+import asyncio
+import fnmatch
 import hashlib
-from typing import Any, Optional, Dict, List, Callable
-from functools import wraps
-import redis
-import os
-from datetime import timedelta
+import json
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta, datetime, date
+from functools import wraps
+from typing import Any, Optional, Dict, Callable, Awaitable, Union
+
+import redis.asyncio as aioredis
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson est optionnel
+    orjson = None
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+KEY_PREFIX = "booktime"
+
 class CacheConfig:
-    """Configuration du cache Redis"""
-    
-    # Durées de cache par type de données
+    """Configuration du cache"""
+
+    # Durées de cache par namespace
     CACHE_DURATIONS = {
         "user_stats": timedelta(minutes=5),      # Statistiques utilisateur
         "series_popular": timedelta(hours=1),    # Séries populaires
         "book_details": timedelta(minutes=30),   # Détails d'un livre
         "search_results": timedelta(minutes=10), # Résultats de recherche
-        "user_books": timedelta(minutes=15),     # Liste des livres utilisateur
-        "openlibrary": timedelta(hours=6),       # Résultats Open Library
+        "search_suggestions": timedelta(minutes=10), # Suggestions de recherche
+        "user_books": timedelta(seconds=int(os.getenv("CACHE_TTL", "300"))),  # Pages de livres
+        "user_series": timedelta(seconds=int(os.getenv("CACHE_TTL", "300"))), # Pages de séries
+        "openlibrary": timedelta(hours=24),      # Réponses Open Library (cache HTTP, une requête par jour au plus)
         "aggregations": timedelta(minutes=20),   # Résultats d'agrégations
         "health_check": timedelta(minutes=1),    # Health checks
     }
-    
-    # Préfixes pour les clés de cache
-    CACHE_PREFIXES = {
-        "user_stats": "stats:user:",
-        "series_popular": "series:popular:",
-        "book_details": "book:details:",
-        "search_results": "search:results:",
-        "user_books": "books:user:",
-        "openlibrary": "ol:search:",
-        "aggregations": "agg:",
-        "health_check": "health:",
-    }
 
-class RedisCache:
-    """Gestionnaire de cache Redis"""
-    
+    # Niveau L1 (mémoire du processus)
+    L1_MAX_ITEMS = int(os.getenv("CACHE_L1_MAX_ITEMS", "5000"))
+    L1_MAX_BYTES = int(os.getenv("CACHE_L1_MAX_BYTES", str(64 * 1024 * 1024)))
+    # TTL maximal en L1 : borne la durée pendant laquelle un autre worker
+    # peut servir une entrée invalidée ailleurs
+    L1_MAX_TTL = timedelta(seconds=int(os.getenv("CACHE_L1_MAX_TTL", "30")))
+
+    # Niveau L2 (Redis)
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+    REDIS_TIMEOUT_SECONDS = float(os.getenv("CACHE_REDIS_TIMEOUT", "0.25"))
+    REDIS_RETRY_SECONDS = float(os.getenv("CACHE_REDIS_RETRY_SECONDS", "30"))
+
+    # Durée pendant laquelle un worker réutilise la génération lue dans Redis :
+    # borne le délai avant qu'une écriture faite sur un autre worker soit visible
+    GENERATION_L1_TTL = float(os.getenv("CACHE_GENERATION_L1_TTL", "1"))
+    # Générations mémorisées par processus (LRU, une par utilisateur actif)
+    GENERATION_MAX_ITEMS = int(os.getenv("CACHE_GENERATION_MAX_ITEMS", str(L1_MAX_ITEMS)))
+
+    @classmethod
+    def duration_for(cls, namespace: str) -> Optional[timedelta]:
+        return cls.CACHE_DURATIONS.get(namespace)
+
+# Sérialisation (une seule fois, partagée par L1 et L2)
+
+def _default(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+def serialize(value: Any) -> bytes:
+    """Sérialiser une valeur en octets"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, default=_default).encode("utf-8")
+
+def deserialize(payload: bytes) -> Any:
+    """Désérialiser une valeur"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+def _seconds(duration: Union[timedelta, int, float, None]) -> Optional[float]:
+    if duration is None:
+        return None
+    if isinstance(duration, timedelta):
+        return duration.total_seconds()
+    return float(duration)
+
+def _namespace_of(key: str) -> str:
+    parts = key.split(":")
+    return parts[1] if len(parts) > 2 and parts[0] == KEY_PREFIX else "default"
+
+def _scope_of(key: str) -> Optional[str]:
+    """Scope (ID utilisateur) d'une clé `booktime:<namespace>:<scope>:<hash>`"""
+    parts = key.split(":")
+    if len(parts) == 4 and parts[0] == KEY_PREFIX:
+        return parts[2]
+    return None
+
+def _generation_key(scope: str) -> str:
+    return f"{KEY_PREFIX}:gen:{scope}"
+
+def _initial_generation() -> int:
+    # Une génération absente (jamais créée, évincée par Redis) repart d'une
+    # valeur horodatée : elle ne peut pas retomber sur une génération déjà utilisée
+    return time.time_ns() // 1_000_000
+
+class MemoryLRUCache:
+    """Cache L1 : LRU borné en entrées et en octets, avec expiration"""
+
+    def __init__(self, max_items: int, max_bytes: int):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key: str, payload: bytes, ttl: Optional[float]):
+        size = len(payload)
+        if size > self.max_bytes or self.max_items <= 0:
+            return
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires_at, payload)
+            self._bytes += size
+            while len(self._entries) > self.max_items or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._remove(key)
+
+    def delete_matching(self, pattern: str) -> int:
+        with self._lock:
+            keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self._bytes -= len(entry[1])
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "items": len(self._entries),
+                "bytes": self._bytes,
+                "max_items": self.max_items,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions
+            }
+
+class TwoTierCache:
+    """Cache L1 (mémoire) + L2 (Redis) avec single-flight"""
+
     def __init__(self, redis_url: Optional[str] = None):
-        """Initialiser la connexion Redis"""
-        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://localhost:6379")
-        self._client = None
-        self._connect()
-    
-    def _connect(self):
-        """Établir la connexion Redis"""
-        try:
-            # Configuration Redis avec fallback
-            if self.redis_url.startswith("redis://"):
-                self._client = redis.from_url(self.redis_url, decode_responses=True)
-            else:
-                self._client = redis.Redis(
-                    host='localhost',
-                    port=6379,
-                    db=0,
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_timeout=5
-                )
-            
-            # Test de la connexion
-            self._client.ping()
-            logger.info("✅ Redis connecté avec succès")
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Redis non disponible: {e}")
-            logger.info("🔄 Mode dégradé sans cache activé")
-            self._client = None
-    
+        self.redis_url = redis_url or CacheConfig.REDIS_URL
+        self.l1 = MemoryLRUCache(CacheConfig.L1_MAX_ITEMS, CacheConfig.L1_MAX_BYTES)
+        self._redis = aioredis.from_url(
+            self.redis_url,
+            socket_connect_timeout=CacheConfig.REDIS_TIMEOUT_SECONDS,
+            socket_timeout=CacheConfig.REDIS_TIMEOUT_SECONDS
+        )
+        self._redis_down_until = 0.0
+        self._generations: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    # Disponibilité de Redis
+
     @property
     def is_available(self) -> bool:
-        """Vérifier si Redis est disponible"""
-        if not self._client:
-            return False
-        try:
-            self._client.ping()
-            return True
-        except:
-            return False
-    
-    def _generate_key(self, prefix: str, *args, **kwargs) -> str:
-        """Générer une clé de cache unique"""
-        # Créer un hash des arguments pour une clé unique
-        key_data = f"{args}:{kwargs}"
-        key_hash = hashlib.md5(key_data.encode()).hexdigest()[:8]
-        return f"{prefix}{key_hash}"
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Récupérer une valeur du cache"""
+        """Redis est-il considéré disponible (hors période de repli)"""
+        return time.monotonic() >= self._redis_down_until
+
+    def _mark_redis_down(self, error: Exception):
+        if self.is_available:
+            logger.warning(f"⚠️ Redis non disponible ({error}) - L1 seul pendant {CacheConfig.REDIS_RETRY_SECONDS:.0f}s")
+        self._redis_down_until = time.monotonic() + CacheConfig.REDIS_RETRY_SECONDS
+
+    async def _redis_call(self, operation: Callable[[], Awaitable[Any]], default: Any = None) -> Any:
         if not self.is_available:
-            return None
-        
+            return default
         try:
-            data = self._client.get(key)
-            if data:
-                return json.loads(data)
+            return await operation()
         except Exception as e:
-            logger.warning(f"Erreur lecture cache {key}: {e}")
-        
+            self._mark_redis_down(e)
+            return default
+
+    # Compteurs par namespace
+
+    def _count(self, key: str, counter: str):
+        namespace = _namespace_of(key)
+        stats = self._stats.get(namespace)
+        if stats is None:
+            stats = self._stats[namespace] = {
+                "l1_hits": 0, "l2_hits": 0, "misses": 0, "sets": 0, "coalesced": 0, "invalidations": 0
+            }
+        stats[counter] += 1
+
+    # Générations par utilisateur
+
+    async def get_generation(self, scope: str) -> int:
+        """Génération courante d'un scope (lue dans Redis, mise en cache brièvement)"""
+        entry = self._generations.get(scope)
+        if entry is not None and entry[0] > time.monotonic():
+            self._generations.move_to_end(scope)
+            return entry[1]
+
+        gen_key = _generation_key(scope)
+
+        async def _read():
+            value = await self._redis.get(gen_key)
+            if value is None:
+                await self._redis.set(gen_key, _initial_generation(), nx=True)
+                value = await self._redis.get(gen_key)
+            return int(value)
+
+        generation = await self._redis_call(_read)
+        if generation is None:
+            # Redis indisponible : conserver la génération locale (éventuellement
+            # fixée par une requête concurrente pendant l'attente)
+            entry = self._generations.get(scope)
+            generation = entry[1] if entry is not None else _initial_generation()
+        self._remember_generation(scope, generation)
+        return generation
+
+    async def bump_generation(self, scope: str) -> int:
+        """Invalider toutes les entrées d'un scope en incrémentant sa génération"""
+        generation = await self._redis_call(lambda: self._redis.incr(_generation_key(scope)))
+        if generation is None:
+            entry = self._generations.get(scope)
+            generation = (entry[1] if entry is not None else _initial_generation()) + 1
+        self._remember_generation(scope, int(generation))
+        self._count(f"{KEY_PREFIX}:gen:{scope}", "invalidations")
+        return int(generation)
+
+    def _remember_generation(self, scope: str, generation: int):
+        """Mémoriser une génération ; au-delà de GENERATION_MAX_ITEMS, la moins récente est oubliée"""
+        self._generations[scope] = (time.monotonic() + CacheConfig.GENERATION_L1_TTL, generation)
+        self._generations.move_to_end(scope)
+        while len(self._generations) > CacheConfig.GENERATION_MAX_ITEMS:
+            self._generations.popitem(last=False)
+
+    async def _storage_key(self, key: str) -> str:
+        """Clé physique : les clés d'un scope portent sa génération courante"""
+        scope = _scope_of(key)
+        if scope is None:
+            return key
+        prefix, key_hash = key.rsplit(":", 1)
+        return f"{prefix}:g{await self.get_generation(scope)}:{key_hash}"
+
+    # Clés
+
+    @staticmethod
+    def build_key(namespace: str, *args, scope: Optional[str] = None, **kwargs) -> str:
+        """
+        Générer une clé `booktime:<namespace>[:<scope>]:<hash>`.
+        Le scope (généralement l'ID utilisateur) rattache la clé à la génération
+        de cet utilisateur, incrémentée par flush_user_cache.
+        """
+        key_data = json.dumps([args, kwargs], sort_keys=True, default=_default)
+        key_hash = hashlib.md5(key_data.encode()).hexdigest()
+        if scope:
+            return f"{KEY_PREFIX}:{namespace}:{scope}:{key_hash}"
+        return f"{KEY_PREFIX}:{namespace}:{key_hash}"
+
+    # Opérations
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Récupérer une valeur (L1 puis L2)"""
+        key = await self._storage_key(key)
+        return await self._get_stored(key)
+
+    async def _get_stored(self, key: str) -> Optional[Any]:
+        payload = self.l1.get(key)
+        if payload is not None:
+            self._count(key, "l1_hits")
+            return deserialize(payload)
+        return await self._get_l2(key)
+
+    async def _get_l2(self, key: str) -> Optional[Any]:
+        payload = await self._redis_call(lambda: self._redis.get(key))
+        if payload is not None:
+            self._count(key, "l2_hits")
+            ttl = await self._redis_call(lambda: self._redis.ttl(key), default=-1)
+            self.l1.set(key, payload, self._l1_ttl(ttl if ttl and ttl > 0 else None))
+            return deserialize(payload)
+
+        self._count(key, "misses")
         return None
-    
-    def set(self, key: str, value: Any, duration: timedelta = None) -> bool:
-        """Stocker une valeur dans le cache"""
-        if not self.is_available:
-            return False
-        
-        try:
-            serialized = json.dumps(value, default=str)
-            if duration:
-                return self._client.setex(key, duration, serialized)
-            else:
-                return self._client.set(key, serialized)
-        except Exception as e:
-            logger.warning(f"Erreur écriture cache {key}: {e}")
-            return False
-    
-    def delete(self, key: str) -> bool:
-        """Supprimer une clé du cache"""
-        if not self.is_available:
-            return False
-        
+
+    async def set(self, key: str, value: Any, duration: Union[timedelta, int, float, None] = None) -> bool:
+        """Stocker une valeur dans les deux niveaux"""
+        return await self._set_stored(await self._storage_key(key), value, duration)
+
+    async def _set_stored(self, key: str, value: Any, duration: Union[timedelta, int, float, None]) -> bool:
+        if duration is None:
+            duration = CacheConfig.duration_for(_namespace_of(key))
+        ttl = _seconds(duration)
         try:
-            return bool(self._client.delete(key))
+            payload = serialize(value)
         except Exception as e:
-            logger.warning(f"Erreur suppression cache {key}: {e}")
+            logger.warning(f"Erreur sérialisation cache {key}: {e}")
             return False
-    
-    def delete_pattern(self, pattern: str) -> int:
-        """Supprimer toutes les clés correspondant à un pattern"""
-        if not self.is_available:
-            return 0
-        
+
+        self._count(key, "sets")
+        self.l1.set(key, payload, self._l1_ttl(ttl))
+        if ttl:
+            stored = await self._redis_call(lambda: self._redis.set(key, payload, ex=max(1, int(ttl))))
+        else:
+            stored = await self._redis_call(lambda: self._redis.set(key, payload))
+        return bool(stored)
+
+    async def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        duration: Union[timedelta, int, float, None] = None
+    ) -> Any:
+        """
+        Récupérer une valeur ou la calculer une seule fois : les appels
+        concurrents sur la même clé attendent le même chargement.
+        Un chargement démarré avant une invalidation écrit sous l'ancienne
+        génération : il ne peut pas masquer l'écriture qui l'a invalidé.
+        """
+        key = await self._storage_key(key)
+        payload = self.l1.get(key)
+        if payload is not None:
+            self._count(key, "l1_hits")
+            return deserialize(payload)
+
+        # Pas d'await entre la vérification et l'enregistrement du chargement
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._count(key, "coalesced")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
         try:
-            keys = self._client.keys(pattern)
-            if keys:
-                return self._client.delete(*keys)
-            return 0
+            value = await self._get_l2(key)
+            if value is None:
+                value = await loader()
+                if value is not None:
+                    await self._set_stored(key, value, duration)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
         except Exception as e:
-            logger.warning(f"Erreur suppression pattern {pattern}: {e}")
-            return 0
-    
-    def flush_user_cache(self, user_id: str):
-        """Vider tout le cache d'un utilisateur"""
-        patterns = [
-            f"stats:user:{user_id}:*",
-            f"books:user:{user_id}:*",
-            f"search:results:{user_id}:*",
-            f"agg:{user_id}:*"
-        ]
-        
-        for pattern in patterns:
-            self.delete_pattern(pattern)
-    
-    def get_cache_stats(self) -> Dict[str, Any]:
-        """Obtenir les statistiques du cache"""
-        if not self.is_available:
-            return {"status": "unavailable"}
-        
-        try:
-            info = self._client.info()
-            return {
-                "status": "available",
-                "connected_clients": info.get("connected_clients", 0),
-                "used_memory": info.get("used_memory_human", "0B"),
-                "total_commands_processed": info.get("total_commands_processed", 0),
-                "keyspace_hits": info.get("keyspace_hits", 0),
-                "keyspace_misses": info.get("keyspace_misses", 0),
-                "hit_rate": round(
-                    info.get("keyspace_hits", 0) / 
-                    max(info.get("keyspace_hits", 0) + info.get("keyspace_misses", 0), 1) * 100,
-                    2
-                )
+            future.set_exception(e)
+            future.exception()  # marquer comme lue si personne n'attend
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def delete(self, key: str) -> bool:
+        """Supprimer une clé des deux niveaux"""
+        key = await self._storage_key(key)
+        removed = self.l1.delete(key)
+        deleted = await self._redis_call(lambda: self._redis.delete(key), default=0)
+        return removed or bool(deleted)
+
+    async def delete_pattern(self, pattern: str) -> int:
+        """
+        Supprimer toutes les clés correspondant à un pattern (maintenance).
+        Parcours incrémental (SCAN) : ne bloque pas Redis, mais reste O(N) ;
+        sur le chemin des requêtes, utiliser flush_user_cache.
+        """
+        removed = self.l1.delete_matching(pattern)
+
+        async def _delete():
+            deleted = 0
+            batch = []
+            async for key in self._redis.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    deleted += await self._redis.unlink(*batch)
+                    batch = []
+            if batch:
+                deleted += await self._redis.unlink(*batch)
+            return deleted
+
+        return removed + (await self._redis_call(_delete, default=0))
+
+    async def flush_user_cache(self, user_id: str) -> int:
+        """Invalider tout le cache d'un utilisateur (incrément de génération, O(1))"""
+        return await self.bump_generation(str(user_id))
+
+    def _l1_ttl(self, ttl: Optional[float]) -> float:
+        max_ttl = CacheConfig.L1_MAX_TTL.total_seconds()
+        return min(ttl, max_ttl) if ttl else max_ttl
+
+    # Statistiques
+
+    def get_local_stats(self) -> Dict[str, Any]:
+        """Statistiques du processus (L1 + compteurs par namespace)"""
+        namespaces = {}
+        for namespace, stats in self._stats.items():
+            lookups = stats["l1_hits"] + stats["l2_hits"] + stats["misses"]
+            namespaces[namespace] = {
+                **stats,
+                "hit_rate": round((stats["l1_hits"] + stats["l2_hits"]) / lookups * 100, 2) if lookups else 0.0
             }
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+        return {
+            "l1": self.l1.get_stats(),
+            "l2_available": self.is_available,
+            "inflight": len(self._inflight),
+            "tracked_generations": len(self._generations),
+            "namespaces": namespaces
+        }
+
+    async def get_cache_stats(self) -> Dict[str, Any]:
+        """Obtenir les statistiques du cache (local + Redis)"""
+        stats = self.get_local_stats()
+        info = await self._redis_call(self._redis.info)
+        if info is None:
+            stats["l2"] = {"status": "unavailable"}
+            return stats
+
+        stats["l2"] = {
+            "status": "available",
+            "connected_clients": info.get("connected_clients", 0),
+            "used_memory": info.get("used_memory_human", "0B"),
+            "total_commands_processed": info.get("total_commands_processed", 0),
+            "keyspace_hits": info.get("keyspace_hits", 0),
+            "keyspace_misses": info.get("keyspace_misses", 0),
+            "hit_rate": round(
+                info.get("keyspace_hits", 0) /
+                max(info.get("keyspace_hits", 0) + info.get("keyspace_misses", 0), 1) * 100,
+                2
+            )
+        }
+        return stats
 
 # Instance globale du cache
-cache = RedisCache()
+cache = TwoTierCache()
+
+def _scope_from_call(args, kwargs) -> Optional[str]:
+    """Les services mis en cache prennent l'ID utilisateur en premier argument"""
+    if "user_id" in kwargs:
+        return str(kwargs["user_id"])
+    if args:
+        return str(args[0])
+    return None
 
 class CacheDecorator:
     """Décorateurs pour le cache automatique"""
-    
+
     @staticmethod
     def cached(cache_type: str, duration: Optional[timedelta] = None):
         """
         Décorateur pour cache automatique des fonctions
-        
+
         Usage:
         @cached("user_stats", duration=timedelta(minutes=5))
         async def get_user_stats(user_id: str):
@@ -205,35 +516,25 @@ class CacheDecorator:
         def decorator(func: Callable):
             @wraps(func)
             async def wrapper(*args, **kwargs):
-                # Générer la clé de cache
-                prefix = CacheConfig.CACHE_PREFIXES.get(cache_type, f"{cache_type}:")
-                cache_key = cache._generate_key(prefix, *args, **kwargs)
-                
-                # Essayer de récupérer du cache
-                cached_result = cache.get(cache_key)
-                if cached_result is not None:
-                    logger.debug(f"Cache HIT: {cache_key}")
-                    return cached_result
-                
-                # Exécuter la fonction
-                logger.debug(f"Cache MISS: {cache_key}")
-                result = await func(*args, **kwargs)
-                
-                # Stocker en cache
-                cache_duration = duration or CacheConfig.CACHE_DURATIONS.get(cache_type)
-                cache.set(cache_key, result, cache_duration)
-                
-                return result
+                cache_key = cache.build_key(
+                    cache_type, func.__name__, *args,
+                    scope=_scope_from_call(args, kwargs), **kwargs
+                )
+                return await cache.get_or_set(
+                    cache_key,
+                    lambda: func(*args, **kwargs),
+                    duration or CacheConfig.duration_for(cache_type)
+                )
             return wrapper
         return decorator
-    
+
     @staticmethod
-    def cache_invalidate(cache_patterns: List[str]):
+    def cache_invalidate():
         """
-        Décorateur pour invalider le cache après modification
-        
+        Décorateur pour invalider le cache de l'utilisateur après modification
+
         Usage:
-        @cache_invalidate(["stats:user:{user_id}:*", "books:user:{user_id}:*"])
+        @cache_invalidate()
         async def update_book(user_id: str, book_id: str, data: dict):
             # logique de mise à jour
         """
@@ -241,22 +542,15 @@ class CacheDecorator:
             @wraps(func)
             async def wrapper(*args, **kwargs):
                 result = await func(*args, **kwargs)
-                
-                # Invalider les patterns de cache
-                for pattern in cache_patterns:
-                    # Remplacer les placeholders avec les arguments
+
+                user_id = _scope_from_call(args, kwargs)
+                if user_id:
                     try:
-                        # Simple remplacement pour {user_id}, etc.
-                        if 'user_id' in kwargs:
-                            pattern = pattern.replace('{user_id}', kwargs['user_id'])
-                        elif args:
-                            pattern = pattern.replace('{user_id}', str(args[0]))
-                        
-                        cache.delete_pattern(pattern)
-                        logger.debug(f"Cache invalidé: {pattern}")
+                        await cache.flush_user_cache(user_id)
+                        logger.debug(f"Cache invalidé pour l'utilisateur {user_id}")
                     except Exception as e:
-                        logger.warning(f"Erreur invalidation cache {pattern}: {e}")
-                
+                        logger.warning(f"Erreur invalidation cache {user_id}: {e}")
+
                 return result
             return wrapper
         return decorator
@@ -265,25 +559,23 @@ class CacheDecorator:
 
 class BookCacheManager:
     """Gestionnaire de cache spécialisé pour les livres"""
-    
+
     @staticmethod
     def get_user_stats_key(user_id: str) -> str:
-        return f"stats:user:{user_id}"
-    
+        return cache.build_key("user_stats", scope=user_id)
+
     @staticmethod
     def get_user_books_key(user_id: str, filters: str = "") -> str:
-        filters_hash = hashlib.md5(filters.encode()).hexdigest()[:8]
-        return f"books:user:{user_id}:{filters_hash}"
-    
+        return cache.build_key("user_books", filters, scope=user_id)
+
     @staticmethod
     def get_search_key(user_id: str, query: str) -> str:
-        query_hash = hashlib.md5(query.encode()).hexdigest()[:8]
-        return f"search:results:{user_id}:{query_hash}"
-    
+        return cache.build_key("search_results", query, scope=user_id)
+
     @staticmethod
-    def invalidate_user_cache(user_id: str):
+    async def invalidate_user_cache(user_id: str):
         """Invalider tout le cache d'un utilisateur"""
-        cache.flush_user_cache(user_id)
+        await cache.flush_user_cache(user_id)
 
 # Exemples d'utilisation
 
@@ -294,23 +586,13 @@ async def get_user_statistics(user_id: str):
     # Logique coûteuse de calcul des stats
     return stats
 
-@CacheDecorator.cache_invalidate(["stats:user:{user_id}:*", "books:user:{user_id}:*"])
+@CacheDecorator.cache_invalidate()
 async def create_book(user_id: str, book_data: dict):
     # Logique de création
     return new_book
 
-# Utilisation manuelle
+# Utilisation manuelle (single-flight : un seul calcul pour N requêtes simultanées)
 async def get_popular_series():
-    cache_key = "series:popular:all"
-    
-    # Essayer le cache
-    cached_series = cache.get(cache_key)
-    if cached_series:
-        return cached_series
-    
-    # Calculer et mettre en cache
-    series = await compute_popular_series()
-    cache.set(cache_key, series, timedelta(hours=1))
-    
-    return series
-"""
\ No newline at end of file
+    cache_key = cache.build_key("series_popular", "all")
+    return await cache.get_or_set(cache_key, compute_popular_series)
+"""
@@ -0,0 +1,65 @@
+# Appels externes concurrents et mesure par étape pour BOOKTIME
+"""
+- `gather_bounded` : asyncio.gather avec un nombre maximal d'appels en vol.
+- `StageTimer` : durée de chaque étape d'une route, renvoyée dans l'en-tête
+  standard `Server-Timing` (visible dans l'onglet réseau des navigateurs).
+  Les étapes concurrentes se chevauchent : `total` est la durée de bout en
+  bout, pas la somme des étapes.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterable, List
+
+from fastapi import Response
+
+
+async def gather_bounded(awaitables: Iterable[Awaitable[Any]], limit: int) -> List[Any]:
+    """Attendre tous les appels, au plus `limit` à la fois, résultats dans l'ordre"""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(awaitable: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await awaitable
+
+    return await asyncio.gather(*(run(awaitable) for awaitable in awaitables))
+
+
+class StageTimer:
+    """Durées des étapes d'une requête (millisecondes)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    def _record(self, name: str, start: float):
+        self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mesurer un bloc synchrone"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start)
+
+    async def measure(self, name: str, awaitable: Awaitable[Any]) -> Any:
+        """Attendre un appel en mesurant sa durée"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self._record(name, start)
+
+    def header(self) -> str:
+        """Valeur Server-Timing : `etape;dur=12.3, ..., total;dur=45.6`"""
+        total = (time.perf_counter() - self.started) * 1000
+        parts = [f"{name};dur={duration:.1f}" for name, duration in self.stages.items()]
+        parts.append(f"total;dur={total:.1f}")
+        return ", ".join(parts)
+
+    def apply(self, response: Response):
+        """Poser l'en-tête Server-Timing sur la réponse"""
+        response.headers["Server-Timing"] = self.header()
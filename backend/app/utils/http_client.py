@@ -0,0 +1,233 @@
+# Client HTTP sortant partagé pour BOOKTIME
+"""
+Toutes les requêtes sortantes (Open Library, Wikipedia, Wikidata, Google
+Books, Goodreads, LibraryThing, images des séries) passent par `http_client` :
+
+- un `httpx.AsyncClient` par hôte, donc une limite de connexions et un pool
+  keep-alive par hôte (un service lent n'affame pas les autres) ;
+- HTTP/2 quand le paquet `h2` est installé ;
+- délais uniformes (HTTP_TIMEOUT, surchargeables par appel) ;
+- nouvelles tentatives des requêtes idempotentes sur erreur réseau et sur
+  429/5xx, avec délai exponentiel (Retry-After respecté, plafonné), dans un
+  délai global par appel (HTTP_REQUEST_DEADLINE) : un fournisseur muet ne
+  coûte pas (1 + HTTP_MAX_RETRIES) × HTTP_TIMEOUT à chaque requête ;
+- débit limité par hôte (seau à jetons, HTTP_RATE_LIMITS) et coupe-circuit
+  par hôte (utils/resilience.py) : un fournisseur en panne ou qui nous
+  limite fait échouer les requêtes immédiatement au lieu d'attendre le délai ;
+- fermeture à l'arrêt de l'application (main.py), statistiques sur /health.
+
+Les appelants reçoivent un `httpx.Response` et testent `status_code` comme
+avant ; les erreurs réseau remontent après la dernière tentative, comme
+CircuitOpenError et RateLimitExceeded (sous-classes de httpx.TransportError).
+"""
+
+import asyncio
+import importlib.util
+import logging
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+from ..config import (
+    HTTP_TIMEOUT, HTTP_CONNECT_TIMEOUT, HTTP_MAX_CONNECTIONS_PER_HOST, HTTP_MAX_KEEPALIVE_PER_HOST,
+    HTTP_KEEPALIVE_EXPIRY, HTTP_MAX_RETRIES, HTTP_RETRY_BACKOFF, HTTP_RETRY_MAX_DELAY, HTTP_REQUEST_DEADLINE,
+    HTTP_USER_AGENT,
+    HTTP_RATE_LIMITS, HTTP_DEFAULT_RATE_LIMIT, HTTP_RATE_LIMIT_MAX_WAIT,
+    HTTP_BREAKER_FAILURE_THRESHOLD, HTTP_BREAKER_RESET_SECONDS
+)
+from .resilience import CircuitBreaker, CircuitOpenError, RateLimitExceeded, TokenBucket
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def host_key(url: str) -> str:
+    """Clé du pool : schéma + hôte (+ port)"""
+    parts = urlsplit(url)
+    if not parts.scheme or not parts.netloc:
+        raise ValueError(f"URL absolue requise : {url}")
+    return f"{parts.scheme}://{parts.netloc.lower()}"
+
+
+def retry_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Délai avant la tentative suivante (Retry-After en secondes si fourni)"""
+    delay = HTTP_RETRY_BACKOFF * (2 ** attempt)
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            delay = float(retry_after)
+    return min(delay, HTTP_RETRY_MAX_DELAY)
+
+
+def is_failure(response: httpx.Response) -> bool:
+    """Réponse comptée comme échec par le coupe-circuit (limitation ou panne du fournisseur)"""
+    return response.status_code == 429 or response.status_code >= 500
+
+
+class HttpClientPool:
+    """Clients httpx par hôte, partagés par tout le processus"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Indépendants de la boucle d'événements : conservés quand les clients sont recréés
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS_PER_HOST,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_PER_HOST,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+            ),
+            headers={"User-Agent": HTTP_USER_AGENT},
+            follow_redirects=True
+        )
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """Client de l'hôte de l'URL, créé à la première requête"""
+        # Les connexions appartiennent à une boucle d'événements : nouvelle boucle, nouveaux clients
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._clients = {}
+            self._loop = loop
+
+        key = host_key(url)
+        client = self._clients.get(key)
+        if client is None:
+            client = self._clients[key] = self._new_client()
+        return client
+
+    def bucket_for(self, key: str) -> TokenBucket:
+        """Seau à jetons de l'hôte (débit de HTTP_RATE_LIMITS)"""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate, capacity = HTTP_RATE_LIMITS.get(urlsplit(key).hostname, HTTP_DEFAULT_RATE_LIMIT)
+            bucket = self._buckets[key] = TokenBucket(rate, capacity)
+        return bucket
+
+    def breaker_for(self, key: str) -> CircuitBreaker:
+        """Coupe-circuit de l'hôte"""
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(key, HTTP_BREAKER_FAILURE_THRESHOLD, HTTP_BREAKER_RESET_SECONDS)
+        return breaker
+
+    def circuit_open(self, url: str) -> bool:
+        """Vrai si les requêtes vers l'hôte de l'URL sont actuellement refusées"""
+        breaker = self._breakers.get(host_key(url))
+        return breaker is not None and breaker.state == "open"
+
+    async def _admit(self, key: str):
+        # Coupe-circuit d'abord : une requête refusée ne consomme pas de jeton
+        self.breaker_for(key).allow()
+        wait = self.bucket_for(key).reserve(HTTP_RATE_LIMIT_MAX_WAIT)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def _count(self, key: str, field: str):
+        stats = self._stats.setdefault(key, {"requests": 0, "retries": 0, "errors": 0})
+        stats[field] += 1
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        retries: Optional[int] = None,
+        deadline: Optional[float] = None,
+        **kwargs: Any
+    ) -> httpx.Response:
+        """
+        Requête via le client de l'hôte (params, headers, json, timeout... comme httpx).
+        Les méthodes idempotentes sont retentées `retries` fois (HTTP_MAX_RETRIES par défaut),
+        tant que le délai global `deadline` (HTTP_REQUEST_DEADLINE par défaut) n'est pas écoulé.
+        """
+        method = method.upper()
+        key = host_key(url)
+        max_retries = (HTTP_MAX_RETRIES if retries is None else retries) if method in IDEMPOTENT_METHODS else 0
+        loop = asyncio.get_running_loop()
+        budget = HTTP_REQUEST_DEADLINE if deadline is None else deadline
+        expires_at = loop.time() + budget
+
+        breaker = self.breaker_for(key)
+        attempt = 0
+        while True:
+            try:
+                await self._admit(key)
+            except (CircuitOpenError, RateLimitExceeded) as e:
+                e.request = httpx.Request(method, url)
+                self._count(key, "errors")
+                raise
+            self._count(key, "requests")
+            try:
+                # La dernière tentative n'a que le temps restant
+                try:
+                    response = await asyncio.wait_for(
+                        self.client_for(url).request(method, url, **kwargs),
+                        max(0.0, expires_at - loop.time())
+                    )
+                except asyncio.TimeoutError:
+                    raise httpx.TimeoutException(
+                        f"délai global de {budget:.1f}s dépassé", request=httpx.Request(method, url)
+                    )
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                delay = retry_delay(attempt)
+                if attempt >= max_retries or loop.time() + delay >= expires_at:
+                    self._count(key, "errors")
+                    raise
+                logger.warning(f"⚠️ {method} {url} : {type(e).__name__}, nouvelle tentative dans {delay:.1f}s")
+            else:
+                if is_failure(response):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                    return response
+                delay = retry_delay(attempt, response)
+                if loop.time() + delay >= expires_at:
+                    return response
+                await response.aclose()
+                logger.warning(f"⚠️ {method} {url} : HTTP {response.status_code}, nouvelle tentative dans {delay:.1f}s")
+
+            self._count(key, "retries")
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        """Requêtes, tentatives et erreurs par hôte, état du débit et du coupe-circuit"""
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "hosts": {key: dict(stats) for key, stats in self._stats.items()},
+            "providers": {
+                key: {
+                    "rate_limit": self.bucket_for(key).snapshot(),
+                    "circuit": self.breaker_for(key).snapshot()
+                }
+                for key in sorted(set(self._buckets) | set(self._breakers))
+            }
+        }
+
+    async def close(self):
+        """Fermer tous les clients (arrêt de l'application ou d'un script)"""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+
+# Instance globale du client HTTP sortant
+http_client = HttpClientPool()
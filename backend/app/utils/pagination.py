@@ -4,7 +4,10 @@ Ce module implémente un système de pagination avancé pour améliorer les perf
 et l'expérience utilisateur avec de grandes collections de livres.
 """
 
-from typing import Dict, List, Optional, Any, Generic, TypeVar
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Generic, TypeVar, Tuple
 from math import ceil
 from pydantic import BaseModel, Field
 from fastapi import Query
@@ -17,6 +20,7 @@ class PaginationParams(BaseModel):
     limit: int = Field(default=20, ge=1, le=100, description="Nombre d'éléments par page (max 100)")
     sort_by: Optional[str] = Field(default="date_added", description="Champ de tri")
     sort_order: Optional[str] = Field(default="desc", pattern="^(asc|desc)$", description="Ordre de tri")
+    cursor: Optional[str] = Field(default=None, description="Curseur opaque (pagination par clé, remplace page)")
 
 class PaginationMeta(BaseModel):
     """Métadonnées de pagination"""
@@ -28,6 +32,7 @@ class PaginationMeta(BaseModel):
     has_previous: bool
     next_page: Optional[int] = None
     previous_page: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class PaginatedResponse(BaseModel, Generic[T]):
     """Réponse paginée générique"""
@@ -42,14 +47,16 @@ class AdvancedPaginator:
         page: int = Query(1, ge=1, description="Numéro de page"),
         limit: int = Query(20, ge=1, le=100, description="Éléments par page"),
         sort_by: str = Query("date_added", description="Champ de tri"),
-        sort_order: str = Query("desc", regex="^(asc|desc)$", description="Ordre de tri")
+        sort_order: str = Query("desc", regex="^(asc|desc)$", description="Ordre de tri"),
+        cursor: Optional[str] = Query(None, description="Curseur opaque (pagination par clé)")
     ) -> PaginationParams:
         """Extraire les paramètres de pagination des query params"""
         return PaginationParams(
             page=page,
             limit=limit,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            cursor=cursor
         )
     
     @staticmethod
@@ -93,7 +100,14 @@ class AdvancedPaginator:
         pagination: PaginationParams,
         projection: Optional[Dict[str, int]] = None
     ) -> PaginatedResponse:
-        """Paginer une requête MongoDB de manière optimisée"""
+        """
+        Paginer une requête MongoDB de manière optimisée.
+        Avec `pagination.cursor`, la page est lue par clé (sans skip).
+        Lève ValueError si le curseur est invalide.
+        """
+        
+        if pagination.cursor:
+            return AdvancedPaginator._paginate_by_keyset(collection, query, pagination, projection)
         
         # Calculer skip et limit
         skip_limit = AdvancedPaginator.calculate_skip_limit(
@@ -114,7 +128,8 @@ class AdvancedPaginator:
         cursor = collection.find(query, projection)
         
         if sort_dict:
-            cursor = cursor.sort(list(sort_dict.items()))
+            # Départage par id : ordre stable, réutilisable par un curseur
+            cursor = cursor.sort(CursorPaginator.keyset_sort(pagination.sort_by, pagination.sort_order))
         
         cursor = cursor.skip(skip_limit["skip"]).limit(skip_limit["limit"])
         
@@ -127,12 +142,125 @@ class AdvancedPaginator:
             pagination.page,
             pagination.limit
         )
+        if meta.has_next and data:
+            meta.next_cursor = CursorPaginator.encode_cursor(data[-1], pagination.sort_by, pagination.sort_order)
+        
+        return PaginatedResponse(data=data, meta=meta)
+    
+    @staticmethod
+    def _paginate_by_keyset(
+        collection,
+        query: Dict[str, Any],
+        pagination: PaginationParams,
+        projection: Optional[Dict[str, int]] = None
+    ) -> PaginatedResponse:
+        """Page suivante à partir d'un curseur (sort_key, id)"""
+        sort_value, last_id = CursorPaginator.decode_cursor(
+            pagination.cursor, pagination.sort_by, pagination.sort_order
+        )
+        
+        total_items = collection.count_documents(query)
+        
+        keyset_query = CursorPaginator.apply_keyset(
+            query, pagination.sort_by, pagination.sort_order, sort_value, last_id
+        )
+        cursor = collection.find(keyset_query, projection)
+        cursor = cursor.sort(CursorPaginator.keyset_sort(pagination.sort_by, pagination.sort_order))
+        data = list(cursor.limit(pagination.limit + 1))
+        
+        has_next = len(data) > pagination.limit
+        data = data[:pagination.limit]
+        
+        meta = PaginationMeta(
+            current_page=pagination.page,
+            per_page=pagination.limit,
+            total_items=total_items,
+            total_pages=ceil(total_items / pagination.limit) if total_items > 0 else 1,
+            has_next=has_next,
+            has_previous=True,
+            next_cursor=CursorPaginator.encode_cursor(
+                data[-1], pagination.sort_by, pagination.sort_order
+            ) if has_next and data else None
+        )
         
         return PaginatedResponse(data=data, meta=meta)
 
 class CursorPaginator:
     """Paginateur par curseur pour de très grandes collections"""
     
+    # Départage des ex aequo sur la clé de tri : l'identifiant métier du livre
+    TIEBREAKER_FIELD = "id"
+    
+    @staticmethod
+    def encode_cursor(item: Dict[str, Any], sort_by: str, sort_order: str) -> str:
+        """Encoder un curseur opaque à partir du dernier élément d'une page"""
+        value = item.get(sort_by)
+        if isinstance(value, datetime):
+            value = {"$date": value.isoformat()}
+        payload = {
+            "k": value,
+            "id": item.get(CursorPaginator.TIEBREAKER_FIELD),
+            "s": sort_by,
+            "o": sort_order
+        }
+        raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+    
+    @staticmethod
+    def decode_cursor(token: str, sort_by: str, sort_order: str) -> Tuple[Any, str]:
+        """
+        Décoder un curseur en (valeur de tri, id).
+        Lève ValueError si le curseur est invalide ou a été émis pour un autre tri.
+        """
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            payload = json.loads(raw)
+            value, last_id = payload["k"], payload["id"]
+            cursor_sort = (payload["s"], payload["o"])
+            if isinstance(value, dict):
+                value = datetime.fromisoformat(value["$date"])
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError("Curseur de pagination invalide") from e
+        
+        if cursor_sort != (sort_by, sort_order):
+            raise ValueError("Curseur émis pour un autre tri")
+        if not isinstance(last_id, str):
+            raise ValueError("Curseur de pagination invalide")
+        
+        return value, last_id
+    
+    @staticmethod
+    def keyset_sort(sort_by: str, sort_order: str) -> List[Tuple[str, int]]:
+        """Tri stable (clé de tri puis id) requis par la pagination par clé"""
+        direction = -1 if sort_order == "desc" else 1
+        return [(sort_by, direction), (CursorPaginator.TIEBREAKER_FIELD, direction)]
+    
+    @staticmethod
+    def apply_keyset(
+        query: Dict[str, Any],
+        sort_by: str,
+        sort_order: str,
+        sort_value: Any,
+        last_id: str
+    ) -> Dict[str, Any]:
+        """
+        Restreindre une requête aux éléments situés après (sort_value, last_id).
+        MongoDB classe null avant toute valeur : en tri décroissant les
+        documents sans clé de tri arrivent en dernier et restent atteignables.
+        """
+        op = "$lt" if sort_order == "desc" else "$gt"
+        tie = {sort_by: sort_value, CursorPaginator.TIEBREAKER_FIELD: {op: last_id}}
+        
+        if sort_value is None:
+            branches = [tie] if sort_order == "desc" else [tie, {sort_by: {"$ne": None}}]
+        elif sort_order == "desc":
+            branches = [{sort_by: {op: sort_value}}, tie, {sort_by: None}]
+        else:
+            branches = [{sort_by: {op: sort_value}}, tie]
+        
+        keyset = branches[0] if len(branches) == 1 else {"$or": branches}
+        return {"$and": [query, keyset]}
+    
     @staticmethod
     def paginate_by_cursor(
         collection,
@@ -0,0 +1,132 @@
+# Limitation de débit et coupe-circuit par fournisseur externe pour BOOKTIME
+"""
+Utilisés par `http_client` (un seau et un coupe-circuit par hôte) :
+
+- `TokenBucket` : `rate` requêtes par seconde, rafales jusqu'à `capacity`.
+  La réservation d'un jeton est synchrone (pas d'await entre lecture et
+  écriture) : des requêtes concurrentes ne peuvent pas partir sur le même
+  créneau, chacune attend son tour.
+- `CircuitBreaker` : ouvert après `failure_threshold` échecs consécutifs
+  (erreur réseau, 429, 5xx), les requêtes échouent alors immédiatement ;
+  après `reset_seconds`, une requête d'essai (demi-ouvert) referme le
+  circuit si elle réussit, sinon il reste ouvert pour une nouvelle période.
+
+Les deux erreurs dérivent de `httpx.TransportError` : les appelants qui
+gèrent déjà les erreurs réseau (réponse en cache servie, valeur par défaut)
+les traitent sans modification.
+"""
+
+import logging
+import time
+from typing import Any, Dict
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Requête refusée : circuit ouvert pour cet hôte"""
+
+
+class RateLimitExceeded(httpx.TransportError):
+    """Requête refusée : attente de jeton supérieure au maximum autorisé"""
+
+
+class TokenBucket:
+    """Seau à jetons d'un hôte"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.delayed = 0
+        self.rejected = 0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, max_wait: float) -> float:
+        """
+        Réserver un jeton et renvoyer l'attente nécessaire (secondes).
+        Les jetons réservés d'avance rendent le solde négatif : file d'attente.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        wait = max(0.0, (1 - self.tokens) / self.rate)
+        if wait > max_wait:
+            self.rejected += 1
+            raise RateLimitExceeded(f"attente de {wait:.1f}s au-delà du maximum ({max_wait:.1f}s)")
+        self.tokens -= 1
+        if wait > 0:
+            self.delayed += 1
+        return wait
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill(time.monotonic())
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "tokens": round(self.tokens, 2),
+            "delayed": self.delayed,
+            "rejected": self.rejected
+        }
+
+
+class CircuitBreaker:
+    """Coupe-circuit d'un hôte : closed → open → half_open → closed"""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probe_at = 0.0
+        self.short_circuited = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() >= self.probe_at else "open"
+
+    def allow(self):
+        """Lever CircuitOpenError si la requête ne doit pas partir"""
+        if self.opened_at is None:
+            return
+        now = time.monotonic()
+        if now >= self.probe_at:
+            # Une requête d'essai par période : si elle n'aboutit jamais (annulée),
+            # la suivante est autorisée après reset_seconds
+            self.probe_at = now + self.reset_seconds
+            return
+        self.short_circuited += 1
+        raise CircuitOpenError(f"circuit ouvert, nouvel essai dans {self.probe_at - now:.0f}s")
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"✅ Circuit refermé : {self.name}")
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                self.opened += 1
+                logger.warning(f"⚠️ Circuit ouvert : {self.name} ({self.failures} échecs consécutifs)")
+            now = time.monotonic()
+            self.opened_at = self.opened_at or now
+            self.probe_at = now + self.reset_seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opened": self.opened,
+            "short_circuited": self.short_circuited,
+            "retry_in": round(max(0.0, self.probe_at - time.monotonic()), 1) if self.opened_at is not None else None
+        }
@@ -0,0 +1,35 @@
+# Clé de saga normalisée pour BOOKTIME
+"""
+Chaque livre porte, à côté de `saga` (nom affiché), un champ `saga_key` :
+nom en casefold, sans accents, espaces compactés. Toutes les lectures par
+saga se font par égalité sur cette clé, servie par l'index
+user_saga_key_volume_index (user_id, saga_key, volume_number) :
+"Naruto" ne correspond plus à "Boruto: Naruto Next Generations", et
+"L'Attaque des Titans" = "l'attaque des  titans".
+
+La clé est posée à chaque écriture (with_saga_key) ; les livres existants
+sont complétés par scripts/backfill_saga_key.py.
+"""
+
+import unicodedata
+from typing import Any, Dict
+
+
+def saga_key(name: Any) -> str:
+    """Clé de comparaison d'un nom de saga ("" si pas de saga)"""
+    text = str(name or "").casefold()
+    if not text.isascii():
+        text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    return " ".join(text.split())
+
+
+def with_saga_key(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Renseigner `saga_key` dans un document ou un $set qui contient `saga`"""
+    if "saga" in fields:
+        fields["saga_key"] = saga_key(fields["saga"])
+    return fields
+
+
+def saga_filter(user_id: str, saga: str) -> Dict[str, Any]:
+    """Filtre exact des livres d'une saga pour un utilisateur"""
+    return {"user_id": user_id, "saga_key": saga_key(saga)}
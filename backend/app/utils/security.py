@@ -5,7 +5,7 @@ from typing import Optional
 import jwt
 import uuid
 from ..config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-from ..database import users_collection
+from ..security.jwt import get_current_user
 
 security = HTTPBearer()
 
@@ -39,15 +39,7 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-def get_current_user(user_id: str = Depends(verify_token)):
-    """Obtenir l'utilisateur actuel"""
-    user = users_collection.find_one({"id": user_id})
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Utilisateur non trouvé"
-        )
-    return user
+# `get_current_user` est réexporté depuis security.jwt (chemin mis en cache)
 
 def generate_user_id():
     """Générer un ID utilisateur unique"""
@@ -0,0 +1,127 @@
+# Cache des résultats SPARQL Wikidata pour BOOKTIME
+"""
+Résultats de `get_author_series`, `get_series_books` et
+`get_author_individual_books`, partagés par tous les workers :
+
+- L1 : LRU en mémoire du processus, borné en entrées et en octets
+  (WIKIDATA_CACHE_MAX_ITEMS / WIKIDATA_CACHE_MAX_BYTES) ;
+- L2 : collection Mongo `wikidata_cache`, une entrée par clé, purgée par
+  index TTL après WIKIDATA_CACHE_RETENTION_DAYS.
+
+Une entrée est fraîche pendant WIKIDATA_CACHE_TTL_SECONDS. Au-delà, elle est
+conservée et servie tant que le coupe-circuit de Wikidata est ouvert
+(http_client) plutôt qu'une réponse vide.
+
+Clés précalculées : `<type>:<sha1 du paramètre>`, sans sérialiser les
+paramètres à chaque appel. Les valeurs sont stockées en JSON (model_dump).
+"""
+
+import hashlib
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from ..config import (
+    WIKIDATA_CACHE_TTL_SECONDS, WIKIDATA_CACHE_MAX_ITEMS, WIKIDATA_CACHE_MAX_BYTES,
+    WIKIDATA_CACHE_RETENTION_DAYS
+)
+from ..database import async_db
+from ..utils.cache import MemoryLRUCache, serialize, deserialize
+from ..utils.http_client import http_client
+
+logger = logging.getLogger(__name__)
+
+WIKIDATA_SPARQL_ENDPOINT = "https://query.wikidata.org/sparql"
+
+# Pause du L2 après une erreur Mongo (secondes)
+STORAGE_RETRY_SECONDS = 30
+
+
+def cache_key(kind: str, subject: str) -> str:
+    """Clé d'un résultat : type de requête + empreinte du paramètre (nom d'auteur, ID de série)"""
+    return f"{kind}:{hashlib.sha1(subject.strip().encode('utf-8')).hexdigest()}"
+
+
+class WikidataCache:
+    """Cache à deux niveaux des résultats Wikidata"""
+
+    def __init__(self):
+        self.db = async_db
+        self.collection = self.db.wikidata_cache
+        self.l1 = MemoryLRUCache(WIKIDATA_CACHE_MAX_ITEMS, WIKIDATA_CACHE_MAX_BYTES)
+        self._storage_paused_until = 0.0
+        self._stats: Counter = Counter()
+
+    async def get(self, kind: str, subject: str) -> Optional[Any]:
+        """Valeur fraîche (ou périmée si Wikidata est injoignable), None sinon"""
+        key = cache_key(kind, subject)
+        payload = self.l1.get(key)
+        if payload is not None:
+            self._stats["l1_hits"] += 1
+            return deserialize(payload)
+
+        entry = await self._load(key)
+        if entry is not None:
+            remaining = (entry["expires_at"] - datetime.utcnow()).total_seconds()
+            if remaining > 0:
+                self._stats["l2_hits"] += 1
+                self.l1.set(key, serialize(entry["data"]), remaining)
+                return entry["data"]
+            if http_client.circuit_open(WIKIDATA_SPARQL_ENDPOINT):
+                self._stats["stale_hits"] += 1
+                return entry["data"]
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, kind: str, subject: str, data: Any):
+        """Enregistrer un résultat (valeur JSON) dans les deux niveaux"""
+        key = cache_key(kind, subject)
+        self._stats["sets"] += 1
+        self.l1.set(key, serialize(data), WIKIDATA_CACHE_TTL_SECONDS)
+
+        now = datetime.utcnow()
+        expires_at = now + timedelta(seconds=WIKIDATA_CACHE_TTL_SECONDS)
+        await self._store(key, {
+            "kind": kind,
+            "subject": subject,
+            "data": data,
+            "fetched_at": now,
+            "expires_at": expires_at,
+            "purge_at": expires_at + timedelta(days=WIKIDATA_CACHE_RETENTION_DAYS)
+        })
+
+    # Stockage : une panne Mongo dégrade en L1 seul pendant STORAGE_RETRY_SECONDS
+
+    def _storage_available(self) -> bool:
+        return time.monotonic() >= self._storage_paused_until
+
+    def _storage_failed(self, error: Exception):
+        self._storage_paused_until = time.monotonic() + STORAGE_RETRY_SECONDS
+        logger.warning(f"⚠️ Cache Wikidata (Mongo) indisponible, ignoré {STORAGE_RETRY_SECONDS}s: {error}")
+
+    async def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self._storage_available():
+            return None
+        try:
+            return await self.collection.find_one({"_id": key})
+        except Exception as e:
+            self._storage_failed(e)
+            return None
+
+    async def _store(self, key: str, document: Dict[str, Any]):
+        if not self._storage_available():
+            return
+        try:
+            await self.collection.replace_one({"_id": key}, document, upsert=True)
+        except Exception as e:
+            self._storage_failed(e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Succès L1/L2, entrées périmées servies, absences et occupation du L1"""
+        return {**self._stats, "l1": self.l1.get_stats(), "ttl_seconds": WIKIDATA_CACHE_TTL_SECONDS}
+
+
+# Instance globale du cache Wikidata
+wikidata_cache = WikidataCache()
@@ -8,6 +8,7 @@ from typing import Optional
 import logging
 
 from .service import wikidata_service
+from ..utils.http_client import http_client, host_key
 from .models import (
     WikidataAuthorResponse, WikidataSeriesResponse, WikidataSeriesSearchResponse,
     WikidataTestResponse
@@ -335,10 +336,8 @@ async def get_wikidata_stats():
     """
     try:
         cache_stats = {
-            "cache_size": len(wikidata_service.cache),
-            "cache_ttl": wikidata_service.cache_ttl,
-            "request_delay": wikidata_service.request_delay,
-            "last_request": wikidata_service.last_request_time
+            **wikidata_service.cache.stats(),
+            "provider": http_client.stats()["providers"].get(host_key(wikidata_service.sparql_endpoint))
         }
         
         return {
@@ -3,15 +3,17 @@ Service Wikidata pour requêtes SPARQL
 Gestion des requêtes, cache et traitement des données
 """
 
-import aiohttp
-import asyncio
 import time
-import json
 from typing import Dict, List, Optional, Any
 from urllib.parse import quote_plus
 import logging
 from datetime import datetime, timedelta
 
+from ..config import WIKIDATA_WARMUP_CONCURRENCY
+from ..utils.fanout import gather_bounded
+from ..utils.http_client import http_client
+from .cache import WIKIDATA_SPARQL_ENDPOINT, wikidata_cache
+
 from .models import (
     WikidataAuthor, WikidataSeries, WikidataBook,
     WikidataAuthorResponse, WikidataSeriesResponse, WikidataSeriesSearchResponse
@@ -29,25 +31,16 @@ class WikidataService:
     """Service pour les requêtes Wikidata SPARQL"""
     
     def __init__(self):
-        self.sparql_endpoint = "https://query.wikidata.org/sparql"
-        self.cache = {}
-        self.cache_ttl = 3600 * 3  # 3 heures (était 1 heure)
-        self.request_delay = 0.5  # Réduit à 0.5s (était 1.0s)
-        self.last_request_time = 0
+        self.sparql_endpoint = WIKIDATA_SPARQL_ENDPOINT
+        # Résultats partagés entre workers, bornés en mémoire (cache.py)
+        self.cache = wikidata_cache
         
     async def _execute_sparql_query(self, query: str, timeout: int = 10) -> Optional[Dict]:
         """Exécute une requête SPARQL sur Wikidata"""
         try:
-            # Respecter le délai entre requêtes
-            now = time.time()
-            time_since_last = now - self.last_request_time
-            if time_since_last < self.request_delay:
-                await asyncio.sleep(self.request_delay - time_since_last)
-            
-            self.last_request_time = time.time()
-            
+            # Débit limité par http_client (HTTP_RATE_LIMITS["query.wikidata.org"]), sûr en concurrence
             headers = {
-                'User-Agent': 'BOOKTIME/1.0 (https://example.com/contact) Python/aiohttp',
+                'User-Agent': 'BOOKTIME/1.0 (https://example.com/contact) Python/httpx',
                 'Accept': 'application/json'
             }
             
@@ -56,32 +49,19 @@ class WikidataService:
                 'format': 'json'
             }
             
-            async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=timeout)) as session:
-                async with session.get(self.sparql_endpoint, params=params, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(f"✅ Requête SPARQL réussie: {len(data.get('results', {}).get('bindings', []))} résultats")
-                        return data
-                    else:
-                        logger.error(f"❌ Erreur SPARQL {response.status}: {await response.text()}")
-                        return None
-                        
+            response = await http_client.get(self.sparql_endpoint, params=params, headers=headers, timeout=timeout)
+            if response.status_code == 200:
+                data = response.json()
+                logger.info(f"✅ Requête SPARQL réussie: {len(data.get('results', {}).get('bindings', []))} résultats")
+                return data
+            else:
+                logger.error(f"❌ Erreur SPARQL {response.status_code}: {response.text}")
+                return None
+                
         except Exception as e:
             logger.error(f"❌ Erreur lors de l'exécution de la requête SPARQL: {str(e)}")
             return None
     
-    def _get_cache_key(self, query_type: str, params: Dict) -> str:
-        """Génère une clé de cache pour la requête"""
-        return f"{query_type}:{json.dumps(params, sort_keys=True)}"
-    
-    def _is_cache_valid(self, cache_entry: Dict) -> bool:
-        """Vérifie si l'entrée du cache est encore valide"""
-        if not cache_entry:
-            return False
-        
-        cached_time = cache_entry.get('timestamp', 0)
-        return (time.time() - cached_time) < self.cache_ttl
-    
     def _extract_wikidata_id(self, uri: str) -> str:
         """Extrait l'ID Wikidata depuis une URI"""
         if uri and uri.startswith('http://www.wikidata.org/entity/'):
@@ -110,12 +90,11 @@ class WikidataService:
         start_time = time.time()
         
         # Vérifier le cache
-        cache_key = self._get_cache_key("author_series", {"author": author_name})
-        cached_result = self.cache.get(cache_key)
+        cached_result = await self.cache.get("author_series", author_name)
         
-        if cached_result and self._is_cache_valid(cached_result):
+        if cached_result is not None:
             logger.info(f"📋 Cache hit pour {author_name}")
-            return cached_result['data']
+            return WikidataAuthorResponse.model_validate(cached_result)
         
         try:
             # Méthode hybride : essayer d'abord avec le nom, puis avec l'ID si échec
@@ -219,10 +198,7 @@ class WikidataService:
             )
             
             # Mettre en cache
-            self.cache[cache_key] = {
-                'data': response,
-                'timestamp': time.time()
-            }
+            await self.cache.set("author_series", author_name, response.model_dump(mode="json"))
             
             logger.info(f"✅ Séries trouvées pour {author_name}: {len(series_list)}")
             return response
@@ -240,12 +216,11 @@ class WikidataService:
         start_time = time.time()
         
         # Vérifier le cache
-        cache_key = self._get_cache_key("series_books", {"series_id": series_id})
-        cached_result = self.cache.get(cache_key)
+        cached_result = await self.cache.get("series_books", series_id)
         
-        if cached_result and self._is_cache_valid(cached_result):
+        if cached_result is not None:
             logger.info(f"📋 Cache hit pour série {series_id}")
-            return cached_result['data']
+            return WikidataSeriesResponse.model_validate(cached_result)
         
         try:
             # Préparer la requête
@@ -302,10 +277,7 @@ class WikidataService:
             )
             
             # Mettre en cache
-            self.cache[cache_key] = {
-                'data': response,
-                'timestamp': time.time()
-            }
+            await self.cache.set("series_books", series_id, response.model_dump(mode="json"))
             
             logger.info(f"✅ Livres trouvés pour série {series_id}: {len(books_list)}")
             return response
@@ -323,12 +295,11 @@ class WikidataService:
         start_time = time.time()
         
         # Vérifier le cache
-        cache_key = self._get_cache_key("author_individual_books", {"author_name": author_name})
-        cached_result = self.cache.get(cache_key)
+        cached_result = await self.cache.get("author_individual_books", author_name)
         
-        if cached_result and self._is_cache_valid(cached_result):
+        if cached_result is not None:
             logger.info(f"📋 Cache hit pour livres individuels de {author_name}")
-            return cached_result['data']
+            return [WikidataBook.model_validate(book) for book in cached_result]
         
         try:
             # Préparer les variantes du nom (comme dans get_author_series)
@@ -391,10 +362,9 @@ class WikidataService:
             books_list.sort(key=lambda x: x.publication_date or "0000", reverse=True)
             
             # Mettre en cache
-            self.cache[cache_key] = {
-                'data': books_list,
-                'timestamp': time.time()
-            }
+            await self.cache.set(
+                "author_individual_books", author_name, [book.model_dump(mode="json") for book in books_list]
+            )
             
             logger.info(f"✅ Livres individuels trouvés pour {author_name}: {len(books_list)}")
             return books_list
@@ -578,5 +548,21 @@ class WikidataService:
                 "execution_time": time.time() - start_time
             }
 
+    async def warm_cache(self, author_names: List[str], concurrency: int = WIKIDATA_WARMUP_CONCURRENCY) -> Dict[str, int]:
+        """Précharger séries, livres des séries et livres individuels d'une liste d'auteurs"""
+        report = {"authors": len(author_names), "series": 0, "individual_books": 0}
+        
+        async def warm(author_name: str):
+            # Entrées fraîches servies par le cache : seuls les auteurs absents interrogent Wikidata
+            series_response = await self.get_author_series(author_name)
+            for series in series_response.series:
+                await self.get_series_books(series.id)
+            individual_books = await self.get_author_individual_books(author_name)
+            report["series"] += len(series_response.series)
+            report["individual_books"] += len(individual_books)
+        
+        await gather_bounded([warm(author_name) for author_name in author_names], concurrency)
+        return report
+
 # Instance globale du service
 wikidata_service = WikidataService()
\ No newline at end of file
@@ -4,11 +4,11 @@ Service d'enrichissement automatique des séries via Wikipedia
 """
 
 import asyncio
-import aiohttp
 import re
 from datetime import datetime
 from typing import List, Dict, Optional
 from app.database import db
+from app.utils.http_client import http_client
 import logging
 
 logger = logging.getLogger(__name__)
@@ -31,20 +31,20 @@ class WikipediaSeriesService:
             'The Expanse', 'The Locked Tomb', 'The Poppy War'
         }
     
-    async def get_author_wikipedia_page(self, session: aiohttp.ClientSession, author_name: str) -> Optional[Dict]:
+    async def get_author_wikipedia_page(self, author_name: str) -> Optional[Dict]:
         """Récupère la page Wikipedia d'un auteur"""
         try:
             formatted_name = author_name.replace(' ', '_')
             url = f"{self.base_url}{formatted_name}"
             
-            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    logger.info(f"✅ Page Wikipedia trouvée : {author_name}")
-                    return data
-                else:
-                    logger.warning(f"❌ Pas de page Wikipedia : {author_name} ({response.status})")
-                    return None
+            response = await http_client.get(url, timeout=10)
+            if response.status_code == 200:
+                data = response.json()
+                logger.info(f"✅ Page Wikipedia trouvée : {author_name}")
+                return data
+            else:
+                logger.warning(f"❌ Pas de page Wikipedia : {author_name} ({response.status_code})")
+                return None
                     
         except Exception as e:
             logger.error(f"❌ Erreur Wikipedia {author_name}: {str(e)}")
@@ -164,12 +164,12 @@ class WikipediaSeriesService:
             logger.error(f"❌ Erreur récupération auteurs : {str(e)}")
             return []
     
-    async def enrich_series_for_author(self, session: aiohttp.ClientSession, author_name: str) -> List[Dict]:
+    async def enrich_series_for_author(self, author_name: str) -> List[Dict]:
         """Enrichit les séries pour un auteur"""
         logger.info(f"🚀 Enrichissement pour : {author_name}")
         
         # Récupération page Wikipedia
-        wiki_page = await self.get_author_wikipedia_page(session, author_name)
+        wiki_page = await self.get_author_wikipedia_page(author_name)
         if not wiki_page:
             return []
         
@@ -259,24 +259,23 @@ class WikipediaSeriesService:
         # Enrichissement parallèle
         all_series = []
         
-        async with aiohttp.ClientSession() as session:
-            # Traitement avec semaphore pour limiter les requêtes
-            semaphore = asyncio.Semaphore(3)  # Max 3 requêtes simultanées
-            
-            async def process_author_with_semaphore(author):
-                async with semaphore:
-                    return await self.enrich_series_for_author(session, author)
-            
-            # Exécution parallèle
-            results = await asyncio.gather(
-                *[process_author_with_semaphore(author) for author in authors_to_process],
-                return_exceptions=True
-            )
-            
-            # Agrégation des résultats
-            for result in results:
-                if isinstance(result, list):
-                    all_series.extend(result)
+        # Traitement avec semaphore pour limiter les requêtes
+        semaphore = asyncio.Semaphore(3)  # Max 3 requêtes simultanées
+        
+        async def process_author_with_semaphore(author):
+            async with semaphore:
+                return await self.enrich_series_for_author(author)
+        
+        # Exécution parallèle
+        results = await asyncio.gather(
+            *[process_author_with_semaphore(author) for author in authors_to_process],
+            return_exceptions=True
+        )
+        
+        # Agrégation des résultats
+        for result in results:
+            if isinstance(result, list):
+                all_series.extend(result)
         
         # Filtrage par confiance
         high_confidence_series = [s for s in all_series if s['confidence'] >= 85]
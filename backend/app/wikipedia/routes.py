@@ -4,10 +4,10 @@ Récupération d'informations sur les auteurs avec données curées
 """
 
 from fastapi import APIRouter, HTTPException
-import httpx
 import re
 from typing import Optional, List, Dict
 import logging
+from ..utils.http_client import http_client
 
 router = APIRouter(prefix="/api/wikipedia", tags=["wikipedia"])
 
@@ -20,69 +20,68 @@ async def get_wikipedia_full_content(author_name: str) -> Optional[dict]:
     try:
         clean_name = author_name.strip()
         
-        async with httpx.AsyncClient() as client:
-            # 1. Rechercher la page
-            search_url = "https://en.wikipedia.org/w/api.php"
-            search_params = {
-                "action": "query",
-                "list": "search",
-                "srsearch": clean_name,
-                "format": "json",
-                "srlimit": 3
-            }
-            
-            search_response = await client.get(search_url, params=search_params, timeout=10)
-            
-            if search_response.status_code != 200:
-                return None
+        # 1. Rechercher la page
+        search_url = "https://en.wikipedia.org/w/api.php"
+        search_params = {
+            "action": "query",
+            "list": "search",
+            "srsearch": clean_name,
+            "format": "json",
+            "srlimit": 3
+        }
+        
+        search_response = await http_client.get(search_url, params=search_params, timeout=10)
+        
+        if search_response.status_code != 200:
+            return None
+        
+        search_data = search_response.json()
+        
+        # 2. Trouver la page d'auteur
+        author_page_title = None
+        for result in search_data.get("query", {}).get("search", []):
+            title = result.get("title", "")
+            snippet = result.get("snippet", "")
             
-            search_data = search_response.json()
+            if any(keyword in snippet.lower() for keyword in ["author", "writer", "novelist", "poet", "playwright"]):
+                author_page_title = title
+                break
+        
+        if not author_page_title:
+            return None
+        
+        # 3. Récupérer le contenu complet
+        content_params = {
+            "action": "query",
+            "format": "json",
+            "prop": "extracts|pageimages",
+            "titles": author_page_title,
+            "exintro": False,
+            "explaintext": True,
+            "exsectionformat": "wiki",
+            "piprop": "thumbnail",
+            "pithumbsize": 300
+        }
+        
+        content_response = await http_client.get(search_url, params=content_params, timeout=15)
+        
+        if content_response.status_code == 200:
+            content_data = content_response.json()
             
-            # 2. Trouver la page d'auteur
-            author_page_title = None
-            for result in search_data.get("query", {}).get("search", []):
-                title = result.get("title", "")
-                snippet = result.get("snippet", "")
-                
-                if any(keyword in snippet.lower() for keyword in ["author", "writer", "novelist", "poet", "playwright"]):
-                    author_page_title = title
-                    break
+            # 4. Récupérer aussi le résumé structuré
+            summary_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{author_page_title}"
+            summary_response = await http_client.get(summary_url, timeout=10)
             
-            if not author_page_title:
-                return None
+            summary_data = {}
+            if summary_response.status_code == 200:
+                summary_data = summary_response.json()
             
-            # 3. Récupérer le contenu complet
-            content_params = {
-                "action": "query",
-                "format": "json",
-                "prop": "extracts|pageimages",
-                "titles": author_page_title,
-                "exintro": False,
-                "explaintext": True,
-                "exsectionformat": "wiki",
-                "piprop": "thumbnail",
-                "pithumbsize": 300
+            return {
+                "title": author_page_title,
+                "content": content_data,
+                "summary": summary_data
             }
-            
-            content_response = await client.get(search_url, params=content_params, timeout=15)
-            
-            if content_response.status_code == 200:
-                content_data = content_response.json()
-                
-                # 4. Récupérer aussi le résumé structuré
-                summary_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{author_page_title}"
-                summary_response = await client.get(summary_url, timeout=10)
-                
-                summary_data = {}
-                if summary_response.status_code == 200:
-                    summary_data = summary_response.json()
-                
-                return {
-                    "title": author_page_title,
-                    "content": content_data,
-                    "summary": summary_data
-                }
-            
+        
         return None
         
     except Exception as e:
@@ -312,45 +311,44 @@ async def search_wikipedia_author(author_name: str) -> Optional[dict]:
         # Endpoint REST API de Wikipedia pour récupérer le résumé
         wikipedia_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{clean_name}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(wikipedia_url, timeout=10)
+        response = await http_client.get(wikipedia_url, timeout=10)
+        
+        if response.status_code == 200:
+            data = response.json()
             
-            if response.status_code == 200:
-                data = response.json()
+            # Vérifier que c'est bien un auteur (pas une page d'homonymie)
+            if data.get("type") == "standard":
+                return data
                 
-                # Vérifier que c'est bien un auteur (pas une page d'homonymie)
-                if data.get("type") == "standard":
-                    return data
-                    
-            # Si l'API REST échoue, essayer l'API action avec recherche
-            search_url = "https://en.wikipedia.org/w/api.php"
-            search_params = {
-                "action": "query",
-                "list": "search",
-                "srsearch": clean_name,
-                "format": "json",
-                "srlimit": 5
-            }
-            
-            search_response = await client.get(search_url, params=search_params, timeout=10)
+        # Si l'API REST échoue, essayer l'API action avec recherche
+        search_url = "https://en.wikipedia.org/w/api.php"
+        search_params = {
+            "action": "query",
+            "list": "search",
+            "srsearch": clean_name,
+            "format": "json",
+            "srlimit": 5
+        }
+        
+        search_response = await http_client.get(search_url, params=search_params, timeout=10)
+        
+        if search_response.status_code == 200:
+            search_data = search_response.json()
             
-            if search_response.status_code == 200:
-                search_data = search_response.json()
+            # Chercher dans les résultats
+            for result in search_data.get("query", {}).get("search", []):
+                title = result.get("title", "")
+                snippet = result.get("snippet", "")
                 
-                # Chercher dans les résultats
-                for result in search_data.get("query", {}).get("search", []):
-                    title = result.get("title", "")
-                    snippet = result.get("snippet", "")
+                # Vérifier si c'est un auteur
+                if any(keyword in snippet.lower() for keyword in ["author", "writer", "novelist", "poet", "playwright"]):
+                    # Récupérer les détails de cette page
+                    detail_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{title}"
+                    detail_response = await http_client.get(detail_url, timeout=10)
                     
-                    # Vérifier si c'est un auteur
-                    if any(keyword in snippet.lower() for keyword in ["author", "writer", "novelist", "poet", "playwright"]):
-                        # Récupérer les détails de cette page
-                        detail_url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{title}"
-                        detail_response = await client.get(detail_url, timeout=10)
+                    if detail_response.status_code == 200:
+                        return detail_response.json()
                         
-                        if detail_response.status_code == 200:
-                            return detail_response.json()
-                            
         return None
         
     except Exception as e:
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+🔑 MIGRATION saga_key BOOKTIME
+Renseigne le champ `saga_key` (nom de saga normalisé) des livres existants,
+utilisé par toutes les lectures par saga via l'index user_saga_key_volume_index
+
+Utilisation :
+python backfill_saga_key.py              # livres sans saga_key
+python backfill_saga_key.py --all        # recalculer la clé de tous les livres
+python backfill_saga_key.py --dry-run    # compter seulement
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+from pymongo import UpdateOne
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import BULK_INSERT_CHUNK_SIZE  # noqa: E402
+from app.database import async_db  # noqa: E402
+from app.utils.saga_key import saga_key  # noqa: E402
+
+# Configuration logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def backfill(recompute: bool, dry_run: bool) -> dict:
+    """Poser saga_key par paquets de mises à jour non ordonnées"""
+    query = {} if recompute else {"saga_key": {"$exists": False}}
+    report = {"scanned": 0, "updated": 0}
+    start_time = time.time()
+
+    operations = []
+    cursor = async_db.books.find(query, {"_id": 1, "saga": 1, "saga_key": 1})
+    async for book in cursor:
+        report["scanned"] += 1
+        key = saga_key(book.get("saga"))
+        if book.get("saga_key") == key:
+            continue
+        operations.append(UpdateOne({"_id": book["_id"]}, {"$set": {"saga_key": key}}))
+
+        if len(operations) >= BULK_INSERT_CHUNK_SIZE:
+            report["updated"] += await _flush(operations, dry_run)
+            operations = []
+
+    if operations:
+        report["updated"] += await _flush(operations, dry_run)
+
+    report["duration_seconds"] = round(time.time() - start_time, 2)
+    return report
+
+
+async def _flush(operations, dry_run: bool) -> int:
+    if dry_run:
+        return len(operations)
+    result = await async_db.books.bulk_write(operations, ordered=False)
+    return result.modified_count
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Migration du champ saga_key")
+    parser.add_argument("--all", action="store_true", help="Recalculer la clé de tous les livres")
+    parser.add_argument("--dry-run", action="store_true", help="Ne rien écrire, compter seulement")
+    args = parser.parse_args()
+
+    logger.info(f"🔑 Migration saga_key{' (dry-run)' if args.dry_run else ''}")
+    report = await backfill(recompute=args.all, dry_run=args.dry_run)
+
+    logger.info(
+        f"✅ {report['scanned']} livre(s) parcouru(s), {report['updated']} "
+        f"{'à mettre à jour' if args.dry_run else 'mis à jour'} en {report['duration_seconds']}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+⏱️ BENCHMARK DE CHARGE - ROUTES ASYNC BOOKTIME
+Mesure la latence (p50/p95/p99) des routes principales sous N clients concurrents
+
+Fonctionnalités :
+- Création d'un utilisateur de test et d'une bibliothèque synthétique
+- N clients concurrents qui bouclent sur les routes livres/sagas/stats/séries
+- Percentiles de latence par route et débit global
+- Rapport JSON étiqueté (--label) pour comparer avant/après
+
+Utilisation :
+python benchmark_async_routes.py --label before            # sur l'ancien commit (pymongo)
+python benchmark_async_routes.py --label after             # sur le nouveau (Motor)
+python benchmark_async_routes.py --compare before after    # tableau comparatif
+python benchmark_async_routes.py --clients 200 --duration 30 --books 500
+"""
+
+import asyncio
+import argparse
+import json
+import logging
+import statistics
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+# Configuration logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = Path(__file__).parent / "benchmark_reports"
+
+# Routes exercées (toutes servies par des routes `async def` accédant à MongoDB)
+BENCHMARK_ROUTES = [
+    "/api/books?limit=20",
+    "/api/books/all?limit=20",
+    "/api/books/search-grouped?q=tome",
+    "/api/sagas",
+    "/api/stats",
+    "/api/library/series",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile par interpolation linéaire (pct entre 0 et 100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class AsyncRoutesBenchmark:
+    """Benchmark de charge des routes async"""
+
+    def __init__(self, base_url: str, clients: int, duration: float, books: int):
+        self.base_url = base_url.rstrip("/")
+        self.clients = clients
+        self.duration = duration
+        self.books = books
+        self.headers: Dict[str, str] = {}
+        self.latencies: Dict[str, List[float]] = {route: [] for route in BENCHMARK_ROUTES}
+        self.errors: Dict[str, int] = {route: 0 for route in BENCHMARK_ROUTES}
+
+    async def setup(self, http: httpx.AsyncClient):
+        """Créer un utilisateur de test et une bibliothèque synthétique"""
+        suffix = uuid.uuid4().hex[:8]
+        response = await http.post("/api/auth/register", json={
+            "first_name": f"Bench{suffix}",
+            "last_name": "Load"
+        })
+        response.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        logger.info(f"📚 Création de {self.books} livres de test...")
+        semaphore = asyncio.Semaphore(20)
+
+        async def create_book(index: int):
+            saga = f"Saga Bench {index % 25}" if index % 3 else ""
+            async with semaphore:
+                await http.post("/api/books", headers=self.headers, json={
+                    "title": f"Livre bench {index} - tome {index % 40 + 1}",
+                    "author": f"Auteur {index % 50}",
+                    "category": ["roman", "bd", "manga"][index % 3],
+                    "saga": saga,
+                    "volume_number": index % 40 + 1 if saga else None,
+                    "status": ["to_read", "reading", "completed"][index % 3]
+                })
+
+        await asyncio.gather(*(create_book(i) for i in range(self.books)))
+
+    async def client_loop(self, http: httpx.AsyncClient, client_index: int, deadline: float):
+        """Boucle d'un client : enchaîne les routes jusqu'à l'échéance"""
+        position = client_index
+        while time.perf_counter() < deadline:
+            route = BENCHMARK_ROUTES[position % len(BENCHMARK_ROUTES)]
+            position += 1
+            start = time.perf_counter()
+            try:
+                response = await http.get(route, headers=self.headers)
+                if response.status_code >= 400:
+                    self.errors[route] += 1
+                    continue
+            except httpx.HTTPError:
+                self.errors[route] += 1
+                continue
+            self.latencies[route].append((time.perf_counter() - start) * 1000)
+
+    async def run(self) -> Dict:
+        """Exécuter le benchmark complet"""
+        limits = httpx.Limits(max_connections=self.clients, max_keepalive_connections=self.clients)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=60, limits=limits) as http:
+            await self.setup(http)
+
+            logger.info(f"🚀 {self.clients} clients concurrents pendant {self.duration}s...")
+            deadline = time.perf_counter() + self.duration
+            await asyncio.gather(*(
+                self.client_loop(http, i, deadline) for i in range(self.clients)
+            ))
+
+        return self.build_report()
+
+    def build_report(self) -> Dict:
+        """Construire le rapport de latence"""
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        routes = {}
+        for route, values in self.latencies.items():
+            routes[route] = {
+                "requests": len(values),
+                "errors": self.errors[route],
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "mean_ms": round(statistics.fmean(values), 2) if values else 0.0
+            }
+
+        return {
+            "clients": self.clients,
+            "duration_s": self.duration,
+            "books": self.books,
+            "total_requests": len(all_latencies),
+            "total_errors": sum(self.errors.values()),
+            "throughput_rps": round(len(all_latencies) / self.duration, 1),
+            "p50_ms": round(percentile(all_latencies, 50), 2),
+            "p95_ms": round(percentile(all_latencies, 95), 2),
+            "p99_ms": round(percentile(all_latencies, 99), 2),
+            "routes": routes
+        }
+
+
+def print_report(label: str, report: Dict):
+    """Afficher un rapport de benchmark"""
+    print(f"\n📊 RÉSULTATS [{label}] - {report['clients']} clients, {report['duration_s']}s")
+    print("=" * 78)
+    print(f"{'Route':<40} {'req':>7} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for route, data in report["routes"].items():
+        print(f"{route:<40} {data['requests']:>7} {data['p50_ms']:>9} {data['p95_ms']:>9} {data['p99_ms']:>9}")
+    print("-" * 78)
+    print(f"{'TOTAL':<40} {report['total_requests']:>7} {report['p50_ms']:>9} {report['p95_ms']:>9} {report['p99_ms']:>9}")
+    print(f"Débit: {report['throughput_rps']} req/s - Erreurs: {report['total_errors']}")
+
+
+def compare_reports(before_label: str, after_label: str):
+    """Comparer deux rapports enregistrés"""
+    before = json.loads((REPORTS_DIR / f"{before_label}.json").read_text())
+    after = json.loads((REPORTS_DIR / f"{after_label}.json").read_text())
+
+    print(f"\n⚖️  COMPARAISON p99 : {before_label} → {after_label}")
+    print("=" * 78)
+    print(f"{'Route':<40} {before_label:>11} {after_label:>11} {'gain':>10}")
+    for route in BENCHMARK_ROUTES:
+        b = before["routes"].get(route, {}).get("p99_ms", 0)
+        a = after["routes"].get(route, {}).get("p99_ms", 0)
+        gain = f"x{b / a:.1f}" if a else "n/a"
+        print(f"{route:<40} {b:>11} {a:>11} {gain:>10}")
+    gain = f"x{before['p99_ms'] / after['p99_ms']:.1f}" if after["p99_ms"] else "n/a"
+    print("-" * 78)
+    print(f"{'TOTAL':<40} {before['p99_ms']:>11} {after['p99_ms']:>11} {gain:>10}")
+    print(f"Débit: {before['throughput_rps']} → {after['throughput_rps']} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de charge des routes async BOOKTIME")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--books", type=int, default=500)
+    parser.add_argument("--label", default="run")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_reports(*args.compare)
+        return
+
+    benchmark = AsyncRoutesBenchmark(args.base_url, args.clients, args.duration, args.books)
+    report = asyncio.run(benchmark.run())
+    print_report(args.label, report)
+
+    REPORTS_DIR.mkdir(exist_ok=True)
+    report_path = REPORTS_DIR / f"{args.label}.json"
+    report_path.write_text(json.dumps(report, indent=2))
+    logger.info(f"💾 Rapport sauvegardé: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+⏱️ BENCHMARK DE RECHERCHE - INDEX TEXTE VS REGEX BOOKTIME
+Mesure la latence (p50/p95) de /api/books/search-grouped côté base de données
+sur une bibliothèque synthétique (50 000 livres par défaut)
+
+Fonctionnalités :
+- Insertion directe d'une bibliothèque synthétique pour un utilisateur de test
+- Même jeu de termes exécuté en mode "regex" puis "text" (book_search_service)
+- Documents examinés par requête (explain) pour vérifier l'usage de l'index
+- Rapport JSON étiqueté (--label), suppression des données de test en fin de run
+
+Utilisation :
+python benchmark_search.py                           # 50 000 livres, 20 itérations par terme
+python benchmark_search.py --books 100000 --iterations 50 --label big
+python benchmark_search.py --keep                    # conserver les livres générés
+"""
+
+import asyncio
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import async_db  # noqa: E402
+from app.database.optimization import MongoOptimizer  # noqa: E402
+from app.services.book_search import book_search_service, build_regex_filter, build_text_filter  # noqa: E402
+
+# Configuration logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = Path(__file__).parent / "benchmark_reports"
+
+# Termes recherchés : titres, sagas, auteurs, mot rare et mot absent
+SEARCH_TERMS = ["harry potter", "one piece", "tolkien", "fondation", "dragon", "introuvable"]
+
+SAGAS = ["Harry Potter", "One Piece", "Le Seigneur des Anneaux", "Fondation", "Dragon Ball", "Astérix"]
+AUTHORS = ["J.K. Rowling", "Eiichiro Oda", "J.R.R. Tolkien", "Isaac Asimov", "Akira Toriyama", "René Goscinny"]
+GENRES = ["fantasy", "aventure", "science-fiction", "humour", "policier"]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile par interpolation linéaire (pct entre 0 et 100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class SearchBenchmark:
+    """Benchmark des moteurs de recherche de livres"""
+
+    def __init__(self, books: int, iterations: int):
+        self.books = books
+        self.iterations = iterations
+        self.user_id = f"bench-search-{uuid.uuid4().hex[:8]}"
+
+    def synthetic_book(self, index: int) -> Dict:
+        """Livre synthétique : 1 livre sur 4 appartient à une saga connue"""
+        in_saga = index % 4 == 0
+        family = index % len(SAGAS)
+        return {
+            "id": str(uuid.uuid4()),
+            "user_id": self.user_id,
+            "title": f"{SAGAS[family]} tome {index % 40 + 1}" if in_saga else f"Roman générique numéro {index}",
+            "author": AUTHORS[family] if in_saga else f"Auteur {index % 2000}",
+            "saga": SAGAS[family] if in_saga else "",
+            "volume_number": index % 40 + 1 if in_saga else None,
+            "category": ["roman", "bd", "manga"][index % 3],
+            "genre": GENRES[index % len(GENRES)],
+            "publisher": f"Éditeur {index % 150}",
+            "description": f"Description synthétique du livre {index} pour le benchmark de recherche",
+            "status": ["to_read", "reading", "completed"][index % 3],
+            "date_added": datetime.utcnow() - timedelta(minutes=index)
+        }
+
+    async def setup(self):
+        """Insérer la bibliothèque synthétique et s'assurer que l'index texte existe"""
+        logger.info(f"📚 Insertion de {self.books} livres pour {self.user_id}...")
+        batch = []
+        for index in range(self.books):
+            batch.append(self.synthetic_book(index))
+            if len(batch) == 5000:
+                await async_db.books.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await async_db.books.insert_many(batch, ordered=False)
+
+        await asyncio.to_thread(MongoOptimizer().create_strategic_indexes)
+
+    async def cleanup(self):
+        """Supprimer les livres de test"""
+        result = await async_db.books.delete_many({"user_id": self.user_id})
+        logger.info(f"🧹 {result.deleted_count} livres de test supprimés")
+
+    async def docs_examined(self, query: Dict) -> int:
+        """Documents examinés par la requête (plan d'exécution)"""
+        plan = await async_db.command(
+            "explain", {"find": "books", "filter": query}, verbosity="executionStats"
+        )
+        return plan.get("executionStats", {}).get("totalDocsExamined", 0)
+
+    async def measure(self, term: str, mode: str) -> Dict:
+        """Latences d'un terme dans un mode donné"""
+        latencies = []
+        results = 0
+        for _ in range(self.iterations):
+            start = time.perf_counter()
+            books, _used_mode = await book_search_service.search(self.user_id, term, mode=mode)
+            latencies.append((time.perf_counter() - start) * 1000)
+            results = len(books)
+
+        base_filter = {"user_id": self.user_id}
+        query = (
+            {**base_filter, **build_text_filter(term)} if mode == "text"
+            else {"$and": [base_filter, build_regex_filter(term)]}
+        )
+        return {
+            "results": results,
+            "docs_examined": await self.docs_examined(query),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "mean_ms": round(statistics.fmean(latencies), 2)
+        }
+
+    async def run(self) -> Dict:
+        """Exécuter le benchmark complet"""
+        await self.setup()
+        terms = {}
+        for term in SEARCH_TERMS:
+            logger.info(f"🔎 '{term}' ({self.iterations} itérations par mode)...")
+            terms[term] = {
+                "regex": await self.measure(term, "regex"),
+                "text": await self.measure(term, "text")
+            }
+
+        return {
+            "books": self.books,
+            "iterations": self.iterations,
+            "terms": terms
+        }
+
+
+def print_report(label: str, report: Dict):
+    """Afficher un rapport de benchmark"""
+    print(f"\n📊 RÉSULTATS [{label}] - {report['books']} livres, {report['iterations']} itérations")
+    print("=" * 86)
+    print(f"{'Terme':<16} {'mode':<6} {'résultats':>10} {'docs lus':>10} {'p50':>9} {'p95':>9} {'gain p95':>10}")
+    for term, modes in report["terms"].items():
+        for mode in ("regex", "text"):
+            data = modes[mode]
+            gain = ""
+            if mode == "text" and data["p95_ms"]:
+                gain = f"x{modes['regex']['p95_ms'] / data['p95_ms']:.1f}"
+            print(
+                f"{term:<16} {mode:<6} {data['results']:>10} {data['docs_examined']:>10} "
+                f"{data['p50_ms']:>9} {data['p95_ms']:>9} {gain:>10}"
+            )
+    print("-" * 86)
+
+
+async def run_benchmark(args) -> Dict:
+    benchmark = SearchBenchmark(args.books, args.iterations)
+    try:
+        return await benchmark.run()
+    finally:
+        if not args.keep:
+            await benchmark.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de recherche BOOKTIME (index texte vs regex)")
+    parser.add_argument("--books", type=int, default=50000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--label", default="search")
+    parser.add_argument("--keep", action="store_true", help="Conserver les livres générés")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    print_report(args.label, report)
+
+    REPORTS_DIR.mkdir(exist_ok=True)
+    report_path = REPORTS_DIR / f"{args.label}.json"
+    report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    logger.info(f"💾 Rapport sauvegardé: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
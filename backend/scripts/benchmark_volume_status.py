@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+⏱️ BENCHMARK TOMES LUS - BOUCLE PAR TOME VS MISE À JOUR GROUPÉE BOOKTIME
+Compare le marquage de N tomes d'une série suivie (series_library) :
+- boucle : find_one + update_one par tome (PUT /api/library/series/{id}/volume/{n})
+- groupé : un find_one_and_update avec arrayFilters (PUT /api/library/series/{id}/volumes)
+
+Utilisation :
+python benchmark_volume_status.py                            # série de 200 tomes, 50 tomes marqués
+python benchmark_volume_status.py --volumes 1000 --mark 500 --iterations 20 --label big
+"""
+
+import asyncio
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import async_db  # noqa: E402
+from app.services.series_library import series_library_service  # noqa: E402
+
+# Configuration logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+REPORTS_DIR = Path(__file__).parent / "benchmark_reports"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentile par interpolation linéaire (pct entre 0 et 100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+class VolumeStatusBenchmark:
+    """Benchmark du marquage des tomes lus"""
+
+    def __init__(self, volumes: int, mark: int, iterations: int):
+        self.volumes = volumes
+        self.mark = min(mark, volumes)
+        self.iterations = iterations
+        self.user_id = f"bench-volumes-{uuid.uuid4().hex[:8]}"
+        self.series_id = str(uuid.uuid4())
+        self.collection = async_db.series_library
+
+    async def setup(self):
+        """Créer une série suivie de test"""
+        await self.collection.insert_one({
+            "id": self.series_id,
+            "user_id": self.user_id,
+            "series_name": f"Série benchmark {self.series_id[:8]}",
+            "authors": ["Auteur Benchmark"],
+            "category": "manga",
+            "volumes": [
+                {"volume_number": number, "volume_title": f"Tome {number}", "is_read": False, "date_read": None}
+                for number in range(1, self.volumes + 1)
+            ],
+            "series_status": "to_read",
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        })
+
+    async def reset(self):
+        """Tous les tomes non lus"""
+        await self.collection.update_one(
+            {"id": self.series_id},
+            {"$set": {"volumes.$[].is_read": False, "volumes.$[].date_read": None}}
+        )
+
+    async def cleanup(self):
+        """Supprimer les données de test"""
+        await self.collection.delete_one({"id": self.series_id})
+        await async_db.series_progress.delete_many({"user_id": self.user_id})
+
+    async def mark_loop(self, numbers: List[int]):
+        """Ancien chemin : contrôle d'appartenance puis écriture, tome par tome"""
+        for number in numbers:
+            series = await self.collection.find_one({"id": self.series_id, "user_id": self.user_id})
+            if not series:
+                raise RuntimeError("Série de test introuvable")
+            await self.collection.update_one(
+                {"id": self.series_id, "user_id": self.user_id, "volumes.volume_number": number},
+                {"$set": {
+                    "volumes.$.is_read": True,
+                    "volumes.$.date_read": datetime.utcnow().isoformat(),
+                    "updated_at": datetime.utcnow()
+                }}
+            )
+
+    async def mark_bulk(self, numbers: List[int]):
+        """Nouveau chemin : une écriture groupée"""
+        await series_library_service.set_volumes_read(self.user_id, self.series_id, numbers, True)
+
+    async def measure(self, method) -> Dict:
+        numbers = list(range(1, self.mark + 1))
+        latencies = []
+        for _ in range(self.iterations):
+            await self.reset()
+            start = time.perf_counter()
+            await method(numbers)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        series = await self.collection.find_one({"id": self.series_id}, {"volumes.is_read": 1})
+        read = sum(1 for volume in series["volumes"] if volume.get("is_read"))
+        return {
+            "read_volumes": read,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "mean_ms": round(statistics.fmean(latencies), 2)
+        }
+
+    async def run(self) -> Dict:
+        await self.setup()
+        logger.info(f"📖 {self.mark} tome(s) marqué(s) sur {self.volumes}, {self.iterations} itérations par méthode")
+        loop = await self.measure(self.mark_loop)
+        bulk = await self.measure(self.mark_bulk)
+        return {
+            "volumes": self.volumes,
+            "marked": self.mark,
+            "iterations": self.iterations,
+            "loop": {**loop, "round_trips": 2 * self.mark},
+            "bulk": {**bulk, "round_trips": 1}
+        }
+
+
+def print_report(label: str, report: Dict):
+    """Afficher un rapport de benchmark"""
+    print(f"\n📊 RÉSULTATS [{label}] - {report['marked']}/{report['volumes']} tomes, {report['iterations']} itérations")
+    print("=" * 72)
+    print(f"{'méthode':<8} {'allers-retours':>15} {'tomes lus':>10} {'p50':>9} {'p95':>9} {'moyenne':>9}")
+    for method in ("loop", "bulk"):
+        data = report[method]
+        print(
+            f"{method:<8} {data['round_trips']:>15} {data['read_volumes']:>10} "
+            f"{data['p50_ms']:>9} {data['p95_ms']:>9} {data['mean_ms']:>9}"
+        )
+    if report["bulk"]["p95_ms"]:
+        print(f"Gain p95 : x{report['loop']['p95_ms'] / report['bulk']['p95_ms']:.1f}")
+    print("-" * 72)
+
+
+async def run_benchmark(args) -> Dict:
+    benchmark = VolumeStatusBenchmark(args.volumes, args.mark, args.iterations)
+    try:
+        return await benchmark.run()
+    finally:
+        await benchmark.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du marquage des tomes lus BOOKTIME (boucle vs groupé)")
+    parser.add_argument("--volumes", type=int, default=200)
+    parser.add_argument("--mark", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--label", default="volume_status")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args))
+    print_report(args.label, report)
+
+    REPORTS_DIR.mkdir(exist_ok=True)
+    report_path = REPORTS_DIR / f"{args.label}.json"
+    report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    logger.info(f"💾 Rapport sauvegardé: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+🖼️ WORKER D'ENRICHISSEMENT D'IMAGES BOOKTIME
+Exécute les travaux de la collection `enrichment_jobs` (enregistrés par
+/api/series/enrich/images et /api/series/enrich/database) hors du serveur web.
+Plusieurs workers peuvent tourner en parallèle ; un travail interrompu est
+repris depuis son dernier point de reprise.
+
+Utilisation :
+python enrichment_worker.py                  # un travail à la fois
+python enrichment_worker.py --concurrency 2  # deux travaux simultanés dans ce processus
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import sys
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.enrichment_jobs import enrichment_job_service  # noqa: E402
+
+# Configuration logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def main(concurrency: int) -> int:
+    worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    stop = asyncio.Event()
+
+    # Arrêt propre : les travaux en cours gardent leur point de reprise
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await enrichment_job_service.run_worker(worker_id, concurrency=concurrency, stop=stop)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Worker des travaux d'enrichissement d'images")
+    parser.add_argument("--concurrency", type=int, default=1, help="Travaux simultanés dans ce processus")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.concurrency)))
@@ -12,7 +12,6 @@ Stratégies multiples :
 """
 
 import asyncio
-import aiohttp
 import json
 import re
 from typing import List, Dict, Optional, Set
@@ -21,6 +20,35 @@ import logging
 from pathlib import Path
 import random
 import time
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.openlibrary_cache import openlibrary_cache  # noqa: E402
+from app.services.series_catalog import SeriesCatalog  # noqa: E402
+from app.utils.http_client import http_client  # noqa: E402
+
+# Confiance minimale pour considérer un livre comme tome d'une série déjà connue
+KNOWN_SERIES_MIN_CONFIDENCE = 80
+
+# Patterns de détection série, compilés une fois pour tous les livres
+SERIES_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in (
+    # Numérotation explicite
+    r'(.+?)\s+(?:Book|Volume|Part|Tome|Episode)\s+(\d+)',
+    r'(.+?)\s+(\d+)(?:st|nd|rd|th)?(?:\s|$)',
+    r'(.+?)\s+#(\d+)',
+    r'(.+?):\s*(.+)',  # Titre: Sous-titre
+
+    # Patterns série
+    r'(.+?)\s+(?:Series|Saga|Chronicles|Adventures|Tales)',
+    r'(.+?)\s+(?:Cycle|Collection|Universe|World)',
+
+    # Patterns spéciaux
+    r'The\s+(.+?)\s+(?:Book|Volume|Part)',
+    r'(.+?)\s+Trilogy',
+    r'(.+?)\s+Quartet',
+)]
 
 # Configuration logging
 logging.basicConfig(
@@ -38,8 +66,8 @@ class MegaExpansionOpenLibrary:
     
     def __init__(self):
         self.base_url = "https://openlibrary.org"
-        self.session = None
         self.existing_series = set()
+        self.series_catalog = None
         self.new_series = []
         self.stats = {
             'queries_made': 0,
@@ -163,17 +191,12 @@ class MegaExpansionOpenLibrary:
     
     async def __aenter__(self):
         """Initialisation session async"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=45),
-            headers={'User-Agent': 'BOOKTIME-MegaExpansion/2.0'}
-        )
         await self.load_existing_series()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Fermeture session"""
-        if self.session:
-            await self.session.close()
+        await http_client.close()
     
     async def load_existing_series(self):
         """Charge les séries existantes pour éviter doublons"""
@@ -181,11 +204,21 @@ class MegaExpansionOpenLibrary:
             with open('/app/backend/data/extended_series_database.json', 'r') as f:
                 existing_data = json.load(f)
                 self.existing_series = {series['name'].lower() for series in existing_data}
+            # Même automate de détection que /api/series/detect
+            self.series_catalog = SeriesCatalog('/app/backend/data/extended_series_database.json')
+            self.series_catalog.reload()
             logger.info(f"📚 Chargé {len(self.existing_series)} séries existantes")
         except Exception as e:
             logger.warning(f"⚠️ Erreur chargement séries existantes: {e}")
             self.existing_series = set()
     
+    def is_known_series(self, title: str, authors: List[str]) -> bool:
+        """Livre d'une série déjà connue : un passage de l'automate, sans regex"""
+        if self.series_catalog is None:
+            return False
+        known_series = self.series_catalog.detect(title, authors[0] if authors else None, limit=1)
+        return bool(known_series) and known_series[0]['confidence'] >= KNOWN_SERIES_MIN_CONFIDENCE
+    
     async def search_open_library(self, query: str, limit: int = 1000) -> List[Dict]:
         """Recherche dans Open Library avec gestion d'erreur robuste"""
         try:
@@ -199,17 +232,17 @@ class MegaExpansionOpenLibrary:
                 'fields': 'key,title,author_name,subject,first_publish_year,number_of_pages_median,cover_i'
             }
             
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    self.stats['queries_made'] += 1
-                    books = data.get('docs', [])
-                    self.stats['books_analyzed'] += len(books)
-                    logger.info(f"🔍 Query '{query}': {len(books)} livres trouvés")
-                    return books
-                else:
-                    logger.warning(f"⚠️ Erreur API {response.status} pour query: {query}")
-                    return []
+            response = await openlibrary_cache.get(url, params=params, timeout=45)
+            if response.status_code == 200:
+                data = response.json()
+                self.stats['queries_made'] += 1
+                books = data.get('docs', [])
+                self.stats['books_analyzed'] += len(books)
+                logger.info(f"🔍 Query '{query}': {len(books)} livres trouvés")
+                return books
+            else:
+                logger.warning(f"⚠️ Erreur API {response.status_code} pour query: {query}")
+                return []
         except Exception as e:
             logger.error(f"❌ Erreur recherche '{query}': {e}")
             return []
@@ -225,26 +258,12 @@ class MegaExpansionOpenLibrary:
             if not title or not authors:
                 continue
             
-            # Patterns de détection série
-            series_patterns = [
-                # Numérotation explicite
-                r'(.+?)\s+(?:Book|Volume|Part|Tome|Episode)\s+(\d+)',
-                r'(.+?)\s+(\d+)(?:st|nd|rd|th)?(?:\s|$)',
-                r'(.+?)\s+#(\d+)',
-                r'(.+?):\s*(.+)',  # Titre: Sous-titre
-                
-                # Patterns série
-                r'(.+?)\s+(?:Series|Saga|Chronicles|Adventures|Tales)',
-                r'(.+?)\s+(?:Cycle|Collection|Universe|World)',
-                
-                # Patterns spéciaux
-                r'The\s+(.+?)\s+(?:Book|Volume|Part)',
-                r'(.+?)\s+Trilogy',
-                r'(.+?)\s+Quartet',
-            ]
+            # Série déjà connue : candidat écarté comme doublon, inutile d'appliquer les patterns
+            if self.is_known_series(title, authors):
+                continue
             
-            for pattern in series_patterns:
-                match = re.search(pattern, title, re.IGNORECASE)
+            for pattern in SERIES_PATTERNS:
+                match = pattern.search(title)
                 if match:
                     series_name = match.group(1).strip()
                     if len(series_name) > 3:  # Nom série valide
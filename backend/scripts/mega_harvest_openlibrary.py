@@ -12,7 +12,6 @@ Innovation principales :
 """
 
 import asyncio
-import aiohttp
 import json
 import re
 from typing import List, Dict, Optional, Set
@@ -20,6 +19,17 @@ from datetime import datetime
 import logging
 from pathlib import Path
 import random
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.openlibrary_cache import openlibrary_cache  # noqa: E402
+from app.services.series_catalog import SeriesCatalog  # noqa: E402
+from app.utils.http_client import http_client  # noqa: E402
+
+# Confiance minimale pour considérer un livre comme tome d'une série déjà connue
+KNOWN_SERIES_MIN_CONFIDENCE = 80
 
 # Configuration logging
 logging.basicConfig(
@@ -37,8 +47,8 @@ class MegaHarvestOpenLibrary:
     
     def __init__(self):
         self.base_url = "https://openlibrary.org"
-        self.session = None
         self.existing_series = set()
+        self.series_catalog = None
         self.new_series = []
         self.stats = {
             'queries_made': 0,
@@ -138,17 +148,12 @@ class MegaHarvestOpenLibrary:
     
     async def __aenter__(self):
         """Initialisation session async"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=45),
-            headers={'User-Agent': 'BOOKTIME-MegaHarvest/4.0'}
-        )
         await self.load_existing_series()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Fermeture session"""
-        if self.session:
-            await self.session.close()
+        await http_client.close()
     
     async def load_existing_series(self):
         """Charge les séries existantes"""
@@ -156,11 +161,21 @@ class MegaHarvestOpenLibrary:
             with open('/app/backend/data/extended_series_database.json', 'r') as f:
                 existing_data = json.load(f)
                 self.existing_series = {series['name'].lower() for series in existing_data}
+            # Même automate de détection que /api/series/detect
+            self.series_catalog = SeriesCatalog('/app/backend/data/extended_series_database.json')
+            self.series_catalog.reload()
             logger.info(f"📚 Chargé {len(self.existing_series)} séries existantes")
         except Exception as e:
             logger.warning(f"⚠️ Erreur chargement séries existantes: {e}")
             self.existing_series = set()
     
+    def is_known_series(self, title: str, authors: List[str]) -> bool:
+        """Livre d'une série déjà connue : un passage de l'automate, sans regex"""
+        if self.series_catalog is None:
+            return False
+        known_series = self.series_catalog.detect(title, authors[0] if authors else None, limit=1)
+        return bool(known_series) and known_series[0]['confidence'] >= KNOWN_SERIES_MIN_CONFIDENCE
+    
     async def search_targeted(self, query: str, limit: int = 50) -> List[Dict]:
         """Recherche ciblée ultra-optimisée"""
         try:
@@ -173,15 +188,15 @@ class MegaHarvestOpenLibrary:
                 'fields': 'key,title,author_name,subject,first_publish_year,publisher,isbn,number_of_pages_median,cover_i'
             }
             
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    self.stats['queries_made'] += 1
-                    books = data.get('docs', [])
-                    self.stats['books_analyzed'] += len(books)
-                    return books
-                else:
-                    return []
+            response = await openlibrary_cache.get(url, params=params, timeout=45)
+            if response.status_code == 200:
+                data = response.json()
+                self.stats['queries_made'] += 1
+                books = data.get('docs', [])
+                self.stats['books_analyzed'] += len(books)
+                return books
+            else:
+                return []
         except Exception as e:
             logger.error(f"❌ Erreur recherche: {e}")
             return []
@@ -197,6 +212,10 @@ class MegaHarvestOpenLibrary:
             if not title or not authors:
                 continue
             
+            # Série déjà connue : candidat écarté comme doublon, inutile d'appliquer les patterns
+            if self.is_known_series(title, authors):
+                continue
+            
             # Application de tous les patterns
             for pattern in self.super_patterns:
                 match = re.search(pattern, title, re.IGNORECASE)
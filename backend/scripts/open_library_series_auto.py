@@ -18,7 +18,6 @@ python open_library_series_auto.py --popular --limit=100
 """
 
 import asyncio
-import aiohttp
 import json
 import re
 from typing import List, Dict, Optional, Set
@@ -26,6 +25,13 @@ from datetime import datetime
 import argparse
 import logging
 from pathlib import Path
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.openlibrary_cache import openlibrary_cache  # noqa: E402
+from app.utils.http_client import http_client  # noqa: E402
 
 # Configuration logging
 logging.basicConfig(
@@ -43,7 +49,6 @@ class OpenLibrarySeriesAutomator:
     
     def __init__(self):
         self.base_url = "https://openlibrary.org"
-        self.session = None
         self.series_database = []
         self.stats = {
             'total_searched': 0,
@@ -93,16 +98,11 @@ class OpenLibrarySeriesAutomator:
     
     async def __aenter__(self):
         """Initialisation session async"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=30),
-            headers={'User-Agent': 'BOOKTIME-SeriesAutomator/1.0'}
-        )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Fermeture session"""
-        if self.session:
-            await self.session.close()
+        await http_client.close()
     
     async def search_author_series(self, author: str, limit: int = 10) -> List[Dict]:
         """Recherche séries d'un auteur spécifique"""
@@ -113,43 +113,43 @@ class OpenLibrarySeriesAutomator:
             url = f"{self.base_url}/search/authors.json"
             params = {'q': author, 'limit': 5}
             
-            async with self.session.get(url, params=params) as response:
-                if response.status != 200:
-                    logger.error(f"Erreur recherche auteur {author}: {response.status}")
-                    return []
-                
-                data = await response.json()
-                if not data.get('docs'):
-                    logger.warning(f"Auteur non trouvé: {author}")
-                    return []
-                
-                author_key = data['docs'][0]['key']
-                logger.info(f"Auteur trouvé: {author} ({author_key})")
+            response = await openlibrary_cache.get(url, params=params, timeout=30)
+            if response.status_code != 200:
+                logger.error(f"Erreur recherche auteur {author}: {response.status_code}")
+                return []
+            
+            data = response.json()
+            if not data.get('docs'):
+                logger.warning(f"Auteur non trouvé: {author}")
+                return []
+            
+            author_key = data['docs'][0]['key']
+            logger.info(f"Auteur trouvé: {author} ({author_key})")
             
             # Récupération œuvres de l'auteur
             url = f"{self.base_url}/authors/{author_key}/works.json"
             params = {'limit': limit * 5}  # Plus large pour filtrer
             
-            async with self.session.get(url, params=params) as response:
-                if response.status != 200:
-                    logger.error(f"Erreur récupération œuvres {author}: {response.status}")
-                    return []
-                
-                data = await response.json()
-                works = data.get('entries', [])
-                
-                # Filtrage et parsing des séries
-                series_data = []
-                for work in works:
-                    series_info = await self.parse_work_for_series(work, author)
-                    if series_info:
-                        series_data.append(series_info)
-                    
-                    if len(series_data) >= limit:
-                        break
+            response = await openlibrary_cache.get(url, params=params, timeout=30)
+            if response.status_code != 200:
+                logger.error(f"Erreur récupération œuvres {author}: {response.status_code}")
+                return []
+            
+            data = response.json()
+            works = data.get('entries', [])
+            
+            # Filtrage et parsing des séries
+            series_data = []
+            for work in works:
+                series_info = await self.parse_work_for_series(work, author)
+                if series_info:
+                    series_data.append(series_info)
                 
-                logger.info(f"Trouvé {len(series_data)} séries pour {author}")
-                return series_data
+                if len(series_data) >= limit:
+                    break
+            
+            logger.info(f"Trouvé {len(series_data)} séries pour {author}")
+            return series_data
         
         except Exception as e:
             logger.error(f"Erreur recherche auteur {author}: {str(e)}")
@@ -351,18 +351,18 @@ class OpenLibrarySeriesAutomator:
                     'has_fulltext': 'true'
                 }
                 
-                async with self.session.get(url, params=params) as response:
-                    if response.status != 200:
-                        logger.error(f"Erreur recherche {term}: {response.status}")
-                        continue
-                    
-                    data = await response.json()
-                    works = data.get('docs', [])
-                    
-                    for work in works:
-                        series_info = await self.parse_search_result_for_series(work)
-                        if series_info:
-                            all_series.append(series_info)
+                response = await openlibrary_cache.get(url, params=params, timeout=30)
+                if response.status_code != 200:
+                    logger.error(f"Erreur recherche {term}: {response.status_code}")
+                    continue
+                
+                data = response.json()
+                works = data.get('docs', [])
+                
+                for work in works:
+                    series_info = await self.parse_search_result_for_series(work)
+                    if series_info:
+                        all_series.append(series_info)
                 
                 # Limite pour éviter too many requests
                 await asyncio.sleep(0.5)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+🔁 RÉCONCILIATION DES STATISTIQUES MATÉRIALISÉES BOOKTIME
+Recalcule le document `user_stats` et les documents `series_progress` de
+chaque utilisateur depuis ses livres et signale les écarts avec la version
+maintenue incrémentalement
+
+Utilisation :
+python reconcile_user_stats.py                  # tous les utilisateurs, corrige les écarts
+python reconcile_user_stats.py --dry-run        # rapport seulement
+python reconcile_user_stats.py --user <user_id> # un seul utilisateur
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import async_db  # noqa: E402
+from app.services.user_stats import user_stats_service  # noqa: E402
+from app.services.series_progress import series_progress_service  # noqa: E402
+
+# Configuration logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def reconcile(user_ids, fix: bool) -> dict:
+    """Réconcilier une liste d'utilisateurs et retourner le rapport d'écarts"""
+    report = {"checked": 0, "skipped": 0, "drifted": 0, "fixed": 0, "users": {}}
+    start_time = time.time()
+
+    for user_id in user_ids:
+        drift = {}
+        stats_drift = await user_stats_service.reconcile(user_id, fix=fix)
+        if stats_drift:
+            drift["user_stats"] = stats_drift
+        series_drift = await series_progress_service.reconcile(user_id, fix=fix)
+        if series_drift:
+            drift["series_progress"] = series_drift
+        if stats_drift is None and series_drift is None:
+            # Jamais matérialisé : rien de stocké à comparer
+            report["skipped"] += 1
+            continue
+        report["checked"] += 1
+        if drift:
+            report["drifted"] += 1
+            report["users"][user_id] = drift
+            if fix:
+                report["fixed"] += 1
+            fields = [*(stats_drift or {}), *(f"saga {key}" for key in series_drift or {})]
+            logger.warning(f"⚠️ Écart pour {user_id}: {', '.join(fields)}")
+
+    report["duration_seconds"] = round(time.time() - start_time, 2)
+    return report
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Réconciliation des statistiques matérialisées")
+    parser.add_argument("--user", help="Réconcilier un seul utilisateur")
+    parser.add_argument("--dry-run", action="store_true", help="Ne pas corriger, rapport seulement")
+    args = parser.parse_args()
+
+    if args.user:
+        user_ids = [args.user]
+    else:
+        # Utilisateurs avec des livres, et ceux qui n'en ont plus mais gardent des compteurs
+        user_ids = set(await async_db.books.distinct("user_id"))
+        user_ids |= set(await async_db.user_stats.distinct("user_id"))
+        user_ids |= set(await async_db.series_progress_users.distinct("user_id"))
+        user_ids = sorted(user_id for user_id in user_ids if user_id)
+
+    logger.info(f"🔁 Réconciliation de {len(user_ids)} utilisateur(s){' (dry-run)' if args.dry_run else ''}")
+    report = await reconcile(user_ids, fix=not args.dry_run)
+
+    logger.info(
+        f"✅ {report['checked']} vérifié(s), {report['skipped']} non matérialisé(s), {report['drifted']} avec écart, "
+        f"{report['fixed']} corrigé(s) en {report['duration_seconds']}s"
+    )
+    if report["users"]:
+        print(json.dumps(report["users"], indent=2, ensure_ascii=False, default=str))
+
+    # Code de sortie non nul si des écarts ont été trouvés (utilisable en cron/CI)
+    return 1 if report["drifted"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
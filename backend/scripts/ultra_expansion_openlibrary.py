@@ -13,7 +13,6 @@ Nouvelles stratégies :
 """
 
 import asyncio
-import aiohttp
 import json
 import re
 from typing import List, Dict, Optional, Set
@@ -22,6 +21,17 @@ import logging
 from pathlib import Path
 import random
 import time
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.openlibrary_cache import openlibrary_cache  # noqa: E402
+from app.services.series_catalog import SeriesCatalog  # noqa: E402
+from app.utils.http_client import http_client  # noqa: E402
+
+# Confiance minimale pour considérer un livre comme tome d'une série déjà connue
+KNOWN_SERIES_MIN_CONFIDENCE = 80
 
 # Configuration logging
 logging.basicConfig(
@@ -39,8 +49,8 @@ class UltraExpansionOpenLibrary:
     
     def __init__(self):
         self.base_url = "https://openlibrary.org"
-        self.session = None
         self.existing_series = set()
+        self.series_catalog = None
         self.new_series = []
         self.stats = {
             'queries_made': 0,
@@ -161,17 +171,12 @@ class UltraExpansionOpenLibrary:
     
     async def __aenter__(self):
         """Initialisation session async"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=60),
-            headers={'User-Agent': 'BOOKTIME-UltraExpansion/3.0'}
-        )
         await self.load_existing_series()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Fermeture session"""
-        if self.session:
-            await self.session.close()
+        await http_client.close()
     
     async def load_existing_series(self):
         """Charge les séries existantes pour éviter doublons"""
@@ -179,11 +184,21 @@ class UltraExpansionOpenLibrary:
             with open('/app/backend/data/extended_series_database.json', 'r') as f:
                 existing_data = json.load(f)
                 self.existing_series = {series['name'].lower() for series in existing_data}
+            # Même automate de détection que /api/series/detect
+            self.series_catalog = SeriesCatalog('/app/backend/data/extended_series_database.json')
+            self.series_catalog.reload()
             logger.info(f"📚 Chargé {len(self.existing_series)} séries existantes")
         except Exception as e:
             logger.warning(f"⚠️ Erreur chargement séries existantes: {e}")
             self.existing_series = set()
     
+    def is_known_series(self, title: str, authors: List[str]) -> bool:
+        """Livre d'une série déjà connue : un passage de l'automate, sans regex"""
+        if self.series_catalog is None:
+            return False
+        known_series = self.series_catalog.detect(title, authors[0] if authors else None, limit=1)
+        return bool(known_series) and known_series[0]['confidence'] >= KNOWN_SERIES_MIN_CONFIDENCE
+    
     async def search_open_library_advanced(self, query: str, limit: int = 1000) -> List[Dict]:
         """Recherche avancée avec paramètres sophistiqués"""
         try:
@@ -197,21 +212,21 @@ class UltraExpansionOpenLibrary:
                 'fields': 'key,title,author_name,subject,first_publish_year,publisher,isbn,language,number_of_pages_median,cover_i,edition_count'
             }
             
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    self.stats['queries_made'] += 1
-                    books = data.get('docs', [])
-                    self.stats['books_analyzed'] += len(books)
-                    logger.info(f"🔍 Query '{query[:50]}...': {len(books)} livres trouvés")
-                    return books
-                elif response.status == 429:  # Rate limit
-                    logger.warning("⚠️ Rate limit detected, attente 2s")
-                    await asyncio.sleep(2)
-                    return []
-                else:
-                    logger.warning(f"⚠️ Erreur API {response.status} pour query: {query[:50]}")
-                    return []
+            response = await openlibrary_cache.get(url, params=params, timeout=60)
+            if response.status_code == 200:
+                data = response.json()
+                self.stats['queries_made'] += 1
+                books = data.get('docs', [])
+                self.stats['books_analyzed'] += len(books)
+                logger.info(f"🔍 Query '{query[:50]}...': {len(books)} livres trouvés")
+                return books
+            elif response.status_code == 429:  # Rate limit
+                logger.warning("⚠️ Rate limit detected, attente 2s")
+                await asyncio.sleep(2)
+                return []
+            else:
+                logger.warning(f"⚠️ Erreur API {response.status_code} pour query: {query[:50]}")
+                return []
         except Exception as e:
             logger.error(f"❌ Erreur recherche '{query[:50]}': {e}")
             return []
@@ -229,6 +244,10 @@ class UltraExpansionOpenLibrary:
             if not title or not authors:
                 continue
             
+            # Série déjà connue : candidat écarté comme doublon, inutile d'appliquer les patterns
+            if self.is_known_series(title, authors):
+                continue
+            
             # Application patterns avancés
             for pattern in self.advanced_series_patterns:
                 match = re.search(pattern, title, re.IGNORECASE)
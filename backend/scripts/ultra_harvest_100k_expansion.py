@@ -16,7 +16,6 @@ python ultra_harvest_100k_expansion.py --wikidata --muchamore --red-rising --exp
 """
 
 import asyncio
-import aiohttp
 import json
 import re
 import logging
@@ -25,6 +24,13 @@ from datetime import datetime
 from pathlib import Path
 import argparse
 import uuid
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.openlibrary_cache import openlibrary_cache  # noqa: E402
+from app.utils.http_client import http_client  # noqa: E402
 
 # Configuration logging
 logging.basicConfig(
@@ -41,7 +47,6 @@ class UltraHarvest100kExpansion:
     """Expansion massive des séries avec méthode Ultra Harvest 100k"""
     
     def __init__(self):
-        self.session = None
         self.series_database_path = Path('/app/backend/data/extended_series_database.json')
         self.wikidata_file_path = Path('/app/backend/wikidata_new_series_discovery.json')
         self.backup_dir = Path('/app/backend/data/backups')
@@ -64,16 +69,11 @@ class UltraHarvest100kExpansion:
     
     async def __aenter__(self):
         """Initialisation session async"""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=30),
-            headers={'User-Agent': 'BOOKTIME-UltraHarvest/2.0'}
-        )
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Fermeture session"""
-        if self.session:
-            await self.session.close()
+        await http_client.close()
     
     def load_existing_series(self) -> Set[str]:
         """Charger les séries existantes pour éviter les doublons"""
@@ -382,29 +382,29 @@ class UltraHarvest100kExpansion:
                         'sort': 'rating'
                     }
                     
-                    async with self.session.get(url, params=params) as response:
-                        if response.status != 200:
-                            logger.error(f"❌ Erreur recherche {term}: {response.status}")
-                            continue
+                    response = await openlibrary_cache.get(url, params=params, timeout=30)
+                    if response.status_code != 200:
+                        logger.error(f"❌ Erreur recherche {term}: {response.status_code}")
+                        continue
+                    
+                    data = response.json()
+                    works = data.get('docs', [])
+                    
+                    for work in works:
+                        processed_count += 1
+                        self.stats['expansion_processed'] += 1
                         
-                        data = await response.json()
-                        works = data.get('docs', [])
+                        if processed_count >= limit:
+                            break
                         
-                        for work in works:
-                            processed_count += 1
-                            self.stats['expansion_processed'] += 1
-                            
-                            if processed_count >= limit:
-                                break
-                            
-                            series_info = self.parse_openlibrary_work(work)
-                            if series_info and not self.is_duplicate(series_info['name']):
-                                self.new_series.append(series_info)
-                                self.existing_series.add(series_info['name'].lower().strip())
-                                added_count += 1
-                                self.stats['expansion_added'] += 1
-                            else:
-                                self.stats['duplicates_skipped'] += 1
+                        series_info = self.parse_openlibrary_work(work)
+                        if series_info and not self.is_duplicate(series_info['name']):
+                            self.new_series.append(series_info)
+                            self.existing_series.add(series_info['name'].lower().strip())
+                            added_count += 1
+                            self.stats['expansion_added'] += 1
+                        else:
+                            self.stats['duplicates_skipped'] += 1
                     
                     # Rate limiting
                     await asyncio.sleep(0.5)
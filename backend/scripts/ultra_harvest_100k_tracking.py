@@ -15,7 +15,6 @@ Innovations majeures :
 """
 
 import asyncio
-import aiohttp
 import json
 import re
 import sqlite3
@@ -28,6 +27,17 @@ from dataclasses import dataclass, asdict
 import random
 import time
 import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.series_catalog import SeriesCatalog  # noqa: E402
+from app.services.openlibrary_cache import openlibrary_cache  # noqa: E402
+from app.utils.http_client import http_client  # noqa: E402
+
+# Confiance minimale pour rattacher un livre à une série déjà connue
+KNOWN_SERIES_MIN_CONFIDENCE = 80
 
 # Configuration logging avancée
 def setup_logging():
@@ -206,11 +216,11 @@ class UltraHarvest100K:
     def __init__(self, target_books: int = 100000):
         self.target_books = target_books
         self.base_url = "https://openlibrary.org"
-        self.session = None
         
         # Initialisation bases de données
         self.tracking_db = BookTrackingDatabase(Path('/app/data/ultra_harvest_tracking.db'))
         self.existing_series = set()
+        self.series_catalog = None
         self.new_series_detected = []
         
         # Métriques session
@@ -340,26 +350,12 @@ class UltraHarvest100K:
     
     async def __aenter__(self):
         """Initialisation session async"""
-        timeout = aiohttp.ClientTimeout(total=60, connect=15)
-        connector = aiohttp.TCPConnector(limit=50, limit_per_host=10)
-        
-        self.session = aiohttp.ClientSession(
-            timeout=timeout,
-            connector=connector,
-            headers={
-                'User-Agent': 'BOOKTIME-UltraHarvest100K/3.0 (Educational Research)',
-                'Accept': 'application/json',
-                'Accept-Encoding': 'gzip, deflate'
-            }
-        )
-        
         await self.load_existing_series()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Fermeture session et cleanup"""
-        if self.session:
-            await self.session.close()
+        await http_client.close()
         
         # Sauvegarde finale métriques
         await self.save_session_metrics()
@@ -372,6 +368,9 @@ class UltraHarvest100K:
                 with open(series_path, 'r') as f:
                     existing_data = json.load(f)
                     self.existing_series = {series['name'].lower() for series in existing_data}
+                # Même automate de détection que /api/series/detect
+                self.series_catalog = SeriesCatalog(str(series_path))
+                self.series_catalog.reload()
                 logger.info(f"📚 Chargé {len(self.existing_series)} séries existantes")
             else:
                 logger.warning("⚠️ Fichier séries existantes non trouvé")
@@ -774,33 +773,33 @@ class UltraHarvest100K:
                 'fields': 'key,title,author_name,subject,first_publish_year,publisher,isbn,number_of_pages_median,cover_i'
             }
             
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    books = data.get('docs', [])
-                    
-                    # Filtrer livres déjà analysés
-                    new_books = []
-                    for book in books:
-                        ol_key = book.get('key', '')
-                        if ol_key and not self.tracking_db.is_book_analyzed(ol_key):
-                            new_books.append(book)
-                    
-                    processing_time = (time.time() - start_time) * 1000
-                    
-                    self.session_stats['api_calls_made'] += 1
-                    
-                    logger.info(
-                        f"🔍 {strategy_name}: Query '{query[:50]}...' → "
-                        f"{len(books)} total, {len(new_books)} nouveaux livres "
-                        f"({processing_time:.0f}ms)"
-                    )
-                    
-                    return new_books, len(books)
-                else:
-                    logger.warning(f"⚠️ API Error {response.status} pour: {query}")
-                    return [], 0
-                    
+            response = await openlibrary_cache.get(url, params=params, timeout=60)
+            if response.status_code == 200:
+                data = response.json()
+                books = data.get('docs', [])
+                
+                # Filtrer livres déjà analysés
+                new_books = []
+                for book in books:
+                    ol_key = book.get('key', '')
+                    if ol_key and not self.tracking_db.is_book_analyzed(ol_key):
+                        new_books.append(book)
+                
+                processing_time = (time.time() - start_time) * 1000
+                
+                self.session_stats['api_calls_made'] += 1
+                
+                logger.info(
+                    f"🔍 {strategy_name}: Query '{query[:50]}...' → "
+                    f"{len(books)} total, {len(new_books)} nouveaux livres "
+                    f"({processing_time:.0f}ms)"
+                )
+                
+                return new_books, len(books)
+            else:
+                logger.warning(f"⚠️ API Error {response.status_code} pour: {query}")
+                return [], 0
+                
         except Exception as e:
             logger.error(f"❌ Erreur recherche '{query}': {e}")
             return [], 0
@@ -825,7 +824,14 @@ class UltraHarvest100K:
             series_name = None
             confidence = 0
             
-            for pattern in self.mega_series_patterns:
+            # Série déjà connue : un passage de l'automate suffit, pas de regex
+            known_series = self.series_catalog.detect(title, authors[0] if authors else None, limit=1) if self.series_catalog else []
+            if known_series and known_series[0]['confidence'] >= KNOWN_SERIES_MIN_CONFIDENCE:
+                series_detected = True
+                series_name = known_series[0]['series_name']
+                confidence = min(known_series[0]['confidence'], 100)
+            
+            for pattern in ([] if series_detected else self.mega_series_patterns):
                 match = re.search(pattern, title, re.IGNORECASE)
                 if match:
                     potential_series = match.group(1).strip()
@@ -12,7 +12,6 @@ Fonctionnalités :
 """
 
 import asyncio
-import aiohttp
 import json
 import hashlib
 from typing import List, Dict, Optional, Set
@@ -21,6 +20,13 @@ from pathlib import Path
 import logging
 import time
 import shutil
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.openlibrary_cache import openlibrary_cache  # noqa: E402
+from app.utils.http_client import http_client  # noqa: E402
 
 # Configuration logging
 logging.basicConfig(
@@ -38,7 +44,6 @@ class UnlimitedExpansionManager:
     
     def __init__(self):
         self.base_url = "https://openlibrary.org"
-        self.session = None
         
         # Fichiers de tracking permanent
         self.data_dir = Path('/app/data')
@@ -236,23 +241,13 @@ class UnlimitedExpansionManager:
 
     async def __aenter__(self):
         """Context manager entry"""
-        await self._setup_session()
         await self._load_tracking_data()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit"""
         await self._save_tracking_data()
-        if self.session:
-            await self.session.close()
-
-    async def _setup_session(self):
-        """Initialiser session HTTP avec timeouts étendus"""
-        timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes timeout
-        self.session = aiohttp.ClientSession(
-            timeout=timeout,
-            headers={'User-Agent': 'BOOKTIME-UnlimitedExpansion/1.0'}
-        )
+        await http_client.close()
 
     async def _load_tracking_data(self):
         """Charger données tracking permanent"""
@@ -497,34 +492,34 @@ Stratégies: {len(self.extended_strategies)} disponibles
                 'fields': 'key,title,author_name,subject,language,publish_date,publisher'
             }
             
-            async with self.session.get(url, params=params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    books = data.get('docs', [])
-                    
-                    # Filtrer avec cache
-                    new_books = []
-                    for book in books:
-                        title = book.get('title', '')
-                        author = ', '.join(book.get('author_name', []))
-                        
-                        if not self._is_book_analyzed(title, author):
-                            self._mark_book_analyzed(title, author)
-                            new_books.append(book)
-                            self.session_stats['new_books_discovered'] += 1
-                        else:
-                            self.session_stats['books_skipped_cache'] += 1
-                    
-                    self.session_stats['queries_made'] += 1
-                    self.session_stats['books_analyzed'] += len(books)
-                    
-                    logger.info(f"🔍 Query '{query[:50]}...': {len(books)} total, {len(new_books)} nouveaux")
-                    return new_books
-                    
-                else:
-                    logger.warning(f"⚠️ Erreur API {response.status}: {query}")
-                    return []
+            response = await openlibrary_cache.get(url, params=params, timeout=300)
+            if response.status_code == 200:
+                data = response.json()
+                books = data.get('docs', [])
+                
+                # Filtrer avec cache
+                new_books = []
+                for book in books:
+                    title = book.get('title', '')
+                    author = ', '.join(book.get('author_name', []))
                     
+                    if not self._is_book_analyzed(title, author):
+                        self._mark_book_analyzed(title, author)
+                        new_books.append(book)
+                        self.session_stats['new_books_discovered'] += 1
+                    else:
+                        self.session_stats['books_skipped_cache'] += 1
+                
+                self.session_stats['queries_made'] += 1
+                self.session_stats['books_analyzed'] += len(books)
+                
+                logger.info(f"🔍 Query '{query[:50]}...': {len(books)} total, {len(new_books)} nouveaux")
+                return new_books
+                
+            else:
+                logger.warning(f"⚠️ Erreur API {response.status_code}: {query}")
+                return []
+                
         except Exception as e:
             logger.error(f"❌ Erreur recherche '{query}': {e}")
             return []
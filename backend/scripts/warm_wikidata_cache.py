@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+🧭 PRÉCHAUFFAGE DU CACHE WIKIDATA BOOKTIME
+Précharge dans la collection `wikidata_cache` les séries, les livres des séries
+et les livres individuels des auteurs présents dans la collection `books`.
+Les auteurs dont les résultats sont encore frais ne sont pas réinterrogés :
+le script peut tourner en cron plus souvent que WIKIDATA_CACHE_TTL_SECONDS.
+
+Utilisation :
+python warm_wikidata_cache.py                    # tous les auteurs de la bibliothèque
+python warm_wikidata_cache.py --limit 200        # les 200 auteurs les plus présents
+python warm_wikidata_cache.py --author "Tolkien" # un seul auteur
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import async_db  # noqa: E402
+from app.utils.http_client import http_client  # noqa: E402
+from app.wikidata.service import wikidata_service  # noqa: E402
+
+# Configuration logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def library_authors(limit: int = 0) -> list:
+    """Auteurs de la bibliothèque, les plus fréquents d'abord"""
+    pipeline = [
+        {"$match": {"author": {"$nin": [None, ""]}}},
+        {"$group": {"_id": "$author", "books": {"$sum": 1}}},
+        {"$sort": {"books": -1, "_id": 1}}
+    ]
+    if limit:
+        pipeline.append({"$limit": limit})
+    return [doc["_id"] async for doc in async_db.books.aggregate(pipeline)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Préchauffage du cache Wikidata")
+    parser.add_argument("--author", help="Préchauffer un seul auteur")
+    parser.add_argument("--limit", type=int, default=0, help="Nombre maximal d'auteurs (0 = tous)")
+    args = parser.parse_args()
+
+    authors = [args.author] if args.author else await library_authors(args.limit)
+    logger.info(f"🧭 Préchauffage Wikidata pour {len(authors)} auteur(s)")
+
+    start_time = time.time()
+    try:
+        report = await wikidata_service.warm_cache(authors)
+    finally:
+        await http_client.close()
+
+    report["duration_seconds"] = round(time.time() - start_time, 2)
+    report["cache"] = wikidata_service.cache.stats()
+    logger.info(f"✅ {report['authors']} auteur(s), {report['series']} série(s) en {report['duration_seconds']}s")
+    print(json.dumps(report, indent=2, ensure_ascii=False, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -2,8 +2,10 @@
 Tests pour l'authentification BOOKTIME
 Tests des endpoints d'inscription, connexion, et gestion des tokens
 """
+import time
 import pytest
 from httpx import AsyncClient
+from app.security.user_cache import UserCache
 
 class TestAuthentication:
     """Tests pour les endpoints d'authentification"""
@@ -75,4 +77,46 @@ class TestAuthentication:
         
         assert response.status_code == 401
         data = response.json()
-        assert "detail" in data
\ No newline at end of file
+        assert "detail" in data
+
+class TestUserCache:
+    """Tests pour le cache LRU des utilisateurs authentifiés"""
+    
+    def test_cache_hit_returns_copy(self):
+        """Test lecture d'un utilisateur en cache"""
+        cache = UserCache(maxsize=10, ttl=60)
+        cache.set("user-1", {"id": "user-1", "first_name": "Test"})
+        
+        user = cache.get("user-1")
+        user["first_name"] = "Modifié"
+        
+        assert cache.get("user-1")["first_name"] == "Test"
+        assert cache.get_stats()["hits"] == 2
+    
+    def test_cache_evicts_least_recently_used(self):
+        """Test éviction LRU quand le cache est plein"""
+        cache = UserCache(maxsize=2, ttl=60)
+        cache.set("user-1", {"id": "user-1"})
+        cache.set("user-2", {"id": "user-2"})
+        cache.get("user-1")
+        cache.set("user-3", {"id": "user-3"})
+        
+        assert cache.get("user-2") is None
+        assert cache.get("user-1") is not None
+        assert cache.get("user-3") is not None
+    
+    def test_cache_expires_entries(self):
+        """Test expiration des entrées après le TTL"""
+        cache = UserCache(maxsize=10, ttl=0.01)
+        cache.set("user-1", {"id": "user-1"})
+        time.sleep(0.02)
+        
+        assert cache.get("user-1") is None
+    
+    def test_cache_invalidation(self):
+        """Test invalidation après modification d'un utilisateur"""
+        cache = UserCache(maxsize=10, ttl=60)
+        cache.set("user-1", {"id": "user-1"})
+        cache.invalidate("user-1")
+        
+        assert cache.get("user-1") is None
@@ -149,6 +149,46 @@ class TestBooks:
         assert len(data) > 0
         assert any("Test Book 1" in book["title"] for book in data)
     
+    @pytest.mark.asyncio
+    async def test_get_books_cursor_pagination(self, test_client: AsyncClient, auth_headers: dict, multiple_test_books: list):
+        """Test parcours complet par curseur sans doublon"""
+        response = await test_client.get("/api/books/all?limit=2", headers=auth_headers)
+        assert response.status_code == 200
+        page = response.json()
+        seen = [book["id"] for book in page["items"]]
+        
+        while page["next_cursor"]:
+            response = await test_client.get(f"/api/books/all?limit=2&cursor={page['next_cursor']}", headers=auth_headers)
+            assert response.status_code == 200
+            page = response.json()
+            seen.extend(book["id"] for book in page["items"])
+        
+        assert len(seen) == len(set(seen)) == page["total"]
+    
+    @pytest.mark.asyncio
+    async def test_get_books_invalid_cursor(self, test_client: AsyncClient, auth_headers: dict):
+        """Test curseur invalide"""
+        response = await test_client.get("/api/books/all?cursor=invalide", headers=auth_headers)
+        
+        assert response.status_code == 400
+    
+    @pytest.mark.asyncio
+    async def test_write_visible_on_next_read(self, test_client: AsyncClient, auth_headers: dict, test_book: dict):
+        """Test qu'une écriture invalide les pages en cache de l'utilisateur"""
+        # Première lecture : met la page en cache
+        response = await test_client.get("/api/books/all", headers=auth_headers)
+        assert response.status_code == 200
+        assert any(book["id"] == test_book["id"] for book in response.json()["items"])
+        
+        await test_client.put(f"/api/books/{test_book['id']}", json={"status": "completed"}, headers=auth_headers)
+        response = await test_client.get("/api/books/all", headers=auth_headers)
+        updated = next(book for book in response.json()["items"] if book["id"] == test_book["id"])
+        assert updated["status"] == "completed"
+        
+        await test_client.delete(f"/api/books/{test_book['id']}", headers=auth_headers)
+        response = await test_client.get("/api/books/all", headers=auth_headers)
+        assert all(book["id"] != test_book["id"] for book in response.json()["items"])
+    
     @pytest.mark.asyncio
     async def test_books_without_auth(self, test_client: AsyncClient):
         """Test accès aux livres sans authentification"""
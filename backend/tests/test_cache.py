@@ -0,0 +1,281 @@
+"""
+Tests pour le cache à deux niveaux BOOKTIME
+Tests du L1 mémoire, du repli sans Redis, de la coalescence des chargements,
+de l'invalidation par génération et du cache des résultats Wikidata
+"""
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.utils.cache import TwoTierCache, MemoryLRUCache, serialize
+from app.utils.http_client import HttpClientPool
+from app.wikidata import cache as wikidata_cache_module
+from app.wikidata.cache import WikidataCache, cache_key
+from app.wikidata.models import WikidataAuthorResponse, WikidataSeries
+from app.wikidata.service import WikidataService
+
+# Port fermé : Redis indisponible, le cache doit fonctionner en L1 seul
+UNREACHABLE_REDIS_URL = "redis://127.0.0.1:1"
+
+class TestMemoryLRUCache:
+    """Tests pour le niveau L1 en mémoire"""
+
+    def test_evicts_by_item_count(self):
+        """Test éviction LRU au-delà du nombre d'entrées"""
+        l1 = MemoryLRUCache(max_items=2, max_bytes=1024)
+        l1.set("a", b"1", ttl=60)
+        l1.set("b", b"2", ttl=60)
+        l1.get("a")
+        l1.set("c", b"3", ttl=60)
+
+        assert l1.get("b") is None
+        assert l1.get("a") == b"1"
+        assert l1.get("c") == b"3"
+
+    def test_evicts_by_size(self):
+        """Test éviction quand la taille totale dépasse le budget en octets"""
+        l1 = MemoryLRUCache(max_items=100, max_bytes=10)
+        l1.set("a", b"12345", ttl=60)
+        l1.set("b", b"12345", ttl=60)
+        l1.set("c", b"12345", ttl=60)
+
+        assert l1.get("a") is None
+        assert l1.get_stats()["bytes"] == 10
+
+    def test_rejects_oversized_entries(self):
+        """Test qu'une entrée plus grosse que le budget n'est pas stockée"""
+        l1 = MemoryLRUCache(max_items=100, max_bytes=4)
+        l1.set("a", b"12345", ttl=60)
+
+        assert l1.get("a") is None
+
+    def test_delete_matching(self):
+        """Test suppression par pattern"""
+        l1 = MemoryLRUCache(max_items=100, max_bytes=1024)
+        l1.set("booktime:user_books:u1:x", b"1", ttl=60)
+        l1.set("booktime:user_books:u2:x", b"1", ttl=60)
+
+        assert l1.delete_matching("booktime:*:u1:*") == 1
+        assert l1.get("booktime:user_books:u2:x") == b"1"
+
+class TestTwoTierCache:
+    """Tests pour le cache L1 + L2"""
+
+    @pytest.mark.asyncio
+    async def test_serves_from_l1_without_redis(self):
+        """Test que le cache reste fonctionnel quand Redis est indisponible"""
+        cache = TwoTierCache(redis_url=UNREACHABLE_REDIS_URL)
+        key = cache.build_key("user_books", page=1, scope="user-1")
+
+        await cache.set(key, {"items": [1, 2, 3]})
+
+        assert await cache.get(key) == {"items": [1, 2, 3]}
+        stats = cache.get_local_stats()
+        assert stats["l2_available"] is False
+        assert stats["namespaces"]["user_books"]["l1_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_single_flight_coalesces_concurrent_misses(self):
+        """Test qu'un seul chargement est exécuté pour N requêtes concurrentes"""
+        cache = TwoTierCache(redis_url=UNREACHABLE_REDIS_URL)
+        key = cache.build_key("user_stats", scope="user-1")
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return {"total_books": 42}
+
+        results = await asyncio.gather(*(cache.get_or_set(key, loader) for _ in range(20)))
+
+        assert calls == 1
+        assert all(result == {"total_books": 42} for result in results)
+        assert cache.get_local_stats()["namespaces"]["user_stats"]["coalesced"] == 19
+
+    @pytest.mark.asyncio
+    async def test_single_flight_propagates_errors(self):
+        """Test que l'erreur du chargement est transmise à tous les appelants"""
+        cache = TwoTierCache(redis_url=UNREACHABLE_REDIS_URL)
+        key = cache.build_key("user_stats", scope="user-1")
+
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise ValueError("mongo down")
+
+        results = await asyncio.gather(
+            *(cache.get_or_set(key, loader) for _ in range(3)),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert await cache.get(key) is None
+
+    @pytest.mark.asyncio
+    async def test_write_visible_on_next_read(self):
+        """Test qu'après invalidation la lecture suivante recharge la donnée"""
+        cache = TwoTierCache(redis_url=UNREACHABLE_REDIS_URL)
+        key = cache.build_key("user_books", page=1, scope="user-1")
+        library = ["Dune"]
+
+        async def loader():
+            return list(library)
+
+        assert await cache.get_or_set(key, loader) == ["Dune"]
+
+        # Écriture puis invalidation, comme dans les routes de mutation
+        library.append("Hyperion")
+        await cache.flush_user_cache("user-1")
+
+        assert await cache.get_or_set(key, loader) == ["Dune", "Hyperion"]
+
+    @pytest.mark.asyncio
+    async def test_load_started_before_write_does_not_mask_it(self):
+        """Test qu'un chargement commencé avant l'invalidation n'écrase pas la nouvelle génération"""
+        cache = TwoTierCache(redis_url=UNREACHABLE_REDIS_URL)
+        key = cache.build_key("user_stats", scope="user-1")
+        release = asyncio.Event()
+
+        async def slow_stale_loader():
+            await release.wait()
+            return {"total_books": 1}
+
+        async def fresh_loader():
+            return {"total_books": 2}
+
+        stale_load = asyncio.create_task(cache.get_or_set(key, slow_stale_loader))
+        await asyncio.sleep(0)
+        await cache.flush_user_cache("user-1")
+        release.set()
+        await stale_load
+
+        assert await cache.get_or_set(key, fresh_loader) == {"total_books": 2}
+
+    @pytest.mark.asyncio
+    async def test_generation_increases_without_redis(self):
+        """Test que les générations progressent même sans Redis"""
+        cache = TwoTierCache(redis_url=UNREACHABLE_REDIS_URL)
+        before = await cache.get_generation("user-1")
+
+        after = await cache.flush_user_cache("user-1")
+
+        assert after == before + 1
+        assert await cache.get_generation("user-1") == after
+
+    @pytest.mark.asyncio
+    async def test_flush_user_cache(self):
+        """Test invalidation de toutes les clés d'un utilisateur"""
+        cache = TwoTierCache(redis_url=UNREACHABLE_REDIS_URL)
+        key_user_1 = cache.build_key("user_books", page=1, scope="user-1")
+        key_user_2 = cache.build_key("user_books", page=1, scope="user-2")
+        await cache.set(key_user_1, {"items": []})
+        await cache.set(key_user_2, {"items": []})
+
+        await cache.flush_user_cache("user-1")
+
+        assert await cache.get(key_user_1) is None
+        assert await cache.get(key_user_2) == {"items": []}
+
+    @pytest.mark.asyncio
+    async def test_generations_are_bounded(self, monkeypatch):
+        """Test générations mémorisées bornées (LRU), invalidation sans parcours du L1"""
+        monkeypatch.setattr("app.utils.cache.CacheConfig.GENERATION_MAX_ITEMS", 2)
+        cache = TwoTierCache(redis_url=UNREACHABLE_REDIS_URL)
+
+        def fail_scan(pattern):
+            raise AssertionError("parcours du L1 sur le chemin des écritures")
+
+        monkeypatch.setattr(cache.l1, "delete_matching", fail_scan)
+        for user_id in ("user-1", "user-2", "user-3"):
+            await cache.get_generation(user_id)
+        await cache.flush_user_cache("user-2")
+
+        assert list(cache._generations) == ["user-3", "user-2"]
+
+    def test_serialize_handles_datetimes(self):
+        """Test sérialisation des dates MongoDB"""
+        from datetime import datetime
+
+        payload = serialize({"date_added": datetime(2024, 1, 2, 3, 4, 5)})
+
+        assert b"2024-01-02T03:04:05" in payload
+
+
+class FakeCollection:
+    """Collection Mongo minimale en mémoire (find_one / replace_one par _id)"""
+
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one(self, query):
+        document = self.documents.get(query["_id"])
+        return dict(document) if document else None
+
+    async def replace_one(self, query, document, upsert=False):
+        self.documents[query["_id"]] = {"_id": query["_id"], **document}
+
+
+class TestWikidataCache:
+    """Tests pour le cache des résultats SPARQL Wikidata"""
+
+    def make_cache(self, collection):
+        wikidata_cache = WikidataCache()
+        wikidata_cache.collection = collection
+        return wikidata_cache
+
+    def test_cache_key_is_hashed(self):
+        """Test clé courte et stable, indépendante des espaces autour du paramètre"""
+        key = cache_key("author_series", " J.K. Rowling ")
+
+        assert key == cache_key("author_series", "J.K. Rowling")
+        assert key.startswith("author_series:") and "Rowling" not in key
+        assert key != cache_key("author_individual_books", "J.K. Rowling")
+
+    @pytest.mark.asyncio
+    async def test_shared_between_workers(self):
+        """Test résultat calculé par un worker servi à un autre depuis Mongo"""
+        collection = FakeCollection()
+        first_worker = self.make_cache(collection)
+        second_worker = self.make_cache(collection)
+
+        await first_worker.set("series_books", "Q8337", {"found": True, "books": []})
+
+        assert await second_worker.get("series_books", "Q8337") == {"found": True, "books": []}
+        assert await second_worker.get("series_books", "Q8337") == {"found": True, "books": []}
+        assert second_worker.stats()["l2_hits"] == 1
+        assert second_worker.stats()["l1_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_only_while_circuit_open(self, monkeypatch):
+        """Test entrée expirée ignorée, sauf si Wikidata est injoignable"""
+        pool = HttpClientPool()
+        monkeypatch.setattr(wikidata_cache_module, "http_client", pool)
+        collection = FakeCollection()
+        wikidata_cache = self.make_cache(collection)
+        await wikidata_cache.set("author_series", "Tolkien", {"found": True})
+        wikidata_cache.l1.clear()
+        collection.documents[cache_key("author_series", "Tolkien")]["expires_at"] = datetime.utcnow() - timedelta(hours=1)
+
+        assert await wikidata_cache.get("author_series", "Tolkien") is None
+
+        breaker = pool.breaker_for("https://query.wikidata.org")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        assert await wikidata_cache.get("author_series", "Tolkien") == {"found": True}
+        assert wikidata_cache.stats()["stale_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_service_rebuilds_models_from_cache(self):
+        """Test réponse typée reconstruite sans requête SPARQL"""
+        service = WikidataService()
+        service.cache = self.make_cache(FakeCollection())
+        response = WikidataAuthorResponse(
+            found=True, query_time=0.1, results_count=1,
+            series=[WikidataSeries(id="Q8337", name="Harry Potter", author_id="", author_name="J.K. Rowling")]
+        )
+        await service.cache.set("author_series", "J.K. Rowling", response.model_dump(mode="json"))
+
+        cached = await service.get_author_series("J.K. Rowling")
+
+        assert isinstance(cached, WikidataAuthorResponse)
+        assert cached.series[0].name == "Harry Potter"
@@ -0,0 +1,335 @@
+"""
+Tests pour le client HTTP sortant partagé BOOKTIME
+Tests du pool par hôte, des nouvelles tentatives, du délai Retry-After,
+du débit par hôte, du coupe-circuit, du cache HTTP Open Library
+et des appels concurrents bornés
+"""
+import asyncio
+from datetime import datetime, timedelta
+import httpx
+import pytest
+from app.services import openlibrary_cache as openlibrary_cache_module
+from app.services.openlibrary_cache import OpenLibraryCache, entry_state, normalize_url
+from app.utils import http_client as http_client_module
+from app.utils.fanout import StageTimer, gather_bounded
+from app.utils.http_client import HttpClientPool, host_key, retry_delay
+from app.utils.resilience import CircuitBreaker, CircuitOpenError, RateLimitExceeded, TokenBucket
+
+
+class MockedPool(HttpClientPool):
+    """Pool dont les clients répondent via un transport simulé"""
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+class TestHttpClientPool:
+    """Tests pour le pool de clients httpx"""
+
+    def test_host_key(self):
+        """Test clé de pool par schéma et hôte"""
+        assert host_key("https://OpenLibrary.org/search.json?q=x") == "https://openlibrary.org"
+        assert host_key("http://localhost:8080/a") == "http://localhost:8080"
+        with pytest.raises(ValueError):
+            host_key("/search.json")
+
+    def test_retry_delay_honors_retry_after(self):
+        """Test délai exponentiel, Retry-After prioritaire et plafonné"""
+        assert retry_delay(0) < retry_delay(1)
+        assert retry_delay(0, httpx.Response(429, headers={"Retry-After": "2"})) == 2
+        assert retry_delay(0, httpx.Response(429, headers={"Retry-After": "3600"})) <= 5
+
+    @pytest.mark.asyncio
+    async def test_one_client_per_host(self):
+        """Test un client réutilisé par hôte"""
+        pool = MockedPool(lambda request: httpx.Response(200))
+
+        first = pool.client_for("https://openlibrary.org/search.json")
+        assert pool.client_for("https://openlibrary.org/works/OL1W.json") is first
+        assert pool.client_for("https://en.wikipedia.org/w/api.php") is not first
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_retries_idempotent_requests(self, monkeypatch):
+        """Test nouvelle tentative d'un GET sur 503, pas d'un POST"""
+        monkeypatch.setattr(http_client_module, "retry_delay", lambda attempt, response=None: 0)
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(503 if len(calls) == 1 else 200)
+
+        pool = MockedPool(handler)
+        response = await pool.get("https://openlibrary.org/search.json", params={"q": "dune"})
+        assert response.status_code == 200
+        assert calls == ["GET", "GET"]
+        assert pool.stats()["hosts"]["https://openlibrary.org"]["retries"] == 1
+
+        calls.clear()
+        response = await pool.post("https://openlibrary.org/search.json")
+        assert response.status_code == 503
+        assert calls == ["POST"]
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_raises_after_last_attempt(self, monkeypatch):
+        """Test erreur réseau remontée une fois les tentatives épuisées"""
+        monkeypatch.setattr(http_client_module, "retry_delay", lambda attempt, response=None: 0)
+
+        def handler(request):
+            raise httpx.ConnectError("refusé", request=request)
+
+        pool = MockedPool(handler)
+        with pytest.raises(httpx.ConnectError):
+            await pool.get("https://query.wikidata.org/sparql", retries=1)
+        assert pool.stats()["hosts"]["https://query.wikidata.org"] == {"requests": 2, "retries": 1, "errors": 1}
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_all_attempts(self, monkeypatch):
+        """Test fournisseur muet : échec au délai global, sans tentative supplémentaire"""
+        monkeypatch.setattr(http_client_module, "retry_delay", lambda attempt, response=None: 0)
+
+        async def handler(request):
+            await asyncio.sleep(5)
+            return httpx.Response(200)
+
+        pool = MockedPool(handler)
+        started = asyncio.get_running_loop().time()
+        with pytest.raises(httpx.TimeoutException):
+            await pool.get("https://openlibrary.org/search.json", deadline=0.2)
+
+        assert asyncio.get_running_loop().time() - started < 1
+        assert pool.stats()["hosts"]["https://openlibrary.org"] == {"requests": 1, "retries": 0, "errors": 1}
+        await pool.close()
+
+
+class TestResilience:
+    """Tests pour le seau à jetons et le coupe-circuit par hôte"""
+
+    def test_token_bucket_queues_then_rejects(self):
+        """Test rafale servie, puis attente croissante, puis refus au-delà du maximum"""
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        assert bucket.reserve(max_wait=1) == 0
+        assert bucket.reserve(max_wait=1) == 0
+        # Réservations concurrentes : chacune attend son propre créneau
+        assert bucket.reserve(max_wait=1) == pytest.approx(0.1, abs=0.01)
+        assert bucket.reserve(max_wait=1) == pytest.approx(0.2, abs=0.01)
+        with pytest.raises(RateLimitExceeded):
+            bucket.reserve(max_wait=0.25)
+        assert bucket.snapshot()["rejected"] == 1
+
+    def test_circuit_half_open_probe(self):
+        """Test ouverture après N échecs, requête d'essai, fermeture sur succès"""
+        breaker = CircuitBreaker("https://openlibrary.org", failure_threshold=2, reset_seconds=60)
+        breaker.record_failure()
+        breaker.allow()
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.allow()
+
+        breaker.probe_at = 0.0
+        assert breaker.state == "half_open"
+        breaker.allow()
+        # Une seule requête d'essai à la fois
+        with pytest.raises(CircuitOpenError):
+            breaker.allow()
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast(self, monkeypatch):
+        """Test plus aucune requête sortante une fois le circuit ouvert"""
+        monkeypatch.setattr(http_client_module, "HTTP_BREAKER_FAILURE_THRESHOLD", 2)
+        calls = []
+
+        def handler(request):
+            calls.append(request.url)
+            return httpx.Response(503)
+
+        pool = MockedPool(handler)
+        for _ in range(2):
+            assert (await pool.get("https://www.googleapis.com/books/v1/volumes", retries=0)).status_code == 503
+        with pytest.raises(CircuitOpenError):
+            await pool.get("https://www.googleapis.com/books/v1/volumes", retries=0)
+
+        assert len(calls) == 2
+        assert pool.circuit_open("https://www.googleapis.com/books/v1/volumes?q=dune")
+        provider = pool.stats()["providers"]["https://www.googleapis.com"]
+        assert provider["circuit"]["short_circuited"] == 1
+        assert provider["rate_limit"]["rate"] == 5.0
+        await pool.close()
+
+
+class FakeCollection:
+    """Collection Mongo minimale en mémoire (find_one / update_one / replace_one par _id)"""
+
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one(self, query):
+        document = self.documents.get(query["_id"])
+        return dict(document) if document else None
+
+    async def update_one(self, query, update):
+        self.documents[query["_id"]].update(update["$set"])
+
+    async def replace_one(self, query, document, upsert=False):
+        self.documents[query["_id"]] = {"_id": query["_id"], **document}
+
+
+class TestOpenLibraryCache:
+    """Tests pour le cache HTTP des réponses Open Library"""
+
+    def make_cache(self, monkeypatch, handler):
+        ol_cache = OpenLibraryCache()
+        ol_cache.collection = FakeCollection()
+        monkeypatch.setattr(openlibrary_cache_module, "http_client", MockedPool(handler))
+        return ol_cache
+
+    def test_normalize_url_sorts_and_merges_params(self):
+        """Test même clé quel que soit l'ordre ou l'emplacement des paramètres"""
+        first = normalize_url("https://OpenLibrary.org/search.json?limit=10", {"q": "harry potter"})
+        second = normalize_url("https://openlibrary.org/search.json", {"q": "harry potter", "limit": 10})
+
+        assert first == second
+        assert normalize_url("https://openlibrary.org/search.json", {"q": "dune", "page": None}) == \
+            normalize_url("https://openlibrary.org/search.json?q=dune")
+
+    def test_entry_state(self):
+        """Test fraîche, périmée (revalidation en arrière-plan) puis expirée"""
+        now = datetime.utcnow()
+
+        assert entry_state({"expires_at": now + timedelta(minutes=1)}, now) == "fresh"
+        assert entry_state({"expires_at": now - timedelta(minutes=1)}, now) == "stale"
+        assert entry_state({"expires_at": now - timedelta(days=30)}, now) == "expired"
+
+    @pytest.mark.asyncio
+    async def test_second_lookup_served_from_cache(self, monkeypatch):
+        """Test une seule requête sortante pour deux recherches identiques"""
+        calls = []
+
+        def handler(request):
+            calls.append(str(request.url))
+            return httpx.Response(200, json={"docs": [{"title": "Harry Potter"}]}, headers={"ETag": '"v1"'})
+
+        ol_cache = self.make_cache(monkeypatch, handler)
+        first = await ol_cache.get("https://openlibrary.org/search.json", params={"q": "harry potter"})
+        second = await ol_cache.get("https://openlibrary.org/search.json?q=harry+potter")
+
+        assert first.json() == second.json() == {"docs": [{"title": "Harry Potter"}]}
+        assert second.headers["X-Cache"] == "HIT"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_revalidated_with_etag(self, monkeypatch):
+        """Test requête conditionnelle et 304 : corps conservé, entrée prolongée"""
+        seen_headers = []
+
+        def handler(request):
+            seen_headers.append(request.headers.get("If-None-Match"))
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"title": "Dune"}, headers={"ETag": '"v1"'})
+
+        ol_cache = self.make_cache(monkeypatch, handler)
+        url = "https://openlibrary.org/works/OL1W.json"
+        await ol_cache.get(url)
+        key = normalize_url(url)
+        ol_cache.collection.documents[key]["expires_at"] = datetime.utcnow() - timedelta(days=30)
+
+        response = await ol_cache.get(url)
+
+        assert response.json() == {"title": "Dune"}
+        assert seen_headers == [None, '"v1"']
+        assert ol_cache.collection.documents[key]["expires_at"] > datetime.utcnow()
+
+    @pytest.mark.asyncio
+    async def test_serves_stale_entry_on_network_error(self, monkeypatch):
+        """Test réponse en cache servie si Open Library est injoignable"""
+        monkeypatch.setattr(http_client_module, "retry_delay", lambda attempt, response=None: 0)
+        online = {"value": True}
+
+        def handler(request):
+            if not online["value"]:
+                raise httpx.ConnectError("injoignable", request=request)
+            return httpx.Response(200, json={"name": "Tolkien"})
+
+        ol_cache = self.make_cache(monkeypatch, handler)
+        url = "https://openlibrary.org/authors/OL26320A.json"
+        await ol_cache.get(url)
+        ol_cache.collection.documents[normalize_url(url)]["expires_at"] = datetime.utcnow() - timedelta(days=30)
+        online["value"] = False
+
+        response = await ol_cache.get(url)
+
+        assert response.json() == {"name": "Tolkien"}
+        assert ol_cache.stats()["stale_if_error"] == 1
+
+
+    @pytest.mark.asyncio
+    async def test_serves_stale_entry_while_circuit_open(self, monkeypatch):
+        """Test entrée expirée servie sans requête tant que le circuit est ouvert"""
+        calls = []
+
+        def handler(request):
+            calls.append(request.url)
+            return httpx.Response(200, json={"title": "Dune"})
+
+        ol_cache = self.make_cache(monkeypatch, handler)
+        url = "https://openlibrary.org/works/OL1W.json"
+        await ol_cache.get(url)
+        ol_cache.collection.documents[normalize_url(url)]["expires_at"] = datetime.utcnow() - timedelta(days=30)
+        breaker = openlibrary_cache_module.http_client.breaker_for("https://openlibrary.org")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        response = await ol_cache.get(url)
+
+        assert response.json() == {"title": "Dune"}
+        assert len(calls) == 1
+
+class TestFanout:
+    """Tests pour les appels concurrents bornés et la mesure par étape"""
+
+    @pytest.mark.asyncio
+    async def test_gather_bounded_limits_concurrency(self):
+        """Test au plus `limit` appels en vol, résultats dans l'ordre d'appel"""
+        running = {"now": 0, "max": 0}
+
+        async def call(value):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.01 * (5 - value))
+            running["now"] -= 1
+            return value
+
+        results = await gather_bounded([call(value) for value in range(5)], limit=2)
+
+        assert results == [0, 1, 2, 3, 4]
+        assert running["max"] == 2
+
+    @pytest.mark.asyncio
+    async def test_stage_timer_header(self):
+        """Test étapes concurrentes mesurées séparément, total de bout en bout"""
+        timer = StageTimer()
+
+        await asyncio.gather(
+            timer.measure("wikipedia", asyncio.sleep(0.02)),
+            timer.measure("openlibrary", asyncio.sleep(0.02))
+        )
+        with timer.stage("insert"):
+            pass
+
+        stages = dict(part.split(";dur=") for part in timer.header().split(", "))
+        assert list(stages) == ["wikipedia", "openlibrary", "insert", "total"]
+        # Les deux appels se chevauchent : le total reste inférieur à leur somme
+        assert float(stages["total"]) < float(stages["wikipedia"]) + float(stages["openlibrary"])
+
@@ -0,0 +1,99 @@
+"""
+Tests pour la pagination par curseur BOOKTIME
+Tests d'encodage des curseurs, des filtres par clé et de la route paginée
+"""
+import httpx
+import pytest
+from datetime import datetime
+from app.main import app
+from app.security.jwt import get_current_user
+from app.utils.pagination import CursorPaginator
+from app.services.series_cards import format_series_card
+
+class TestCursorPaginator:
+    """Tests pour les curseurs opaques (sort_key, id)"""
+
+    def test_cursor_round_trip_with_datetime(self):
+        """Test encodage/décodage d'un curseur sur date_added"""
+        book = {"id": "book-42", "date_added": datetime(2024, 5, 1, 12, 30, 15, 123000)}
+
+        token = CursorPaginator.encode_cursor(book, "date_added", "desc")
+        value, last_id = CursorPaginator.decode_cursor(token, "date_added", "desc")
+
+        assert value == book["date_added"]
+        assert last_id == "book-42"
+        assert "=" not in token
+
+    def test_cursor_rejects_other_sort(self):
+        """Test qu'un curseur ne peut pas être réutilisé avec un autre tri"""
+        token = CursorPaginator.encode_cursor({"id": "b1", "title": "Dune"}, "title", "asc")
+
+        with pytest.raises(ValueError):
+            CursorPaginator.decode_cursor(token, "title", "desc")
+
+    def test_cursor_rejects_garbage(self):
+        """Test curseur malformé"""
+        with pytest.raises(ValueError):
+            CursorPaginator.decode_cursor("pas-un-curseur", "date_added", "desc")
+
+    def test_keyset_filter_desc(self):
+        """Test filtre par clé en tri décroissant (ex aequo départagés par id)"""
+        query = {"user_id": "u1"}
+        added = datetime(2024, 5, 1)
+
+        keyset_query = CursorPaginator.apply_keyset(query, "date_added", "desc", added, "b5")
+
+        assert keyset_query["$and"][0] == query
+        assert keyset_query["$and"][1]["$or"] == [
+            {"date_added": {"$lt": added}},
+            {"date_added": added, "id": {"$lt": "b5"}},
+            {"date_added": None}
+        ]
+        assert CursorPaginator.keyset_sort("date_added", "desc") == [("date_added", -1), ("id", -1)]
+
+    def test_keyset_filter_null_sort_value(self):
+        """Test reprise après un livre sans clé de tri"""
+        keyset_query = CursorPaginator.apply_keyset({"user_id": "u1"}, "rating", "desc", None, "b5")
+
+        assert keyset_query["$and"][1] == {"rating": None, "id": {"$lt": "b5"}}
+
+class TestSeriesCards:
+    """Tests pour les cartes séries paginées"""
+
+    def test_format_card_from_progress(self):
+        """Test carte formatée : progression, statut et lien vers les tomes"""
+        card = format_series_card({
+            "user_id": "user-1",
+            "saga_key": "l'attaque des titans",
+            "name": "L'Attaque des Titans",
+            "total_books": 3,
+            "completed_books": 2,
+            "reading_books": 0,
+            "to_read_books": 1,
+            "library_volumes": 0,
+            "library_volumes_read": 0
+        })
+
+        assert card["id"] == "series_l'attaque_des_titans"
+        assert card["completion_percentage"] == 67
+        assert card["status"] == "to_read"
+        assert card["progress_text"] == "2/3 tomes lus"
+        assert card["books_url"] == "/api/sagas/L%27Attaque%20des%20Titans/books"
+        assert card["isSeriesCard"] is True
+        assert "user_id" not in card and "books" not in card
+
+class TestPaginatedBooksRoute:
+    """Tests pour la route /books/paginated"""
+
+    @pytest.mark.asyncio
+    async def test_cursor_reaches_service(self):
+        """Test curseur transmis au service : curseur invalide rejeté en 400, pas en 500"""
+        app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get("/books/paginated", params={"cursor": "pas-un-curseur"})
+        finally:
+            app.dependency_overrides.pop(get_current_user, None)
+
+        assert response.status_code == 400
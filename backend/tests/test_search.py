@@ -0,0 +1,134 @@
+"""
+Tests pour la recherche de livres BOOKTIME
+Tests du choix de moteur (index texte / regex), des filtres générés
+et du pipeline de regroupement
+"""
+import pytest
+from pymongo.errors import OperationFailure
+from app.services import book_search as book_search_module
+from app.services.book_search import (
+    BookSearchService, build_regex_filter, build_text_filter, build_grouped_pipeline, format_group, SEARCH_FIELDS
+)
+
+class TestBookSearch:
+    """Tests pour le moteur de recherche"""
+
+    def test_short_terms_use_regex(self):
+        """Test que les termes trop courts pour l'index passent par la regex"""
+        assert BookSearchService.resolve_mode("xo") == "regex"
+        assert BookSearchService.resolve_mode("potter") == "text"
+
+    def test_explicit_mode_is_kept(self):
+        """Test que le mode demandé explicitement est respecté"""
+        assert BookSearchService.resolve_mode("xo", "text") == "text"
+        assert BookSearchService.resolve_mode("potter", "regex") == "regex"
+
+    def test_regex_filter_escapes_term(self):
+        """Test échappement des caractères spéciaux dans la regex"""
+        query = build_regex_filter("c++ (2e)")
+
+        assert len(query["$or"]) == len(SEARCH_FIELDS)
+        assert query["$or"][0]["title"]["$regex"] == r"c\+\+\ \(2e\)"
+
+    def test_text_filter_ignores_accents(self):
+        """Test que la recherche texte ignore casse et accents"""
+        query = build_text_filter("astérix")
+
+        assert query["$text"]["$search"] == "astérix"
+        assert query["$text"]["$diacriticSensitive"] is False
+
+    def test_text_filter_quotes_multi_word_terms(self):
+        """Test plusieurs mots cherchés comme une phrase, pas en OU"""
+        assert build_text_filter("harry potter")["$text"]["$search"] == '"harry potter"'
+        assert build_text_filter(' harry  "pott" ')["$text"]["$search"] == '"harry pott"'
+
+    @pytest.mark.asyncio
+    async def test_missing_text_index_falls_back_to_regex(self, monkeypatch):
+        """Test repli regex quand l'index texte n'existe pas"""
+        service = BookSearchService()
+        pipelines = []
+
+        async def aggregate_groups(match, text, limit, offset, books_per_group):
+            pipelines.append(text)
+            if text:
+                raise OperationFailure("text index required for $text query", code=27)
+            return {"groups": [], "counts": []}
+
+        monkeypatch.setattr(service, "_aggregate_groups", aggregate_groups)
+
+        result = await service.search_grouped("user-1", "harry potter", mode="text")
+
+        assert pipelines == [True, False]
+        assert result["search_mode"] == "regex_fallback"
+
+class TestGroupedSearch:
+    """Tests pour le regroupement des résultats côté MongoDB"""
+
+    def test_pipeline_groups_and_paginates_server_side(self):
+        """Test que le regroupement et la pagination sont dans le pipeline"""
+        pipeline = build_grouped_pipeline({"user_id": "user-1"}, text=False, limit=5, offset=10, books_per_group=3)
+
+        group_stage = next(stage["$group"] for stage in pipeline if "$group" in stage)
+        facet = pipeline[-1]["$facet"]
+
+        assert pipeline[0] == {"$match": {"user_id": "user-1"}}
+        assert group_stage["books"]["$firstN"]["n"] == 3
+        assert facet["groups"] == [{"$skip": 10}, {"$limit": 5}]
+        assert "counts" in facet
+
+    def test_series_grouped_by_saga_key(self):
+        """Test « One Piece » et « one  piece » dans le même groupe, nom du premier tome"""
+        pipeline = build_grouped_pipeline({"user_id": "user-1"}, text=False, limit=5, offset=0)
+
+        group_stage = next(stage["$group"] for stage in pipeline if "$group" in stage)
+        series_branch = group_stage["_id"]["key"]["$switch"]["branches"][0]
+
+        assert series_branch["then"]["$ifNull"][0] == "$saga_key"
+        assert "$first" in group_stage["name"]
+
+    def test_text_pipeline_sorts_by_relevance(self):
+        """Test tri par pertinence quand l'index texte est utilisé"""
+        pipeline = build_grouped_pipeline({"$text": {"$search": "potter"}}, text=True, limit=20, offset=0)
+
+        sort_stage = [stage["$sort"] for stage in pipeline if "$sort" in stage][-1]
+
+        assert pipeline[1] == {"$addFields": {"score": {"$meta": "textScore"}}}
+        assert list(sort_stage)[0] == "relevance"
+
+    def test_format_series_group_links_remaining_books(self):
+        """Test entité série tronquée avec lien vers la suite"""
+        group = {
+            "_id": {"type": "series", "key": "one piece"}, "name": "One Piece", "type": "series",
+            "total_books": 4, "completed_books": 1, "reading_books": 1, "relevance": 2.5,
+            "books": [{"title": "One Piece 1", "author": "Eiichiro Oda", "category": "manga"}]
+        }
+
+        entity = format_group(group)
+
+        assert entity["id"] == "series_one_piece"
+        assert entity["author"] == "Eiichiro Oda"
+        assert entity["progress_percentage"] == 25
+        assert entity["has_more_books"] is True
+        assert entity["books_url"] == "/api/sagas/One%20Piece/books"
+
+    def test_format_isolated_book(self):
+        """Test qu'un groupe d'un livre isolé redevient un livre"""
+        group = {"_id": {"type": "book", "key": "b1"}, "name": "b1", "type": "book", "total_books": 1, "books": [{"id": "b1"}]}
+
+        assert format_group(group) == {"id": "b1", "type": "book"}
+
+    @pytest.mark.asyncio
+    async def test_series_progress_kept_apart_from_group_counts(self, monkeypatch):
+        """Test progression de la série entière sous series_*, compteurs du groupe inchangés"""
+        async def get_many(user_id, names):
+            return {"naruto": {"total_books": 12, "completed_books": 12, "reading_books": 0}}
+
+        monkeypatch.setattr(book_search_module.series_progress_service, "get_many", get_many)
+        results = [{"type": "series", "title": "Naruto", "total_books": 1, "completed_books": 1, "reading_books": 0}]
+
+        await BookSearchService._apply_series_progress("user-1", results)
+
+        assert results[0]["total_books"] == 1 and results[0]["completed_books"] == 1
+        assert results[0]["series_total_books"] == 12
+        assert results[0]["series_completed_books"] == 12
+        assert results[0]["series_progress_percentage"] == 100
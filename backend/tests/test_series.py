@@ -1,9 +1,23 @@
 """
 Tests pour la gestion des séries BOOKTIME
-Tests des endpoints de séries intelligentes
+Tests des endpoints de séries intelligentes et du catalogue indexé
 """
+import json
+import time
+from datetime import datetime
 import pytest
 from httpx import AsyncClient
+from pymongo.errors import DuplicateKeyError
+from app.services.series_catalog import SeriesCatalog, extract_volume_number, parse_series_hint
+from app.utils.aho_corasick import AhoCorasick
+from app.services.saga_volumes import SagaVolumeService, build_gaps_pipeline, gaps_entry, volume_gaps
+from app.utils.saga_key import saga_key, with_saga_key
+from app.services.series_library import SeriesLibraryService, expand_volume_numbers, summarize_volume_update
+from app.models.series import VolumeRange
+from app.services.enrichment_jobs import (
+    DatabaseImageStats, EnrichmentJobService, JOB_KIND_DATABASE, JOB_KIND_SERIES_LIST, claimable_filter,
+    job_percentage, new_job
+)
 
 class TestSeries:
     """Tests pour les endpoints de gestion des séries"""
@@ -171,4 +185,330 @@ class TestSeries:
         
         response = await test_client.post("/api/series/complete", json=invalid_data, headers=auth_headers)
         
-        assert response.status_code == 422
\ No newline at end of file
+        assert response.status_code == 422
+
+class TestSeriesCatalog:
+    """Tests pour le catalogue des séries en mémoire"""
+
+    HARVESTED = [
+        {"name": "Les Chroniques de Narnia", "authors": ["C.S. Lewis"], "category": "roman", "volumes": 7,
+         "keywords": ["narnia", "aslan"], "variations": ["Narnia"], "confidence_score": 90},
+        {"name": "Blacksad", "authors": ["Juan Díaz Canales"], "category": "bd", "volumes": 7,
+         "keywords": ["detective", "chat"], "variations": ["Blacksad"], "languages": ["fr"]}
+    ]
+
+    def make_catalog(self, tmp_path, series=None):
+        path = tmp_path / "extended_series_database.json"
+        path.write_text(json.dumps(self.HARVESTED if series is None else series), encoding="utf-8")
+        return SeriesCatalog(str(path), check_interval=0), path
+
+    def test_loads_harvested_and_builtin_series(self, tmp_path):
+        """Test fusion des séries de référence et de la base récoltée"""
+        catalog, _ = self.make_catalog(tmp_path)
+
+        names = [series["name"] for series in catalog.popular(limit=100)]
+
+        assert "Harry Potter" in names
+        assert "Les Chroniques de Narnia" in names
+        assert [series["name"] for series in catalog.popular(category="bd", language="en")] == ["Astérix", "Tintin"]
+
+    def test_search_by_token_prefix_and_author(self, tmp_path):
+        """Test recherche par préfixe de jeton, sans accents"""
+        catalog, _ = self.make_catalog(tmp_path)
+
+        assert [series["name"] for series in catalog.search("narn")] == ["Les Chroniques de Narnia"]
+        assert [series["name"] for series in catalog.search("diaz")] == ["Blacksad"]
+        assert catalog.search("asterix")[0]["name"] == "Astérix"
+        assert catalog.search("narnia", category="bd") == []
+
+    def test_detect_series_from_title(self, tmp_path):
+        """Test détection avec score de confiance"""
+        catalog, _ = self.make_catalog(tmp_path)
+
+        detected = catalog.detect("Harry Potter et la Coupe de feu", "J.K. Rowling")
+
+        assert detected[0]["series_name"] == "Harry Potter"
+        assert detected[0]["confidence"] >= 80 + 50
+        assert catalog.detect("Un roman sans série") == []
+
+    def test_detect_matches_whole_words_only(self, tmp_path):
+        """Test qu'une variation courte ne correspond pas à l'intérieur d'un mot"""
+        catalog, _ = self.make_catalog(tmp_path, [
+            {"name": "Blue Lock", "authors": ["Muneyuki Kaneshiro"], "variations": ["Blue Lock", "BL"], "keywords": []}
+        ])
+
+        assert catalog.detect("Tables et bloc-notes") == []
+        assert catalog.detect("BL tome 12")[0]["confidence"] == 60
+
+    def test_get_by_variation(self, tmp_path):
+        """Test accès exact par nom ou variation"""
+        catalog, _ = self.make_catalog(tmp_path)
+
+        assert catalog.get("lord of the rings")["name"] == "Le Seigneur des Anneaux"
+        assert catalog.get("Harry Potter")["tomes"][0] == "Harry Potter à l'école des sorciers"
+        assert catalog.get("Inconnue") is None
+
+    def test_detect_many_keeps_order(self, tmp_path):
+        """Test détection par lot dans l'ordre de la requête"""
+        catalog, _ = self.make_catalog(tmp_path)
+
+        results = list(catalog.detect_many([
+            ("Narnia tome 2", "C.S. Lewis"), ("Un roman isolé", None), ("Narnia tome 2", "C.S. Lewis")
+        ]))
+
+        assert [len(detected) for detected in results] == [1, 0, 1]
+        assert results[0][0]["series_name"] == "Les Chroniques de Narnia"
+
+    def test_assign_series_on_import(self, tmp_path):
+        """Test rattachement automatique saga + tome"""
+        catalog, _ = self.make_catalog(tmp_path)
+        books = [
+            {"title": "Harry Potter et la Coupe de feu", "author": "J.K. Rowling", "volume_number": 4},
+            {"title": "Mistborn: The Final Empire (Mistborn, #1)", "author": "Brandon Sanderson"},
+            {"title": "Narnia Tome 3", "author": "C.S. Lewis"},
+            {"title": "Narnia", "saga": "Déjà rangé"},
+            {"title": "Un roman isolé", "author": "Inconnu"}
+        ]
+
+        assigned = catalog.assign_series(books)
+
+        assert assigned == 3
+        assert books[0]["saga"] == "Harry Potter" and books[0]["volume_number"] == 4
+        assert books[1]["saga"] == "Mistborn" and books[1]["volume_number"] == 1
+        assert books[2]["saga"] == "Les Chroniques de Narnia" and books[2]["volume_number"] == 3
+        assert books[3]["saga"] == "Déjà rangé"
+        assert "saga" not in books[4]
+
+    def test_title_hint_wins_over_detection(self, tmp_path):
+        """Test indication "(Saga, #n)" prioritaire sur une autre série détectée dans le titre"""
+        catalog, _ = self.make_catalog(tmp_path, self.HARVESTED + [
+            {"name": "Naruto", "authors": ["Masashi Kishimoto"], "category": "manga", "variations": ["Naruto"]}
+        ])
+        books = [
+            {"title": "Boruto: Naruto Next Generations, Vol. 1 (Boruto: Naruto Next Generations, #1)",
+             "author": "Ukyō Kodachi"},
+            {"title": "Le Lion, la Sorcière blanche (narnia, #2)", "author": "C.S. Lewis"},
+            {"title": "Random (My Saga, #3)"}
+        ]
+
+        assert catalog.assign_series(books) == 3
+        assert books[0]["saga"] == "Boruto: Naruto Next Generations" and books[0]["volume_number"] == 1
+        assert books[1]["saga"] == "Les Chroniques de Narnia" and books[1]["volume_number"] == 2
+        assert books[2]["saga"] == "My Saga" and books[2]["volume_number"] == 3
+
+    def test_volume_hints(self):
+        """Test extraction du numéro de tome"""
+        assert extract_volume_number("One Piece Tome 12") == 12
+        assert extract_volume_number("Naruto Vol. 3") == 3
+        assert extract_volume_number("Un roman") is None
+        assert parse_series_hint("The Way of Kings (The Stormlight Archive, #1)") == ("The Stormlight Archive", 1)
+
+    def test_hot_reload_on_file_change(self, tmp_path):
+        """Test rechargement quand le fichier source change"""
+        catalog, path = self.make_catalog(tmp_path)
+        assert catalog.get("Saga Ajoutée") is None
+
+        path.write_text(json.dumps(self.HARVESTED + [{"name": "Saga Ajoutée", "authors": ["Auteur"]}]), encoding="utf-8")
+
+        deadline = time.time() + 5
+        while catalog.get("Saga Ajoutée") is None and time.time() < deadline:
+            time.sleep(0.01)
+        assert catalog.get("saga ajoutee")["name"] == "Saga Ajoutée"
+
+class TestAhoCorasick:
+    """Tests pour l'automate multi-motifs"""
+
+    def test_overlapping_patterns_in_one_pass(self):
+        """Test motifs imbriqués et chevauchants"""
+        matcher = AhoCorasick()
+        matcher.add(["dragon", "ball"], "db")
+        matcher.add(["dragon", "ball", "z"], "dbz")
+        matcher.add(["ball", "z", "kai"], "kai")
+        matcher.add(["z"], "z")
+        matcher.build()
+
+        matches = list(matcher.finditer(["dragon", "ball", "z", "kai"]))
+
+        assert matches == [(0, 2, "db"), (0, 3, "dbz"), (2, 3, "z"), (1, 4, "kai")]
+
+    def test_failure_links_recover_partial_match(self):
+        """Test reprise après un préfixe de motif sans correspondance"""
+        matcher = AhoCorasick()
+        matcher.add(["le", "seigneur", "des", "anneaux"], "lotr")
+        matcher.add(["seigneur", "des", "tenebres"], "sdt")
+
+        matches = list(matcher.finditer(["le", "seigneur", "des", "tenebres", "inconnu"]))
+
+        assert matches == [(1, 4, "sdt")]
+
+class TestSagaVolumes:
+    """Tests pour la création des tomes manquants"""
+
+    def test_new_volume_copies_template(self):
+        """Test tome ajouté automatiquement depuis le livre modèle"""
+        template = {"author": "Eiichiro Oda", "category": "manga", "publisher": "Glénat"}
+
+        book = SagaVolumeService.new_volume("user-1", "One Piece", 4, template)
+
+        assert book["title"] == "One Piece - Tome 4"
+        assert book["volume_number"] == 4
+        assert book["author"] == "Eiichiro Oda"
+        assert book["category"] == "manga"
+        assert book["publisher"] == "Glénat"
+        assert book["status"] == "to_read"
+        assert book["auto_added"] is True
+        assert book["saga_key"] == "one piece"
+        assert "_id" not in book
+
+    def test_volume_gaps_sequences(self):
+        """Test regroupement des tomes manquants en séquences"""
+        assert volume_gaps([9, 2, 3, 4, 7]) == [{"start": 2, "end": 4}, {"start": 7, "end": 7}, {"start": 9, "end": 9}]
+        assert volume_gaps([]) == []
+
+    def test_gaps_entry_extends_to_catalog_volumes(self):
+        """Test tomes manquants : trous internes puis tomes connus du catalogue"""
+        row = {"saga_key": "naruto", "name": "Naruto", "books_count": 4, "volumes": [1, 2, 5, 6], "max_volume": 6, "missing": [4, 3]}
+
+        entry = gaps_entry(row, {"volumes": 9})
+
+        assert entry["missing_volumes"] == [3, 4, 7, 8, 9]
+        assert entry["gaps"] == [{"start": 3, "end": 4}, {"start": 7, "end": 9}]
+        assert entry["expected_volumes"] == 9
+        assert entry["completion_percentage"] == 44
+        assert gaps_entry(row)["missing_volumes"] == [3, 4]
+
+    def test_gaps_pipeline_single_aggregation(self):
+        """Test rapport : un $group par saga et différence d'ensembles côté MongoDB"""
+        pipeline = build_gaps_pipeline("user-1")
+
+        assert pipeline[0]["$match"] == {"user_id": "user-1", "saga_key": {"$nin": ["", None]}}
+        assert "$addToSet" in pipeline[1]["$group"]["volumes"]
+        assert "$setDifference" in pipeline[4]["$addFields"]["missing"]
+
+    def test_saga_key_normalization(self):
+        """Test clé de saga : casse, accents et espaces ignorés, sans sous-chaîne"""
+        assert saga_key("L'Attaque des  Titans ") == saga_key("l'attaque des titans")
+        assert saga_key("Les Rougon-Macquart") == saga_key("LES ROUGON-MACQUART")
+        assert saga_key("Éragon") == "eragon"
+        assert saga_key("Straße") == "strasse"
+        assert saga_key(None) == ""
+        assert saga_key("Naruto") != saga_key("Boruto: Naruto Next Generations")
+
+    def test_with_saga_key_only_when_saga_written(self):
+        """Test clé posée seulement si le document ou le $set contient saga"""
+        assert with_saga_key({"status": "completed"}) == {"status": "completed"}
+        assert with_saga_key({"saga": "Astérix"})["saga_key"] == "asterix"
+
+class TestBulkVolumeStatus:
+    """Tests pour la mise à jour groupée des tomes lus"""
+
+    def test_expand_lists_and_ranges(self):
+        """Test numéros dédoublonnés et triés depuis liste et plages"""
+        numbers = expand_volume_numbers([7, 3, 3], [{"start": 1, "end": 4}, VolumeRange(start=10, end=11)])
+
+        assert numbers == [1, 2, 3, 4, 7, 10, 11]
+
+    def test_expand_rejects_invalid_requests(self):
+        """Test demande vide, plage inversée ou trop grande"""
+        with pytest.raises(ValueError):
+            expand_volume_numbers([], [])
+        with pytest.raises(ValueError):
+            expand_volume_numbers([], [{"start": 5, "end": 2}])
+        with pytest.raises(ValueError):
+            expand_volume_numbers([], [{"start": 1, "end": 10 ** 6}])
+
+    def test_summary_counts_only_flipped_volumes(self):
+        """Test bilan : tomes basculés, inchangés, absents et progression"""
+        volumes = [{"volume_number": number, "is_read": number <= 2} for number in range(1, 6)]
+
+        summary = summarize_volume_update(volumes, [1, 2, 3, 4, 9], is_read=True)
+
+        assert summary["updated_volumes"] == [3, 4]
+        assert summary["unchanged_volumes"] == [1, 2]
+        assert summary["missing_volumes"] == [9]
+        assert summary["progress"] == {"read_volumes": 4, "total_volumes": 5, "completion_percentage": 80}
+
+    @pytest.mark.asyncio
+    async def test_series_without_volumes_is_not_found(self):
+        """Test préférence de lecture (pas de tableau volumes) : série introuvable, pas d'erreur"""
+        queries = []
+
+        class FakeSeriesLibrary:
+            async def find_one_and_update(self, query, update, **kwargs):
+                queries.append(query)
+                return None
+
+        service = SeriesLibraryService()
+        service.collection = FakeSeriesLibrary()
+
+        assert await service.set_volumes_read("user-1", "pref-1", [1], True) is None
+        assert queries[0]["volumes"] == {"$exists": True}
+
+
+class TestEnrichmentJobs:
+    """Tests pour la file des travaux d'enrichissement d'images"""
+
+    def test_new_job_is_queued_with_progress(self):
+        """Test travail en attente, point de reprise à zéro"""
+        job = new_job("user-1", JOB_KIND_SERIES_LIST, {"series_list": [{"name": "One Piece"}]}, 1)
+
+        assert job["status"] == "queued"
+        assert job["checkpoint"] == 0
+        assert job["progress"] == {"total": 1, "processed": 0, "enriched": 0}
+        assert job_percentage(job) == 0
+
+    def test_claimable_filter_includes_expired_leases(self):
+        """Test travaux réservables : en attente ou bail expiré, essais restants"""
+        now = datetime.utcnow()
+        query = claimable_filter(now)
+
+        assert {"status": "queued"} in query["$or"]
+        assert {"status": "running", "lease_expires_at": {"$lt": now}} in query["$or"]
+        assert "$lt" in query["attempts"]
+
+    def test_only_exclusive_jobs_carry_the_lock_key(self):
+        """Test clé d'exclusivité posée sur l'enrichissement de la base seulement"""
+        assert new_job("user-1", JOB_KIND_DATABASE, {}, 10)["exclusive_key"] == JOB_KIND_DATABASE
+        assert "exclusive_key" not in new_job("user-1", JOB_KIND_SERIES_LIST, {}, 10)
+
+    @pytest.mark.asyncio
+    async def test_second_database_job_returns_the_active_one(self):
+        """Test insertion refusée par l'index unique : le travail actif est renvoyé"""
+        active = new_job("user-1", JOB_KIND_DATABASE, {}, 10)
+
+        class FakeJobs:
+            async def create_index(self, *args, **kwargs):
+                pass
+
+            async def insert_one(self, job):
+                raise DuplicateKeyError("E11000 duplicate key error")
+
+        service = EnrichmentJobService()
+        service.collection = FakeJobs()
+
+        async def active_jobs(kind):
+            return [active]
+
+        service.active = active_jobs
+        job, created = await service.enqueue_exclusive("user-2", JOB_KIND_DATABASE, {}, 10)
+
+        assert created is False and job["id"] == active["id"]
+
+    def test_percentage_follows_checkpoint(self):
+        """Test pourcentage d'avancement"""
+        assert job_percentage({"progress": {"total": 200, "processed": 50}}) == 25
+        assert job_percentage({"progress": {"total": 0, "processed": 0}}) == 0
+
+    def test_database_stats_cached_until_file_changes(self, tmp_path):
+        """Test comptage des images relu seulement si le fichier change"""
+        path = tmp_path / "series.json"
+        path.write_text(json.dumps([{"name": "A", "cover_url": "http://a"}, {"name": "B"}]))
+        stats = DatabaseImageStats()
+
+        assert stats._compute(str(path)) == {"total_series": 2, "series_with_images": 1}
+        stats._cache[str(path)][1]["total_series"] = 99  # valeur en cache réutilisée
+        assert stats._compute(str(path))["total_series"] == 99
+
+        path.write_text(json.dumps([{"name": "A", "cover_url": "http://a"}, {"name": "B", "cover_url": "http://b"}, {"name": "C"}]))
+        assert stats._compute(str(path)) == {"total_series": 3, "series_with_images": 2}
+        assert stats._compute(str(tmp_path / "absent.json")) is None
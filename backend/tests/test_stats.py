@@ -0,0 +1,446 @@
+"""
+Tests pour les statistiques de bibliothèque BOOKTIME
+Tests du pipeline $facet, de la normalisation des résultats
+et des compteurs matérialisés
+"""
+import copy
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from pymongo import ReplaceOne, UpdateOne
+from app.services.stats_service import LibraryStatsService
+from app.services.user_stats import UserStatsService, book_contribution, contribution_delta, build_stats_document
+from app.services.series_progress import (
+    SeriesProgressService, build_progress_document, status_delta, progress_percentage, global_status
+)
+
+class TestLibraryStats:
+    """Tests pour le service de statistiques"""
+
+    def test_pipeline_is_single_facet(self):
+        """Test que toutes les statistiques sont calculées en un seul $facet"""
+        pipeline = LibraryStatsService.build_pipeline("user-1")
+
+        assert pipeline[0] == {"$match": {"user_id": "user-1"}}
+        assert len(pipeline) == 2
+        assert set(pipeline[1]["$facet"]) == {
+            "totals", "by_status", "by_category", "by_rating", "authors", "sagas"
+        }
+
+    def test_normalize_facets(self):
+        """Test conversion de la sortie $facet"""
+        facets = {
+            "totals": [{"_id": None, "total_books": 4, "auto_added_count": 1,
+                        "total_pages_read": 350, "average_rating": 4.5}],
+            "by_status": [{"_id": "completed", "count": 2}, {"_id": "to_read", "count": 2}],
+            "by_category": [{"_id": "manga", "count": 3}, {"_id": None, "count": 1}],
+            "by_rating": [{"_id": 5, "count": 1}, {"_id": 4, "count": 1}],
+            "authors": [{"count": 3}],
+            "sagas": []
+        }
+
+        stats = LibraryStatsService.normalize(facets)
+
+        assert stats["total_books"] == 4
+        assert stats["completed_books"] == 2
+        assert stats["reading_books"] == 0
+        assert stats["by_category"] == {"manga": 3, "unknown": 1}
+        assert stats["by_rating"] == {"5": 1, "4": 1}
+        assert stats["authors_count"] == 3
+        assert stats["sagas_count"] == 0
+        assert stats["total_pages_read"] == 350
+
+    def test_normalize_empty_library(self):
+        """Test utilisateur sans livres"""
+        stats = LibraryStatsService.normalize({})
+
+        assert stats["total_books"] == 0
+        assert stats["by_status"] == {}
+        assert stats["average_rating"] == 0
+
+class TestMaterializedUserStats:
+    """Tests pour les compteurs incrémentaux de user_stats"""
+
+    def test_book_contribution(self):
+        """Test compteurs apportés par un livre terminé"""
+        book = {
+            "status": "completed", "category": "manga", "author": "Eiichiro Oda",
+            "saga": "One Piece", "total_pages": 200, "date_completed": datetime(2024, 3, 9)
+        }
+
+        contribution = book_contribution(book)
+
+        assert contribution["total_books"] == 1
+        assert contribution["by_status.completed"] == 1
+        assert contribution["by_category.manga"] == 1
+        assert contribution["pages_read"] == 200
+        assert contribution["completed_by_month.2024-03"] == 1
+        assert sum(1 for path in contribution if path.startswith("author_refs.")) == 1
+
+    def test_update_delta_only_touches_changed_counters(self):
+        """Test qu'une mise à jour n'applique que la différence"""
+        before = {"status": "reading", "category": "roman", "author": "Frank Herbert", "total_pages": 600}
+        after = {**before, "status": "completed", "date_completed": "2024-06-01T10:00:00"}
+
+        delta = contribution_delta(before=[before], after=[after])
+
+        assert delta == {
+            "by_status.reading": -1,
+            "by_status.completed": 1,
+            "pages_read": 600,
+            "completed_by_month.2024-06": 1
+        }
+
+    def test_rebuild_matches_incremental_counters(self):
+        """Test que la reconstruction et les incréments donnent le même résultat"""
+        books = [
+            {"status": "to_read", "category": "bd", "author": "Goscinny", "saga": "Astérix"},
+            {"status": "to_read", "category": "bd", "author": "Goscinny", "saga": "Astérix", "auto_added": True},
+            {"status": "reading", "category": "roman", "author": "", "saga": None}
+        ]
+
+        document = build_stats_document("user-1", books)
+
+        assert document["total_books"] == 3
+        assert document["by_status"] == {"to_read": 2, "reading": 1}
+        assert document["authors_count"] == 1
+        assert document["sagas_count"] == 1
+        assert document["auto_added_count"] == 1
+        assert contribution_delta(after=books)["total_books"] == document["total_books"]
+
+    def test_delete_cancels_create(self):
+        """Test qu'une suppression annule exactement la création"""
+        book = {"status": "completed", "category": "roman", "author": "Tolkien", "total_pages": 400}
+
+        assert contribution_delta(before=[book], after=[book]) == {}
+
+class FakeStatsCollection:
+    """Collection user_stats minimale en mémoire : filtres d'égalité, $set / $inc / $setOnInsert"""
+
+    def __init__(self):
+        self.documents = []
+
+    def _find(self, query):
+        for document in self.documents:
+            if all(document.get(field) == value for field, value in query.items()):
+                return document
+        return None
+
+    @staticmethod
+    def _apply(document, update):
+        for path, value in update.get("$set", {}).items():
+            document[path] = value
+        for path, value in update.get("$inc", {}).items():
+            target = document
+            *groups, key = path.split(".")
+            for group in groups:
+                target = target.setdefault(group, {})
+            target[key] = (target.get(key) or 0) + value
+
+    async def find_one(self, query, projection=None):
+        document = self._find(query)
+        return copy.deepcopy(document) if document else None
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        document = self._find(query)
+        if document is None:
+            return None
+        self._apply(document, update)
+        return copy.deepcopy(document)
+
+    async def update_one(self, query, update, upsert=False):
+        document = self._find(query)
+        if document is None:
+            if not upsert:
+                return SimpleNamespace(matched_count=0, upserted_id=None)
+            document = {**query, **copy.deepcopy(update.get("$setOnInsert", {}))}
+            self.documents.append(document)
+            self._apply(document, update)
+            return SimpleNamespace(matched_count=0, upserted_id=len(self.documents))
+        self._apply(document, update)
+        return SimpleNamespace(matched_count=1, upserted_id=None)
+
+    async def replace_one(self, query, replacement):
+        document = self._find(query)
+        if document is None:
+            return SimpleNamespace(matched_count=0)
+        document.clear()
+        document.update(copy.deepcopy(replacement))
+        return SimpleNamespace(matched_count=1)
+
+    async def delete_one(self, query):
+        document = self._find(query)
+        if document is not None:
+            self.documents.remove(document)
+        return SimpleNamespace(deleted_count=int(document is not None))
+
+    def find(self, query, projection=None):
+        documents = [copy.deepcopy(document) for document in self.documents
+                     if all(document.get(field) == value for field, value in query.items())]
+
+        async def to_list(length=None):
+            return documents
+
+        return SimpleNamespace(to_list=to_list)
+
+    async def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            if isinstance(operation, ReplaceOne):
+                await self.replace_one(operation._filter, operation._doc)
+            elif isinstance(operation, UpdateOne):
+                await self.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+            else:
+                await self.delete_one(operation._filter)
+
+
+class FakeBooks:
+    """Collection books : agrégat de progression renvoyant des lignes prédéfinies"""
+
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.calls = 0
+        # Écriture concurrente jouée une fois l'agrégat calculé, avant son résultat
+        self.during_aggregate = None
+
+    def aggregate(self, pipeline, **kwargs):
+        self.calls += 1
+        rows = [dict(row) for row in self.rows]
+
+        async def to_list(length=None):
+            hook, self.during_aggregate = self.during_aggregate, None
+            if hook:
+                await hook()
+            return rows
+
+        return SimpleNamespace(to_list=to_list)
+
+
+def fake_progress_service(rows=None):
+    """Service de progression branché sur des collections en mémoire"""
+    service = SeriesProgressService()
+    service.collection = FakeStatsCollection()
+    service.users = FakeStatsCollection()
+    service.db = SimpleNamespace(books=FakeBooks(rows))
+
+    async def library_by_key(user_id):
+        return {}
+
+    service._library_by_key = library_by_key
+    return service
+
+
+class TestUserStatsRebuild:
+    """Tests de la reconstruction face aux écritures concurrentes"""
+
+    @pytest.mark.asyncio
+    async def test_write_during_first_rebuild_is_kept(self):
+        """Test livre créé pendant la reconstruction : compté, document propre"""
+        service = UserStatsService()
+        service.collection = FakeStatsCollection()
+        book = {"status": "reading", "category": "roman"}
+        library = []
+
+        async def compute(user_id):
+            snapshot = build_stats_document(user_id, list(library))
+            if not library:
+                # Création concurrente : le livre manque au calcul, son incrément arrive sans document
+                library.append(book)
+                await service.record_books_added(user_id, [book])
+            return snapshot
+
+        service.compute = compute
+        stats = await service.get("user-1")
+
+        assert stats["total_books"] == 1
+        stored = service.collection.documents[0]
+        assert stored["total_books"] == 1 and not stored.get("dirty")
+
+    @pytest.mark.asyncio
+    async def test_rebuild_does_not_overwrite_concurrent_increment(self):
+        """Test incrément arrivé pendant le calcul : reconstruction recommencée"""
+        service = UserStatsService()
+        service.collection = FakeStatsCollection()
+        service.collection.documents.append({"user_id": "user-1", "total_books": 5, "writes": 3})
+        library = [{"status": "to_read", "category": "bd"}]
+        calls = []
+
+        async def compute(user_id):
+            calls.append(len(library))
+            snapshot = build_stats_document(user_id, list(library))
+            if len(calls) == 1:
+                added = {"status": "to_read", "category": "bd"}
+                library.append(added)
+                await service.record_books_added(user_id, [added])
+            return snapshot
+
+        service.compute = compute
+        document = await service.rebuild("user-1")
+
+        assert calls == [1, 2]
+        assert document["total_books"] == 2
+        assert service.collection.documents[0]["total_books"] == 2
+
+
+    @pytest.mark.asyncio
+    async def test_reconcile_skips_users_never_materialized(self):
+        """Test réconciliation : pas d'écart signalé sans document, écart détecté sinon"""
+        service = UserStatsService()
+        service.collection = FakeStatsCollection()
+        library = [{"status": "completed", "category": "roman"}]
+
+        async def compute(user_id):
+            return build_stats_document(user_id, list(library))
+
+        service.compute = compute
+
+        assert await service.reconcile("user-1", fix=False) is None
+
+        service.collection.documents.append({**build_stats_document("user-1", []), "writes": 0})
+        drift = await service.reconcile("user-1", fix=False)
+
+        assert drift["total_books"] == {"stored": 0, "expected": 1}
+
+
+class TestSeriesProgress:
+    """Tests pour la progression matérialisée des séries"""
+
+    def test_status_delta_per_saga(self):
+        """Test $inc par saga : seul le statut modifié bouge"""
+        before = [
+            {"saga": "One Piece", "status": "to_read"},
+            {"saga": "one  piece", "status": "reading"},
+            {"saga": "Naruto", "status": "completed"},
+            {"saga": "", "status": "reading"}
+        ]
+        after = [
+            {"saga": "One Piece", "status": "completed"},
+            {"saga": "one  piece", "status": "completed"},
+            {"saga": "Naruto", "status": "completed"},
+            {"saga": "", "status": "completed"}
+        ]
+
+        delta = status_delta(before, after)
+
+        assert delta == {"one piece": {"completed_books": 2, "to_read_books": -1, "reading_books": -1}}
+
+    def test_progress_document_merges_books_and_library(self):
+        """Test document : compteurs des livres et tomes lus de series_library"""
+        row = {
+            "_id": "one piece", "name": "One Piece", "author": "Eiichiro Oda", "category": "manga",
+            "total_books": 4, "completed_books": 3, "reading_books": 1, "to_read_books": 0,
+            "max_volume": 4, "cover_url": "https://covers.example/4.jpg"
+        }
+        library = {"series_name": "One Piece", "volumes": [{"is_read": True}, {"is_read": False}]}
+
+        document = build_progress_document("user-1", "one piece", row, library)
+
+        assert document["total_books"] == 4
+        assert document["library_volumes"] == 2
+        assert document["library_volumes_read"] == 1
+        assert progress_percentage(document) == 75
+        assert global_status(document) == "reading"
+
+    def test_library_only_series(self):
+        """Test série suivie sans livre : progression des tomes suivis"""
+        library = {"series_name": "Berserk", "authors": ["Kentaro Miura"], "category": "manga",
+                   "volumes": [{"is_read": True}, {"is_read": True}, {"is_read": False}, {"is_read": False}]}
+
+        document = build_progress_document("user-1", "berserk", None, library)
+
+        assert document["name"] == "Berserk"
+        assert document["total_books"] == 0
+        assert progress_percentage(document) == 50
+        assert build_progress_document("user-1", "berserk", None, None) is None
+
+    @pytest.mark.asyncio
+    async def test_user_without_series_is_rebuilt_once(self):
+        """Test utilisateur sans saga : marqué matérialisé, pas de reconstruction à chaque lecture"""
+        service = fake_progress_service()
+
+        await service.ensure("user-1")
+        await service.ensure("user-1")
+
+        assert service.db.books.calls == 1
+        assert await service.is_materialized("user-1")
+
+    @pytest.mark.asyncio
+    async def test_refresh_does_not_overwrite_concurrent_increment(self):
+        """Test $inc arrivé pendant le recalcul d'une saga : recalcul recommencé"""
+        row = {"_id": "one piece", "name": "One Piece", "total_books": 2,
+               "completed_books": 0, "reading_books": 0, "to_read_books": 2}
+        service = fake_progress_service([row])
+        await service.users.update_one({"user_id": "user-1"}, {"$set": {"materialized_at": datetime.utcnow()}}, upsert=True)
+        service.collection.documents.append(build_progress_document("user-1", "one piece", dict(row)))
+
+        async def finish_book():
+            # Le livre passe à « lu » après la lecture des livres par l'agrégat
+            row.update(completed_books=1, to_read_books=1)
+            await service.record_status_change(
+                "user-1", [{"saga": "One Piece", "status": "to_read"}], [{"saga": "One Piece", "status": "completed"}]
+            )
+
+        service.db.books.during_aggregate = finish_book
+        await service.refresh("user-1", ["One Piece"])
+
+        stored = service.collection.documents[0]
+        assert service.db.books.calls == 2
+        assert stored["completed_books"] == 1 and stored["to_read_books"] == 1
+
+    @pytest.mark.asyncio
+    async def test_status_change_during_first_rebuild_is_kept(self):
+        """Test livre terminé pendant la première reconstruction : recalculé, pas écrasé"""
+        row = {"_id": "one piece", "name": "One Piece", "total_books": 2,
+               "completed_books": 0, "reading_books": 0, "to_read_books": 2}
+        service = fake_progress_service([row])
+
+        async def finish_book():
+            row.update(completed_books=1, to_read_books=1)
+            await service.record_status_change(
+                "user-1", [{"saga": "One Piece", "status": "to_read"}], [{"saga": "One Piece", "status": "completed"}]
+            )
+
+        service.db.books.during_aggregate = finish_book
+        await service.rebuild("user-1")
+
+        stored = service.collection.documents
+        assert len(stored) == 1
+        assert stored[0]["completed_books"] == 1 and stored[0]["to_read_books"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rebuild_does_not_overwrite_concurrent_increment(self):
+        """Test $inc arrivé pendant la reconstruction d'un utilisateur matérialisé : saga recalculée"""
+        row = {"_id": "one piece", "name": "One Piece", "total_books": 2,
+               "completed_books": 0, "reading_books": 0, "to_read_books": 2}
+        service = fake_progress_service([row])
+        await service.users.update_one({"user_id": "user-1"}, {"$set": {"materialized_at": datetime.utcnow()}}, upsert=True)
+        service.collection.documents.append({**build_progress_document("user-1", "one piece", dict(row)), "writes": 4})
+
+        async def finish_book():
+            row.update(completed_books=1, to_read_books=1)
+            await service.record_status_change(
+                "user-1", [{"saga": "One Piece", "status": "to_read"}], [{"saga": "One Piece", "status": "completed"}]
+            )
+
+        service.db.books.during_aggregate = finish_book
+        await service.rebuild("user-1")
+
+        stored = service.collection.documents[0]
+        assert stored["completed_books"] == 1 and stored["to_read_books"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reconcile_reports_and_fixes_drift(self):
+        """Test réconciliation : écart signalé puis corrigé, utilisateur non matérialisé ignoré"""
+        row = {"_id": "one piece", "name": "One Piece", "total_books": 3,
+               "completed_books": 3, "reading_books": 0, "to_read_books": 0}
+        service = fake_progress_service([row])
+
+        assert await service.reconcile("user-1") is None
+
+        await service.rebuild("user-1")
+        service.collection.documents[0]["completed_books"] = 1
+        drift = await service.reconcile("user-1")
+
+        assert drift["one piece"]["stored"]["completed_books"] == 1
+        assert drift["one piece"]["expected"]["completed_books"] == 3
+        assert service.collection.documents[0]["completed_books"] == 3
+        assert await service.reconcile("user-1") == {}